@@ -0,0 +1,72 @@
+# benchmarks/bench_employee_client.py
+"""
+Benchmark da validação de funcionários contra o servidor local.
+
+Mede o custo de uma validação servida pelo cache, de uma consulta remota
+com o pool de conexões e de uma consulta abrindo uma conexão nova a cada
+vez, e quantas requisições uma rajada de validações simultâneas do mesmo
+id gera.
+
+Uso: python benchmarks/bench_employee_client.py [--consultas 2000] [--rajada 500]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+
+from src.equipamento.infrastructure.clients.employee_client import CacheDeValidacoes, ClienteDeFuncionarios  # noqa: E402
+from src.equipamento.infrastructure.clients.employee_stub_server import ServidorDeFuncionariosLocal  # noqa: E402
+
+
+async def medir(args, servidor: ServidorDeFuncionariosLocal):
+    # TTL zero: toda validação vai ao serviço, pelo pool.
+    sem_cache = ClienteDeFuncionarios(servidor.url, cache=CacheDeValidacoes(ttl_positivo=0, ttl_negativo=0))
+    inicio = time.perf_counter()
+    for _ in range(args.consultas):
+        await sem_cache.existe(1)
+    remota_pool = (time.perf_counter() - inicio) / args.consultas
+    await sem_cache.fechar()
+
+    inicio = time.perf_counter()
+    for _ in range(args.consultas):
+        async with httpx.AsyncClient(base_url=servidor.url) as http:
+            await http.get("/funcionario/1")
+    remota_sem_pool = (time.perf_counter() - inicio) / args.consultas
+
+    cliente = ClienteDeFuncionarios(servidor.url)
+    await cliente.existe(1)
+    inicio = time.perf_counter()
+    for _ in range(args.consultas * 100):
+        await cliente.existe(1)
+    acerto = (time.perf_counter() - inicio) / (args.consultas * 100)
+
+    antes = servidor.requisicoes
+    await asyncio.gather(*(cliente.existe(2) for _ in range(args.rajada)))
+    rajada = servidor.requisicoes - antes
+    await cliente.fechar()
+    return acerto, remota_pool, remota_sem_pool, rajada
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--rajada", type=int, default=500)
+    args = parser.parse_args()
+
+    with ServidorDeFuncionariosLocal(funcionarios=[1, 2], atraso=0.001) as servidor:
+        acerto, remota_pool, remota_sem_pool, rajada = asyncio.run(medir(args, servidor))
+
+    print(f"validação pelo cache:             {acerto * 1e6:8.2f} µs")
+    print(f"consulta remota com pool:         {remota_pool * 1e6:8.1f} µs")
+    print(f"consulta remota, conexão nova:    {remota_sem_pool * 1e6:8.1f} µs")
+    print(f"rajada de {args.rajada} validações do mesmo id: {rajada} requisição(ões) ao serviço")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_rate_limiter.py
+"""
+Benchmark do limite de requisições por cliente.
+
+Mede o custo de uma verificação nos baldes de fichas com muitos clientes
+distintos (inclusive com descarte pelo LRU) e o custo de uma requisição
+passando pelo middleware, comparado à mesma aplicação ASGI sem ele.
+
+Uso: python benchmarks/bench_rate_limiter.py [--clientes 100000] [--requisicoes 1000000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.infrastructure.web.rate_limit import (  # noqa: E402
+    BaldesDeFichas,
+    LimitadorDeTaxa,
+    LimiteDeTaxaMiddleware,
+    ler_limites,
+)
+
+
+def medir_baldes(nome, capacidade, clientes, requisicoes):
+    limitador = LimitadorDeTaxa(ler_limites("*=1000/1000"), BaldesDeFichas(capacidade=capacidade))
+    aleatorio = random.Random(42)
+    chaves = [f"ip:10.0.{i // 256}.{i % 256}" for i in aleatorio.choices(range(clientes), k=requisicoes)]
+    inicio = time.perf_counter()
+    for chave in chaves:
+        limitador.verificar(chave, "/tranca/1")
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:>28}: {1e6 * duracao / requisicoes:6.2f} µs/verificação "
+          f"({len(limitador.baldes):,} baldes, {limitador.baldes.descartados:,} descartados)")
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _enviar(mensagem):
+    pass
+
+
+async def _receber():
+    return {"type": "http.request", "body": b""}
+
+
+def medir_middleware(nome, app, requisicoes):
+    escopos = [{
+        "type": "http", "method": "GET", "path": "/tranca/1",
+        "headers": [(b"x-api-key", f"cliente-{i % 1000}".encode())], "client": ("127.0.0.1", 1234),
+    } for i in range(1000)]
+
+    async def rodar():
+        for i in range(requisicoes):
+            await app(escopos[i % 1000], _receber, _enviar)
+
+    inicio = time.perf_counter()
+    asyncio.run(rodar())
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:>28}: {1e6 * duracao / requisicoes:6.2f} µs/requisição")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--requisicoes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    medir_baldes("todos os clientes cabem", args.clientes, args.clientes, args.requisicoes)
+    medir_baldes("LRU com 1/10 dos clientes", args.clientes // 10, args.clientes, args.requisicoes)
+
+    limitador = LimitadorDeTaxa(ler_limites("*=1000000/1000000"))
+    medir_middleware("aplicação sem limite", _app, args.requisicoes)
+    medir_middleware("com LimiteDeTaxaMiddleware", LimiteDeTaxaMiddleware(_app, limitador), args.requisicoes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_sharded_repository.py
+"""
+Benchmark da vazão do repositório particionado em função do número de partições.
+
+Várias threads (as requisições do threadpool do FastAPI) fazem operações
+pontuais — buscar_por_id seguido de salvar, como num trancar/destrancar — e
+criações de novas entidades, sobre estações diferentes da frota.
+
+Uso: python benchmarks/bench_sharded_repository.py [--threads 8] [--operacoes 20000] [--particoes 1 2 4 8 16 32]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import Tranca, StatusTranca  # noqa: E402
+from src.equipamento.infrastructure.repositories.sharded_repository import ShardedTrancaRepository  # noqa: E402
+
+TOTAL_TRANCAS = 20_000
+
+
+def _tranca(numero: int) -> Tranca:
+    return Tranca(numero=numero, localizacao="Bench", ano_de_fabricacao="2024", modelo="B", status=StatusTranca.DISPONIVEL)
+
+
+def medir(particoes: int, threads: int, operacoes: int, fracao_criacoes: float) -> float:
+    repo = ShardedTrancaRepository(particoes=particoes)
+    ids = [repo.salvar(_tranca(i)).id for i in range(TOTAL_TRANCAS)]
+    barreira = threading.Barrier(threads + 1)
+
+    def trabalhar(semente: int):
+        aleatorio = random.Random(semente)
+        barreira.wait()
+        for i in range(operacoes):
+            if aleatorio.random() < fracao_criacoes:
+                repo.salvar(_tranca(i))
+                continue
+            tranca = repo.buscar_por_id(aleatorio.choice(ids))
+            tranca.status = StatusTranca.OCUPADA if tranca.status == StatusTranca.DISPONIVEL else StatusTranca.DISPONIVEL
+            repo.salvar(tranca)
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.join()
+    return threads * operacoes / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=20_000, help="operações por thread")
+    parser.add_argument("--criacoes", type=float, default=0.05, help="fração de operações que criam entidades")
+    parser.add_argument("--particoes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    print(f"threads: {args.threads}, operações por thread: {args.operacoes}")
+    base = None
+    for particoes in args.particoes:
+        vazao = medir(particoes, args.threads, args.operacoes, args.criacoes)
+        base = base or vazao
+        print(f"{particoes:3d} partição(ões): {vazao:12,.0f} ops/s  ({vazao / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
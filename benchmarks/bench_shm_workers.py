@@ -0,0 +1,81 @@
+# benchmarks/bench_shm_workers.py
+"""
+Benchmark do repositório em memória compartilhada com vários processos.
+
+Cada processo simula um worker do uvicorn fazendo uma mistura de leituras
+(buscar_por_id) e escritas (salvar) sobre o mesmo estado compartilhado, e o
+script mede a vazão total para 1, 2, 4... processos.
+
+Uso: python benchmarks/bench_shm_workers.py [--processos 1 2 4] [--operacoes 20000] [--escritas 0.1]
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta  # noqa: E402
+from src.equipamento.infrastructure.repositories.shm_repository import ShmBicicletaRepository  # noqa: E402
+
+TOTAL_BICICLETAS = 5_000
+
+
+def worker(prefixo: str, diretorio: str, operacoes: int, fracao_escritas: float, inicio, fila):
+    repo = ShmBicicletaRepository(prefixo=prefixo, diretorio_travas=diretorio)
+    aleatorio = random.Random()
+    inicio.wait()
+    t0 = time.perf_counter()
+    for _ in range(operacoes):
+        bicicleta = repo.buscar_por_id(aleatorio.randint(1, TOTAL_BICICLETAS))
+        if aleatorio.random() < fracao_escritas:
+            bicicleta.numero += 1
+            repo.salvar(bicicleta)
+    fila.put(time.perf_counter() - t0)
+    repo.fechar()
+
+
+def medir(processos: int, operacoes: int, fracao_escritas: float) -> float:
+    prefixo = f"bench_{uuid.uuid4().hex[:10]}"
+    diretorio = tempfile.mkdtemp()
+    repo = ShmBicicletaRepository(prefixo=prefixo, diretorio_travas=diretorio)
+    for i in range(TOTAL_BICICLETAS):
+        repo.salvar(Bicicleta(marca="Caloi", modelo="B", ano="2024", numero=i, status=StatusBicicleta.DISPONIVEL))
+
+    contexto = multiprocessing.get_context("fork")
+    inicio = contexto.Barrier(processos)
+    fila = contexto.Queue()
+    filhos = [
+        contexto.Process(target=worker, args=(prefixo, diretorio, operacoes, fracao_escritas, inicio, fila))
+        for _ in range(processos)
+    ]
+    for p in filhos:
+        p.start()
+    duracoes = [fila.get() for _ in filhos]
+    for p in filhos:
+        p.join()
+    repo.destruir()
+    return processos * operacoes / max(duracoes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--operacoes", type=int, default=20_000, help="operações por processo")
+    parser.add_argument("--escritas", type=float, default=0.1, help="fração de operações que também salvam")
+    args = parser.parse_args()
+
+    base = None
+    for processos in args.processos:
+        vazao = medir(processos, args.operacoes, args.escritas)
+        base = base or vazao
+        print(f"{processos:3d} processo(s): {vazao:12,.0f} ops/s  ({vazao / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
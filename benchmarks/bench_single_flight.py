@@ -0,0 +1,86 @@
+# benchmarks/bench_single_flight.py
+"""
+Benchmark da coalescência (single-flight) das leituras por totem.
+
+Simula uma "manada" de clientes pedindo GET /totem/{idTotem}/trancas no mesmo
+instante e compara o tempo de CPU gasto com e sem o SingleFlight.
+
+Uso: python benchmarks/bench_single_flight.py [--clientes 200] [--trancas 20000] [--rodadas 5]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.application.use_cases import ListarTrancasPorTotemUseCase  # noqa: E402
+from src.equipamento.domain.entities import Totem, Tranca, StatusTranca  # noqa: E402
+from src.equipamento.infrastructure.repositories.mem_repository import MemTotemRepository, MemTrancaRepository  # noqa: E402
+from src.equipamento.infrastructure.web.routes import lista_trancas_adapter, serializar_lista  # noqa: E402
+from src.equipamento.infrastructure.web.single_flight import SingleFlight  # noqa: E402
+
+
+def montar_rede(total_trancas: int, totens: int = 20):
+    totem_repo = MemTotemRepository()
+    tranca_repo = MemTrancaRepository()
+    for i in range(totens):
+        totem_repo.salvar(Totem(localizacao=f"Estação {i}", descricao="Benchmark"))
+    for i in range(total_trancas):
+        tranca_repo.salvar(Tranca(
+            numero=i, localizacao="Benchmark", ano_de_fabricacao="2024", modelo="B",
+            status=StatusTranca.DISPONIVEL, totem_id=(i % totens) + 1,
+        ))
+    return ListarTrancasPorTotemUseCase(totem_repo=totem_repo, tranca_repo=tranca_repo)
+
+
+def manada(clientes: int, atender) -> float:
+    """Dispara 'clientes' threads juntas e retorna o tempo de CPU do processo gasto."""
+    barreira = threading.Barrier(clientes)
+
+    def cliente():
+        barreira.wait()
+        atender()
+
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    inicio = time.process_time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.process_time() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--trancas", type=int, default=20_000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    use_case = montar_rede(args.trancas)
+
+    def computar():
+        return serializar_lista(lista_trancas_adapter, use_case.execute(1))
+
+    cpu_sem = sum(manada(args.clientes, computar) for _ in range(args.rodadas)) / args.rodadas
+
+    single_flight = SingleFlight()
+    cpu_com = sum(
+        manada(args.clientes, lambda: single_flight.executar(("trancas", 1), computar))
+        for _ in range(args.rodadas)
+    ) / args.rodadas
+    estatisticas = single_flight.estatisticas()
+
+    print(f"clientes simultâneos: {args.clientes}, trancas na rede: {args.trancas}, rodadas: {args.rodadas}")
+    print(f"sem single-flight: {cpu_sem * 1000:8.1f} ms de CPU por rajada")
+    print(f"com single-flight: {cpu_com * 1000:8.1f} ms de CPU por rajada")
+    print(f"execuções: {estatisticas['execucoes']}, coalescidas: {estatisticas['coalescidas']}")
+    if cpu_com > 0:
+        print(f"CPU economizada: {(1 - cpu_com / cpu_sem) * 100:.1f}% ({cpu_sem / cpu_com:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
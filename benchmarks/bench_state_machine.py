@@ -0,0 +1,63 @@
+# benchmarks/bench_state_machine.py
+"""
+Benchmark da validação de transições de status.
+
+Compara as verificações encadeadas com listas que os casos de uso faziam,
+consultas individuais à tabela compilada e a validação de um lote inteiro
+de uma vez.
+
+Uso: python benchmarks/bench_state_machine.py [--transicoes 1000000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import StatusBicicleta  # noqa: E402
+from src.equipamento.domain.state_machine import (  # noqa: E402
+    MAQUINA_BICICLETA,
+    OPERACAO_INTEGRAR,
+    OPERACAO_RETIRAR,
+    OPERACAO_TRANCAR,
+)
+
+
+def encadeado(operacao, origem, destino) -> bool:
+    if operacao == OPERACAO_INTEGRAR:
+        return origem in [StatusBicicleta.NOVA, StatusBicicleta.EM_REPARO] and destino == StatusBicicleta.DISPONIVEL
+    if operacao == OPERACAO_RETIRAR:
+        return destino in [StatusBicicleta.EM_REPARO, StatusBicicleta.APOSENTADA]
+    return origem == StatusBicicleta.EM_USO and destino == StatusBicicleta.DISPONIVEL
+
+
+def medir(nome, funcao, quantidade):
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:>12}: {quantidade / duracao:14,.0f} transições/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transicoes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(42)
+    estados = list(StatusBicicleta)
+    operacoes = [OPERACAO_INTEGRAR, OPERACAO_RETIRAR, OPERACAO_TRANCAR]
+    transicoes = [
+        (aleatorio.choice(operacoes), aleatorio.choice(estados), aleatorio.choice(estados))
+        for _ in range(args.transicoes)
+    ]
+
+    medir("encadeado", lambda: [encadeado(*t) for t in transicoes], args.transicoes)
+    medir("individual", lambda: [MAQUINA_BICICLETA.permite(*t) for t in transicoes], args.transicoes)
+    medir("lote", lambda: MAQUINA_BICICLETA.validar_lote(transicoes), args.transicoes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_timing_wheel.py
+"""
+Benchmark do vencimento de reservas.
+
+Cria muitas reservas com prazos espalhados por alguns minutos, com um
+relógio simulado, e mede o custo de criar cada reserva, de cancelar parte
+delas e de vencer as restantes avançando a roda tick a tick. Mede também a
+RodaDeTempo sozinha, comparada a uma fila de prioridade (heapq) com
+cancelamento preguiçoso, que não devolve a memória das canceladas antes do
+prazo.
+
+Uso: python benchmarks/bench_timing_wheel.py [--reservas 300000] [--janela 1800]
+"""
+
+import argparse
+import heapq
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import ENTIDADE_TRANCA  # noqa: E402
+from src.equipamento.infrastructure.repositories.mem_reservations import MemReservas  # noqa: E402
+from src.equipamento.infrastructure.repositories.timing_wheel import RodaDeTempo  # noqa: E402
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def medir_reservas(quantidade, janela):
+    relogio = Relogio()
+    reservas = MemReservas(resolucao=1.0, relogio=relogio)
+    aleatorio = random.Random(42)
+    duracoes = [aleatorio.uniform(1, janela) for _ in range(quantidade)]
+
+    inicio = time.perf_counter()
+    criadas = [reservas.criar(ENTIDADE_TRANCA, i, duracao) for i, duracao in enumerate(duracoes)]
+    criar = time.perf_counter() - inicio
+
+    canceladas = criadas[::10]
+    inicio = time.perf_counter()
+    for reserva in canceladas:
+        reservas.remover(reserva.id)
+    cancelar = time.perf_counter() - inicio
+
+    vencidas = 0
+    inicio = time.perf_counter()
+    for _ in range(int(janela) + 1):
+        relogio.agora += 1
+        vencidas += len(reservas.expirar_vencidas())
+    vencer = time.perf_counter() - inicio
+
+    print(f"{'MemReservas':>16}: criar {1e6 * criar / quantidade:5.2f} µs, "
+          f"cancelar {1e6 * cancelar / len(canceladas):5.2f} µs, "
+          f"vencer {1e6 * vencer / vencidas:5.2f} µs/reserva ({vencidas:,} vencidas)")
+
+
+def medir_roda(quantidade, janela):
+    aleatorio = random.Random(42)
+    prazos = [int(aleatorio.uniform(1, janela)) for _ in range(quantidade)]
+    roda = RodaDeTempo(0)
+
+    inicio = time.perf_counter()
+    for i, prazo in enumerate(prazos):
+        roda.agendar(i, prazo)
+    criar = time.perf_counter() - inicio
+
+    canceladas = range(0, quantidade, 10)
+    inicio = time.perf_counter()
+    for i in canceladas:
+        roda.cancelar(i)
+    cancelar = time.perf_counter() - inicio
+
+    vencidas = 0
+    inicio = time.perf_counter()
+    for tick in range(1, int(janela) + 2):
+        vencidas += len(roda.avancar(tick))
+    vencer = time.perf_counter() - inicio
+
+    print(f"{'RodaDeTempo':>16}: criar {1e6 * criar / quantidade:5.2f} µs, "
+          f"cancelar {1e6 * cancelar / len(canceladas):5.2f} µs, "
+          f"vencer {1e6 * vencer / vencidas:5.2f} µs/reserva ({vencidas:,} vencidas)")
+
+
+def medir_heap(quantidade, janela):
+    aleatorio = random.Random(42)
+    prazos = [int(aleatorio.uniform(1, janela)) for _ in range(quantidade)]
+    heap, ativas = [], {}
+
+    inicio = time.perf_counter()
+    for i, prazo in enumerate(prazos):
+        ativas[i] = prazo
+        heapq.heappush(heap, (prazo, i))
+    criar = time.perf_counter() - inicio
+
+    canceladas = range(0, quantidade, 10)
+    inicio = time.perf_counter()
+    for i in canceladas:
+        del ativas[i]
+    cancelar = time.perf_counter() - inicio
+
+    vencidas = 0
+    inicio = time.perf_counter()
+    for tick in range(1, int(janela) + 2):
+        while heap and heap[0][0] <= tick:
+            _, i = heapq.heappop(heap)
+            if ativas.pop(i, None) is not None:
+                vencidas += 1
+    vencer = time.perf_counter() - inicio
+
+    print(f"{'heapq':>16}: criar {1e6 * criar / quantidade:5.2f} µs, "
+          f"cancelar {1e6 * cancelar / len(canceladas):5.2f} µs, "
+          f"vencer {1e6 * vencer / vencidas:5.2f} µs/reserva ({vencidas:,} vencidas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservas", type=int, default=300_000)
+    parser.add_argument("--janela", type=float, default=1800.0)
+    args = parser.parse_args()
+
+    medir_reservas(args.reservas, args.janela)
+    medir_roda(args.reservas, args.janela)
+    medir_heap(args.reservas, args.janela)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_tracing.py
+"""
+Benchmark do custo do rastreamento por chamada de repositório.
+
+Compara buscar_por_id sem instrumentação (rastreamento desligado), com
+instrumentação fora de requisição amostrada e dentro de uma requisição
+amostrada, exportando para o buffer em memória.
+
+Uso: python benchmarks/bench_tracing.py [--chamadas 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta  # noqa: E402
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository  # noqa: E402
+from src.equipamento.infrastructure.web.tracing import (  # noqa: E402
+    ExportadorEmMemoria,
+    Rastreador,
+    _span_atual,
+    instrumentar,
+)
+
+
+def _repositorio():
+    repo = MemBicicletaRepository()
+    repo.salvar(Bicicleta(id=None, marca="M", modelo="M", ano="2020", numero=1, status=StatusBicicleta.NOVA))
+    return repo
+
+
+def medir(nome, repo, chamadas):
+    buscar = repo.buscar_por_id
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        buscar(1)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:>24}: {1e9 * duracao / chamadas:8.0f} ns/chamada")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    medir("desligado", _repositorio(), args.chamadas)
+
+    rastreador = Rastreador(amostragem=1.0, exportadores=[ExportadorEmMemoria()])
+    repo = _repositorio()
+    instrumentar(rastreador, repo, "bicicleta_repo")
+    medir("ligado, não amostrada", repo, args.chamadas)
+
+    token = _span_atual.set(rastreador.iniciar_raiz("GET /bicicleta/1"))
+    try:
+        medir("ligado, amostrada", repo, args.chamadas)
+    finally:
+        _span_atual.reset(token)
+
+
+if __name__ == "__main__":
+    main()
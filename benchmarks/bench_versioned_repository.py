@@ -0,0 +1,78 @@
+# benchmarks/bench_versioned_repository.py
+"""
+Benchmark de gravações pontuais com listagens completas acontecendo ao mesmo tempo.
+
+Algumas threads fazem buscar_por_id seguido de salvar (como num
+trancar/destrancar) enquanto outras listam todas as trancas sem parar, como
+um GET /tranca ou uma exportação. Compara o repositório particionado, que
+copia cada partição sob a sua trava para listar, com o versionado, que lista
+a versão publicada sem trava alguma.
+
+Uso: python benchmarks/bench_versioned_repository.py [--escritores 4] [--leitores 2] [--segundos 3]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.equipamento.domain.entities import Tranca, StatusTranca  # noqa: E402
+from src.equipamento.infrastructure.repositories.sharded_repository import ShardedTrancaRepository  # noqa: E402
+from src.equipamento.infrastructure.repositories.versioned_repository import VersionadoTrancaRepository  # noqa: E402
+
+TOTAL_TRANCAS = 20_000
+
+
+def _tranca(numero: int) -> Tranca:
+    return Tranca(numero=numero, localizacao="Bench", ano_de_fabricacao="2024", modelo="B", status=StatusTranca.DISPONIVEL)
+
+
+def medir(repo, escritores: int, leitores: int, segundos: float):
+    ids = [repo.salvar(_tranca(i)).id for i in range(TOTAL_TRANCAS)]
+    parar = threading.Event()
+    gravacoes = [0] * escritores
+    listagens = [0] * leitores
+
+    def escrever(indice: int):
+        aleatorio = random.Random(indice)
+        while not parar.is_set():
+            tranca = repo.buscar_por_id(aleatorio.choice(ids))
+            tranca.status = StatusTranca.OCUPADA if tranca.status == StatusTranca.DISPONIVEL else StatusTranca.DISPONIVEL
+            repo.salvar(tranca)
+            gravacoes[indice] += 1
+
+    def listar(indice: int):
+        while not parar.is_set():
+            repo.listar_todas()
+            listagens[indice] += 1
+
+    threads = [threading.Thread(target=escrever, args=(i,)) for i in range(escritores)]
+    threads += [threading.Thread(target=listar, args=(i,)) for i in range(leitores)]
+    for t in threads:
+        t.start()
+    time.sleep(segundos)
+    parar.set()
+    for t in threads:
+        t.join()
+    return sum(gravacoes) / segundos, sum(listagens) / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--leitores", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{TOTAL_TRANCAS} trancas, escritores: {args.escritores}, leitores: {args.leitores}")
+    for nome, repo in (("particionado", ShardedTrancaRepository()), ("versionado", VersionadoTrancaRepository())):
+        gravacoes, listagens = medir(repo, args.escritores, args.leitores, args.segundos)
+        print(f"{nome:>12}: {gravacoes:10,.0f} gravações/s  {listagens:8,.1f} listagens/s")
+
+
+if __name__ == "__main__":
+    main()
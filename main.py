@@ -1,22 +1,101 @@
 # main.py
 
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 # Importamos o router que criamos no nosso módulo de rotas
-from src.equipamento.infrastructure.web.routes import router as equipamento_router
+from src.equipamento.infrastructure.web.routes import (
+    router as equipamento_router,
+    compactador_excluidos,
+    armazem_idempotencia,
+    controlador_admissao,
+    limitador_taxa,
+    rastreador,
+    registro_lentas,
+    expirador_reservas,
+    cliente_funcionarios,
+    despachante_notificacoes,
+    retransmissor_eventos,
+)
+from src.equipamento.infrastructure.repositories.shm_repository import RegistroGrandeDemais
+from src.equipamento.infrastructure.web.idempotency import IdempotenciaMiddleware
+from src.equipamento.infrastructure.web.admission import AdmissaoMiddleware
+from src.equipamento.infrastructure.web.rate_limit import LimiteDeTaxaMiddleware
+from src.equipamento.infrastructure.web.slow_requests import RequisicoesLentasMiddleware
+from src.equipamento.infrastructure.web.tracing import RastreamentoMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tarefas em segundo plano que vivem enquanto a aplicação estiver no ar.
+    compactador_excluidos.iniciar()
+    registro_lentas.iniciar()
+    if expirador_reservas is not None:
+        expirador_reservas.iniciar()
+    if despachante_notificacoes is not None:
+        despachante_notificacoes.iniciar()
+    if retransmissor_eventos is not None:
+        retransmissor_eventos.iniciar()
+    yield
+    compactador_excluidos.parar()
+    registro_lentas.parar()
+    if expirador_reservas is not None:
+        expirador_reservas.parar()
+    if retransmissor_eventos is not None:
+        retransmissor_eventos.parar()
+    if cliente_funcionarios is not None:
+        await cliente_funcionarios.fechar()
+    if despachante_notificacoes is not None:
+        # Tenta entregar o que ficou na caixa de saída antes de sair.
+        await despachante_notificacoes.encerrar()
+    for exportador in rastreador.exportadores:
+        if hasattr(exportador, "fechar"):
+            exportador.fechar()
 
 # Criamos a instância principal da aplicação FastAPI
 app = FastAPI(
     title="Microsserviço de Equipamento",
     description="API para gerenciamento de Bicicletas, Trancas e Totens.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Incluímos as rotas do nosso microsserviço na aplicação principal.
 # O prefixo "/api" é opcional, mas é uma boa prática para organizar os endpoints.
 app.include_router(equipamento_router)
 
+# No backend "compartilhado" cada entidade precisa caber num slot de tamanho
+# fixo; o que não cabe é recusado em qualquer rota que grave.
+@app.exception_handler(RegistroGrandeDemais)
+async def registro_grande_demais(request: Request, erro: RegistroGrandeDemais):
+    return JSONResponse(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        content={"detail": {"codigo": "REGISTRO_GRANDE_DEMAIS", "mensagem": str(erro)}},
+    )
+
+# Requisições POST com o cabeçalho Idempotency-Key são executadas uma única vez;
+# as repetições recebem a resposta original.
+app.add_middleware(IdempotenciaMiddleware, armazem=armazem_idempotencia)
+
+# Adicionado por último para ficar por fora: requisições recusadas por
+# sobrecarga não chegam a ler o corpo nem a ocupar o threadpool.
+app.add_middleware(AdmissaoMiddleware, controlador=controlador_admissao)
+
+# Com rastreamento ligado, o span raiz inclui a espera na admissão.
+if rastreador.ativo:
+    app.add_middleware(RastreamentoMiddleware, rastreador=rastreador)
+
+# Requisições acima do limiar vão para o log de lentas, com a espera na
+# admissão incluída na duração.
+if registro_lentas.ativo:
+    app.add_middleware(RequisicoesLentasMiddleware, registro=registro_lentas)
+
+# O mais externo: clientes acima do seu limite são recusados antes de
+# disputarem vagas no controle de admissão.
+app.add_middleware(LimiteDeTaxaMiddleware, limitador=limitador_taxa)
+
 @app.get("/", tags=["Root"])
 def read_root():
     """Endpoint raiz para verificar se a API está no ar."""
@@ -1,9 +1,9 @@
 # src/equipamento/application/repositories.py
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from ..domain.entities import Bicicleta, Totem, Tranca
+from ..domain.entities import Bicicleta, Evento, Mudanca, Notificacao, PaginaDeMudancas, Reserva, Totem, Tranca
 
 # ABC (Abstract Base Class) define a estrutura para uma classe abstrata.
 # Nossas interfaces de repositório herdam dela.
@@ -36,6 +36,11 @@ class BicicletaRepositoryInterface(ABC):
         """Busca uma lista de bicicletas por seus IDs."""
         pass
 
+    @abstractmethod
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Bicicleta]:
+        """Lista as bicicletas não deletadas cujos campos são iguais a todos os critérios."""
+        pass
+
 
 class TrancaRepositoryInterface(ABC):
     """Interface para o Repositório de Trancas."""
@@ -65,6 +70,16 @@ class TrancaRepositoryInterface(ABC):
         """Busca todas as trancas associadas a um totem específico."""
         pass
 
+    @abstractmethod
+    def buscar_por_totem_ids(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        """Busca as trancas de vários totens de uma vez, agrupadas por totem (em ordem de id)."""
+        pass
+
+    @abstractmethod
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Tranca]:
+        """Lista as trancas não deletadas cujos campos são iguais a todos os critérios."""
+        pass
+
 
 class TotemRepositoryInterface(ABC):
     """Interface para o Repositório de Totens."""
@@ -88,3 +103,159 @@ class TotemRepositoryInterface(ABC):
     def deletar(self, totem_id: int) -> None:
         """Deleta um totem pelo seu ID."""
         pass
+
+    @abstractmethod
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Totem]:
+        """Lista os totens não deletados cujos campos são iguais a todos os critérios."""
+        pass
+
+
+class RegistroDeMudancasInterface(ABC):
+    """Interface para o log de mudanças usado na sincronização incremental."""
+
+    @abstractmethod
+    def registrar(self, entidade: str, entidade_id: int, operacao: str, dados: Dict[str, Any]) -> Mudanca:
+        """Acrescenta uma mudança ao log, atribuindo o próximo número de sequência."""
+        pass
+
+    @abstractmethod
+    def listar_desde(self, desde: int, limite: int) -> PaginaDeMudancas:
+        """Lista as mudanças com sequência maior que 'desde', até 'limite' itens."""
+        pass
+
+    @abstractmethod
+    def sequencia_atual(self) -> int:
+        """Sequência da última mudança registrada (muda a cada registro)."""
+        pass
+
+    @abstractmethod
+    def descartar_historico(self) -> None:
+        """Invalida todos os cursores atuais, forçando os consumidores a ressincronizar."""
+        pass
+
+
+class PublicadorDeEventosInterface(ABC):
+    """Interface para a publicação de eventos de mudança de estado."""
+
+    @abstractmethod
+    def publicar(self, evento: Evento) -> None:
+        """Publica um evento. Não deve bloquear quem publica."""
+        pass
+
+
+class IndiceDeBuscaInterface(ABC):
+    """Interface para o índice de busca textual de um tipo de entidade."""
+
+    @abstractmethod
+    def indexar(self, entidade_id: int, textos: List[str]) -> None:
+        """Indexa (ou reindexa) os textos de uma entidade."""
+        pass
+
+    @abstractmethod
+    def remover(self, entidade_id: int) -> None:
+        """Remove uma entidade do índice."""
+        pass
+
+    @abstractmethod
+    def buscar(self, consulta: str, limite: int) -> List[int]:
+        """Retorna os IDs que casam com a consulta, do mais para o menos relevante."""
+        pass
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Esvazia o índice."""
+        pass
+
+
+class AlocadorDeIdsInterface(ABC):
+    """Interface para a geração de IDs de novas entidades."""
+
+    @abstractmethod
+    def alocar(self) -> int:
+        """Retorna um ID ainda não usado."""
+        pass
+
+    @abstractmethod
+    def reservar_ate(self, entidade_id: int) -> None:
+        """Avisa que um ID foi gravado explicitamente, para que não seja alocado de novo."""
+        pass
+
+
+class LocalizacaoDeBicicletasInterface(ABC):
+    """Interface para o mapa bicicleta -> tranca onde ela está presa."""
+
+    @abstractmethod
+    def associar(self, bicicleta_id: int, tranca_id: int) -> None:
+        """Registra que a bicicleta está presa na tranca."""
+        pass
+
+    @abstractmethod
+    def desassociar(self, bicicleta_id: int, tranca_id: int) -> None:
+        """Remove a bicicleta do mapa, se ela ainda estiver associada a essa tranca."""
+        pass
+
+    @abstractmethod
+    def tranca_de(self, bicicleta_id: int) -> Optional[int]:
+        """ID da tranca onde a bicicleta está presa, ou None."""
+        pass
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Esvazia o mapa."""
+        pass
+
+class TrancasLivresInterface(ABC):
+    """Interface para as trancas livres de cada totem, usadas nas devoluções."""
+
+    @abstractmethod
+    def liberar(self, totem_id: int, tranca_id: int) -> None:
+        """Registra que a tranca está livre no totem."""
+        pass
+
+    @abstractmethod
+    def remover(self, tranca_id: int) -> None:
+        """Tira a tranca das livres (ocupada, fora do totem ou removida)."""
+        pass
+
+    @abstractmethod
+    def alocar(self, totem_id: int) -> Optional[int]:
+        """Retira e retorna uma tranca livre do totem, ou None se não houver."""
+        pass
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Esvazia o mapa."""
+        pass
+
+
+class ReservasInterface(ABC):
+    """Interface para as reservas temporárias de bicicletas e trancas."""
+
+    @abstractmethod
+    def criar(self, entidade: str, entidade_id: int, duracao: float, totem_id: Optional[int] = None) -> Optional[Reserva]:
+        """Reserva a entidade por 'duracao' segundos; None se ela já tiver uma reserva ativa."""
+        pass
+
+    @abstractmethod
+    def buscar(self, reserva_id: str) -> Optional[Reserva]:
+        """Busca uma reserva ativa pelo seu ID."""
+        pass
+
+    @abstractmethod
+    def ativa(self, entidade: str, entidade_id: int) -> Optional[Reserva]:
+        """Reserva ativa da entidade, se houver."""
+        pass
+
+    @abstractmethod
+    def remover(self, reserva_id: str) -> Optional[Reserva]:
+        """Encerra a reserva (cancelada ou usada) e a retorna, se ela ainda existia."""
+        pass
+
+
+class CaixaDeSaidaInterface(ABC):
+    """Interface para a caixa de saída (outbox) das notificações a outros microsserviços."""
+
+    @abstractmethod
+    def acrescentar(self, tipo: str, dados: Dict[str, Any]) -> List[Notificacao]:
+        """Guarda uma notificação para cada destino; a entrega é feita depois, fora da requisição."""
+        pass
@@ -1,10 +1,25 @@
-from typing import List, Optional, Dict, Any 
+from dataclasses import asdict
+from typing import List, Optional, Dict, Any, Tuple
 
-from ..domain.entities import Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca
+from ..domain.entities import (
+    Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca, PaginaDeMudancas, Evento, Reserva,
+    ENTIDADE_BICICLETA, ENTIDADE_TRANCA,
+)
+from ..domain.state_machine import (
+    MAQUINA_BICICLETA, MAQUINA_TRANCA,
+    OPERACAO_ALTERAR_STATUS, OPERACAO_INTEGRAR, OPERACAO_RETIRAR, OPERACAO_TRANCAR, OPERACAO_DESTRANCAR,
+)
 from .repositories import (
     BicicletaRepositoryInterface,
     TrancaRepositoryInterface,
     TotemRepositoryInterface,
+    RegistroDeMudancasInterface,
+    PublicadorDeEventosInterface,
+    IndiceDeBuscaInterface,
+    LocalizacaoDeBicicletasInterface,
+    TrancasLivresInterface,
+    ReservasInterface,
+    CaixaDeSaidaInterface,
 )
 
 # ======================================================
@@ -13,14 +28,170 @@ from .repositories import (
 ERRO_BICICLETA_NAO_ENCONTRADA = "Bicicleta não encontrada." 
 ERRO_TRANCA_NAO_ENCONTRADA = "Tranca não encontrada."
 ERRO_TOTEM_NAO_ENCONTRADO = "Totem não encontrado."
+ERRO_CONSULTA_VAZIA = "A consulta deve conter ao menos uma letra ou número."
+ERRO_FILTRO_VAZIO = "Informe ao menos um critério de filtro."
+ERRO_BICICLETA_FORA_DE_TRANCA = "A bicicleta não está presa em nenhuma tranca."
+ERRO_TOTEM_SEM_TRANCA_LIVRE = "O totem não tem tranca livre."
+ERRO_RESERVA_NAO_ENCONTRADA = "Reserva não encontrada."
+ERRO_BICICLETA_RESERVADA = "A bicicleta está reservada."
+ERRO_TRANCA_RESERVADA = "A tranca está reservada."
+
+# ======================================================
+# --- Tipos de Eventos Publicados ---
+# ======================================================
+EVENTO_STATUS_BICICLETA_ALTERADO = "STATUS_BICICLETA_ALTERADO"
+EVENTO_BICICLETA_INTEGRADA = "BICICLETA_INTEGRADA"
+EVENTO_BICICLETA_RETIRADA = "BICICLETA_RETIRADA"
+EVENTO_STATUS_TRANCA_ALTERADO = "STATUS_TRANCA_ALTERADO"
+EVENTO_TRANCA_INTEGRADA = "TRANCA_INTEGRADA"
+EVENTO_TRANCA_RETIRADA = "TRANCA_RETIRADA"
+EVENTO_TRANCA_TRANCADA = "TRANCA_TRANCADA"
+EVENTO_TRANCA_DESTRANCADA = "TRANCA_DESTRANCADA"
+
+
+def _publicar(publicador: Optional[PublicadorDeEventosInterface], tipo: str, entidade: str, objeto, totem_id: Optional[int]) -> None:
+    """Publica o estado já salvo do objeto, se houver um publicador configurado."""
+    if publicador is not None:
+        publicador.publicar(Evento(tipo=tipo, entidade=entidade, entidade_id=objeto.id, dados=asdict(objeto), totem_id=totem_id))
+
+
+def _notificar(caixa: Optional[CaixaDeSaidaInterface], tipo: str, dados: Dict[str, Any]) -> None:
+    """
+    Guarda a notificação aos outros microsserviços na caixa de saída, logo
+    depois de salvar a mudança que ela anuncia; a entrega fica para o
+    despachante, fora da requisição.
+    """
+    if caixa is not None:
+        caixa.acrescentar(tipo, dados)
+
+
+# Campos de texto de cada entidade que entram no índice de busca.
+def textos_bicicleta(bicicleta: Bicicleta) -> List[str]:
+    return [bicicleta.marca, bicicleta.modelo]
+
+def textos_tranca(tranca: Tranca) -> List[str]:
+    return [tranca.modelo, tranca.localizacao]
+
+def textos_totem(totem: Totem) -> List[str]:
+    return [totem.localizacao, totem.descricao]
+
+
+def _indexar(indice: Optional[IndiceDeBuscaInterface], objeto, textos) -> None:
+    if indice is not None:
+        indice.indexar(objeto.id, textos(objeto))
+
+def _desindexar(indice: Optional[IndiceDeBuscaInterface], objeto_id: int) -> None:
+    if indice is not None:
+        indice.remover(objeto_id)
+
+
+def _associar(localizacao: Optional[LocalizacaoDeBicicletasInterface], bicicleta_id: int, tranca_id: int) -> None:
+    if localizacao is not None:
+        localizacao.associar(bicicleta_id, tranca_id)
+
+def _desassociar(localizacao: Optional[LocalizacaoDeBicicletasInterface], bicicleta_id: int, tranca_id: int) -> None:
+    if localizacao is not None:
+        localizacao.desassociar(bicicleta_id, tranca_id)
+
+
+def localizar_tranca(localizacao: Optional[LocalizacaoDeBicicletasInterface], tranca_repo: TrancaRepositoryInterface,
+                     bicicleta_id: int) -> Optional[Tranca]:
+    """
+    Tranca onde a bicicleta está presa. Com o mapa, é uma consulta a ele e
+    uma busca por id, conferida contra a própria tranca; sem o mapa (ou se
+    ele estiver desatualizado), percorre as trancas e corrige o mapa.
+    """
+    if localizacao is not None:
+        tranca_id = localizacao.tranca_de(bicicleta_id)
+        if tranca_id is None:
+            return None
+        tranca = tranca_repo.buscar_por_id(tranca_id)
+        if tranca is not None and tranca.bicicleta_id == bicicleta_id:
+            return tranca
+        localizacao.desassociar(bicicleta_id, tranca_id)
+    tranca = next((t for t in tranca_repo.listar_todas() if t.bicicleta_id == bicicleta_id), None)
+    if tranca is not None:
+        _associar(localizacao, bicicleta_id, tranca.id)
+    return tranca
+
+
+def reconstruir_localizacoes(localizacao: Optional[LocalizacaoDeBicicletasInterface], trancas: List[Tranca]) -> None:
+    """Refaz o mapa bicicleta -> tranca a partir das trancas vivas (inicialização e restauração)."""
+    if localizacao is None:
+        return
+    localizacao.limpar()
+    for tranca in trancas:
+        if tranca.bicicleta_id is not None:
+            localizacao.associar(tranca.bicicleta_id, tranca.id)
+
+
+def _tranca_livre(tranca: Tranca) -> bool:
+    return tranca.status == StatusTranca.DISPONIVEL and tranca.totem_id is not None and tranca.bicicleta_id is None
+
+def _atualizar_vaga(livres: Optional[TrancasLivresInterface], tranca: Tranca) -> None:
+    """Põe a tranca entre as livres do seu totem, ou a tira de lá, conforme o estado salvo."""
+    if livres is None:
+        return
+    if _tranca_livre(tranca):
+        livres.liberar(tranca.totem_id, tranca.id)
+    else:
+        livres.remover(tranca.id)
+
+
+def reconstruir_vagas(livres: Optional[TrancasLivresInterface], trancas: List[Tranca]) -> None:
+    """Refaz as trancas livres de cada totem a partir das trancas vivas (inicialização e restauração)."""
+    if livres is None:
+        return
+    livres.limpar()
+    for tranca in trancas:
+        if _tranca_livre(tranca):
+            livres.liberar(tranca.totem_id, tranca.id)
+
+
+def _reservada_por_outro(reservas: Optional[ReservasInterface], entidade: str, entidade_id: int,
+                         reserva_id: Optional[str]) -> Optional[Reserva]:
+    """Reserva ativa da entidade que não é a apresentada por quem está agindo, se houver."""
+    if reservas is None:
+        return None
+    reserva = reservas.ativa(entidade, entidade_id)
+    return reserva if reserva is not None and reserva.id != reserva_id else None
+
+def _conferir_reserva(reservas: Optional[ReservasInterface], entidade: str, entidade_id: int,
+                      reserva_id: Optional[str], erro: str) -> None:
+    if _reservada_por_outro(reservas, entidade, entidade_id, reserva_id) is not None:
+        raise ValueError(erro)
+
+def _encerrar_reserva(reservas: Optional[ReservasInterface], entidade: str, entidade_id: int) -> None:
+    """A reserva foi usada: a bicicleta saiu ou a tranca recebeu a bicicleta."""
+    if reservas is None:
+        return
+    reserva = reservas.ativa(entidade, entidade_id)
+    if reserva is not None:
+        reservas.remover(reserva.id)
+
+
+class _BuscarPorTextoUseCase:
+    """Busca textual: o índice ordena os ids e o repositório devolve as entidades vivas."""
+    def __init__(self, repository, indice: IndiceDeBuscaInterface):
+        self.repository = repository
+        self.indice = indice
+
+    def execute(self, consulta: str, limite: int) -> list:
+        if limite <= 0:
+            raise ValueError("O limite deve ser maior que zero.")
+        if not any(c.isalnum() for c in consulta):
+            raise ValueError(ERRO_CONSULTA_VAZIA)
+        encontrados = (self.repository.buscar_por_id(entidade_id) for entidade_id in self.indice.buscar(consulta, limite))
+        return [entidade for entidade in encontrados if entidade is not None]
 
 
 # ======================================================
 # --- Casos de Uso para Bicicleta ---
 # ======================================================
 class CadastrarBicicletaUseCase:
-    def __init__(self, repository: BicicletaRepositoryInterface):
+    def __init__(self, repository: BicicletaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
     def execute(self, dados_bicicleta: Dict[str, Any]) -> Bicicleta:
         nova_bicicleta = Bicicleta(
             marca=dados_bicicleta["marca"],
@@ -29,7 +200,27 @@ class CadastrarBicicletaUseCase:
             numero=dados_bicicleta["numero"],
             status=StatusBicicleta.NOVA,
         )
-        return self.repository.salvar(nova_bicicleta)
+        nova_bicicleta = self.repository.salvar(nova_bicicleta)
+        _indexar(self.indice, nova_bicicleta, textos_bicicleta)
+        return nova_bicicleta
+
+class _FiltrarUseCase:
+    """Filtro por igualdade em vários campos; os critérios None são ignorados."""
+    def __init__(self, repository):
+        self.repository = repository
+
+    def execute(self, criterios: Dict[str, Any]) -> list:
+        criterios = {campo: valor for campo, valor in criterios.items() if valor is not None}
+        if not criterios:
+            raise ValueError(ERRO_FILTRO_VAZIO)
+        return self.repository.filtrar(criterios)
+
+
+class BuscarBicicletasPorTextoUseCase(_BuscarPorTextoUseCase):
+    """Busca bicicletas por marca e modelo."""
+
+class FiltrarBicicletasUseCase(_FiltrarUseCase):
+    """Filtra bicicletas por status, marca, modelo e ano."""
 
 class ListarBicicletasUseCase:
     def __init__(self, repository: BicicletaRepositoryInterface):
@@ -44,28 +235,40 @@ class BuscarBicicletaPorIdUseCase:
         return self.repository.buscar_por_id(bicicleta_id)
 
 class DeletarBicicletaUseCase:
-    def __init__(self, repository: BicicletaRepositoryInterface):
+    def __init__(self, repository: BicicletaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
     def execute(self, bicicleta_id: int) -> None:
         self.repository.deletar(bicicleta_id)
+        _desindexar(self.indice, bicicleta_id)
 
 class AlterarStatusBicicletaUseCase:
-    def __init__(self, repository: BicicletaRepositoryInterface):
+    def __init__(self, repository: BicicletaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None):
         self.repository = repository
+        self.publicador = publicador
     def execute(self, bicicleta_id: int, novo_status: StatusBicicleta) -> Bicicleta:
         bicicleta = self.repository.buscar_por_id(bicicleta_id)
         if not bicicleta:
             raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+        status_anterior = bicicleta.status
         bicicleta.status = novo_status
         bicicleta_atualizada = self.repository.salvar(bicicleta)
+        MAQUINA_BICICLETA.registrar(OPERACAO_ALTERAR_STATUS, status_anterior, novo_status)
+        _publicar(self.publicador, EVENTO_STATUS_BICICLETA_ALTERADO, ENTIDADE_BICICLETA, bicicleta_atualizada, None)
         return bicicleta_atualizada
     
 class IntegrarBicicletaNaRedeUseCase:
-    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface):
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None, livres: Optional[TrancasLivresInterface] = None,
+                 caixa: Optional[CaixaDeSaidaInterface] = None):
         self.bicicleta_repo = bicicleta_repo
         self.tranca_repo = tranca_repo
+        self.publicador = publicador
+        self.localizacao = localizacao
+        self.livres = livres
+        self.caixa = caixa
 
-    def execute(self, bicicleta_id: int, tranca_id: int) -> Tranca:
+    def execute(self, bicicleta_id: int, tranca_id: int, funcionario_id: Optional[int] = None) -> Tranca:
         bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
         tranca = self.tranca_repo.buscar_por_id(tranca_id)
 
@@ -74,51 +277,86 @@ class IntegrarBicicletaNaRedeUseCase:
         if not tranca:
             raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
 
-        if bicicleta.status not in [StatusBicicleta.NOVA, StatusBicicleta.EM_REPARO]:
+        if not MAQUINA_BICICLETA.permite(OPERACAO_INTEGRAR, bicicleta.status, StatusBicicleta.DISPONIVEL):
             raise ValueError(f"Bicicleta com status '{bicicleta.status.value}' não pode ser integrada.")
 
-        if tranca.status != StatusTranca.DISPONIVEL:
+        if not MAQUINA_TRANCA.permite(OPERACAO_TRANCAR, tranca.status, StatusTranca.OCUPADA):
             raise ValueError("Tranca não está livre.")
         
+        status_bicicleta, status_tranca = bicicleta.status, tranca.status
         bicicleta.status = StatusBicicleta.DISPONIVEL
         tranca.status = StatusTranca.OCUPADA
         tranca.bicicleta_id = bicicleta.id
 
         self.bicicleta_repo.salvar(bicicleta)
         tranca_atualizada = self.tranca_repo.salvar(tranca)
-
+        MAQUINA_BICICLETA.registrar(OPERACAO_INTEGRAR, status_bicicleta, StatusBicicleta.DISPONIVEL)
+        MAQUINA_TRANCA.registrar(OPERACAO_TRANCAR, status_tranca, StatusTranca.OCUPADA)
+        _associar(self.localizacao, bicicleta.id, tranca.id)
+        _atualizar_vaga(self.livres, tranca_atualizada)
+        _notificar(self.caixa, EVENTO_BICICLETA_INTEGRADA, {
+            "bicicleta_id": bicicleta.id, "tranca_id": tranca.id, "totem_id": tranca.totem_id,
+            "status": bicicleta.status.value, "funcionario_id": funcionario_id,
+        })
+
+        _publicar(self.publicador, EVENTO_BICICLETA_INTEGRADA, ENTIDADE_BICICLETA, bicicleta, tranca.totem_id)
+        _publicar(self.publicador, EVENTO_BICICLETA_INTEGRADA, ENTIDADE_TRANCA, tranca_atualizada, tranca.totem_id)
         return tranca_atualizada
     
 class RetirarBicicletaDaRedeUseCase:
-    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface):
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None, livres: Optional[TrancasLivresInterface] = None,
+                 caixa: Optional[CaixaDeSaidaInterface] = None):
         self.bicicleta_repo = bicicleta_repo
         self.tranca_repo = tranca_repo
-
-    def execute(self, bicicleta_id: int, tranca_id: int, status_final: StatusBicicleta) -> Bicicleta:
+        self.publicador = publicador
+        self.localizacao = localizacao
+        self.livres = livres
+        self.caixa = caixa
+
+    def execute(self, bicicleta_id: int, tranca_id: Optional[int], status_final: StatusBicicleta,
+                funcionario_id: Optional[int] = None) -> Bicicleta:
+        """Sem tranca_id, retira a bicicleta da tranca onde ela está presa."""
         bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
-        tranca = self.tranca_repo.buscar_por_id(tranca_id)
-
         if not bicicleta:
             raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+
+        if tranca_id is None:
+            tranca = localizar_tranca(self.localizacao, self.tranca_repo, bicicleta_id)
+            if not tranca:
+                raise ValueError(ERRO_BICICLETA_FORA_DE_TRANCA)
+        else:
+            tranca = self.tranca_repo.buscar_por_id(tranca_id)
         if not tranca:
             raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
 
         if tranca.bicicleta_id != bicicleta.id:
             raise ValueError("A bicicleta informada não está na tranca especificada.")
         
-        if tranca.status != StatusTranca.OCUPADA:
+        if not MAQUINA_TRANCA.permite(OPERACAO_DESTRANCAR, tranca.status, StatusTranca.DISPONIVEL):
             raise ValueError("A tranca não está ocupada.")
 
-        if status_final not in [StatusBicicleta.EM_REPARO, StatusBicicleta.APOSENTADA]:
+        if not MAQUINA_BICICLETA.permite(OPERACAO_RETIRAR, bicicleta.status, status_final):
             raise ValueError(f"Status de destino '{status_final.value}' é inválido para esta operação.")
 
+        status_bicicleta, status_tranca = bicicleta.status, tranca.status
         bicicleta.status = status_final
         tranca.status = StatusTranca.DISPONIVEL
         tranca.bicicleta_id = None
 
         bicicleta_atualizada = self.bicicleta_repo.salvar(bicicleta)
         self.tranca_repo.salvar(tranca)
-
+        MAQUINA_BICICLETA.registrar(OPERACAO_RETIRAR, status_bicicleta, status_final)
+        MAQUINA_TRANCA.registrar(OPERACAO_DESTRANCAR, status_tranca, StatusTranca.DISPONIVEL)
+        _desassociar(self.localizacao, bicicleta.id, tranca.id)
+        _atualizar_vaga(self.livres, tranca)
+        _notificar(self.caixa, EVENTO_BICICLETA_RETIRADA, {
+            "bicicleta_id": bicicleta.id, "tranca_id": tranca.id, "totem_id": tranca.totem_id,
+            "status": status_final.value, "funcionario_id": funcionario_id,
+        })
+
+        _publicar(self.publicador, EVENTO_BICICLETA_RETIRADA, ENTIDADE_BICICLETA, bicicleta_atualizada, tranca.totem_id)
+        _publicar(self.publicador, EVENTO_BICICLETA_RETIRADA, ENTIDADE_TRANCA, tranca, tranca.totem_id)
         return bicicleta_atualizada
 
 # ======================================================
@@ -126,8 +364,9 @@ class RetirarBicicletaDaRedeUseCase:
 # ======================================================
 
 class CadastrarTrancaUseCase:
-    def __init__(self, repository: TrancaRepositoryInterface):
+    def __init__(self, repository: TrancaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
     def execute(self, dados_tranca: Dict[str, Any]) -> Tranca:
         nova_tranca = Tranca(
             numero=dados_tranca["numero"],
@@ -136,7 +375,15 @@ class CadastrarTrancaUseCase:
             modelo=dados_tranca["modelo"],
             status=StatusTranca.NOVA,
         )
-        return self.repository.salvar(nova_tranca)
+        nova_tranca = self.repository.salvar(nova_tranca)
+        _indexar(self.indice, nova_tranca, textos_tranca)
+        return nova_tranca
+
+class BuscarTrancasPorTextoUseCase(_BuscarPorTextoUseCase):
+    """Busca trancas por modelo e localização."""
+
+class FiltrarTrancasUseCase(_FiltrarUseCase):
+    """Filtra trancas por status, modelo, localização e totem."""
 
 class ListarTrancasUseCase:
     def __init__(self, repository: TrancaRepositoryInterface):
@@ -151,14 +398,22 @@ class BuscarTrancaPorIdUseCase:
         return self.repository.buscar_por_id(tranca_id)
 
 class DeletarTrancaUseCase:
-    def __init__(self, repository: TrancaRepositoryInterface):
+    def __init__(self, repository: TrancaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None, livres: Optional[TrancasLivresInterface] = None):
         self.repository = repository
+        self.indice = indice
+        self.livres = livres
     def execute(self, tranca_id: int) -> None:
         self.repository.deletar(tranca_id)
+        _desindexar(self.indice, tranca_id)
+        if self.livres is not None:
+            self.livres.remover(tranca_id)
 
 class AlterarStatusTrancaUseCase:
-    def __init__(self, repository: TrancaRepositoryInterface):
+    def __init__(self, repository: TrancaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 livres: Optional[TrancasLivresInterface] = None):
         self.repository = repository
+        self.publicador = publicador
+        self.livres = livres
 
     def execute(self, tranca_id: int, novo_status: StatusTranca) -> Tranca:
         tranca = self.repository.buscar_por_id(tranca_id)
@@ -166,16 +421,39 @@ class AlterarStatusTrancaUseCase:
         if not tranca:
             raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
 
-        if novo_status == StatusTranca.OCUPADA:
+        if not MAQUINA_TRANCA.aceita_destino(OPERACAO_ALTERAR_STATUS, novo_status):
             raise ValueError(f"Status '{novo_status.value}' não pode ser definido diretamente. Use a operação de trancar com uma bicicleta.")
         
-        if tranca.status == StatusTranca.OCUPADA and novo_status == StatusTranca.DISPONIVEL:
+        if not MAQUINA_TRANCA.permite(OPERACAO_ALTERAR_STATUS, tranca.status, novo_status):
             raise ValueError("Não é possível liberar uma tranca ocupada. Use a operação de destrancar ou retirar bicicleta.")
 
+        status_anterior = tranca.status
         tranca.status = novo_status
 
-        return self.repository.salvar(tranca)
+        tranca_atualizada = self.repository.salvar(tranca)
+        MAQUINA_TRANCA.registrar(OPERACAO_ALTERAR_STATUS, status_anterior, novo_status)
+        _atualizar_vaga(self.livres, tranca_atualizada)
+        _publicar(self.publicador, EVENTO_STATUS_TRANCA_ALTERADO, ENTIDADE_TRANCA, tranca_atualizada, tranca_atualizada.totem_id)
+        return tranca_atualizada
     
+def _validar_totens(totem_repo: TotemRepositoryInterface, totem_ids: List[int]) -> List[int]:
+    """Remove repetições (mantendo a ordem) e falha se algum totem não existir."""
+    totem_ids = list(dict.fromkeys(totem_ids))
+    inexistentes = [totem_id for totem_id in totem_ids if not totem_repo.buscar_por_id(totem_id)]
+    if inexistentes:
+        raise ValueError(f"{ERRO_TOTEM_NAO_ENCONTRADO} IDs: {', '.join(map(str, inexistentes))}.")
+    return totem_ids
+
+class ListarTrancasPorTotensUseCase:
+    """Trancas de vários totens, agrupadas por totem, numa única consulta ao repositório."""
+    def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface):
+        self.totem_repo = totem_repo
+        self.tranca_repo = tranca_repo
+
+    def execute(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        totem_ids = _validar_totens(self.totem_repo, totem_ids)
+        return self.tranca_repo.buscar_por_totem_ids(totem_ids)
+
 class ListarTrancasPorTotemUseCase:
     def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface):
         self.totem_repo = totem_repo
@@ -189,9 +467,13 @@ class ListarTrancasPorTotemUseCase:
         return self.tranca_repo.buscar_por_totem_id(totem_id)
 
 class IntegrarTrancaNoTotemUseCase:
-    def __init__(self, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface):
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 livres: Optional[TrancasLivresInterface] = None, caixa: Optional[CaixaDeSaidaInterface] = None):
         self.tranca_repo = tranca_repo
         self.totem_repo = totem_repo
+        self.publicador = publicador
+        self.livres = livres
+        self.caixa = caixa
 
     def execute(self, tranca_id: int, totem_id: int, funcionario_id: int) -> Tranca:
         tranca = self.tranca_repo.buscar_por_id(tranca_id)
@@ -205,14 +487,22 @@ class IntegrarTrancaNoTotemUseCase:
         if tranca.totem_id is not None:
             raise ValueError(f"Tranca já está integrada ao totem {tranca.totem_id}.")
         
-        if tranca.status not in [StatusTranca.NOVA, StatusTranca.EM_REPARO]:
+        if not MAQUINA_TRANCA.permite(OPERACAO_INTEGRAR, tranca.status, StatusTranca.DISPONIVEL):
             raise ValueError(f"Tranca com status '{tranca.status.value}' não pode ser integrada.")
 
+        status_anterior = tranca.status
         tranca.totem_id = totem.id
         tranca.status = StatusTranca.DISPONIVEL
         
         tranca_atualizada = self.tranca_repo.salvar(tranca)
-
+        MAQUINA_TRANCA.registrar(OPERACAO_INTEGRAR, status_anterior, StatusTranca.DISPONIVEL)
+        _atualizar_vaga(self.livres, tranca_atualizada)
+        _notificar(self.caixa, EVENTO_TRANCA_INTEGRADA, {
+            "tranca_id": tranca.id, "totem_id": totem.id,
+            "status": StatusTranca.DISPONIVEL.value, "funcionario_id": funcionario_id,
+        })
+
+        _publicar(self.publicador, EVENTO_TRANCA_INTEGRADA, ENTIDADE_TRANCA, tranca_atualizada, totem.id)
         return tranca_atualizada
         
 # ======================================================
@@ -220,14 +510,23 @@ class IntegrarTrancaNoTotemUseCase:
 # ======================================================
 
 class CadastrarTotemUseCase:
-    def __init__(self, repository: TotemRepositoryInterface):
+    def __init__(self, repository: TotemRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
     def execute(self, dados_totem: Dict[str, Any]) -> Totem:
         novo_totem = Totem(
             localizacao=dados_totem["localizacao"],
             descricao=dados_totem["descricao"],
         )
-        return self.repository.salvar(novo_totem)
+        novo_totem = self.repository.salvar(novo_totem)
+        _indexar(self.indice, novo_totem, textos_totem)
+        return novo_totem
+
+class BuscarTotensPorTextoUseCase(_BuscarPorTextoUseCase):
+    """Busca totens por localização e descrição."""
+
+class FiltrarTotensUseCase(_FiltrarUseCase):
+    """Filtra totens por localização."""
 
 class ListarTotensUseCase:
     def __init__(self, repository: TotemRepositoryInterface):
@@ -242,15 +541,18 @@ class BuscarTotemPorIdUseCase:
         return self.repository.buscar_por_id(totem_id)
 
 class DeletarTotemUseCase:
-    def __init__(self, repository: TotemRepositoryInterface):
+    def __init__(self, repository: TotemRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
     def execute(self, totem_id: int) -> None:
         self.repository.deletar(totem_id)
+        _desindexar(self.indice, totem_id)
 
 
 class AtualizarBicicletaUseCase:
-    def __init__(self, repository: BicicletaRepositoryInterface):
+    def __init__(self, repository: BicicletaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
 
     def execute(self, bicicleta_id: int, dados_atualizacao: dict) -> Bicicleta:
         bicicleta = self.repository.buscar_por_id(bicicleta_id)
@@ -262,12 +564,15 @@ class AtualizarBicicletaUseCase:
         bicicleta.ano = dados_atualizacao.get("ano", bicicleta.ano)
         bicicleta.numero = dados_atualizacao.get("numero", bicicleta.numero)
         
-        return self.repository.salvar(bicicleta)
+        bicicleta = self.repository.salvar(bicicleta)
+        _indexar(self.indice, bicicleta, textos_bicicleta)
+        return bicicleta
 
 
 class AtualizarTrancaUseCase:
-    def __init__(self, repository: TrancaRepositoryInterface):
+    def __init__(self, repository: TrancaRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
 
     def execute(self, tranca_id: int, dados_atualizacao: dict) -> Tranca:
         tranca = self.repository.buscar_por_id(tranca_id)
@@ -279,12 +584,15 @@ class AtualizarTrancaUseCase:
         tranca.ano_de_fabricacao = dados_atualizacao.get("ano_de_fabricacao", tranca.ano_de_fabricacao)
         tranca.modelo = dados_atualizacao.get("modelo", tranca.modelo)
         
-        return self.repository.salvar(tranca)
+        tranca = self.repository.salvar(tranca)
+        _indexar(self.indice, tranca, textos_tranca)
+        return tranca
 
 
 class AtualizarTotemUseCase:
-    def __init__(self, repository: TotemRepositoryInterface):
+    def __init__(self, repository: TotemRepositoryInterface, indice: Optional[IndiceDeBuscaInterface] = None):
         self.repository = repository
+        self.indice = indice
 
     def execute(self, totem_id: int, dados_atualizacao: dict) -> Totem:
         totem = self.repository.buscar_por_id(totem_id)
@@ -294,7 +602,9 @@ class AtualizarTotemUseCase:
         totem.localizacao = dados_atualizacao.get("localizacao", totem.localizacao)
         totem.descricao = dados_atualizacao.get("descricao", totem.descricao)
 
-        return self.repository.salvar(totem)
+        totem = self.repository.salvar(totem)
+        _indexar(self.indice, totem, textos_totem)
+        return totem
     
 class BuscarBicicletaEmTrancaUseCase:
     def __init__(self, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
@@ -317,6 +627,34 @@ class BuscarBicicletaEmTrancaUseCase:
 
         return bicicleta
     
+class ListarBicicletasPorTotensUseCase:
+    """
+    Bicicletas presas nas trancas de vários totens, agrupadas por totem: uma
+    consulta de trancas para todos os totens e uma busca das bicicletas por id.
+    """
+    def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
+        self.totem_repo = totem_repo
+        self.tranca_repo = tranca_repo
+        self.bicicleta_repo = bicicleta_repo
+
+    def execute(self, totem_ids: List[int]) -> Dict[int, List[Bicicleta]]:
+        totem_ids = _validar_totens(self.totem_repo, totem_ids)
+        trancas_por_totem = self.tranca_repo.buscar_por_totem_ids(totem_ids)
+
+        ids_de_bicicletas = [
+            tranca.bicicleta_id for trancas in trancas_por_totem.values() for tranca in trancas
+            if tranca.bicicleta_id is not None
+        ]
+        bicicletas = {b.id: b for b in self.bicicleta_repo.buscar_por_ids(ids_de_bicicletas)} if ids_de_bicicletas else {}
+
+        return {
+            totem_id: sorted(
+                (bicicletas[t.bicicleta_id] for t in trancas_por_totem.get(totem_id, []) if t.bicicleta_id in bicicletas),
+                key=lambda b: b.id,
+            )
+            for totem_id in totem_ids
+        }
+
 class ListarBicicletasPorTotemUseCase:
     def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
         self.totem_repo = totem_repo
@@ -341,11 +679,15 @@ class ListarBicicletasPorTotemUseCase:
         return self.bicicleta_repo.buscar_por_ids(ids_de_bicicletas)
     
 class RetirarTrancaDoTotemUseCase:
-    def __init__(self, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface):
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 livres: Optional[TrancasLivresInterface] = None, caixa: Optional[CaixaDeSaidaInterface] = None):
         self.tranca_repo = tranca_repo
         self.totem_repo = totem_repo
+        self.publicador = publicador
+        self.livres = livres
+        self.caixa = caixa
 
-    def execute(self, tranca_id: int, totem_id: int, status_final: StatusTranca) -> Tranca:
+    def execute(self, tranca_id: int, totem_id: int, status_final: StatusTranca, funcionario_id: Optional[int] = None) -> Tranca:
         tranca = self.tranca_repo.buscar_por_id(tranca_id)
         totem = self.totem_repo.buscar_por_id(totem_id)
 
@@ -357,58 +699,90 @@ class RetirarTrancaDoTotemUseCase:
         if tranca.totem_id != totem.id:
             raise ValueError("Tranca não pertence ao totem informado.")
         
-        # NOVA REGRA: A tranca deve ter o status REPARO_SOLICITADO
-        if tranca.status != StatusTranca.REPARO_SOLICITADO:
+        # A tranca deve ter o status REPARO_SOLICITADO (o que já exclui as ocupadas).
+        if not MAQUINA_TRANCA.aceita_origem(OPERACAO_RETIRAR, tranca.status):
             raise ValueError("Ação negada. Apenas trancas com status 'REPARO_SOLICITADO' podem ser retiradas.")
 
-        if tranca.status == StatusTranca.OCUPADA:
-            raise ValueError("Não é possível retirar uma tranca que está ocupada por uma bicicleta.")
-        
-        if status_final not in [StatusTranca.EM_REPARO, StatusTranca.APOSENTADA]:
+        if not MAQUINA_TRANCA.permite(OPERACAO_RETIRAR, tranca.status, status_final):
             raise ValueError(f"Status de destino '{status_final.value}' é inválido para esta operação.")
         
+        status_anterior = tranca.status
         tranca.status = status_final
         tranca.totem_id = None
 
-        return self.tranca_repo.salvar(tranca)
+        tranca_atualizada = self.tranca_repo.salvar(tranca)
+        MAQUINA_TRANCA.registrar(OPERACAO_RETIRAR, status_anterior, status_final)
+        _atualizar_vaga(self.livres, tranca_atualizada)
+        _notificar(self.caixa, EVENTO_TRANCA_RETIRADA, {
+            "tranca_id": tranca.id, "totem_id": totem.id,
+            "status": status_final.value, "funcionario_id": funcionario_id,
+        })
+        # O evento leva o totem de origem, para que os painéis daquele totem vejam a saída.
+        _publicar(self.publicador, EVENTO_TRANCA_RETIRADA, ENTIDADE_TRANCA, tranca_atualizada, totem.id)
+        return tranca_atualizada
 
 class TrancarTrancaUseCase:
-    def __init__(self, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None, livres: Optional[TrancasLivresInterface] = None,
+                 reservas: Optional[ReservasInterface] = None):
         self.tranca_repo = tranca_repo
         self.bicicleta_repo = bicicleta_repo
+        self.publicador = publicador
+        self.localizacao = localizacao
+        self.livres = livres
+        self.reservas = reservas
 
-    def execute(self, tranca_id: int, bicicleta_id: int) -> Tranca:
+    def execute(self, tranca_id: int, bicicleta_id: int, reserva_id: Optional[str] = None) -> Tranca:
+        """Uma tranca reservada só recebe a bicicleta de quem apresentar a reserva."""
         tranca = self.tranca_repo.buscar_por_id(tranca_id)
         bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
 
         if not tranca: raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
         if not bicicleta: raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+        _conferir_reserva(self.reservas, ENTIDADE_TRANCA, tranca.id, reserva_id, ERRO_TRANCA_RESERVADA)
 
-        if tranca.status != StatusTranca.DISPONIVEL:
+        if not MAQUINA_TRANCA.permite(OPERACAO_TRANCAR, tranca.status, StatusTranca.OCUPADA):
             raise ValueError("A tranca não está livre para receber uma bicicleta.")
         
-        if bicicleta.status != StatusBicicleta.EM_USO:
+        if not MAQUINA_BICICLETA.permite(OPERACAO_TRANCAR, bicicleta.status, StatusBicicleta.DISPONIVEL):
             raise ValueError("A bicicleta não está em uso para ser devolvida.")
 
+        status_tranca, status_bicicleta = tranca.status, bicicleta.status
         tranca.status = StatusTranca.OCUPADA
         tranca.bicicleta_id = bicicleta.id
         bicicleta.status = StatusBicicleta.DISPONIVEL
 
         self.bicicleta_repo.salvar(bicicleta)
-        return self.tranca_repo.salvar(tranca)
+        tranca_atualizada = self.tranca_repo.salvar(tranca)
+        MAQUINA_TRANCA.registrar(OPERACAO_TRANCAR, status_tranca, StatusTranca.OCUPADA)
+        MAQUINA_BICICLETA.registrar(OPERACAO_TRANCAR, status_bicicleta, StatusBicicleta.DISPONIVEL)
+        _associar(self.localizacao, bicicleta.id, tranca.id)
+        _atualizar_vaga(self.livres, tranca_atualizada)
+        _encerrar_reserva(self.reservas, ENTIDADE_TRANCA, tranca.id)
+
+        _publicar(self.publicador, EVENTO_TRANCA_TRANCADA, ENTIDADE_BICICLETA, bicicleta, tranca.totem_id)
+        _publicar(self.publicador, EVENTO_TRANCA_TRANCADA, ENTIDADE_TRANCA, tranca_atualizada, tranca.totem_id)
+        return tranca_atualizada
 
 
 class DestrancarTrancaUseCase:
-    def __init__(self, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface, publicador: Optional[PublicadorDeEventosInterface] = None,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None, livres: Optional[TrancasLivresInterface] = None,
+                 reservas: Optional[ReservasInterface] = None):
         self.tranca_repo = tranca_repo
         self.bicicleta_repo = bicicleta_repo
+        self.publicador = publicador
+        self.localizacao = localizacao
+        self.livres = livres
+        self.reservas = reservas
 
-    def execute(self, tranca_id: int) -> Tranca:
+    def execute(self, tranca_id: int, reserva_id: Optional[str] = None) -> Tranca:
+        """Uma bicicleta reservada só é liberada para quem apresentar a reserva."""
         tranca = self.tranca_repo.buscar_por_id(tranca_id)
 
         if not tranca: raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
 
-        if tranca.status != StatusTranca.OCUPADA:
+        if not MAQUINA_TRANCA.permite(OPERACAO_DESTRANCAR, tranca.status, StatusTranca.DISPONIVEL):
             raise ValueError("A tranca não está ocupada.")
         if tranca.bicicleta_id is None:
             raise ValueError("Inconsistência: Tranca ocupada mas sem bicicleta associada.")
@@ -416,26 +790,260 @@ class DestrancarTrancaUseCase:
         bicicleta = self.bicicleta_repo.buscar_por_id(tranca.bicicleta_id)
         if not bicicleta:
              raise ValueError(f"Inconsistência: Bicicleta com ID {tranca.bicicleta_id} não foi encontrada.")
+        _conferir_reserva(self.reservas, ENTIDADE_BICICLETA, bicicleta.id, reserva_id, ERRO_BICICLETA_RESERVADA)
 
+        status_tranca, status_bicicleta = tranca.status, bicicleta.status
         tranca.status = StatusTranca.DISPONIVEL
         tranca.bicicleta_id = None
         bicicleta.status = StatusBicicleta.EM_USO
 
         self.bicicleta_repo.salvar(bicicleta)
-        return self.tranca_repo.salvar(tranca)
+        tranca_atualizada = self.tranca_repo.salvar(tranca)
+        MAQUINA_TRANCA.registrar(OPERACAO_DESTRANCAR, status_tranca, StatusTranca.DISPONIVEL)
+        MAQUINA_BICICLETA.registrar(OPERACAO_DESTRANCAR, status_bicicleta, StatusBicicleta.EM_USO)
+        _desassociar(self.localizacao, bicicleta.id, tranca.id)
+        _atualizar_vaga(self.livres, tranca)
+        _encerrar_reserva(self.reservas, ENTIDADE_BICICLETA, bicicleta.id)
+
+        _publicar(self.publicador, EVENTO_TRANCA_DESTRANCADA, ENTIDADE_BICICLETA, bicicleta, tranca.totem_id)
+        _publicar(self.publicador, EVENTO_TRANCA_DESTRANCADA, ENTIDADE_TRANCA, tranca_atualizada, tranca.totem_id)
+        return tranca_atualizada
     
+class DevolverBicicletaNoTotemUseCase:
+    """
+    Prende a bicicleta numa tranca livre do totem escolhida pelo serviço,
+    pelas regras de TrancarTrancaUseCase. Com a lista de trancas livres a
+    escolha é O(1) e cada tranca é entregue a uma única devolução; sem ela,
+    as trancas do totem são percorridas.
+    """
+    def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface,
+                 trancar: TrancarTrancaUseCase, livres: Optional[TrancasLivresInterface] = None,
+                 reservas: Optional[ReservasInterface] = None):
+        self.totem_repo = totem_repo
+        self.tranca_repo = tranca_repo
+        self.bicicleta_repo = bicicleta_repo
+        self.trancar = trancar
+        self.livres = livres
+        self.reservas = reservas
+
+    def _candidatas(self, totem_id: int):
+        if self.livres is None:
+            return (t.id for t in self.tranca_repo.buscar_por_totem_id(totem_id) if _tranca_livre(t))
+        return iter(lambda: self.livres.alocar(totem_id), None)
+
+    def execute(self, totem_id: int, bicicleta_id: int, reserva_id: Optional[str] = None) -> Tranca:
+        """Com a reserva de uma tranca do totem, a bicicleta vai para ela; trancas reservadas por outros são puladas."""
+        if not self.totem_repo.buscar_por_id(totem_id):
+            raise ValueError(ERRO_TOTEM_NAO_ENCONTRADO)
+        bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
+        if not bicicleta:
+            raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+        # Validada antes de alocar, para não tirar uma tranca da lista à toa.
+        if not MAQUINA_BICICLETA.permite(OPERACAO_TRANCAR, bicicleta.status, StatusBicicleta.DISPONIVEL):
+            raise ValueError("A bicicleta não está em uso para ser devolvida.")
+
+        reserva = self.reservas.buscar(reserva_id) if self.reservas is not None and reserva_id else None
+        if reserva is not None and reserva.entidade == ENTIDADE_TRANCA and reserva.totem_id == totem_id:
+            return self.trancar.execute(reserva.entidade_id, bicicleta_id, reserva_id)
+
+        for tranca_id in self._candidatas(totem_id):
+            if _reservada_por_outro(self.reservas, ENTIDADE_TRANCA, tranca_id, None) is not None:
+                # Fica fora da lista até a reserva acabar (ver LiberarReservasEncerradasUseCase).
+                continue
+            try:
+                return self.trancar.execute(tranca_id, bicicleta_id)
+            except ValueError:
+                tranca = self.tranca_repo.buscar_por_id(tranca_id)
+                if (tranca is not None and tranca.totem_id == totem_id and _tranca_livre(tranca)
+                        and _reservada_por_outro(self.reservas, ENTIDADE_TRANCA, tranca_id, None) is None):
+                    # A tranca continua livre, então o problema é a bicicleta: devolve a vaga.
+                    _atualizar_vaga(self.livres, tranca)
+                    raise
+                # Entrada desatualizada (a tranca foi ocupada por outro caminho): tenta a próxima.
+        raise ValueError(ERRO_TOTEM_SEM_TRANCA_LIVRE)
+
+class ReservarBicicletaUseCase:
+    """Reserva, por alguns minutos, uma bicicleta disponível presa numa tranca."""
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, reservas: ReservasInterface,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None):
+        self.bicicleta_repo = bicicleta_repo
+        self.tranca_repo = tranca_repo
+        self.reservas = reservas
+        self.localizacao = localizacao
+
+    def execute(self, bicicleta_id: int, duracao: float) -> Reserva:
+        bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
+        if not bicicleta:
+            raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+        if bicicleta.status != StatusBicicleta.DISPONIVEL:
+            raise ValueError(f"Bicicleta com status '{bicicleta.status.value}' não pode ser reservada.")
+        tranca = localizar_tranca(self.localizacao, self.tranca_repo, bicicleta_id)
+        if not tranca:
+            raise ValueError(ERRO_BICICLETA_FORA_DE_TRANCA)
+
+        reserva = self.reservas.criar(ENTIDADE_BICICLETA, bicicleta.id, duracao, tranca.totem_id)
+        if reserva is None:
+            raise ValueError(ERRO_BICICLETA_RESERVADA)
+        return reserva
+
+class ReservarTrancaUseCase:
+    """Reserva, por alguns minutos, uma tranca livre para a devolução de uma bicicleta."""
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, reservas: ReservasInterface,
+                 livres: Optional[TrancasLivresInterface] = None):
+        self.tranca_repo = tranca_repo
+        self.reservas = reservas
+        self.livres = livres
+
+    def execute(self, tranca_id: int, duracao: float) -> Reserva:
+        tranca = self.tranca_repo.buscar_por_id(tranca_id)
+        if not tranca:
+            raise ValueError(ERRO_TRANCA_NAO_ENCONTRADA)
+        if not _tranca_livre(tranca):
+            raise ValueError("Apenas trancas livres integradas a um totem podem ser reservadas.")
+
+        reserva = self.reservas.criar(ENTIDADE_TRANCA, tranca.id, duracao, tranca.totem_id)
+        if reserva is None:
+            raise ValueError(ERRO_TRANCA_RESERVADA)
+        # Enquanto durar a reserva, as devoluções sem ela não recebem esta tranca.
+        if self.livres is not None:
+            self.livres.remover(tranca.id)
+        return reserva
+
+class BuscarReservaPorIdUseCase:
+    def __init__(self, reservas: ReservasInterface):
+        self.reservas = reservas
+    def execute(self, reserva_id: str) -> Optional[Reserva]:
+        return self.reservas.buscar(reserva_id)
+
+class LiberarReservasEncerradasUseCase:
+    """Devolve às trancas livres do totem as trancas cuja reserva venceu ou foi cancelada."""
+    def __init__(self, tranca_repo: TrancaRepositoryInterface, livres: Optional[TrancasLivresInterface] = None):
+        self.tranca_repo = tranca_repo
+        self.livres = livres
+
+    def execute(self, reservas: List[Reserva]) -> None:
+        if self.livres is None:
+            return
+        for reserva in reservas:
+            if reserva.entidade == ENTIDADE_TRANCA:
+                tranca = self.tranca_repo.buscar_por_id(reserva.entidade_id)
+                if tranca is not None:
+                    _atualizar_vaga(self.livres, tranca)
+
+class CancelarReservaUseCase:
+    def __init__(self, reservas: ReservasInterface, liberar: LiberarReservasEncerradasUseCase):
+        self.reservas = reservas
+        self.liberar = liberar
+
+    def execute(self, reserva_id: str) -> Reserva:
+        reserva = self.reservas.remover(reserva_id)
+        if reserva is None:
+            raise ValueError(ERRO_RESERVA_NAO_ENCONTRADA)
+        self.liberar.execute([reserva])
+        return reserva
+
 class RestaurarDadosUseCase:
     """
     Caso de uso para restaurar todos os dados da aplicação para o estado inicial.
     """
-    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface):
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface,
+                 indice_bicicletas: Optional[IndiceDeBuscaInterface] = None, indice_trancas: Optional[IndiceDeBuscaInterface] = None,
+                 indice_totens: Optional[IndiceDeBuscaInterface] = None, localizacao: Optional[LocalizacaoDeBicicletasInterface] = None,
+                 livres: Optional[TrancasLivresInterface] = None):
         self.bicicleta_repo = bicicleta_repo
         self.tranca_repo = tranca_repo
         self.totem_repo = totem_repo
+        self.indice_bicicletas = indice_bicicletas
+        self.indice_trancas = indice_trancas
+        self.indice_totens = indice_totens
+        self.localizacao = localizacao
+        self.livres = livres
 
     def execute(self) -> None:
         # A ordem é importante: primeiro os independentes (Totem, Bicicleta), depois os dependentes (Tranca)
         self.totem_repo.restaurar_para_estado_inicial()
         self.bicicleta_repo.restaurar_para_estado_inicial()
         self.tranca_repo.restaurar_para_estado_inicial()
+        reconstruir_indice(self.indice_totens, self.totem_repo.listar_todos(), textos_totem)
+        reconstruir_indice(self.indice_bicicletas, self.bicicleta_repo.listar_todas(), textos_bicicleta)
+        trancas = self.tranca_repo.listar_todas()
+        reconstruir_indice(self.indice_trancas, trancas, textos_tranca)
+        reconstruir_localizacoes(self.localizacao, trancas)
+        reconstruir_vagas(self.livres, trancas)
+
+
+def reconstruir_indice(indice: Optional[IndiceDeBuscaInterface], entidades: list, textos) -> None:
+    """Reindexa do zero as entidades vivas (usado na inicialização e na restauração)."""
+    if indice is None:
+        return
+    indice.limpar()
+    for entidade in entidades:
+        indice.indexar(entidade.id, textos(entidade))
+
+# ======================================================
+# --- Casos de Uso para a Rede ---
+# ======================================================
+
+TopologiaDaRede = List[Tuple[Totem, List[Tuple[Tranca, Optional[Bicicleta]]]]]
+
+class MontarTopologiaDaRedeUseCase:
+    """
+    Monta a rede inteira: cada totem com as suas trancas e a bicicleta presa
+    em cada uma. Usa uma listagem de totens, uma consulta de trancas para
+    todos eles e uma busca das bicicletas por id.
+    """
+    def __init__(self, totem_repo: TotemRepositoryInterface, tranca_repo: TrancaRepositoryInterface, bicicleta_repo: BicicletaRepositoryInterface):
+        self.totem_repo = totem_repo
+        self.tranca_repo = tranca_repo
+        self.bicicleta_repo = bicicleta_repo
+
+    def execute(self) -> TopologiaDaRede:
+        totens = sorted(self.totem_repo.listar_todos(), key=lambda t: t.id)
+        trancas_por_totem = self.tranca_repo.buscar_por_totem_ids([t.id for t in totens])
+        ids_de_bicicletas = [
+            tranca.bicicleta_id for trancas in trancas_por_totem.values() for tranca in trancas
+            if tranca.bicicleta_id is not None
+        ]
+        bicicletas = {b.id: b for b in self.bicicleta_repo.buscar_por_ids(ids_de_bicicletas)} if ids_de_bicicletas else {}
+        return [
+            (totem, [(tranca, bicicletas.get(tranca.bicicleta_id)) for tranca in trancas_por_totem.get(totem.id, [])])
+            for totem in totens
+        ]
+
+LocalizacaoDaBicicleta = Tuple[Tranca, Optional[Totem]]
+
+class BuscarLocalizacaoDaBicicletaUseCase:
+    """Tranca e totem onde uma bicicleta está presa, pelo mapa bicicleta -> tranca."""
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface, totem_repo: TotemRepositoryInterface,
+                 localizacao: Optional[LocalizacaoDeBicicletasInterface] = None):
+        self.bicicleta_repo = bicicleta_repo
+        self.tranca_repo = tranca_repo
+        self.totem_repo = totem_repo
+        self.localizacao = localizacao
+
+    def execute(self, bicicleta_id: int) -> Optional[LocalizacaoDaBicicleta]:
+        """None se a bicicleta existe mas não está presa em nenhuma tranca."""
+        if not self.bicicleta_repo.buscar_por_id(bicicleta_id):
+            raise ValueError(ERRO_BICICLETA_NAO_ENCONTRADA)
+        tranca = localizar_tranca(self.localizacao, self.tranca_repo, bicicleta_id)
+        if tranca is None:
+            return None
+        totem = self.totem_repo.buscar_por_id(tranca.totem_id) if tranca.totem_id is not None else None
+        return tranca, totem
+
+# ======================================================
+# --- Casos de Uso para Sincronização ---
+# ======================================================
+
+class ListarMudancasUseCase:
+    """
+    Caso de uso para a sincronização incremental: devolve apenas as mudanças
+    posteriores ao cursor 'desde' informado pelo consumidor.
+    """
+    def __init__(self, registro: RegistroDeMudancasInterface):
+        self.registro = registro
 
+    def execute(self, desde: int, limite: int) -> PaginaDeMudancas:
+        if limite <= 0:
+            raise ValueError("O limite deve ser maior que zero.")
+        return self.registro.listar_desde(desde, limite)
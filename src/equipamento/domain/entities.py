@@ -2,7 +2,11 @@
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional 
+from typing import Any, Dict, List, Optional 
+
+ENTIDADE_BICICLETA = "bicicleta"
+ENTIDADE_TRANCA = "tranca"
+ENTIDADE_TOTEM = "totem"
 
 class StatusBicicleta(str, Enum):
     DISPONIVEL = "DISPONÍVEL"
@@ -49,4 +53,47 @@ class Totem:
     descricao: str
     id: Optional[int] = None 
     tranca_ids: List[int] = field(default_factory=list)
-    is_deleted: bool = False
\ No newline at end of file
+    is_deleted: bool = False
+
+@dataclass
+class Mudanca:
+    """Registro de uma alteração (salvar ou deletar) feita em um repositório."""
+    sequencia: int
+    entidade: str
+    entidade_id: int
+    operacao: str
+    dados: Dict[str, Any]
+
+@dataclass
+class PaginaDeMudancas:
+    """Fatia do log de mudanças entregue a um consumidor incremental."""
+    mudancas: List[Mudanca]
+    sequencia_atual: int
+    ressincronizar: bool = False
+
+@dataclass
+class Evento:
+    """Notificação de uma mudança de estado já confirmada por um caso de uso."""
+    tipo: str
+    entidade: str
+    entidade_id: int
+    dados: Dict[str, Any]
+    totem_id: Optional[int] = None
+
+@dataclass
+class Reserva:
+    """Reserva temporária de uma bicicleta presa numa tranca ou de uma tranca livre."""
+    id: str
+    entidade: str
+    entidade_id: int
+    expira_em: float
+    totem_id: Optional[int] = None
+
+@dataclass
+class Notificacao:
+    """Aviso a outro microsserviço, guardado na caixa de saída até ser entregue."""
+    id: int
+    destino: str
+    tipo: str
+    dados: Dict[str, Any]
+    criada_em: float
@@ -0,0 +1,122 @@
+# src/equipamento/domain/state_machine.py
+"""
+Tabelas de transição de status de bicicletas e trancas.
+
+Cada operação (integrar, trancar, ...) declara os pares (origem, destino)
+que aceita. As regras são compiladas uma única vez numa tabela plana de
+bytes indexada por (operação, origem, destino), então consultar uma
+transição é uma conta de índice e um acesso à tabela, e validar um lote
+inteiro é um único laço sobre ela.
+"""
+
+import threading
+from enum import Enum
+from itertools import product
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .entities import StatusBicicleta, StatusTranca
+
+OPERACAO_ALTERAR_STATUS = "alterar_status"
+OPERACAO_INTEGRAR = "integrar"
+OPERACAO_RETIRAR = "retirar"
+OPERACAO_TRANCAR = "trancar"
+OPERACAO_DESTRANCAR = "destrancar"
+
+
+class MaquinaDeEstados:
+    """
+    Tabela de transições compilada, com um contador por transição aplicada.
+
+    A tabela é imutável depois de criada; só os contadores mudam, sob uma
+    trava própria.
+    """
+
+    def __init__(self, estados: Iterable[Enum], regras: Mapping[str, Iterable[Tuple[Enum, Enum]]]):
+        self.estados: Tuple[Enum, ...] = tuple(estados)
+        self.operacoes: Tuple[str, ...] = tuple(regras)
+        n = len(self.estados)
+        self._n = n
+        self._codigo: Dict[Enum, int] = {estado: i for i, estado in enumerate(self.estados)}
+        self._base: Dict[str, int] = {operacao: k * n * n for k, operacao in enumerate(self.operacoes)}
+        self._tabela = bytearray(len(self.operacoes) * n * n)
+        self._origens = bytearray(len(self.operacoes) * n)
+        self._destinos = bytearray(len(self.operacoes) * n)
+        for k, (operacao, pares) in enumerate(regras.items()):
+            for origem, destino in pares:
+                o, d = self._codigo[origem], self._codigo[destino]
+                self._tabela[self._base[operacao] + o * n + d] = 1
+                self._origens[k * n + o] = 1
+                self._destinos[k * n + d] = 1
+        self._contadores = [0] * len(self._tabela)
+        self._lock = threading.Lock()
+
+    def _posicao(self, operacao: str, origem: Enum, destino: Enum) -> int:
+        return self._base[operacao] + self._codigo[origem] * self._n + self._codigo[destino]
+
+    def permite(self, operacao: str, origem: Enum, destino: Enum) -> bool:
+        return self._tabela[self._posicao(operacao, origem, destino)] == 1
+
+    def aceita_origem(self, operacao: str, origem: Enum) -> bool:
+        """Se a operação parte de 'origem' para algum destino."""
+        return self._origens[self._base[operacao] // self._n + self._codigo[origem]] == 1
+
+    def aceita_destino(self, operacao: str, destino: Enum) -> bool:
+        """Se a operação leva de alguma origem a 'destino'."""
+        return self._destinos[self._base[operacao] // self._n + self._codigo[destino]] == 1
+
+    def validar_lote(self, transicoes: Iterable[Tuple[str, Enum, Enum]]) -> List[bool]:
+        """Valida várias transições (operação, origem, destino) de uma vez."""
+        tabela, base, codigo, n = self._tabela, self._base, self._codigo, self._n
+        return [tabela[base[operacao] + codigo[origem] * n + codigo[destino]] == 1 for operacao, origem, destino in transicoes]
+
+    def registrar(self, operacao: str, origem: Enum, destino: Enum) -> None:
+        """Conta uma transição já aplicada e salva."""
+        posicao = self._posicao(operacao, origem, destino)
+        with self._lock:
+            self._contadores[posicao] += 1
+
+    def estatisticas(self) -> Dict[str, Dict[str, int]]:
+        """Contadores não nulos por operação, com chaves 'ORIGEM->DESTINO'."""
+        with self._lock:
+            contadores = list(self._contadores)
+        n = self._n
+        resultado: Dict[str, Dict[str, int]] = {}
+        for operacao, base in self._base.items():
+            por_transicao = {
+                f"{self.estados[o].value}->{self.estados[d].value}": contadores[base + o * n + d]
+                for o in range(n) for d in range(n)
+                if contadores[base + o * n + d]
+            }
+            if por_transicao:
+                resultado[operacao] = por_transicao
+        return resultado
+
+    def zerar(self) -> None:
+        with self._lock:
+            self._contadores = [0] * len(self._tabela)
+
+
+def _de_qualquer(estados, destinos) -> List[Tuple[Enum, Enum]]:
+    return list(product(estados, destinos))
+
+
+MAQUINA_BICICLETA = MaquinaDeEstados(StatusBicicleta, {
+    # Status definido pelo operador: sem restrição.
+    OPERACAO_ALTERAR_STATUS: _de_qualquer(StatusBicicleta, StatusBicicleta),
+    OPERACAO_INTEGRAR: _de_qualquer([StatusBicicleta.NOVA, StatusBicicleta.EM_REPARO], [StatusBicicleta.DISPONIVEL]),
+    OPERACAO_RETIRAR: _de_qualquer(StatusBicicleta, [StatusBicicleta.EM_REPARO, StatusBicicleta.APOSENTADA]),
+    OPERACAO_TRANCAR: [(StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)],
+    OPERACAO_DESTRANCAR: _de_qualquer(StatusBicicleta, [StatusBicicleta.EM_USO]),
+})
+
+MAQUINA_TRANCA = MaquinaDeEstados(StatusTranca, {
+    # OCUPADA só é alcançada trancando uma bicicleta, e só é deixada destrancando.
+    OPERACAO_ALTERAR_STATUS: [
+        (origem, destino) for origem, destino in product(StatusTranca, StatusTranca)
+        if destino != StatusTranca.OCUPADA and (origem, destino) != (StatusTranca.OCUPADA, StatusTranca.DISPONIVEL)
+    ],
+    OPERACAO_INTEGRAR: _de_qualquer([StatusTranca.NOVA, StatusTranca.EM_REPARO], [StatusTranca.DISPONIVEL]),
+    OPERACAO_RETIRAR: _de_qualquer([StatusTranca.REPARO_SOLICITADO], [StatusTranca.EM_REPARO, StatusTranca.APOSENTADA]),
+    OPERACAO_TRANCAR: [(StatusTranca.DISPONIVEL, StatusTranca.OCUPADA)],
+    OPERACAO_DESTRANCAR: [(StatusTranca.OCUPADA, StatusTranca.DISPONIVEL)],
+})
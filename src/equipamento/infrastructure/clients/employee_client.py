@@ -0,0 +1,240 @@
+# src/equipamento/infrastructure/clients/employee_client.py
+"""
+Cliente do serviço externo de funcionários, usado para validar o
+idFuncionario das ações de manutenção (integrar e retirar bicicletas e
+trancas).
+
+Uma consulta remota por ação seria cara, então o cliente:
+
+- mantém um pool de conexões HTTP/1.1 persistentes (httpx.AsyncClient);
+- guarda as respostas num cache TTL + LRU, as positivas por mais tempo que
+  as negativas (um funcionário recém-cadastrado não fica recusado por muito
+  tempo);
+- coalesce consultas simultâneas pelo mesmo id numa única requisição;
+- passa por um disjuntor: depois de várias falhas seguidas o serviço é dado
+  como fora do ar e as consultas falham na hora, sem esperar o timeout, até
+  que uma consulta de sondagem volte a dar certo.
+
+Com o id no cache a validação não sai do processo. Tudo roda no loop de
+eventos, então as estruturas dispensam trava.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+CAPACIDADE_PADRAO = 10_000
+TTL_POSITIVO_PADRAO = 300.0
+TTL_NEGATIVO_PADRAO = 30.0
+TIMEOUT_PADRAO = 2.0
+CONEXOES_PADRAO = 20
+LIMITE_FALHAS_PADRAO = 5
+ESPERA_PADRAO = 30.0
+
+FECHADO = "FECHADO"
+ABERTO = "ABERTO"
+MEIO_ABERTO = "MEIO_ABERTO"
+
+
+class ServicoDeFuncionariosIndisponivel(Exception):
+    """O serviço de funcionários não respondeu, respondeu com erro ou o disjuntor está aberto."""
+
+    def __init__(self, mensagem: str, tentar_em: float = 0.0):
+        super().__init__(mensagem)
+        self.tentar_em = tentar_em
+
+
+class CacheDeValidacoes:
+    """Resultados de validação por id, com prazo de validade e descarte do menos usado."""
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO, ttl_positivo: float = TTL_POSITIVO_PADRAO,
+                 ttl_negativo: float = TTL_NEGATIVO_PADRAO, relogio: Callable[[], float] = time.monotonic):
+        self.capacidade = capacidade
+        self.ttl_positivo = ttl_positivo
+        self.ttl_negativo = ttl_negativo
+        self._relogio = relogio
+        # id -> (existe, vence_em), do menos para o mais recentemente usado.
+        self._entradas: "OrderedDict[int, tuple]" = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, funcionario_id: int) -> Optional[bool]:
+        """O resultado guardado, ou None se não houver um ainda válido."""
+        entrada = self._entradas.get(funcionario_id)
+        if entrada is None or entrada[1] <= self._relogio():
+            if entrada is not None:
+                del self._entradas[funcionario_id]
+            self.faltas += 1
+            return None
+        self._entradas.move_to_end(funcionario_id)
+        self.acertos += 1
+        return entrada[0]
+
+    def guardar(self, funcionario_id: int, existe: bool) -> None:
+        ttl = self.ttl_positivo if existe else self.ttl_negativo
+        self._entradas[funcionario_id] = (existe, self._relogio() + ttl)
+        self._entradas.move_to_end(funcionario_id)
+        while len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {"entradas": len(self._entradas), "acertos": self.acertos, "faltas": self.faltas}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+class Disjuntor:
+    """
+    Disjuntor (circuit breaker). Fechado, deixa passar; depois de
+    'limite_falhas' falhas seguidas abre e recusa tudo por 'espera'
+    segundos; então deixa passar uma única sondagem (meio aberto), que o
+    fecha se der certo ou o abre de novo se falhar.
+    """
+
+    def __init__(self, limite_falhas: int = LIMITE_FALHAS_PADRAO, espera: float = ESPERA_PADRAO,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.limite_falhas = limite_falhas
+        self.espera = espera
+        self._relogio = relogio
+        self.estado = FECHADO
+        self._falhas_seguidas = 0
+        self._aberto_ate = 0.0
+        self._sondando = False
+        self.aberturas = 0
+        self.recusadas = 0
+
+    def permitir(self) -> bool:
+        if self.estado == ABERTO and self._relogio() >= self._aberto_ate:
+            self.estado = MEIO_ABERTO
+        if self.estado == FECHADO:
+            return True
+        if self.estado == MEIO_ABERTO and not self._sondando:
+            self._sondando = True
+            return True
+        self.recusadas += 1
+        return False
+
+    def sucesso(self) -> None:
+        self._falhas_seguidas = 0
+        self._sondando = False
+        self.estado = FECHADO
+
+    def falha(self) -> None:
+        self._falhas_seguidas += 1
+        if self.estado == MEIO_ABERTO or self._falhas_seguidas >= self.limite_falhas:
+            if self.estado != ABERTO:
+                self.aberturas += 1
+            self.estado = ABERTO
+            self._aberto_ate = self._relogio() + self.espera
+            self._sondando = False
+
+    def segundos_para_tentar(self) -> float:
+        return max(0.0, self._aberto_ate - self._relogio()) if self.estado == ABERTO else 0.0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "estado": self.estado,
+            "falhas_seguidas": self._falhas_seguidas,
+            "aberturas": self.aberturas,
+            "recusadas": self.recusadas,
+        }
+
+
+class ClienteDeFuncionarios:
+    """
+    Consulta GET {url_base}/funcionario/{id}: 200 quer dizer que o
+    funcionário existe e 404 que não existe; qualquer outra resposta, erro
+    de rede ou timeout conta como falha do serviço.
+    """
+
+    def __init__(self, url_base: str, cache: Optional[CacheDeValidacoes] = None,
+                 disjuntor: Optional[Disjuntor] = None, timeout: float = TIMEOUT_PADRAO,
+                 conexoes: int = CONEXOES_PADRAO, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url_base = url_base.rstrip("/")
+        self.cache = cache if cache is not None else CacheDeValidacoes()
+        self.disjuntor = disjuntor if disjuntor is not None else Disjuntor()
+        self.timeout = timeout
+        self.conexoes = conexoes
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._em_andamento: Dict[int, asyncio.Task] = {}
+        self.consultas = 0
+        self.coalescidas = 0
+        self.falhas = 0
+
+    def _cliente_http(self) -> httpx.AsyncClient:
+        # Criado no primeiro uso, já dentro do loop de eventos que vai usá-lo.
+        # As conexões do pool pertencem a esse loop: se outro loop aparecer
+        # (o TestClient sem 'with' abre um por requisição), começa outro pool.
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            self._loop = loop
+            self._http = httpx.AsyncClient(
+                base_url=self.url_base,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.conexoes, max_keepalive_connections=self.conexoes),
+                transport=self._transport,
+            )
+        return self._http
+
+    async def existe(self, funcionario_id: int) -> bool:
+        """Se o funcionário existe; levanta ServicoDeFuncionariosIndisponivel se não for possível saber."""
+        existe = self.cache.obter(funcionario_id)
+        if existe is not None:
+            return existe
+        tarefa = self._em_andamento.get(funcionario_id)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(self._consultar(funcionario_id))
+            self._em_andamento[funcionario_id] = tarefa
+        else:
+            self.coalescidas += 1
+        # shield: quem desiste de esperar (requisição cancelada) não cancela a
+        # consulta dos outros que esperam pelo mesmo id.
+        return await asyncio.shield(tarefa)
+
+    async def _consultar(self, funcionario_id: int) -> bool:
+        try:
+            if not self.disjuntor.permitir():
+                raise ServicoDeFuncionariosIndisponivel(
+                    "Serviço de funcionários indisponível.", self.disjuntor.segundos_para_tentar())
+            self.consultas += 1
+            try:
+                resposta = await self._cliente_http().get(f"/funcionario/{funcionario_id}")
+            except httpx.HTTPError as erro:
+                self._falhou()
+                raise ServicoDeFuncionariosIndisponivel(f"Falha ao consultar o serviço de funcionários: {erro!r}") from erro
+            if resposta.status_code not in (200, 404):
+                self._falhou()
+                raise ServicoDeFuncionariosIndisponivel(
+                    f"O serviço de funcionários respondeu {resposta.status_code}.")
+            self.disjuntor.sucesso()
+            existe = resposta.status_code == 200
+            self.cache.guardar(funcionario_id, existe)
+            return existe
+        finally:
+            del self._em_andamento[funcionario_id]
+
+    def _falhou(self) -> None:
+        self.falhas += 1
+        self.disjuntor.falha()
+
+    async def fechar(self) -> None:
+        """Fecha as conexões do pool (no encerramento da aplicação)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.estatisticas(),
+            "disjuntor": self.disjuntor.estatisticas(),
+            "consultas": self.consultas,
+            "coalescidas": self.coalescidas,
+            "falhas": self.falhas,
+            "em_andamento": len(self._em_andamento),
+        }
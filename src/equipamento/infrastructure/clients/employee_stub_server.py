@@ -0,0 +1,49 @@
+# src/equipamento/infrastructure/clients/employee_stub_server.py
+"""
+Servidor local que faz as vezes do serviço de funcionários, para testes,
+benchmarks e desenvolvimento sem o serviço real.
+
+Responde GET /funcionario/{id} com 200 para os ids cadastrados e 404 para
+os demais. 'falhar' faz toda resposta ser 500.
+
+Uso: python -m src.equipamento.infrastructure.clients.employee_stub_server [--porta 8001] [--ids 1,2,3]
+"""
+
+import argparse
+from typing import Any, Iterable, Set, Tuple
+
+from .stub_server import ServidorLocal
+
+
+class ServidorDeFuncionariosLocal(ServidorLocal):
+    def __init__(self, funcionarios: Iterable[int] = (), atraso: float = 0.0, host: str = "127.0.0.1", porta: int = 0):
+        super().__init__(atraso=atraso, host=host, porta=porta)
+        self.funcionarios: Set[int] = set(funcionarios)
+        self.falhar = False
+
+    def tratar(self, metodo: str, caminho: str, corpo: Any) -> Tuple[int, Any]:
+        partes = caminho.strip("/").split("/")
+        if self.falhar:
+            return 500, {"mensagem": "Falha simulada."}
+        if metodo == "GET" and len(partes) == 2 and partes[0] == "funcionario" and partes[1].isdigit():
+            funcionario_id = int(partes[1])
+            if funcionario_id in self.funcionarios:
+                return 200, {"id": funcionario_id}
+            return 404, {"codigo": "NAO_ENCONTRADO", "mensagem": "Funcionário não encontrado."}
+        return 404, {"mensagem": "Rota não encontrada."}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8001)
+    parser.add_argument("--ids", default="1,2,3", help="ids dos funcionários cadastrados, separados por vírgula")
+    parser.add_argument("--atraso", type=float, default=0.0, help="segundos de espera antes de cada resposta")
+    args = parser.parse_args()
+
+    ServidorDeFuncionariosLocal(
+        (int(i) for i in args.ids.split(",") if i.strip()), atraso=args.atraso, host="0.0.0.0", porta=args.porta,
+    ).servir_ate_interromper()
+
+
+if __name__ == "__main__":
+    main()
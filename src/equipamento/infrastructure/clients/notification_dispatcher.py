@@ -0,0 +1,181 @@
+# src/equipamento/infrastructure/clients/notification_dispatcher.py
+"""
+Entrega das notificações da caixa de saída aos outros microsserviços.
+
+Uma única tarefa no loop de eventos acorda a cada 'intervalo' segundos e,
+para cada destino com notificações pendentes, envia lotes de até 'lote'
+notificações num POST {url}/notificacoes, com as conexões reaproveitadas
+de um pool. Os destinos são atendidos em paralelo e, dentro de um destino,
+os lotes saem em ordem.
+
+Um lote só sai da fila quando o destino responde 2xx. Se a resposta for
+outro erro, ou se houver falha de rede ou timeout, o destino espera um
+recuo exponencial com variação aleatória antes da próxima tentativa (as
+notificações seguintes esperam junto, para manter a ordem). Depois de
+'max_tentativas' falhas, ou se o destino recusar o lote com 4xx, o lote é
+descartado e a fila segue. A entrega é pelo menos uma vez: o id de cada
+notificação permite ao destino ignorar repetições.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from ...domain.entities import Notificacao
+from ..repositories.mem_outbox import MemCaixaDeSaida
+
+LOTE_PADRAO = 100
+INTERVALO_PADRAO = 0.5
+TIMEOUT_PADRAO = 5.0
+MAX_TENTATIVAS_PADRAO = 8
+ESPERA_INICIAL_PADRAO = 0.5
+ESPERA_MAXIMA_PADRAO = 60.0
+CONEXOES_PADRAO = 10
+# Recusas que podem passar se repetidas mais tarde.
+_REPETIVEIS = (408, 429)
+
+
+class _Destino:
+    __slots__ = ("url", "tentativas", "proxima_tentativa", "lotes", "falhas")
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/") + "/notificacoes"
+        self.tentativas = 0
+        self.proxima_tentativa = 0.0
+        self.lotes = 0
+        self.falhas = 0
+
+
+def _corpo(lote: List[Notificacao]) -> Dict[str, Any]:
+    return {"notificacoes": [
+        {"id": n.id, "tipo": n.tipo, "dados": n.dados, "criada_em": n.criada_em} for n in lote
+    ]}
+
+
+class DespachanteDeNotificacoes:
+    def __init__(self, caixa: MemCaixaDeSaida, urls: Dict[str, str], lote: int = LOTE_PADRAO,
+                 intervalo: float = INTERVALO_PADRAO, timeout: float = TIMEOUT_PADRAO,
+                 max_tentativas: int = MAX_TENTATIVAS_PADRAO, espera_inicial: float = ESPERA_INICIAL_PADRAO,
+                 espera_maxima: float = ESPERA_MAXIMA_PADRAO, conexoes: int = CONEXOES_PADRAO,
+                 relogio: Callable[[], float] = time.monotonic, aleatorio: Callable[[], float] = random.random,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.caixa = caixa
+        self.lote = lote
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.conexoes = conexoes
+        self._relogio = relogio
+        self._aleatorio = aleatorio
+        self._transport = transport
+        self._destinos = {destino: _Destino(urls[destino]) for destino in caixa.destinos}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self.falhas_do_laco = 0
+
+    def _cliente_http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.conexoes, max_keepalive_connections=self.conexoes),
+                transport=self._transport,
+            )
+        return self._http
+
+    async def despachar_agora(self) -> int:
+        """Uma rodada de entregas; retorna quantas notificações foram entregues."""
+        agora = self._relogio()
+        prontos = [
+            nome for nome, destino in self._destinos.items()
+            if destino.proxima_tentativa <= agora and self.caixa.pendentes(nome)
+        ]
+        if not prontos:
+            return 0
+        return sum(await asyncio.gather(*(self._esvaziar(nome) for nome in prontos)))
+
+    async def _esvaziar(self, nome: str) -> int:
+        entregues = 0
+        while True:
+            lote = self.caixa.lote(nome, self.lote)
+            if not lote or not await self._enviar(nome, lote):
+                return entregues
+            entregues += len(lote)
+
+    async def _enviar(self, nome: str, lote: List[Notificacao]) -> bool:
+        destino = self._destinos[nome]
+        destino.lotes += 1
+        try:
+            resposta = await self._cliente_http().post(destino.url, json=_corpo(lote))
+        except httpx.HTTPError:
+            self._falhou(nome, lote, definitiva=False)
+            return False
+        if resposta.is_success:
+            self.caixa.confirmar(nome, lote[-1].id)
+            destino.tentativas = 0
+            return True
+        definitiva = resposta.is_client_error and resposta.status_code not in _REPETIVEIS
+        self._falhou(nome, lote, definitiva)
+        return False
+
+    def _falhou(self, nome: str, lote: List[Notificacao], definitiva: bool) -> None:
+        destino = self._destinos[nome]
+        destino.falhas += 1
+        destino.tentativas += 1
+        if definitiva or destino.tentativas >= self.max_tentativas:
+            self.caixa.descartar(nome, lote[-1].id)
+            destino.tentativas = 0
+            destino.proxima_tentativa = 0.0
+            return
+        espera = min(self.espera_maxima, self.espera_inicial * 2 ** (destino.tentativas - 1))
+        # Entre metade e o total da espera, para que as instâncias não repitam todas juntas.
+        destino.proxima_tentativa = self._relogio() + espera * (0.5 + self._aleatorio() / 2)
+
+    async def _executar(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.despachar_agora()
+            except Exception:
+                # Uma rodada com problema não pode parar as entregas seguintes.
+                self.falhas_do_laco += 1
+
+    def iniciar(self) -> None:
+        """Deve ser chamada de dentro do loop de eventos (no lifespan da aplicação)."""
+        if self._tarefa is None:
+            self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    async def encerrar(self, prazo: float = 5.0) -> None:
+        """Para a tarefa, tenta entregar o que restou por até 'prazo' segundos e fecha o pool."""
+        self.parar()
+        try:
+            await asyncio.wait_for(self.despachar_agora(), prazo)
+        except Exception:
+            # Inclui o timeout: o que não saiu a tempo se perde com o processo.
+            self.falhas_do_laco += 1
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "destinos": {
+                nome: {
+                    "lotes": destino.lotes,
+                    "falhas": destino.falhas,
+                    "tentativas": destino.tentativas,
+                    "espera_segundos": max(0.0, destino.proxima_tentativa - self._relogio()),
+                }
+                for nome, destino in self._destinos.items()
+            },
+            "falhas_do_laco": self.falhas_do_laco,
+        }
@@ -0,0 +1,59 @@
+# src/equipamento/infrastructure/clients/notification_stub_server.py
+"""
+Servidor local que faz as vezes de um destino das notificações (aluguel,
+email), para testes, benchmarks e desenvolvimento sem os serviços reais.
+
+Aceita POST /notificacoes com {"notificacoes": [...]} e guarda o que
+recebeu, ignorando ids repetidos como um destino real deveria fazer.
+'falhar_proximas' faz as próximas N requisições receberem
+'status_de_falha' sem guardar nada.
+
+Uso: python -m src.equipamento.infrastructure.clients.notification_stub_server [--porta 8002]
+"""
+
+import argparse
+from typing import Any, Dict, List, Set, Tuple
+
+from .stub_server import ServidorLocal
+
+
+class ReceptorDeNotificacoesLocal(ServidorLocal):
+    def __init__(self, atraso: float = 0.0, host: str = "127.0.0.1", porta: int = 0):
+        super().__init__(atraso=atraso, host=host, porta=porta)
+        self.recebidas: List[Dict[str, Any]] = []
+        self.lotes = 0
+        self.repetidas = 0
+        self.falhar_proximas = 0
+        self.status_de_falha = 503
+        self._ids: Set[int] = set()
+
+    def tratar(self, metodo: str, caminho: str, corpo: Any) -> Tuple[int, Any]:
+        if metodo != "POST" or caminho.rstrip("/") != "/notificacoes":
+            return 404, {"mensagem": "Rota não encontrada."}
+        if not isinstance(corpo, dict) or not isinstance(corpo.get("notificacoes"), list):
+            return 400, {"mensagem": "Esperado {\"notificacoes\": [...]}."}
+        with self._lock:
+            if self.falhar_proximas > 0:
+                self.falhar_proximas -= 1
+                return self.status_de_falha, {"mensagem": "Falha simulada."}
+            self.lotes += 1
+            for notificacao in corpo["notificacoes"]:
+                if notificacao["id"] in self._ids:
+                    self.repetidas += 1
+                    continue
+                self._ids.add(notificacao["id"])
+                self.recebidas.append(notificacao)
+        return 200, {"recebidas": len(corpo["notificacoes"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8002)
+    parser.add_argument("--atraso", type=float, default=0.0, help="segundos de espera antes de cada resposta")
+    args = parser.parse_args()
+
+    ReceptorDeNotificacoesLocal(atraso=args.atraso, host="0.0.0.0", porta=args.porta).servir_ate_interromper()
+
+
+if __name__ == "__main__":
+    main()
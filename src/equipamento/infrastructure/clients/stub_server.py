@@ -0,0 +1,108 @@
+# src/equipamento/infrastructure/clients/stub_server.py
+"""
+Base dos servidores locais que fazem as vezes de outros microsserviços em
+testes, benchmarks e desenvolvimento.
+
+Atendem HTTP/1.1 com conexões persistentes numa thread própria, contam
+requisições e conexões abertas e entregam cada requisição a tratar(), que
+as subclasses implementam. 'atraso' simula a latência do serviço.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+
+
+class ServidorLocal:
+    def __init__(self, atraso: float = 0.0, host: str = "127.0.0.1", porta: int = 0):
+        self.atraso = atraso
+        self.requisicoes = 0
+        self.conexoes = 0
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer((host, porta), self._tratador())
+        self._servidor.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def tratar(self, metodo: str, caminho: str, corpo: Any) -> Tuple[int, Any]:
+        """(status, corpo JSON da resposta) de uma requisição; chamada de várias threads."""
+        raise NotImplementedError
+
+    def _tratador(self) -> type:
+        servidor = self
+
+        class Tratador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo saem em escritas separadas: sem isto, o Nagle
+            # somado ao ACK atrasado do cliente põe ~40 ms em cada resposta.
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with servidor._lock:
+                    servidor.conexoes += 1
+
+            def _atender(self, metodo: str):
+                with servidor._lock:
+                    servidor.requisicoes += 1
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                dados = self.rfile.read(tamanho) if tamanho else b""
+                if servidor.atraso:
+                    time.sleep(servidor.atraso)
+                try:
+                    corpo = json.loads(dados) if dados else None
+                except ValueError:
+                    codigo, resposta = 400, {"mensagem": "Corpo inválido."}
+                else:
+                    codigo, resposta = servidor.tratar(metodo, self.path, corpo)
+                saida = json.dumps(resposta).encode()
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(saida)))
+                self.end_headers()
+                self.wfile.write(saida)
+
+            def do_GET(self):
+                self._atender("GET")
+
+            def do_POST(self):
+                self._atender("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Tratador
+
+    def iniciar(self) -> "ServidorLocal":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._servidor.serve_forever, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        if self._thread is not None:
+            self._servidor.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
+
+    def servir_ate_interromper(self) -> None:
+        """Atende até Ctrl+C; usado quando o módulo é executado diretamente."""
+        self.iniciar()
+        print(f"{type(self).__name__} em {self.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            self.parar()
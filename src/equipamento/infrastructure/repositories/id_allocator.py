@@ -0,0 +1,153 @@
+# src/equipamento/infrastructure/repositories/id_allocator.py
+"""
+Alocadores de IDs para os repositórios.
+
+- AlocadorSequencial: contador local ao processo (um único nó).
+- AlocadorPorBlocos: cada nó arrenda blocos de IDs num arquivo SQLite
+  compartilhado e aloca dentro do bloco sem falar com ninguém; só a troca de
+  bloco passa pela trava do SQLite.
+- AlocadorSnowflake: IDs de 63 bits (tempo em ms | nó | sequência), sem
+  nenhuma coordenação, bastando que cada nó tenha um número distinto.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable
+
+from ...application.repositories import AlocadorDeIdsInterface
+
+TAMANHO_BLOCO_PADRAO = 1000
+
+BITS_NO = 10
+BITS_SEQUENCIA = 12
+MAX_NO = (1 << BITS_NO) - 1
+MASCARA_SEQUENCIA = (1 << BITS_SEQUENCIA) - 1
+# 2024-01-01T00:00:00Z: o campo de tempo (41 bits) dura ~69 anos a partir daqui.
+EPOCA_SNOWFLAKE_MS = 1_704_067_200_000
+
+
+class AlocadorSequencial(AlocadorDeIdsInterface):
+    """Contador em memória; só é seguro com um único processo gerando IDs."""
+
+    def __init__(self, primeiro_id: int = 1):
+        self._proximo_id = primeiro_id
+        self._lock = threading.Lock()
+
+    def alocar(self) -> int:
+        with self._lock:
+            novo_id = self._proximo_id
+            self._proximo_id += 1
+            return novo_id
+
+    def reservar_ate(self, entidade_id: int) -> None:
+        with self._lock:
+            self._proximo_id = max(self._proximo_id, entidade_id + 1)
+
+
+class AlocadorPorBlocos(AlocadorDeIdsInterface):
+    """
+    Arrenda blocos de tamanho_bloco IDs de um contador guardado em SQLite.
+
+    O arquivo guarda, por chave (tipo de entidade), o primeiro ID ainda não
+    arrendado. Arrendar é uma transação BEGIN IMMEDIATE que lê e avança esse
+    contador, então processos (ou nós com o arquivo num volume compartilhado)
+    nunca recebem blocos sobrepostos. IDs de um bloco não usados até o fim do
+    processo são perdidos, o que deixa buracos mas nunca repetições.
+    """
+
+    def __init__(self, caminho: str, chave: str, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO):
+        if tamanho_bloco <= 0:
+            raise ValueError("O tamanho do bloco deve ser positivo.")
+        self.caminho = caminho
+        self.chave = chave
+        self.tamanho_bloco = tamanho_bloco
+        self.blocos_arrendados = 0
+        self._proximo_id = 0
+        self._fim_bloco = 0
+        self._maior_reservado = 0
+        self._lock = threading.Lock()
+        with closing(self._conectar()) as conexao:
+            conexao.execute("CREATE TABLE IF NOT EXISTS blocos_de_ids (chave TEXT PRIMARY KEY, proximo INTEGER NOT NULL)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+
+    def _avancar_contador(self, minimo: int, quantidade: int) -> int:
+        """Arrenda 'quantidade' IDs a partir de pelo menos 'minimo'; retorna o primeiro."""
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                linha = conexao.execute("SELECT proximo FROM blocos_de_ids WHERE chave = ?", (self.chave,)).fetchone()
+                inicio = max(linha[0] if linha else 1, minimo)
+                conexao.execute(
+                    "INSERT INTO blocos_de_ids (chave, proximo) VALUES (?, ?) "
+                    "ON CONFLICT(chave) DO UPDATE SET proximo = excluded.proximo",
+                    (self.chave, inicio + quantidade),
+                )
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        return inicio
+
+    def alocar(self) -> int:
+        with self._lock:
+            if self._proximo_id >= self._fim_bloco:
+                self._proximo_id = self._avancar_contador(1, self.tamanho_bloco)
+                self._fim_bloco = self._proximo_id + self.tamanho_bloco
+                self.blocos_arrendados += 1
+            novo_id = self._proximo_id
+            self._proximo_id += 1
+            return novo_id
+
+    def reservar_ate(self, entidade_id: int) -> None:
+        with self._lock:
+            if self._proximo_id <= entidade_id < self._fim_bloco:
+                # Dentro do bloco deste nó: basta pular localmente.
+                self._proximo_id = entidade_id + 1
+            elif entidade_id >= self._fim_bloco and entidade_id > self._maior_reservado:
+                # Fora de qualquer bloco nosso: empurra o contador compartilhado,
+                # para que nenhum nó arrende um bloco que contenha esse ID.
+                self._avancar_contador(entidade_id + 1, 0)
+                self._maior_reservado = entidade_id
+
+
+class AlocadorSnowflake(AlocadorDeIdsInterface):
+    """
+    IDs no formato snowflake: ms desde EPOCA_SNOWFLAKE_MS, número do nó e uma
+    sequência de 12 bits por milissegundo (até 4096 IDs/ms por nó).
+
+    Se o relógio andar para trás, continua a partir do último milissegundo
+    usado em vez de arriscar repetir IDs. Os IDs passam de 2^53, então
+    clientes JavaScript precisam tratá-los como BigInt ou texto.
+    """
+
+    def __init__(self, no_id: int, relogio_ms: Callable[[], int] = lambda: time.time_ns() // 1_000_000):
+        if not 0 <= no_id <= MAX_NO:
+            raise ValueError(f"O número do nó deve estar entre 0 e {MAX_NO}.")
+        self.no_id = no_id
+        self._relogio_ms = relogio_ms
+        self._ultimo_ms = -1
+        self._sequencia = 0
+        self._lock = threading.Lock()
+
+    def alocar(self) -> int:
+        with self._lock:
+            agora = max(self._relogio_ms() - EPOCA_SNOWFLAKE_MS, self._ultimo_ms)
+            if agora == self._ultimo_ms:
+                self._sequencia = (self._sequencia + 1) & MASCARA_SEQUENCIA
+                if self._sequencia == 0:
+                    # Sequência esgotada neste milissegundo: espera o próximo.
+                    while agora <= self._ultimo_ms:
+                        agora = self._relogio_ms() - EPOCA_SNOWFLAKE_MS
+            else:
+                self._sequencia = 0
+            self._ultimo_ms = agora
+            return (agora << (BITS_NO + BITS_SEQUENCIA)) | (self.no_id << BITS_SEQUENCIA) | self._sequencia
+
+    def reservar_ate(self, entidade_id: int) -> None:
+        # IDs explícitos (o estado inicial) são pequenos e nunca colidem com
+        # IDs gerados a partir do relógio.
+        pass
@@ -0,0 +1,84 @@
+# src/equipamento/infrastructure/repositories/mem_attribute_index.py
+
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+CAMPOS_FILTRO_BICICLETA = ("status", "marca", "modelo", "ano")
+CAMPOS_FILTRO_TRANCA = ("status", "modelo", "localizacao", "totem_id")
+CAMPOS_FILTRO_TOTEM = ("localizacao",)
+
+
+class IndiceDeAtributos:
+    """
+    Índice de igualdade sobre alguns campos das entidades vivas.
+
+    Para cada campo guarda valor -> conjunto de ids, e para cada id os valores
+    indexados da última gravação. Assim, uma entidade alterada no lugar e
+    depois salva tem os valores antigos retirados sem varrer o índice.
+
+    Um filtro com vários critérios intersecta os conjuntos começando pelo
+    menor, então o custo acompanha o critério mais seletivo e não o tamanho
+    da coleção.
+
+    Não tem trava própria: quem o usa deve serializar as alterações junto com
+    as do dicionário de dados.
+    """
+
+    def __init__(self, campos: Iterable[str]):
+        self.campos: Tuple[str, ...] = tuple(campos)
+        self._ids: Dict[str, Dict[Hashable, Set[int]]] = {campo: defaultdict(set) for campo in self.campos}
+        self._valores_por_id: Dict[int, Tuple[Hashable, ...]] = {}
+
+    def atualizar(self, entidade) -> None:
+        """Indexa a entidade salva; entidades deletadas saem do índice."""
+        if entidade.is_deleted:
+            self.remover(entidade.id)
+            return
+        valores = tuple(getattr(entidade, campo) for campo in self.campos)
+        if self._valores_por_id.get(entidade.id) == valores:
+            return
+        self.remover(entidade.id)
+        self._valores_por_id[entidade.id] = valores
+        for campo, valor in zip(self.campos, valores):
+            self._ids[campo][valor].add(entidade.id)
+
+    def remover(self, entidade_id: int) -> None:
+        valores = self._valores_por_id.pop(entidade_id, None)
+        if valores is None:
+            return
+        for campo, valor in zip(self.campos, valores):
+            ids = self._ids[campo][valor]
+            ids.discard(entidade_id)
+            if not ids:
+                del self._ids[campo][valor]
+
+    def limpar(self) -> None:
+        for por_valor in self._ids.values():
+            por_valor.clear()
+        self._valores_por_id.clear()
+
+    def buscar(self, criterios: Dict[str, Any]) -> List[int]:
+        """Ids (em ordem crescente) das entidades vivas que satisfazem todos os critérios."""
+        validar_criterios(criterios, self.campos)
+        conjuntos = []
+        for campo, valor in criterios.items():
+            ids = self._ids[campo].get(valor)
+            if not ids:
+                return []
+            conjuntos.append(ids)
+        if not conjuntos:
+            return sorted(self._valores_por_id)
+
+        conjuntos.sort(key=len)
+        resultado = set(conjuntos[0])
+        for ids in conjuntos[1:]:
+            resultado.intersection_update(ids)
+            if not resultado:
+                return []
+        return sorted(resultado)
+
+
+def validar_criterios(criterios: Dict[str, Any], campos: Tuple[str, ...]) -> None:
+    desconhecidos = set(criterios) - set(campos)
+    if desconhecidos:
+        raise ValueError(f"Campos de filtro não suportados: {', '.join(sorted(desconhecidos))}.")
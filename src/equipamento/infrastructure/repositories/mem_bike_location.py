@@ -0,0 +1,40 @@
+# src/equipamento/infrastructure/repositories/mem_bike_location.py
+
+import threading
+from typing import Dict, Optional
+
+from ...application.repositories import LocalizacaoDeBicicletasInterface
+
+
+class MemLocalizacaoDeBicicletas(LocalizacaoDeBicicletasInterface):
+    """
+    Mapa bicicleta -> tranca em memória, mantido pelos casos de uso que
+    prendem e soltam bicicletas. É local ao processo, como os índices de
+    busca, e reconstruído a partir das trancas na inicialização e na
+    restauração.
+    """
+
+    def __init__(self):
+        self._tranca_por_bicicleta: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def associar(self, bicicleta_id: int, tranca_id: int) -> None:
+        with self._lock:
+            self._tranca_por_bicicleta[bicicleta_id] = tranca_id
+
+    def desassociar(self, bicicleta_id: int, tranca_id: int) -> None:
+        with self._lock:
+            # Só remove se o mapa ainda apontar para essa tranca: a bicicleta
+            # pode já ter sido presa em outra.
+            if self._tranca_por_bicicleta.get(bicicleta_id) == tranca_id:
+                del self._tranca_por_bicicleta[bicicleta_id]
+
+    def tranca_de(self, bicicleta_id: int) -> Optional[int]:
+        return self._tranca_por_bicicleta.get(bicicleta_id)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._tranca_por_bicicleta.clear()
+
+    def __len__(self) -> int:
+        return len(self._tranca_por_bicicleta)
@@ -0,0 +1,71 @@
+# src/equipamento/infrastructure/repositories/mem_change_log.py
+
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from ...application.repositories import RegistroDeMudancasInterface
+from ...domain.entities import Mudanca, PaginaDeMudancas
+
+CAPACIDADE_PADRAO = 10_000
+
+OPERACAO_SALVAR = "salvar"
+OPERACAO_DELETAR = "deletar"
+
+
+class MemRegistroDeMudancas(RegistroDeMudancasInterface):
+    """
+    Log de mudanças em memória, limitado a um anel de tamanho fixo.
+
+    A mudança de sequência 's' fica na posição 's % capacidade', então ler as
+    mudanças a partir de um cursor custa O(mudanças lidas), e não O(tamanho do log).
+    Cursores anteriores ao piso (mudanças já sobrescritas no anel) exigem ressincronização.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do log de mudanças deve ser positiva.")
+        self._capacidade = capacidade
+        self._anel: List[Optional[Mudanca]] = [None] * capacidade
+        self._sequencia: int = 0
+        # Menor cursor ainda atendido: 'desde' precisa ser >= piso.
+        self._piso: int = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, entidade: str, entidade_id: int, operacao: str, dados: Dict[str, Any]) -> Mudanca:
+        with self._lock:
+            self._sequencia += 1
+            mudanca = Mudanca(
+                sequencia=self._sequencia,
+                entidade=entidade,
+                entidade_id=entidade_id,
+                operacao=operacao,
+                dados=dados,
+            )
+            self._anel[self._sequencia % self._capacidade] = mudanca
+            if self._sequencia - self._piso > self._capacidade:
+                self._piso = self._sequencia - self._capacidade
+            return mudanca
+
+    def listar_desde(self, desde: int, limite: int) -> PaginaDeMudancas:
+        with self._lock:
+            # Um cursor à frente da sequência atual veio de outra vida do processo.
+            if desde < self._piso or desde > self._sequencia:
+                return PaginaDeMudancas(mudancas=[], sequencia_atual=self._sequencia, ressincronizar=True)
+
+            fim = min(self._sequencia, desde + limite)
+            mudancas = [self._anel[s % self._capacidade] for s in range(desde + 1, fim + 1)]
+            return PaginaDeMudancas(mudancas=mudancas, sequencia_atual=self._sequencia)
+
+    def sequencia_atual(self) -> int:
+        return self._sequencia
+
+    def descartar_historico(self) -> None:
+        with self._lock:
+            self._piso = self._sequencia
+
+
+def registrar_mudanca(registro: Optional[RegistroDeMudancasInterface], entidade: str, operacao: str, objeto) -> None:
+    """Copia o estado atual do objeto para o log de mudanças, se houver um configurado."""
+    if registro is not None:
+        registro.registrar(entidade, objeto.id, operacao, asdict(objeto))
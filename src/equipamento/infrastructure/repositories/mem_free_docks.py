@@ -0,0 +1,62 @@
+# src/equipamento/infrastructure/repositories/mem_free_docks.py
+
+import threading
+from typing import Dict, Optional
+
+from ...application.repositories import TrancasLivresInterface
+
+
+class MemTrancasLivres(TrancasLivresInterface):
+    """
+    Lista de trancas livres por totem, em memória. Cada totem tem um dict
+    usado como conjunto ordenado: liberar e remover são O(1) e alocar tira a
+    última tranca liberada com popitem, também O(1). Como a retirada é feita
+    sob a trava, uma tranca livre é entregue a uma única devolução.
+
+    É local ao processo, como o mapa de localização das bicicletas, e
+    reconstruído a partir das trancas na inicialização e na restauração.
+    """
+
+    def __init__(self):
+        self._livres_por_totem: Dict[int, Dict[int, None]] = {}
+        self._totem_por_tranca: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _tirar(self, tranca_id: int) -> None:
+        totem_id = self._totem_por_tranca.pop(tranca_id, None)
+        if totem_id is not None:
+            livres = self._livres_por_totem[totem_id]
+            del livres[tranca_id]
+            if not livres:
+                del self._livres_por_totem[totem_id]
+
+    def liberar(self, totem_id: int, tranca_id: int) -> None:
+        with self._lock:
+            if self._totem_por_tranca.get(tranca_id) == totem_id:
+                return
+            self._tirar(tranca_id)
+            self._livres_por_totem.setdefault(totem_id, {})[tranca_id] = None
+            self._totem_por_tranca[tranca_id] = totem_id
+
+    def remover(self, tranca_id: int) -> None:
+        with self._lock:
+            self._tirar(tranca_id)
+
+    def alocar(self, totem_id: int) -> Optional[int]:
+        with self._lock:
+            livres = self._livres_por_totem.get(totem_id)
+            if not livres:
+                return None
+            tranca_id, _ = livres.popitem()
+            if not livres:
+                del self._livres_por_totem[totem_id]
+            del self._totem_por_tranca[tranca_id]
+            return tranca_id
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._livres_por_totem.clear()
+            self._totem_por_tranca.clear()
+
+    def __len__(self) -> int:
+        return len(self._totem_por_tranca)
@@ -0,0 +1,104 @@
+# src/equipamento/infrastructure/repositories/mem_outbox.py
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List
+
+from ...application.repositories import CaixaDeSaidaInterface
+from ...domain.entities import Notificacao
+
+CAPACIDADE_PADRAO = 100_000
+DESCARTADAS_PADRAO = 1_000
+
+
+class MemCaixaDeSaida(CaixaDeSaidaInterface):
+    """
+    Caixa de saída em memória: uma fila por destino, na ordem em que as
+    notificações foram criadas. Os casos de uso acrescentam logo depois de
+    salvar a mudança de estado, sem E/S no meio, e o DespachanteDeNotificacoes
+    lê lotes do início das filas e os confirma (ou descarta) depois de
+    tentar entregá-los.
+
+    Com um destino fora do ar a fila cresce até 'capacidade'; a partir daí
+    as mais antigas são perdidas (e contadas), para que um serviço parado
+    não esgote a memória deste.
+    """
+
+    def __init__(self, destinos: Iterable[str], capacidade: int = CAPACIDADE_PADRAO,
+                 descartadas: int = DESCARTADAS_PADRAO, relogio: Callable[[], float] = time.time):
+        self.capacidade = capacidade
+        self._relogio = relogio
+        self._filas: Dict[str, Deque[Notificacao]] = {destino: deque() for destino in destinos}
+        # Entregas desistidas, para inspeção em GET /admin/notificacoes.
+        self._descartadas: Deque[Notificacao] = deque(maxlen=descartadas)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.acrescentadas = 0
+        self.entregues = 0
+        self.descartadas = 0
+        self.perdidas = 0
+
+    @property
+    def destinos(self) -> List[str]:
+        return list(self._filas)
+
+    def acrescentar(self, tipo: str, dados: Dict[str, Any]) -> List[Notificacao]:
+        agora = self._relogio()
+        with self._lock:
+            notificacoes = []
+            for destino, fila in self._filas.items():
+                notificacao = Notificacao(id=next(self._ids), destino=destino, tipo=tipo, dados=dados, criada_em=agora)
+                if len(fila) >= self.capacidade:
+                    fila.popleft()
+                    self.perdidas += 1
+                fila.append(notificacao)
+                notificacoes.append(notificacao)
+            self.acrescentadas += len(notificacoes)
+            return notificacoes
+
+    def lote(self, destino: str, limite: int) -> List[Notificacao]:
+        """As 'limite' notificações mais antigas do destino, sem tirá-las da fila."""
+        with self._lock:
+            return list(itertools.islice(self._filas[destino], limite))
+
+    def _retirar_ate(self, destino: str, ultimo_id: int) -> List[Notificacao]:
+        # Pelo id e não pela quantidade: enquanto o lote estava em trânsito,
+        # o início da fila pode ter sido perdido por falta de capacidade.
+        fila = self._filas[destino]
+        retiradas = []
+        while fila and fila[0].id <= ultimo_id:
+            retiradas.append(fila.popleft())
+        return retiradas
+
+    def confirmar(self, destino: str, ultimo_id: int) -> None:
+        """Tira da fila as notificações entregues, até 'ultimo_id'."""
+        with self._lock:
+            self.entregues += len(self._retirar_ate(destino, ultimo_id))
+
+    def descartar(self, destino: str, ultimo_id: int) -> None:
+        """Desiste de entregar as notificações até 'ultimo_id'."""
+        with self._lock:
+            retiradas = self._retirar_ate(destino, ultimo_id)
+            self._descartadas.extend(retiradas)
+            self.descartadas += len(retiradas)
+
+    def pendentes(self, destino: str) -> int:
+        return len(self._filas[destino])
+
+    def ultimas_descartadas(self) -> List[Notificacao]:
+        return list(self._descartadas)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pendentes": {destino: len(fila) for destino, fila in self._filas.items()},
+                "acrescentadas": self.acrescentadas,
+                "entregues": self.entregues,
+                "descartadas": self.descartadas,
+                "perdidas": self.perdidas,
+            }
+
+    def __len__(self) -> int:
+        return sum(len(fila) for fila in self._filas.values())
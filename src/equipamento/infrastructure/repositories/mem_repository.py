@@ -1,30 +1,97 @@
 # src/equipamento/infrastructure/repositories/mem_repository.py
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 # Importando as interfaces que vamos implementar
 from ...application.repositories import (
     BicicletaRepositoryInterface,
     TrancaRepositoryInterface,
     TotemRepositoryInterface,
+    RegistroDeMudancasInterface,
+    AlocadorDeIdsInterface,
 )
 # Importando as entidades que vamos armazenar
-from ...domain.entities import Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca
+from ...domain.entities import (
+    Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca,
+    ENTIDADE_BICICLETA, ENTIDADE_TRANCA, ENTIDADE_TOTEM,
+)
+from .mem_change_log import OPERACAO_SALVAR, OPERACAO_DELETAR, registrar_mudanca
+from .mem_attribute_index import (
+    IndiceDeAtributos, CAMPOS_FILTRO_BICICLETA, CAMPOS_FILTRO_TRANCA, CAMPOS_FILTRO_TOTEM,
+)
+from .tombstone_archive import ArquivoMorto, Excluidos
+from .id_allocator import AlocadorSequencial
+
+
+# ======================================================
+# --- Estado inicial (usado por /restaurarDados) ---
+# ======================================================
+
+def bicicletas_iniciais() -> List[Bicicleta]:
+    return [
+        Bicicleta(id=1, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.DISPONIVEL),
+        Bicicleta(id=2, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.REPARO_SOLICITADO),
+        Bicicleta(id=3, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_USO),
+        Bicicleta(id=4, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_REPARO),
+        Bicicleta(id=5, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_USO),
+    ]
+
+def trancas_iniciais() -> List[Tranca]:
+    # Trancas associadas aos totens e bicicletas iniciais
+    return [
+        Tranca(id=1, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=1, totem_id=1),
+        Tranca(id=2, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.DISPONIVEL, totem_id=1),
+        Tranca(id=3, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=2, totem_id=1),
+        Tranca(id=4, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=5, totem_id=1),
+        Tranca(id=5, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.EM_REPARO),
+        Tranca(id=6, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.REPARO_SOLICITADO, totem_id=1),
+    ]
+
+def totens_iniciais() -> List[Totem]:
+    return [
+        Totem(id=1, localizacao="Praça Central", descricao="Totem perto do chafariz"),
+        Totem(id=2, localizacao="Parque da Cidade", descricao="Totem na entrada principal"),
+    ]
+
+
+# ======================================================
+# --- Decodificação (arquivo morto, memória compartilhada) ---
+# ======================================================
+
+def decodificar_bicicleta(dados: Dict[str, Any]) -> Bicicleta:
+    return Bicicleta(**{**dados, "status": StatusBicicleta(dados["status"])})
+
+def decodificar_tranca(dados: Dict[str, Any]) -> Tranca:
+    return Tranca(**{**dados, "status": StatusTranca(dados["status"])})
+
+def decodificar_totem(dados: Dict[str, Any]) -> Totem:
+    return Totem(**dados)
 
 
 class MemBicicletaRepository(BicicletaRepositoryInterface):
     """Implementação em memória do repositório de bicicletas."""
 
-    def __init__(self):
+    ENTIDADE = ENTIDADE_BICICLETA
+
+    def __init__(self, registro: Optional[RegistroDeMudancasInterface] = None, arquivo: Optional[ArquivoMorto] = None,
+                 alocador: Optional[AlocadorDeIdsInterface] = None):
+        # Só as vivas; as excluídas ficam em self.excluidos.
         self._dados: Dict[int, Bicicleta] = {}
-        self._proximo_id: int = 1
+        self._alocador = alocador if alocador is not None else AlocadorSequencial()
+        self._registro = registro
+        self._indice = IndiceDeAtributos(CAMPOS_FILTRO_BICICLETA)
+        self.excluidos = Excluidos(arquivo, reservar=self._alocador.reservar_ate)
 
     def salvar(self, bicicleta: Bicicleta) -> Bicicleta:
         if bicicleta.id is None:
-            bicicleta.id = self._proximo_id
-            self._proximo_id += 1
+            bicicleta.id = self._alocador.alocar()
+        elif bicicleta.id not in self._dados:
+            # ID explícito (ex.: estado inicial): não pode ser alocado de novo.
+            self._alocador.reservar_ate(bicicleta.id)
         
         self._dados[bicicleta.id] = bicicleta
+        self._indice.atualizar(bicicleta)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, bicicleta)
         return bicicleta
 
     def buscar_por_id(self, bicicleta_id: int) -> Optional[Bicicleta]:
@@ -35,56 +102,62 @@ class MemBicicletaRepository(BicicletaRepositoryInterface):
         return None
 
     def listar_todas(self, include_deleted: bool = False) -> List[Bicicleta]:
-        # Filtra os deletados por padrão
+        # As deletadas ficam fora de self._dados; só entram quando pedidas
         if not include_deleted:
-            return [b for b in self._dados.values() if not b.is_deleted]
-        return list(self._dados.values())
+            return list(self._dados.values())
+        return sorted([*self._dados.values(), *self.excluidos.listar()], key=lambda b: b.id)
     
     def deletar(self, bicicleta_id: int) -> None:
-        # Lógica de Soft Delete
-        bicicleta = self._dados.get(bicicleta_id)
+        # Lógica de Soft Delete: a bicicleta sai das vivas e vai para as excluídas
+        bicicleta = self._dados.pop(bicicleta_id, None)
         if bicicleta:
             bicicleta.is_deleted = True
-            self.salvar(bicicleta)
+            self._indice.remover(bicicleta_id)
+            self.excluidos.adicionar(bicicleta)
+            registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, bicicleta)
+
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Bicicleta]:
+        return [self._dados[bicicleta_id] for bicicleta_id in self._indice.buscar(criterios)]
 
     def buscar_por_ids(self, bicicleta_ids: List[int]) -> List[Bicicleta]:
-        # Filtra o dicionário de dados, pegando apenas as bicicletas
-        # cujos IDs estão na lista fornecida e que não estão deletadas.
-        return [
-            bicicleta for bicicleta_id, bicicleta in self._dados.items()
-            if bicicleta_id in bicicleta_ids and not bicicleta.is_deleted
-        ]
+        # Acesso direto por id (todas em self._dados estão vivas), em ordem de id.
+        return [self._dados[bicicleta_id] for bicicleta_id in sorted(set(bicicleta_ids)) if bicicleta_id in self._dados]
 
     def restaurar_para_estado_inicial(self):
         """Limpa todos os dados e recria um estado inicial para testes."""
         self._dados.clear()
-        self._proximo_id = 1
+        self._indice.limpar()
+        self.excluidos.limpar()
+        # As remoções feitas pelo clear() não entram no log; os consumidores precisam recomeçar.
+        if self._registro is not None:
+            self._registro.descartar_historico()
         
-        # Adiciona bicicletas iniciais
-        bicicleta1 = Bicicleta(id=1, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.DISPONIVEL)
-        bicicleta2 = Bicicleta(id=2, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.REPARO_SOLICITADO)
-        bicicleta3 = Bicicleta(id=3, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_USO)
-        bicicleta4 = Bicicleta(id=4, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_REPARO)
-        bicicleta5 = Bicicleta(id=5, marca="Caloi", modelo="Caloi", ano="2020", numero=12345, status=StatusBicicleta.EM_USO)
-        
-        self.salvar(bicicleta1)
-        self.salvar(bicicleta2)
-        self.salvar(bicicleta3)
-        self.salvar(bicicleta4)
-        self.salvar(bicicleta5)
+        for bicicleta in bicicletas_iniciais():
+            self.salvar(bicicleta)
 
 class MemTrancaRepository(TrancaRepositoryInterface):
     """Implementação em memória do repositório de trancas."""
 
-    def __init__(self):
+    ENTIDADE = ENTIDADE_TRANCA
+
+    def __init__(self, registro: Optional[RegistroDeMudancasInterface] = None, arquivo: Optional[ArquivoMorto] = None,
+                 alocador: Optional[AlocadorDeIdsInterface] = None):
+        # Só as vivas; as excluídas ficam em self.excluidos.
         self._dados: Dict[int, Tranca] = {}
-        self._proximo_id: int = 1
+        self._alocador = alocador if alocador is not None else AlocadorSequencial()
+        self._registro = registro
+        self._indice = IndiceDeAtributos(CAMPOS_FILTRO_TRANCA)
+        self.excluidos = Excluidos(arquivo, reservar=self._alocador.reservar_ate)
 
     def salvar(self, tranca: Tranca) -> Tranca:
         if tranca.id is None:
-            tranca.id = self._proximo_id
-            self._proximo_id += 1
+            tranca.id = self._alocador.alocar()
+        elif tranca.id not in self._dados:
+            # ID explícito (ex.: estado inicial): não pode ser alocado de novo.
+            self._alocador.reservar_ate(tranca.id)
         self._dados[tranca.id] = tranca
+        self._indice.atualizar(tranca)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, tranca)
         return tranca
 
     def buscar_por_id(self, tranca_id: int) -> Optional[Tranca]:
@@ -95,53 +168,61 @@ class MemTrancaRepository(TrancaRepositoryInterface):
     
     def listar_todas(self, include_deleted: bool = False) -> List[Tranca]:
         if not include_deleted:
-            return [t for t in self._dados.values() if not t.is_deleted]
-        return list(self._dados.values())
+            return list(self._dados.values())
+        return sorted([*self._dados.values(), *self.excluidos.listar()], key=lambda t: t.id)
 
     def deletar(self, tranca_id: int) -> None:
-        tranca = self._dados.get(tranca_id)
+        tranca = self._dados.pop(tranca_id, None)
         if tranca:
             tranca.is_deleted = True
-            self.salvar(tranca)
+            self._indice.remover(tranca_id)
+            self.excluidos.adicionar(tranca)
+            registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, tranca)
+
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Tranca]:
+        return [self._dados[tranca_id] for tranca_id in self._indice.buscar(criterios)]
 
     def buscar_por_totem_id(self, totem_id: int) -> List[Tranca]:
-        # Filtra a lista de trancas, retornando apenas aquelas
-        # que pertencem ao totem_id informado e não estão deletadas.
-        return [
-            tranca for tranca in self._dados.values()
-            if tranca.totem_id == totem_id and not tranca.is_deleted
-        ]
+        # Usa o índice de totem_id em vez de varrer todas as trancas.
+        return self.filtrar({"totem_id": totem_id})
+
+    def buscar_por_totem_ids(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        return {totem_id: self.filtrar({"totem_id": totem_id}) for totem_id in dict.fromkeys(totem_ids)}
 
     def restaurar_para_estado_inicial(self):
         self._dados.clear()
-        self._proximo_id = 1
-
-        # Adiciona trancas iniciais (associadas aos totens e bicicletas)
-        tranca1 = Tranca(id=1, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=1, totem_id=1)
-        tranca2 = Tranca(id=2, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.DISPONIVEL, totem_id=1)
-        tranca3 = Tranca(id=3, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=2, totem_id=1)
-        tranca4 = Tranca(id=4, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.OCUPADA, bicicleta_id=5, totem_id=1)
-        tranca5 = Tranca(id=5, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.EM_REPARO)
-        tranca6 = Tranca(id=6, numero=12345, localizacao="Rio de Janeiro", ano_de_fabricacao="2020", modelo="Caloi", status=StatusTranca.REPARO_SOLICITADO, totem_id=1)
-        self.salvar(tranca1)
-        self.salvar(tranca2)
-        self.salvar(tranca3)
-        self.salvar(tranca4)
-        self.salvar(tranca5)
-        self.salvar(tranca6)
+        self._indice.limpar()
+        self.excluidos.limpar()
+        # As remoções feitas pelo clear() não entram no log; os consumidores precisam recomeçar.
+        if self._registro is not None:
+            self._registro.descartar_historico()
+
+        for tranca in trancas_iniciais():
+            self.salvar(tranca)
 
 class MemTotemRepository(TotemRepositoryInterface):
     """Implementação em memória do repositório de totens."""
 
-    def __init__(self):
+    ENTIDADE = ENTIDADE_TOTEM
+
+    def __init__(self, registro: Optional[RegistroDeMudancasInterface] = None, arquivo: Optional[ArquivoMorto] = None,
+                 alocador: Optional[AlocadorDeIdsInterface] = None):
+        # Só as vivas; as excluídas ficam em self.excluidos.
         self._dados: Dict[int, Totem] = {}
-        self._proximo_id: int = 1
+        self._alocador = alocador if alocador is not None else AlocadorSequencial()
+        self._registro = registro
+        self._indice = IndiceDeAtributos(CAMPOS_FILTRO_TOTEM)
+        self.excluidos = Excluidos(arquivo, reservar=self._alocador.reservar_ate)
 
     def salvar(self, totem: Totem) -> Totem:
         if totem.id is None:
-            totem.id = self._proximo_id
-            self._proximo_id += 1
+            totem.id = self._alocador.alocar()
+        elif totem.id not in self._dados:
+            # ID explícito (ex.: estado inicial): não pode ser alocado de novo.
+            self._alocador.reservar_ate(totem.id)
         self._dados[totem.id] = totem
+        self._indice.atualizar(totem)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, totem)
         return totem
 
     def buscar_por_id(self, totem_id: int) -> Optional[Totem]:
@@ -152,22 +233,27 @@ class MemTotemRepository(TotemRepositoryInterface):
 
     def listar_todos(self, include_deleted: bool = False) -> List[Totem]:
         if not include_deleted:
-            return [t for t in self._dados.values() if not t.is_deleted]
-        return list(self._dados.values())
+            return list(self._dados.values())
+        return sorted([*self._dados.values(), *self.excluidos.listar()], key=lambda t: t.id)
+
+    def filtrar(self, criterios: Dict[str, Any]) -> List[Totem]:
+        return [self._dados[totem_id] for totem_id in self._indice.buscar(criterios)]
 
     def deletar(self, totem_id: int) -> None:
-        totem = self._dados.get(totem_id)
+        totem = self._dados.pop(totem_id, None)
         if totem:
             totem.is_deleted = True
-            self.salvar(totem)
+            self._indice.remover(totem_id)
+            self.excluidos.adicionar(totem)
+            registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, totem)
 
     def restaurar_para_estado_inicial(self):
         self._dados.clear()
-        self._proximo_id = 1
-
-        # Adiciona totens iniciais
-        totem1 = Totem(id=1, localizacao="Praça Central", descricao="Totem perto do chafariz")
-        totem2 = Totem(id=2, localizacao="Parque da Cidade", descricao="Totem na entrada principal")
+        self._indice.limpar()
+        self.excluidos.limpar()
+        # As remoções feitas pelo clear() não entram no log; os consumidores precisam recomeçar.
+        if self._registro is not None:
+            self._registro.descartar_historico()
 
-        self.salvar(totem1)
-        self.salvar(totem2)
\ No newline at end of file
+        for totem in totens_iniciais():
+            self.salvar(totem)
@@ -0,0 +1,133 @@
+# src/equipamento/infrastructure/repositories/mem_reservations.py
+
+import asyncio
+import math
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...application.repositories import ReservasInterface
+from ...domain.entities import Reserva
+from .timing_wheel import RodaDeTempo
+
+RESOLUCAO_PADRAO_SEGUNDOS = 1.0
+
+
+class MemReservas(ReservasInterface):
+    """
+    Reservas em memória, com o vencimento agendado numa RodaDeTempo cujo
+    tick vale 'resolucao' segundos. Uma reserva vencida deixa de valer na
+    hora (ativa() e buscar() conferem o prazo); a roda só a tira da memória
+    e a entrega a quem precisa reagir ao vencimento (ver ExpiradorDeReservas).
+
+    É local ao processo, como o mapa de localização das bicicletas.
+    """
+
+    def __init__(self, resolucao: float = RESOLUCAO_PADRAO_SEGUNDOS, relogio: Callable[[], float] = time.time):
+        self.resolucao = resolucao
+        self._relogio = relogio
+        self._por_id: Dict[str, Reserva] = {}
+        self._por_entidade: Dict[Tuple[str, int], str] = {}
+        self._roda = RodaDeTempo(math.floor(relogio() / resolucao))
+        self._lock = threading.Lock()
+        self.expiradas = 0
+
+    def _tick_do_prazo(self, instante: float) -> int:
+        # Arredonda para cima: a reserva nunca é recolhida antes do prazo.
+        return math.ceil(instante / self.resolucao)
+
+    def _tirar(self, reserva: Reserva) -> None:
+        del self._por_id[reserva.id]
+        del self._por_entidade[(reserva.entidade, reserva.entidade_id)]
+
+    def criar(self, entidade: str, entidade_id: int, duracao: float, totem_id: Optional[int] = None) -> Optional[Reserva]:
+        agora = self._relogio()
+        with self._lock:
+            anterior_id = self._por_entidade.get((entidade, entidade_id))
+            if anterior_id is not None:
+                anterior = self._por_id[anterior_id]
+                if anterior.expira_em > agora:
+                    return None
+                # Vencida mas ainda não recolhida pela roda: dá lugar à nova.
+                self._tirar(anterior)
+                self._roda.cancelar(anterior.id)
+            reserva = Reserva(id=uuid.uuid4().hex, entidade=entidade, entidade_id=entidade_id,
+                              expira_em=agora + duracao, totem_id=totem_id)
+            self._por_id[reserva.id] = reserva
+            self._por_entidade[(entidade, entidade_id)] = reserva.id
+            self._roda.agendar(reserva.id, self._tick_do_prazo(reserva.expira_em))
+            return reserva
+
+    def buscar(self, reserva_id: str) -> Optional[Reserva]:
+        reserva = self._por_id.get(reserva_id)
+        if reserva is None or reserva.expira_em <= self._relogio():
+            return None
+        return reserva
+
+    def ativa(self, entidade: str, entidade_id: int) -> Optional[Reserva]:
+        reserva_id = self._por_entidade.get((entidade, entidade_id))
+        return self.buscar(reserva_id) if reserva_id is not None else None
+
+    def remover(self, reserva_id: str) -> Optional[Reserva]:
+        with self._lock:
+            reserva = self._por_id.get(reserva_id)
+            if reserva is None:
+                return None
+            self._tirar(reserva)
+            self._roda.cancelar(reserva_id)
+            return reserva
+
+    def expirar_vencidas(self) -> List[Reserva]:
+        """Tira da memória e retorna as reservas cujo prazo já passou."""
+        with self._lock:
+            vencidas = [self._por_id[reserva_id] for reserva_id in self._roda.avancar(math.floor(self._relogio() / self.resolucao))]
+            for reserva in vencidas:
+                self._tirar(reserva)
+            self.expiradas += len(vencidas)
+            return vencidas
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {"ativas": len(self._por_id), "expiradas": self.expiradas}
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+
+class ExpiradorDeReservas:
+    """
+    Tarefa no loop de eventos que, a cada 'resolucao' segundos, avança a roda
+    das reservas e entrega as vencidas a 'ao_expirar'. Uma única tarefa
+    atende todas as reservas, sem temporizador nem thread por reserva.
+    """
+
+    def __init__(self, reservas: MemReservas, ao_expirar: Callable[[List[Reserva]], None]):
+        self.reservas = reservas
+        self.ao_expirar = ao_expirar
+        self.falhas = 0
+        self._tarefa: Optional[asyncio.Task] = None
+
+    def expirar_agora(self) -> int:
+        vencidas = self.reservas.expirar_vencidas()
+        if vencidas:
+            self.ao_expirar(vencidas)
+        return len(vencidas)
+
+    async def _executar(self) -> None:
+        while True:
+            await asyncio.sleep(self.reservas.resolucao)
+            try:
+                self.expirar_agora()
+            except Exception:
+                # Uma falha ao reagir a um lote não pode parar os vencimentos seguintes.
+                self.falhas += 1
+
+    def iniciar(self) -> None:
+        """Deve ser chamada de dentro do loop de eventos (no lifespan da aplicação)."""
+        if self._tarefa is None:
+            self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
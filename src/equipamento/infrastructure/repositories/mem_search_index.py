@@ -0,0 +1,168 @@
+# src/equipamento/infrastructure/repositories/mem_search_index.py
+
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from ...application.repositories import IndiceDeBuscaInterface, RegistroDeMudancasInterface
+from .mem_change_log import OPERACAO_DELETAR
+
+PONTOS_TERMO_EXATO = 2
+PONTOS_PREFIXO = 1
+LOTE_SINCRONIZACAO = 1000
+_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto: str) -> List[str]:
+    """Remove acentos, passa para minúsculas e quebra o texto em termos."""
+    sem_acentos = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+    return [termo for termo in _SEPARADORES.split(sem_acentos.lower()) if termo]
+
+
+class MemIndiceDeBusca(IndiceDeBuscaInterface):
+    """
+    Índice invertido em memória com busca por prefixo.
+
+    - termo -> ids que o contêm (índice invertido);
+    - id -> termos indexados (para reindexar/remover sem varrer o índice);
+    - vocabulário ordenado, onde os termos com um dado prefixo formam uma
+      faixa contígua encontrada com bisect em O(log V).
+
+    Todos os termos da consulta precisam casar (E lógico). Cada termo da
+    consulta vale PONTOS_TERMO_EXATO se casar com um termo inteiro e
+    PONTOS_PREFIXO se casar apenas como prefixo; o resultado é ordenado pela
+    soma dos pontos e, no empate, pelo id.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._termos_por_id: Dict[int, Set[str]] = {}
+        self._vocabulario: List[str] = []
+        self._lock = threading.Lock()
+
+    def indexar(self, entidade_id: int, textos: List[str]) -> None:
+        termos = {termo for texto in textos if texto for termo in normalizar(str(texto))}
+        with self._lock:
+            self._remover(entidade_id)
+            self._termos_por_id[entidade_id] = termos
+            for termo in termos:
+                if termo not in self._postings:
+                    bisect.insort(self._vocabulario, termo)
+                self._postings[termo].add(entidade_id)
+
+    def remover(self, entidade_id: int) -> None:
+        with self._lock:
+            self._remover(entidade_id)
+
+    def _remover(self, entidade_id: int) -> None:
+        for termo in self._termos_por_id.pop(entidade_id, ()):
+            ids = self._postings[termo]
+            ids.discard(entidade_id)
+            if not ids:
+                del self._postings[termo]
+                del self._vocabulario[bisect.bisect_left(self._vocabulario, termo)]
+
+    def _termos_com_prefixo(self, prefixo: str) -> List[str]:
+        inicio = bisect.bisect_left(self._vocabulario, prefixo)
+        # Primeiro termo que não começa com o prefixo: incrementa o último caractere.
+        fim = bisect.bisect_left(self._vocabulario, prefixo[:-1] + chr(ord(prefixo[-1]) + 1), inicio)
+        return self._vocabulario[inicio:fim]
+
+    def buscar(self, consulta: str, limite: int) -> List[int]:
+        termos_consulta = normalizar(consulta)
+        if not termos_consulta:
+            return []
+
+        with self._lock:
+            pontuacao: Dict[int, int] = {}
+            for posicao, termo_consulta in enumerate(termos_consulta):
+                pontos_do_termo: Dict[int, int] = {}
+                for termo in self._termos_com_prefixo(termo_consulta):
+                    pontos = PONTOS_TERMO_EXATO if termo == termo_consulta else PONTOS_PREFIXO
+                    for entidade_id in self._postings[termo]:
+                        if pontos > pontos_do_termo.get(entidade_id, 0):
+                            pontos_do_termo[entidade_id] = pontos
+
+                if posicao == 0:
+                    pontuacao = pontos_do_termo
+                else:
+                    pontuacao = {
+                        entidade_id: total + pontos_do_termo[entidade_id]
+                        for entidade_id, total in pontuacao.items()
+                        if entidade_id in pontos_do_termo
+                    }
+                if not pontuacao:
+                    return []
+
+        ranking = sorted(pontuacao.items(), key=lambda item: (-item[1], item[0]))
+        return [entidade_id for entidade_id, _ in ranking[:limite]]
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._termos_por_id.clear()
+            self._vocabulario.clear()
+
+
+class IndiceSincronizado(IndiceDeBuscaInterface):
+    """
+    Índice local mantido em dia pelo log de mudanças compartilhado.
+
+    Com vários workers, as gravações feitas pelos outros não passam pelos
+    casos de uso deste processo; antes de cada busca o índice aplica as
+    mudanças da sua entidade registradas depois do último cursor. Se o cursor
+    já saiu do log (ou o histórico foi descartado), o índice é refeito a
+    partir de 'recarregar'.
+    """
+
+    def __init__(self, indice: IndiceDeBuscaInterface, registro: RegistroDeMudancasInterface, entidade: str,
+                 textos: Callable[[Dict[str, Any]], List[str]], recarregar: Callable[[], Iterable[Tuple[int, List[str]]]]):
+        self.indice = indice
+        self.registro = registro
+        self.entidade = entidade
+        self._textos = textos
+        self._recarregar = recarregar
+        self._cursor = registro.sequencia_atual()
+        self._lock = threading.Lock()
+
+    def indexar(self, entidade_id: int, textos: List[str]) -> None:
+        self.indice.indexar(entidade_id, textos)
+
+    def remover(self, entidade_id: int) -> None:
+        self.indice.remover(entidade_id)
+
+    def buscar(self, consulta: str, limite: int) -> List[int]:
+        self._sincronizar()
+        return self.indice.buscar(consulta, limite)
+
+    def limpar(self) -> None:
+        # Quem limpa reindexa o estado atual em seguida; o que mudar depois
+        # disso é reaplicado pela próxima sincronização.
+        with self._lock:
+            self._cursor = self.registro.sequencia_atual()
+            self.indice.limpar()
+
+    def _sincronizar(self) -> None:
+        with self._lock:
+            while True:
+                pagina = self.registro.listar_desde(self._cursor, LOTE_SINCRONIZACAO)
+                if pagina.ressincronizar:
+                    self._cursor = pagina.sequencia_atual
+                    self.indice.limpar()
+                    for entidade_id, textos in self._recarregar():
+                        self.indice.indexar(entidade_id, textos)
+                    return
+                for mudanca in pagina.mudancas:
+                    if mudanca.entidade != self.entidade:
+                        continue
+                    if mudanca.operacao == OPERACAO_DELETAR or mudanca.dados.get("is_deleted"):
+                        self.indice.remover(mudanca.entidade_id)
+                    else:
+                        self.indice.indexar(mudanca.entidade_id, self._textos(mudanca.dados))
+                if not pagina.mudancas:
+                    return
+                self._cursor = pagina.mudancas[-1].sequencia
@@ -0,0 +1,159 @@
+# src/equipamento/infrastructure/repositories/persistent_map.py
+"""
+Mapa imutável de id inteiro -> valor com compartilhamento estrutural.
+
+É uma trie de 32 ramos (HAMT) sobre os bits do próprio id, 5 bits por nível
+começando pelos menos significativos. Cada nó guarda um bitmap dos ramos
+ocupados e uma tupla só com esses ramos. Incluir ou remover uma chave copia
+apenas os nós do caminho até ela (O(log32 n)); todo o resto é compartilhado
+com a versão anterior, que continua válida e inalterada.
+"""
+
+from typing import Any, Iterator, List, Tuple
+
+BITS_POR_NIVEL = 5
+MASCARA_NIVEL = (1 << BITS_POR_NIVEL) - 1
+
+
+def _contar_bits_py39(valor: int) -> int:
+    return bin(valor).count("1")
+
+
+_contar_bits = getattr(int, "bit_count", _contar_bits_py39)
+
+
+class _No:
+    __slots__ = ("bitmap", "ramos")
+
+    def __init__(self, bitmap: int, ramos: tuple):
+        # Cada ramo é um _No ou uma folha (chave, valor).
+        self.bitmap = bitmap
+        self.ramos = ramos
+
+
+_VAZIO = _No(0, ())
+_AUSENTE = object()
+
+
+def _unir(a: Tuple[int, Any], b: Tuple[int, Any], deslocamento: int) -> _No:
+    """Nó com as duas folhas, descendo enquanto as chaves caírem no mesmo ramo."""
+    ramo_a = (a[0] >> deslocamento) & MASCARA_NIVEL
+    ramo_b = (b[0] >> deslocamento) & MASCARA_NIVEL
+    if ramo_a == ramo_b:
+        return _No(1 << ramo_a, (_unir(a, b, deslocamento + BITS_POR_NIVEL),))
+    if ramo_a < ramo_b:
+        return _No((1 << ramo_a) | (1 << ramo_b), (a, b))
+    return _No((1 << ramo_a) | (1 << ramo_b), (b, a))
+
+
+def _incluir(no: _No, chave: int, valor: Any, deslocamento: int) -> Tuple[_No, bool]:
+    """Retorna o novo nó e se a chave é nova."""
+    bit = 1 << ((chave >> deslocamento) & MASCARA_NIVEL)
+    posicao = _contar_bits(no.bitmap & (bit - 1))
+    ramos = no.ramos
+    if not no.bitmap & bit:
+        return _No(no.bitmap | bit, ramos[:posicao] + ((chave, valor),) + ramos[posicao:]), True
+    atual = ramos[posicao]
+    if isinstance(atual, _No):
+        novo, adicionou = _incluir(atual, chave, valor, deslocamento + BITS_POR_NIVEL)
+    elif atual[0] == chave:
+        novo, adicionou = (chave, valor), False
+    else:
+        novo, adicionou = _unir(atual, (chave, valor), deslocamento + BITS_POR_NIVEL), True
+    return _No(no.bitmap, ramos[:posicao] + (novo,) + ramos[posicao + 1:]), adicionou
+
+
+def _retirar(no: _No, chave: int, deslocamento: int):
+    """Retorna o novo ramo (nó, folha ou None se ficou vazio), ou _AUSENTE se a chave não existe."""
+    bit = 1 << ((chave >> deslocamento) & MASCARA_NIVEL)
+    if not no.bitmap & bit:
+        return _AUSENTE
+    posicao = _contar_bits(no.bitmap & (bit - 1))
+    atual = no.ramos[posicao]
+    if isinstance(atual, _No):
+        novo = _retirar(atual, chave, deslocamento + BITS_POR_NIVEL)
+        if novo is _AUSENTE:
+            return _AUSENTE
+    elif atual[0] == chave:
+        novo = None
+    else:
+        return _AUSENTE
+
+    if novo is None:
+        bitmap = no.bitmap & ~bit
+        ramos = no.ramos[:posicao] + no.ramos[posicao + 1:]
+        if not ramos:
+            return None
+        # Uma folha sozinha sobe para o nível de cima (exceto na raiz).
+        if len(ramos) == 1 and not isinstance(ramos[0], _No) and deslocamento > 0:
+            return ramos[0]
+        return _No(bitmap, ramos)
+    return _No(no.bitmap, no.ramos[:posicao] + (novo,) + no.ramos[posicao + 1:])
+
+
+def _coletar_folhas(no: _No, folhas: List[Tuple[int, Any]]) -> None:
+    # Acumula numa lista em vez de encadear geradores: bem mais rápido para
+    # percorrer o mapa inteiro.
+    for ramo in no.ramos:
+        if type(ramo) is _No:
+            _coletar_folhas(ramo, folhas)
+        else:
+            folhas.append(ramo)
+
+
+def _folhas(no: _No) -> List[Tuple[int, Any]]:
+    folhas: List[Tuple[int, Any]] = []
+    _coletar_folhas(no, folhas)
+    return folhas
+
+
+class MapaPersistente:
+    """Mapa imutável de chaves inteiras não negativas; com() e sem() devolvem novas versões."""
+
+    __slots__ = ("_raiz", "_tamanho")
+
+    def __init__(self, _raiz: _No = _VAZIO, _tamanho: int = 0):
+        self._raiz = _raiz
+        self._tamanho = _tamanho
+
+    def get(self, chave: int, padrao: Any = None) -> Any:
+        no, deslocamento = self._raiz, 0
+        while True:
+            bit = 1 << ((chave >> deslocamento) & MASCARA_NIVEL)
+            if not no.bitmap & bit:
+                return padrao
+            ramo = no.ramos[_contar_bits(no.bitmap & (bit - 1))]
+            if not isinstance(ramo, _No):
+                return ramo[1] if ramo[0] == chave else padrao
+            no, deslocamento = ramo, deslocamento + BITS_POR_NIVEL
+
+    def __contains__(self, chave: int) -> bool:
+        return self.get(chave, _AUSENTE) is not _AUSENTE
+
+    def com(self, chave: int, valor: Any) -> "MapaPersistente":
+        raiz, adicionou = _incluir(self._raiz, chave, valor, 0)
+        return MapaPersistente(raiz, self._tamanho + adicionou)
+
+    def sem(self, chave: int) -> "MapaPersistente":
+        raiz = _retirar(self._raiz, chave, 0)
+        if raiz is _AUSENTE:
+            return self
+        if raiz is None:
+            return MapaPersistente()
+        return MapaPersistente(raiz, self._tamanho - 1)
+
+    def itens(self) -> List[Tuple[int, Any]]:
+        """Pares (chave, valor) sem ordem definida."""
+        return _folhas(self._raiz)
+
+    def valores(self) -> List[Any]:
+        return [valor for _, valor in _folhas(self._raiz)]
+
+    def chaves_ordenadas(self) -> list:
+        return sorted(chave for chave, _ in _folhas(self._raiz))
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self) -> Iterator[int]:
+        return iter([chave for chave, _ in _folhas(self._raiz)])
@@ -0,0 +1,279 @@
+# src/equipamento/infrastructure/repositories/sharded_repository.py
+"""
+Repositórios em memória particionados por hash do id.
+
+Cada partição tem o seu dicionário, a sua trava e o seu alocador de ids, então
+operações pontuais em entidades de partições diferentes nunca disputam a mesma
+trava, e criar entidades não passa por nenhum contador global.
+
+Os ids são distribuídos em blocos de TAMANHO_BLOCO: o bloco b cobre os ids
+[b * TAMANHO_BLOCO + 1, (b + 1) * TAMANHO_BLOCO] e pertence à partição
+b % particoes. Cada partição aloca sequencialmente dentro dos seus próprios
+blocos (k, k + particoes, k + 2 * particoes...), o que torna a partição de
+qualquer id calculável sem consultar tabela alguma.
+
+Com um alocador externo (AlocadorDeIdsInterface, para vários nós), o id vem
+dele e a partição é calculada a partir do id pela mesma fórmula.
+"""
+
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ...application.repositories import (
+    BicicletaRepositoryInterface,
+    TrancaRepositoryInterface,
+    TotemRepositoryInterface,
+    RegistroDeMudancasInterface,
+    AlocadorDeIdsInterface,
+)
+from ...domain.entities import (
+    Bicicleta, Tranca, Totem,
+    ENTIDADE_BICICLETA, ENTIDADE_TRANCA, ENTIDADE_TOTEM,
+)
+from .mem_change_log import OPERACAO_SALVAR, OPERACAO_DELETAR, registrar_mudanca
+from .mem_repository import bicicletas_iniciais, trancas_iniciais, totens_iniciais
+from .tombstone_archive import ArquivoMorto, Excluidos
+from .mem_attribute_index import (
+    IndiceDeAtributos, validar_criterios, CAMPOS_FILTRO_BICICLETA, CAMPOS_FILTRO_TRANCA, CAMPOS_FILTRO_TOTEM,
+)
+
+PARTICOES_PADRAO = 16
+TAMANHO_BLOCO = 1024
+
+
+class _Particao:
+    """Uma partição: dados, índice de atributos, trava e alocador de blocos de ids próprios."""
+
+    def __init__(self, indice: int, total_particoes: int, campos_filtro: Tuple[str, ...] = ()):
+        self.indice = indice
+        self.total_particoes = total_particoes
+        self.dados: Dict[int, object] = {}
+        self.atributos = IndiceDeAtributos(campos_filtro)
+        self.lock = threading.Lock()
+        self._reiniciar_alocador()
+
+    def _reiniciar_alocador(self) -> None:
+        self._blocos = itertools.count(self.indice, self.total_particoes)
+        self._proximo_id = 0
+        self._fim_bloco = 0
+
+    def alocar_id(self) -> int:
+        """
+        Deve ser chamado com a trava da partição obtida. Os ids gravados
+        explicitamente (ex.: estado inicial) já foram reservados em _salvar,
+        inclusive os que depois foram excluídos e saíram de 'dados'.
+        """
+        while True:
+            if self._proximo_id >= self._fim_bloco:
+                bloco = next(self._blocos)
+                self._proximo_id = bloco * TAMANHO_BLOCO + 1
+                self._fim_bloco = self._proximo_id + TAMANHO_BLOCO
+            novo_id = self._proximo_id
+            self._proximo_id += 1
+            return novo_id
+
+    def reservar_ate(self, entidade_id: int) -> None:
+        """Faz a partição, dona do bloco do id, alocar dali em diante só ids maiores (com a trava obtida)."""
+        bloco = (entidade_id - 1) // TAMANHO_BLOCO
+        bloco_atual = (self._fim_bloco - 1) // TAMANHO_BLOCO - 1 if self._fim_bloco else -1
+        if bloco == bloco_atual:
+            self._proximo_id = max(self._proximo_id, entidade_id + 1)
+        elif bloco > bloco_atual:
+            self._blocos = itertools.count(bloco + self.total_particoes, self.total_particoes)
+            self._proximo_id = entidade_id + 1
+            self._fim_bloco = bloco * TAMANHO_BLOCO + 1 + TAMANHO_BLOCO
+
+    def limpar(self) -> None:
+        self.dados.clear()
+        self.atributos.limpar()
+        self._reiniciar_alocador()
+
+
+class _RepositorioParticionado:
+    """Operações comuns aos repositórios particionados."""
+
+    ENTIDADE = ""
+    CAMPOS_FILTRO: Tuple[str, ...] = ()
+
+    def __init__(self, particoes: int = PARTICOES_PADRAO, registro: Optional[RegistroDeMudancasInterface] = None,
+                 arquivo: Optional[ArquivoMorto] = None, alocador: Optional[AlocadorDeIdsInterface] = None):
+        if particoes <= 0:
+            raise ValueError("O número de partições deve ser positivo.")
+        self._particoes = [_Particao(i, particoes, self.CAMPOS_FILTRO) for i in range(particoes)]
+        self._registro = registro
+        self._alocador = alocador
+        # As partições só guardam as vivas; as excluídas ficam aqui.
+        self.excluidos = Excluidos(arquivo, reservar=self._reservar_ate)
+
+    def _reservar_ate(self, entidade_id: int) -> None:
+        if self._alocador is not None:
+            self._alocador.reservar_ate(entidade_id)
+            return
+        particao = self._particao_do_id(entidade_id)
+        with particao.lock:
+            particao.reservar_ate(entidade_id)
+
+    def _particao_do_id(self, entidade_id: int) -> _Particao:
+        return self._particoes[((entidade_id - 1) // TAMANHO_BLOCO) % len(self._particoes)]
+
+    def _particao_para_nova_entidade(self) -> _Particao:
+        # Threads diferentes (requisições simultâneas) tendem a cair em partições diferentes.
+        return self._particoes[hash(threading.get_ident()) % len(self._particoes)]
+
+    def _salvar(self, entidade):
+        if entidade.id is None and self._alocador is None:
+            particao = self._particao_para_nova_entidade()
+            with particao.lock:
+                entidade.id = particao.alocar_id()
+                particao.dados[entidade.id] = entidade
+                particao.atributos.atualizar(entidade)
+        else:
+            if entidade.id is None:
+                entidade.id = self._alocador.alocar()
+            elif self._alocador is not None and entidade.id not in self._particao_do_id(entidade.id).dados:
+                self._alocador.reservar_ate(entidade.id)
+            particao = self._particao_do_id(entidade.id)
+            with particao.lock:
+                if self._alocador is None:
+                    particao.reservar_ate(entidade.id)
+                particao.dados[entidade.id] = entidade
+                particao.atributos.atualizar(entidade)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, entidade)
+        return entidade
+
+    def _buscar(self, entidade_id: int):
+        # dict.get é atômico no CPython; leituras pontuais não precisam da trava.
+        entidade = self._particao_do_id(entidade_id).dados.get(entidade_id)
+        if entidade and not entidade.is_deleted:
+            return entidade
+        return None
+
+    def deletar(self, entidade_id: int) -> None:
+        particao = self._particao_do_id(entidade_id)
+        with particao.lock:
+            entidade = particao.dados.pop(entidade_id, None)
+            if not entidade:
+                return
+            entidade.is_deleted = True
+            particao.atributos.remover(entidade_id)
+        self.excluidos.adicionar(entidade)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, entidade)
+
+    def iterar(self, criterio: Optional[Callable[[object], bool]] = None) -> Iterator:
+        """
+        Percorre todas as partições em ordem de id, sob demanda.
+
+        Cada partição é copiada sob a sua própria trava (nunca todas ao mesmo
+        tempo) e as cópias são intercaladas com heapq.merge.
+        """
+        fatias = []
+        for particao in self._particoes:
+            with particao.lock:
+                fatias.append(sorted(particao.dados.items()))
+        for _, entidade in heapq.merge(*fatias, key=lambda item: item[0]):
+            if criterio is None or criterio(entidade):
+                yield entidade
+
+    def filtrar(self, criterios: Dict[str, Any]) -> list:
+        """Consulta o índice de atributos de cada partição e intercala os resultados por id."""
+        validar_criterios(criterios, self.CAMPOS_FILTRO)
+        fatias = []
+        for particao in self._particoes:
+            with particao.lock:
+                fatias.append([particao.dados[i] for i in particao.atributos.buscar(criterios)])
+        return list(heapq.merge(*fatias, key=lambda entidade: entidade.id))
+
+    def _listar(self, include_deleted: bool) -> list:
+        if include_deleted:
+            return list(heapq.merge(self.iterar(), self.excluidos.listar(), key=lambda e: e.id))
+        return list(self.iterar())
+
+    def _buscar_varios(self, entidade_ids: List[int]) -> list:
+        entidades = (self._buscar(entidade_id) for entidade_id in sorted(set(entidade_ids)))
+        return [e for e in entidades if e is not None]
+
+    def _restaurar(self, iniciais: list) -> None:
+        for particao in self._particoes:
+            with particao.lock:
+                particao.limpar()
+        self.excluidos.limpar()
+        if self._registro is not None:
+            self._registro.descartar_historico()
+        for entidade in iniciais:
+            self._salvar(entidade)
+
+
+class ShardedBicicletaRepository(_RepositorioParticionado, BicicletaRepositoryInterface):
+    """Repositório de bicicletas particionado por hash do id."""
+
+    ENTIDADE = ENTIDADE_BICICLETA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_BICICLETA
+
+    def salvar(self, bicicleta: Bicicleta) -> Bicicleta:
+        return self._salvar(bicicleta)
+
+    def buscar_por_id(self, bicicleta_id: int) -> Optional[Bicicleta]:
+        return self._buscar(bicicleta_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Bicicleta]:
+        return self._listar(include_deleted)
+
+    def buscar_por_ids(self, bicicleta_ids: List[int]) -> List[Bicicleta]:
+        return self._buscar_varios(bicicleta_ids)
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(bicicletas_iniciais())
+
+
+class ShardedTrancaRepository(_RepositorioParticionado, TrancaRepositoryInterface):
+    """Repositório de trancas particionado por hash do id."""
+
+    ENTIDADE = ENTIDADE_TRANCA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TRANCA
+
+    def salvar(self, tranca: Tranca) -> Tranca:
+        return self._salvar(tranca)
+
+    def buscar_por_id(self, tranca_id: int) -> Optional[Tranca]:
+        return self._buscar(tranca_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Tranca]:
+        return self._listar(include_deleted)
+
+    def buscar_por_totem_id(self, totem_id: int) -> List[Tranca]:
+        return self.filtrar({"totem_id": totem_id})
+
+    def buscar_por_totem_ids(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        # Uma passada pelas partições, consultando o índice de totem_id de cada uma.
+        grupos: Dict[int, List[Tranca]] = {totem_id: [] for totem_id in totem_ids}
+        for particao in self._particoes:
+            with particao.lock:
+                for totem_id, trancas in grupos.items():
+                    trancas.extend(particao.dados[i] for i in particao.atributos.buscar({"totem_id": totem_id}))
+        for trancas in grupos.values():
+            trancas.sort(key=lambda t: t.id)
+        return grupos
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(trancas_iniciais())
+
+
+class ShardedTotemRepository(_RepositorioParticionado, TotemRepositoryInterface):
+    """Repositório de totens particionado por hash do id."""
+
+    ENTIDADE = ENTIDADE_TOTEM
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TOTEM
+
+    def salvar(self, totem: Totem) -> Totem:
+        return self._salvar(totem)
+
+    def buscar_por_id(self, totem_id: int) -> Optional[Totem]:
+        return self._buscar(totem_id)
+
+    def listar_todos(self, include_deleted: bool = False) -> List[Totem]:
+        return self._listar(include_deleted)
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(totens_iniciais())
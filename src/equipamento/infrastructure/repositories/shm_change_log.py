@@ -0,0 +1,54 @@
+# src/equipamento/infrastructure/repositories/shm_change_log.py
+
+from typing import Any, Dict, Optional
+
+from ...application.repositories import RegistroDeMudancasInterface
+from ...domain.entities import Mudanca, PaginaDeMudancas
+from .shm_repository import AnelCompartilhado, CAPACIDADE_ANEL_PADRAO, TAMANHO_SLOT_PADRAO
+
+# Folga do slot do log sobre o slot das entidades, para os campos da mudança.
+FOLGA_SLOT_MUDANCA = 256
+
+
+class ShmRegistroDeMudancas(RegistroDeMudancasInterface):
+    """
+    Log de mudanças num anel de memória compartilhada.
+
+    Todos os workers com o mesmo prefixo numeram as mudanças na mesma
+    sequência, então um cursor de /mudancas vale em qualquer um deles. Os
+    repositórios compartilhados registram a mudança ainda sob a trava da
+    tabela, na ordem em que as gravações aconteceram.
+    """
+
+    def __init__(self, prefixo: str, capacidade: int = CAPACIDADE_ANEL_PADRAO,
+                 tamanho_slot: int = TAMANHO_SLOT_PADRAO + FOLGA_SLOT_MUDANCA, diretorio_travas: Optional[str] = None):
+        self._anel = AnelCompartilhado(f"{prefixo}_mudancas", capacidade, tamanho_slot, diretorio_travas)
+
+    @property
+    def epoca(self) -> int:
+        return self._anel.epoca
+
+    def registrar(self, entidade: str, entidade_id: int, operacao: str, dados: Dict[str, Any]) -> Mudanca:
+        sequencia = self._anel.acrescentar({"entidade": entidade, "entidade_id": entidade_id, "operacao": operacao, "dados": dados})
+        return Mudanca(sequencia=sequencia, entidade=entidade, entidade_id=entidade_id, operacao=operacao, dados=dados)
+
+    def listar_desde(self, desde: int, limite: int) -> PaginaDeMudancas:
+        registros, sequencia, perdido = self._anel.ler_desde(desde, limite)
+        if perdido:
+            return PaginaDeMudancas(mudancas=[], sequencia_atual=sequencia, ressincronizar=True)
+        return PaginaDeMudancas(mudancas=[Mudanca(sequencia=s, **r) for s, r in registros], sequencia_atual=sequencia)
+
+    def sequencia_atual(self) -> int:
+        return self._anel.sequencia_atual()
+
+    def descartar_historico(self) -> None:
+        self._anel.descartar_historico()
+
+    def tamanho_segmento(self) -> int:
+        return self._anel.tamanho_segmento()
+
+    def fechar(self) -> None:
+        self._anel.fechar()
+
+    def destruir(self) -> None:
+        self._anel.destruir()
@@ -0,0 +1,42 @@
+# src/equipamento/infrastructure/repositories/shm_events.py
+
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+from ...application.repositories import PublicadorDeEventosInterface
+from ...domain.entities import Evento
+from .shm_change_log import FOLGA_SLOT_MUDANCA
+from .shm_repository import AnelCompartilhado, CAPACIDADE_ANEL_PADRAO, TAMANHO_SLOT_PADRAO
+
+
+class ShmPublicadorDeEventos(PublicadorDeEventosInterface):
+    """
+    Publica os eventos num anel de memória compartilhada em vez de entregá-los
+    direto aos assinantes: cada worker lê o anel e repassa os eventos aos
+    seus próprios assinantes SSE (ver RetransmissorDeEventos), então um
+    assinante recebe as mudanças feitas em qualquer worker.
+    """
+
+    def __init__(self, prefixo: str, capacidade: int = CAPACIDADE_ANEL_PADRAO,
+                 tamanho_slot: int = TAMANHO_SLOT_PADRAO + FOLGA_SLOT_MUDANCA, diretorio_travas: Optional[str] = None):
+        self._anel = AnelCompartilhado(f"{prefixo}_eventos", capacidade, tamanho_slot, diretorio_travas)
+
+    def publicar(self, evento: Evento) -> None:
+        self._anel.acrescentar(asdict(evento))
+
+    def eventos_desde(self, desde: int, limite: int) -> Tuple[List[Evento], int, bool]:
+        """Eventos posteriores a 'desde' (até 'limite'), a sequência atual e se o cursor se perdeu."""
+        registros, sequencia, perdido = self._anel.ler_desde(desde, limite)
+        return [Evento(**registro) for _, registro in registros], sequencia, perdido
+
+    def sequencia_atual(self) -> int:
+        return self._anel.sequencia_atual()
+
+    def tamanho_segmento(self) -> int:
+        return self._anel.tamanho_segmento()
+
+    def fechar(self) -> None:
+        self._anel.fechar()
+
+    def destruir(self) -> None:
+        self._anel.destruir()
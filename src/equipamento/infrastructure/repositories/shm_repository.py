@@ -0,0 +1,531 @@
+# src/equipamento/infrastructure/repositories/shm_repository.py
+"""
+Repositórios cujos dados vivem em segmentos de multiprocessing.shared_memory.
+
+Permitem rodar o uvicorn com vários workers (--workers N) servindo um único
+estado da frota: todos os processos que usam o mesmo prefixo se ligam aos
+mesmos segmentos, um por tipo de entidade.
+
+Layout de cada tabela:
+    cabeçalho: magic, versão, capacidade, tamanho do slot, próximo id, geração,
+               segmentos (a geração avança a cada escrita ou limpeza da tabela)
+    slots:     capacidade x tamanho_slot bytes por segmento; o slot de uma
+               entidade guarda [tamanho u32][JSON]. Tamanho 0 significa slot vazio.
+
+O primeiro segmento ('nome') traz o cabeçalho e os ids 1..capacidade; quando
+os ids passam disso, a tabela cresce com segmentos de extensão ('nome_1',
+'nome_2', ...) só com slots, anexados sob demanda por cada processo.
+
+AnelCompartilhado guarda, no mesmo esquema de slots, os últimos registros de
+um log com sequência única entre os processos (log de mudanças e eventos).
+
+A exclusão mútua entre processos usa flock(2) em um arquivo de trava por
+tabela: leituras pegam a trava compartilhada e escritas a exclusiva. Como o
+flock é por descritor (e não por thread), um threading.Lock serializa o uso
+do descritor dentro de cada processo.
+"""
+
+import fcntl
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ...application.repositories import (
+    BicicletaRepositoryInterface,
+    TrancaRepositoryInterface,
+    TotemRepositoryInterface,
+    RegistroDeMudancasInterface,
+)
+from ...domain.entities import (
+    Bicicleta, Tranca, Totem,
+    ENTIDADE_BICICLETA, ENTIDADE_TRANCA, ENTIDADE_TOTEM,
+)
+from .mem_change_log import OPERACAO_SALVAR, OPERACAO_DELETAR, registrar_mudanca
+from .mem_repository import (
+    bicicletas_iniciais, trancas_iniciais, totens_iniciais,
+    decodificar_bicicleta, decodificar_tranca, decodificar_totem,
+)
+from .mem_attribute_index import (
+    validar_criterios, CAMPOS_FILTRO_BICICLETA, CAMPOS_FILTRO_TRANCA, CAMPOS_FILTRO_TOTEM,
+)
+
+MAGIC = 0x45515550  # "EQUP"
+VERSAO_LAYOUT = 2
+CABECALHO = struct.Struct("<IIIIQQQ")
+TAMANHO_REGISTRO = struct.Struct("<I")
+CAPACIDADE_PADRAO = 65_536
+TAMANHO_SLOT_PADRAO = 512
+MAX_SEGMENTOS = 1024
+
+
+class RegistroGrandeDemais(Exception):
+    """A entidade serializada não cabe num slot da tabela compartilhada."""
+
+
+class TravaEntreProcessos:
+    """
+    flock(2) num arquivo de trava: compartilhada para leituras, exclusiva
+    para escritas. Como o flock é por descritor, um threading.Lock serializa
+    o uso do descritor dentro do processo.
+    """
+
+    def __init__(self, caminho: str):
+        self._lock_local = threading.Lock()
+        self._fd = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o600)
+
+    @contextmanager
+    def _trava(self, modo: int) -> Iterator[None]:
+        with self._lock_local:
+            fcntl.flock(self._fd, modo)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def leitura(self):
+        return self._trava(fcntl.LOCK_SH)
+
+    def escrita(self):
+        return self._trava(fcntl.LOCK_EX)
+
+    def fechar(self) -> None:
+        os.close(self._fd)
+
+
+class TabelaCompartilhada:
+    """Tabela de slots de tamanho fixo em segmentos de memória compartilhada."""
+
+    def __init__(self, nome: str, capacidade: int = CAPACIDADE_PADRAO, tamanho_slot: int = TAMANHO_SLOT_PADRAO,
+                 diretorio_travas: Optional[str] = None):
+        self.nome = nome
+        self._trava = TravaEntreProcessos(os.path.join(diretorio_travas or tempfile.gettempdir(), f"{nome}.lock"))
+
+        # A criação/anexação acontece sob a trava exclusiva para que nenhum
+        # processo leia o cabeçalho antes de ele ser inicializado.
+        with self._trava.escrita():
+            principal = _abrir_segmento(nome, CABECALHO.size + capacidade * tamanho_slot)
+            magic, versao, cap, slot, _, _, _ = CABECALHO.unpack_from(principal.buf, 0)
+            if magic != MAGIC:
+                CABECALHO.pack_into(principal.buf, 0, MAGIC, VERSAO_LAYOUT, capacidade, tamanho_slot, 1, 0, 1)
+            elif versao != VERSAO_LAYOUT:
+                raise ValueError(f"Segmento '{nome}' usa um layout incompatível (versão {versao}).")
+            else:
+                # Um segmento já existente dita as dimensões.
+                capacidade, tamanho_slot = cap, slot
+        self.capacidade = capacidade
+        self.tamanho_slot = tamanho_slot
+        self._segmentos: List[shared_memory.SharedMemory] = [principal]
+
+    def leitura(self):
+        return self._trava.leitura()
+
+    def escrita(self):
+        return self._trava.escrita()
+
+    # --- As operações abaixo devem ser chamadas com a trava adequada já obtida ---
+
+    def _cabecalho(self):
+        return list(CABECALHO.unpack_from(self._segmentos[0].buf, 0))
+
+    def _gravar_cabecalho(self, cabecalho) -> None:
+        CABECALHO.pack_into(self._segmentos[0].buf, 0, *cabecalho)
+
+    def proximo_id(self) -> int:
+        return self._cabecalho()[4]
+
+    def geracao(self) -> int:
+        return self._cabecalho()[5]
+
+    def _avancar_geracao(self) -> None:
+        cabecalho = self._cabecalho()
+        cabecalho[5] += 1
+        self._gravar_cabecalho(cabecalho)
+
+    def alocar_id(self) -> int:
+        cabecalho = self._cabecalho()
+        novo_id = cabecalho[4]
+        cabecalho[4] += 1
+        self._gravar_cabecalho(cabecalho)
+        return novo_id
+
+    def observar_id(self, entidade_id: int) -> None:
+        """Garante que ids informados explicitamente não sejam realocados depois."""
+        cabecalho = self._cabecalho()
+        if entidade_id >= cabecalho[4]:
+            cabecalho[4] = entidade_id + 1
+            self._gravar_cabecalho(cabecalho)
+
+    def _anexar_ate(self, indice: int) -> None:
+        """Anexa os segmentos até 'indice', criando os que ainda não existem."""
+        while len(self._segmentos) <= indice:
+            proximo = len(self._segmentos)
+            self._segmentos.append(_abrir_segmento(f"{self.nome}_{proximo}", self.capacidade * self.tamanho_slot))
+            cabecalho = self._cabecalho()
+            if cabecalho[6] <= proximo:
+                cabecalho[6] = proximo + 1
+                self._gravar_cabecalho(cabecalho)
+
+    def _slot(self, entidade_id: int) -> Tuple[memoryview, int]:
+        """Buffer do segmento que guarda a entidade e o deslocamento do seu slot nele."""
+        indice, posicao = divmod(entidade_id - 1, self.capacidade)
+        if entidade_id < 1 or indice >= MAX_SEGMENTOS:
+            raise ValueError(f"ID {entidade_id} fora dos limites da tabela '{self.nome}'.")
+        self._anexar_ate(indice)
+        base = CABECALHO.size if indice == 0 else 0
+        return self._segmentos[indice].buf, base + posicao * self.tamanho_slot
+
+    def ler(self, entidade_id: int) -> Optional[Dict[str, Any]]:
+        # Ids ainda não alocados nunca foram gravados (e o segmento deles pode nem existir).
+        if not 1 <= entidade_id < self.proximo_id():
+            return None
+        buf, inicio = self._slot(entidade_id)
+        (tamanho,) = TAMANHO_REGISTRO.unpack_from(buf, inicio)
+        if tamanho == 0:
+            return None
+        inicio += TAMANHO_REGISTRO.size
+        return json.loads(bytes(buf[inicio:inicio + tamanho]))
+
+    def escrever(self, entidade_id: int, dados: Dict[str, Any]) -> None:
+        corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(corpo) > self.tamanho_slot - TAMANHO_REGISTRO.size:
+            raise RegistroGrandeDemais(
+                f"Registro {entidade_id} tem {len(corpo)} bytes e excede o tamanho do slot "
+                f"({self.tamanho_slot - TAMANHO_REGISTRO.size} bytes) da tabela '{self.nome}'."
+            )
+        buf, inicio = self._slot(entidade_id)
+        buf[inicio + TAMANHO_REGISTRO.size:inicio + TAMANHO_REGISTRO.size + len(corpo)] = corpo
+        TAMANHO_REGISTRO.pack_into(buf, inicio, len(corpo))
+        self._avancar_geracao()
+
+    def ler_todos(self) -> Iterator[Dict[str, Any]]:
+        for entidade_id in range(1, self.proximo_id()):
+            dados = self.ler(entidade_id)
+            if dados is not None:
+                yield dados
+
+    def limpar(self) -> None:
+        for entidade_id in range(1, self.proximo_id()):
+            buf, inicio = self._slot(entidade_id)
+            TAMANHO_REGISTRO.pack_into(buf, inicio, 0)
+        cabecalho = self._cabecalho()
+        cabecalho[4] = 1
+        cabecalho[5] += 1
+        self._gravar_cabecalho(cabecalho)
+
+    def tamanho_segmento(self) -> int:
+        """Bytes de todos os segmentos da tabela (fora do heap do processo)."""
+        self._anexar_ate(self._cabecalho()[6] - 1)
+        return sum(segmento.size for segmento in self._segmentos)
+
+    def fechar(self) -> None:
+        for segmento in self._segmentos:
+            segmento.close()
+        self._trava.fechar()
+
+    def destruir(self) -> None:
+        """Remove os segmentos do sistema. Só deve ser chamado quando nenhum worker os usa mais."""
+        with self.escrita():
+            # Extensões criadas por outros processos também precisam sair.
+            self._anexar_ate(self._cabecalho()[6] - 1)
+        for segmento in self._segmentos:
+            segmento.close()
+            if sys.version_info < (3, 13):
+                # unlink() desfaz um registro no resource_tracker que foi removido na abertura.
+                resource_tracker.register(segmento._name, "shared_memory")
+            segmento.unlink()
+        self._trava.fechar()
+
+
+def _abrir_segmento(nome: str, tamanho: int) -> shared_memory.SharedMemory:
+    try:
+        shm = _shared_memory(nome, create=True, size=tamanho)
+    except FileExistsError:
+        shm = _shared_memory(nome, create=False)
+    return shm
+
+
+def _shared_memory(nome: str, create: bool, size: int = 0) -> shared_memory.SharedMemory:
+    # O resource_tracker apagaria o segmento quando o primeiro worker terminasse;
+    # o ciclo de vida do segmento é controlado explicitamente por destruir().
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, create=create, size=size, track=False)
+    shm = shared_memory.SharedMemory(name=nome, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+MAGIC_ANEL = 0x414E454C  # "ANEL"
+VERSAO_ANEL = 1
+# magic, versão, capacidade, tamanho do slot, sequência, piso, época
+CABECALHO_ANEL = struct.Struct("<IIIIQQQ")
+CAPACIDADE_ANEL_PADRAO = 10_000
+
+
+class AnelCompartilhado:
+    """
+    Anel de registros JSON com sequência compartilhada entre os processos.
+
+    O registro de sequência 's' fica no slot 's % capacidade'. O piso é o
+    menor cursor ainda atendido: avança quando o anel dá a volta ou quando o
+    histórico é descartado. A época é sorteada na criação do segmento e
+    distingue cursores de uma vida anterior do anel.
+    """
+
+    def __init__(self, nome: str, capacidade: int = CAPACIDADE_ANEL_PADRAO, tamanho_slot: int = TAMANHO_SLOT_PADRAO,
+                 diretorio_travas: Optional[str] = None):
+        self.nome = nome
+        self._trava = TravaEntreProcessos(os.path.join(diretorio_travas or tempfile.gettempdir(), f"{nome}.lock"))
+        with self._trava.escrita():
+            self._shm = _abrir_segmento(nome, CABECALHO_ANEL.size + capacidade * tamanho_slot)
+            magic, versao, cap, slot, _, _, epoca = CABECALHO_ANEL.unpack_from(self._shm.buf, 0)
+            if magic != MAGIC_ANEL:
+                epoca = int.from_bytes(os.urandom(8), "little")
+                CABECALHO_ANEL.pack_into(self._shm.buf, 0, MAGIC_ANEL, VERSAO_ANEL, capacidade, tamanho_slot, 0, 0, epoca)
+            elif versao != VERSAO_ANEL:
+                raise ValueError(f"Segmento '{nome}' usa um layout incompatível (versão {versao}).")
+            else:
+                capacidade, tamanho_slot = cap, slot
+        self.capacidade = capacidade
+        self.tamanho_slot = tamanho_slot
+        self.epoca = epoca
+
+    def _cabecalho(self):
+        return list(CABECALHO_ANEL.unpack_from(self._shm.buf, 0))
+
+    def _inicio_slot(self, sequencia: int) -> int:
+        return CABECALHO_ANEL.size + (sequencia % self.capacidade) * self.tamanho_slot
+
+    def acrescentar(self, registro: Dict[str, Any]) -> int:
+        """Grava o registro na próxima sequência e a retorna."""
+        corpo = json.dumps(registro, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(corpo) > self.tamanho_slot - TAMANHO_REGISTRO.size:
+            raise RegistroGrandeDemais(
+                f"Registro de {len(corpo)} bytes excede o tamanho do slot "
+                f"({self.tamanho_slot - TAMANHO_REGISTRO.size} bytes) do anel '{self.nome}'."
+            )
+        with self._trava.escrita():
+            cabecalho = self._cabecalho()
+            sequencia = cabecalho[4] + 1
+            inicio = self._inicio_slot(sequencia)
+            self._shm.buf[inicio + TAMANHO_REGISTRO.size:inicio + TAMANHO_REGISTRO.size + len(corpo)] = corpo
+            TAMANHO_REGISTRO.pack_into(self._shm.buf, inicio, len(corpo))
+            cabecalho[4] = sequencia
+            if sequencia - cabecalho[5] > self.capacidade:
+                cabecalho[5] = sequencia - self.capacidade
+            CABECALHO_ANEL.pack_into(self._shm.buf, 0, *cabecalho)
+        return sequencia
+
+    def ler_desde(self, desde: int, limite: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, bool]:
+        """(sequência, registro) posteriores a 'desde' (até 'limite'), a sequência atual e se o cursor se perdeu."""
+        with self._trava.leitura():
+            _, _, _, _, sequencia, piso, _ = self._cabecalho()
+            if desde < piso or desde > sequencia:
+                return [], sequencia, True
+            registros = []
+            for s in range(desde + 1, min(sequencia, desde + limite) + 1):
+                inicio = self._inicio_slot(s)
+                (tamanho,) = TAMANHO_REGISTRO.unpack_from(self._shm.buf, inicio)
+                inicio += TAMANHO_REGISTRO.size
+                registros.append((s, json.loads(bytes(self._shm.buf[inicio:inicio + tamanho]))))
+            return registros, sequencia, False
+
+    def sequencia_atual(self) -> int:
+        with self._trava.leitura():
+            return self._cabecalho()[4]
+
+    def descartar_historico(self) -> None:
+        with self._trava.escrita():
+            cabecalho = self._cabecalho()
+            cabecalho[5] = cabecalho[4]
+            CABECALHO_ANEL.pack_into(self._shm.buf, 0, *cabecalho)
+
+    def tamanho_segmento(self) -> int:
+        return self._shm.size
+
+    def fechar(self) -> None:
+        self._shm.close()
+        self._trava.fechar()
+
+    def destruir(self) -> None:
+        """Remove o segmento do sistema. Só deve ser chamado quando nenhum worker o usa mais."""
+        self._shm.close()
+        if sys.version_info < (3, 13):
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+        self._trava.fechar()
+
+
+class _ShmRepositorioBase:
+    """Operações comuns aos repositórios em memória compartilhada."""
+
+    ENTIDADE = ""
+    CAMPOS_FILTRO: tuple = ()
+
+    def __init__(self, prefixo: str, capacidade: int = CAPACIDADE_PADRAO, tamanho_slot: int = TAMANHO_SLOT_PADRAO,
+                 registro: Optional[RegistroDeMudancasInterface] = None, diretorio_travas: Optional[str] = None):
+        self._tabela = TabelaCompartilhada(f"{prefixo}_{self.ENTIDADE}", capacidade, tamanho_slot, diretorio_travas)
+        # Com vários workers, o registro precisa ser compartilhado também
+        # (ShmRegistroDeMudancas), senão cada um numera as mudanças à sua maneira.
+        self._registro = registro
+
+    def _decodificar(self, dados: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _salvar(self, entidade):
+        with self._tabela.escrita():
+            novo = entidade.id is None
+            if novo:
+                entidade.id = self._tabela.alocar_id()
+            else:
+                self._tabela.observar_id(entidade.id)
+            try:
+                self._tabela.escrever(entidade.id, asdict(entidade))
+            except RegistroGrandeDemais:
+                if novo:
+                    # O id alocado fica sem uso; a entidade continua sem id.
+                    entidade.id = None
+                raise
+            # Ainda sob a trava: as mudanças de uma mesma entidade entram no
+            # log na ordem em que foram gravadas, qualquer que seja o worker.
+            registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, entidade)
+        return entidade
+
+    def _buscar(self, entidade_id: int):
+        with self._tabela.leitura():
+            dados = self._tabela.ler(entidade_id)
+        if dados is None or dados["is_deleted"]:
+            return None
+        return self._decodificar(dados)
+
+    def _filtrar(self, criterio: Callable[[Dict[str, Any]], bool]) -> list:
+        with self._tabela.leitura():
+            selecionados = [d for d in self._tabela.ler_todos() if criterio(d)]
+        return [self._decodificar(d) for d in selecionados]
+
+    def filtrar(self, criterios: Dict[str, Any]) -> list:
+        # Um índice aqui seria local ao processo e não veria as gravações dos
+        # outros workers; o filtro é feito numa única passada pela tabela,
+        # decodificando só as entidades selecionadas.
+        validar_criterios(criterios, self.CAMPOS_FILTRO)
+        return self._filtrar(lambda d: not d["is_deleted"] and all(d[c] == v for c, v in criterios.items()))
+
+    def _listar(self, include_deleted: bool) -> list:
+        return self._filtrar(lambda d: include_deleted or not d["is_deleted"])
+
+    def deletar(self, entidade_id: int) -> None:
+        with self._tabela.escrita():
+            dados = self._tabela.ler(entidade_id)
+            if dados is None:
+                return
+            dados["is_deleted"] = True
+            self._tabela.escrever(entidade_id, dados)
+            registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, self._decodificar(dados))
+
+    def _restaurar(self, iniciais: list) -> None:
+        with self._tabela.escrita():
+            self._tabela.limpar()
+        if self._registro is not None:
+            self._registro.descartar_historico()
+        for entidade in iniciais:
+            self._salvar(entidade)
+
+    def geracao(self) -> int:
+        """Contador que muda a cada gravação feita por qualquer processo."""
+        with self._tabela.leitura():
+            return self._tabela.geracao()
+
+    def tamanho_segmento(self) -> int:
+        with self._tabela.leitura():
+            return self._tabela.tamanho_segmento()
+
+    def fechar(self) -> None:
+        self._tabela.fechar()
+
+    def destruir(self) -> None:
+        self._tabela.destruir()
+
+
+class ShmBicicletaRepository(_ShmRepositorioBase, BicicletaRepositoryInterface):
+    """Repositório de bicicletas em memória compartilhada entre processos."""
+
+    ENTIDADE = ENTIDADE_BICICLETA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_BICICLETA
+
+    def _decodificar(self, dados: Dict[str, Any]) -> Bicicleta:
+        return decodificar_bicicleta(dados)
+
+    def salvar(self, bicicleta: Bicicleta) -> Bicicleta:
+        return self._salvar(bicicleta)
+
+    def buscar_por_id(self, bicicleta_id: int) -> Optional[Bicicleta]:
+        return self._buscar(bicicleta_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Bicicleta]:
+        return self._listar(include_deleted)
+
+    def buscar_por_ids(self, bicicleta_ids: List[int]) -> List[Bicicleta]:
+        bicicletas = (self._buscar(bicicleta_id) for bicicleta_id in sorted(set(bicicleta_ids)))
+        return [b for b in bicicletas if b is not None]
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(bicicletas_iniciais())
+
+
+class ShmTrancaRepository(_ShmRepositorioBase, TrancaRepositoryInterface):
+    """Repositório de trancas em memória compartilhada entre processos."""
+
+    ENTIDADE = ENTIDADE_TRANCA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TRANCA
+
+    def _decodificar(self, dados: Dict[str, Any]) -> Tranca:
+        return decodificar_tranca(dados)
+
+    def salvar(self, tranca: Tranca) -> Tranca:
+        return self._salvar(tranca)
+
+    def buscar_por_id(self, tranca_id: int) -> Optional[Tranca]:
+        return self._buscar(tranca_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Tranca]:
+        return self._listar(include_deleted)
+
+    def buscar_por_totem_id(self, totem_id: int) -> List[Tranca]:
+        return self._filtrar(lambda d: d["totem_id"] == totem_id and not d["is_deleted"])
+
+    def buscar_por_totem_ids(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        grupos: Dict[int, List[Tranca]] = {totem_id: [] for totem_id in totem_ids}
+        for tranca in self._filtrar(lambda d: d["totem_id"] in grupos and not d["is_deleted"]):
+            grupos[tranca.totem_id].append(tranca)
+        return grupos
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(trancas_iniciais())
+
+
+class ShmTotemRepository(_ShmRepositorioBase, TotemRepositoryInterface):
+    """Repositório de totens em memória compartilhada entre processos."""
+
+    ENTIDADE = ENTIDADE_TOTEM
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TOTEM
+
+    def _decodificar(self, dados: Dict[str, Any]) -> Totem:
+        return decodificar_totem(dados)
+
+    def salvar(self, totem: Totem) -> Totem:
+        return self._salvar(totem)
+
+    def buscar_por_id(self, totem_id: int) -> Optional[Totem]:
+        return self._buscar(totem_id)
+
+    def listar_todos(self, include_deleted: bool = False) -> List[Totem]:
+        return self._listar(include_deleted)
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(totens_iniciais())
@@ -0,0 +1,107 @@
+# src/equipamento/infrastructure/repositories/timing_wheel.py
+"""
+Roda de tempo hierárquica (hierarchical timing wheel).
+
+O tempo é contado em ticks inteiros. Cada nível tem 64 posições: uma
+posição do nível 0 vale um tick, uma do nível 1 vale 64 ticks, uma do nível
+2 vale 64² e assim por diante. Uma chave fica no nível mais baixo em que o
+seu prazo e o tick atual caem no mesmo bloco do nível de cima, então
+agendar e cancelar são O(1). Quando o tick atual entra num novo bloco de um
+nível, a posição correspondente é redistribuída para os níveis de baixo;
+como cada chave desce no máximo uma vez por nível, vencer N chaves custa
+O(N) no total, sem um temporizador por chave.
+
+Não é segura para uso concorrente: quem a usa deve protegê-la.
+"""
+
+from typing import Dict, Hashable, List, Set, Tuple
+
+BITS_POR_NIVEL = 6
+POSICOES_POR_NIVEL = 1 << BITS_POR_NIVEL
+NIVEIS_PADRAO = 4
+_MASCARA = POSICOES_POR_NIVEL - 1
+
+
+class RodaDeTempo:
+    """Chaves agendadas para vencer num tick; avancar() retorna as que venceram."""
+
+    def __init__(self, tick_inicial: int, niveis: int = NIVEIS_PADRAO):
+        self._tick = tick_inicial
+        self._niveis: List[List[Set[Hashable]]] = [
+            [set() for _ in range(POSICOES_POR_NIVEL)] for _ in range(niveis)
+        ]
+        # Chaves agendadas para um tick que já passou: vencem no próximo avanço.
+        self._atrasadas: Set[Hashable] = set()
+        # chave -> (conjunto onde ela está, tick de vencimento)
+        self._posicao: Dict[Hashable, Tuple[Set[Hashable], int]] = {}
+
+    @property
+    def tick(self) -> int:
+        return self._tick
+
+    def _inserir(self, chave: Hashable, tick: int) -> None:
+        if tick <= self._tick:
+            posicao = self._atrasadas
+        else:
+            nivel = 0
+            ultimo = len(self._niveis) - 1
+            while nivel < ultimo and (tick >> (BITS_POR_NIVEL * (nivel + 1))) != (self._tick >> (BITS_POR_NIVEL * (nivel + 1))):
+                nivel += 1
+            # Além do alcance do último nível, a chave dá voltas nele até chegar a sua vez.
+            posicao = self._niveis[nivel][(tick >> (BITS_POR_NIVEL * nivel)) & _MASCARA]
+        posicao.add(chave)
+        self._posicao[chave] = (posicao, tick)
+
+    def agendar(self, chave: Hashable, tick: int) -> None:
+        self.cancelar(chave)
+        self._inserir(chave, tick)
+
+    def cancelar(self, chave: Hashable) -> bool:
+        posicao = self._posicao.pop(chave, None)
+        if posicao is None:
+            return False
+        posicao[0].discard(chave)
+        return True
+
+    def _esvaziar(self, posicao: Set[Hashable], vencidas: List[Hashable]) -> None:
+        for chave in posicao:
+            del self._posicao[chave]
+            vencidas.append(chave)
+        posicao.clear()
+
+    def avancar(self, ate: int) -> List[Hashable]:
+        """Avança o tick atual até 'ate' e retorna as chaves que venceram no caminho."""
+        vencidas: List[Hashable] = []
+        self._esvaziar(self._atrasadas, vencidas)
+        if not self._posicao:
+            self._tick = max(self._tick, ate)
+            return vencidas
+        while self._tick < ate:
+            self._tick += 1
+            tick = self._tick
+            # Do nível mais alto para o mais baixo, para que o que desce de um
+            # nível ainda seja redistribuído pelo de baixo neste mesmo tick.
+            for nivel in range(len(self._niveis) - 1, 0, -1):
+                if tick & ((1 << (BITS_POR_NIVEL * nivel)) - 1) == 0:
+                    indice = (tick >> (BITS_POR_NIVEL * nivel)) & _MASCARA
+                    posicao = self._niveis[nivel][indice]
+                    self._niveis[nivel][indice] = set()
+                    for chave in posicao:
+                        self._inserir(chave, self._posicao[chave][1])
+            indice = tick & _MASCARA
+            posicao = self._niveis[0][indice]
+            self._niveis[0][indice] = set()
+            for chave in posicao:
+                if self._posicao[chave][1] <= tick:
+                    del self._posicao[chave]
+                    vencidas.append(chave)
+                else:
+                    # Só acontece com um único nível, quando o prazo está além de uma volta.
+                    self._inserir(chave, self._posicao[chave][1])
+            self._esvaziar(self._atrasadas, vencidas)
+            if not self._posicao:
+                self._tick = ate
+        return vencidas
+
+    def __len__(self) -> int:
+        return len(self._posicao)
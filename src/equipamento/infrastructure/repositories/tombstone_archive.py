@@ -0,0 +1,190 @@
+# src/equipamento/infrastructure/repositories/tombstone_archive.py
+"""
+Entidades excluídas (soft delete) guardadas fora do dicionário das vivas.
+
+As listagens padrão só percorrem as entidades vivas. As excluídas ficam
+primeiro em memória, na ordem em que foram excluídas, e uma compactação
+periódica move as mais antigas para um arquivo morto em disco (JSON Lines,
+uma entidade por linha), que continua sendo lido por include_deleted=true,
+inclusive depois de o processo ser reiniciado.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+IDADE_MINIMA_PADRAO_SEGUNDOS = 60 * 60
+INTERVALO_COMPACTACAO_PADRAO_SEGUNDOS = 5 * 60
+
+
+class ArquivoMorto:
+    """
+    Arquivo append-only com as entidades excluídas já compactadas.
+
+    Nada é criado no construtor: abrir() cria o diretório e abre o arquivo
+    para acréscimo, mantendo o que execuções anteriores arquivaram no mesmo
+    caminho. Só limpar() (restauração dos dados) o esvazia.
+    """
+
+    def __init__(self, caminho: str, decodificar: Callable[[Dict[str, Any]], Any]):
+        self.caminho = caminho
+        self._decodificar = decodificar
+        self._lock = threading.Lock()
+        self._arquivo: Optional[TextIO] = None
+
+    def abrir(self) -> None:
+        with self._lock:
+            if self._arquivo is not None:
+                return
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+    def acrescentar(self, entidades: Iterable) -> None:
+        linhas = "".join(json.dumps(asdict(e), ensure_ascii=False, separators=(",", ":")) + "\n" for e in entidades)
+        if not linhas:
+            return
+        self.abrir()
+        with self._lock:
+            self._arquivo.write(linhas)
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def ler_todos(self) -> list:
+        with self._lock:
+            try:
+                with open(self.caminho, encoding="utf-8") as arquivo:
+                    linhas = arquivo.readlines()
+            except FileNotFoundError:
+                return []
+        return [self._decodificar(json.loads(linha)) for linha in linhas if linha.strip()]
+
+    def limpar(self) -> None:
+        with self._lock:
+            if self._arquivo is not None:
+                # Aberto para acréscimo: a próxima escrita vai para o novo fim.
+                self._arquivo.truncate(0)
+            elif os.path.exists(self.caminho):
+                open(self.caminho, "w").close()
+
+
+class Excluidos:
+    """
+    Entidades excluídas de um repositório.
+
+    As recentes ficam num OrderedDict em ordem de exclusão, então a
+    compactação retira do início só as que passaram da idade mínima, sem
+    percorrer as demais. Sem arquivo morto, a compactação não faz nada.
+    'reservar' recebe o maior id já arquivado quando o arquivo é aberto, para
+    que o repositório não entregue esse id a uma entidade nova.
+    """
+
+    def __init__(self, arquivo: Optional[ArquivoMorto] = None, relogio: Callable[[], float] = time.monotonic,
+                 reservar: Optional[Callable[[int], None]] = None):
+        self._arquivo = arquivo
+        self._relogio = relogio
+        self._reservar = reservar
+        self._recentes: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def abrir(self) -> None:
+        if self._arquivo is None:
+            return
+        self._arquivo.abrir()
+        arquivadas = self._arquivo.ler_todos()
+        if arquivadas and self._reservar is not None:
+            self._reservar(max(entidade.id for entidade in arquivadas))
+
+    def fechar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.fechar()
+
+    def adicionar(self, entidade) -> None:
+        with self._lock:
+            self._recentes[entidade.id] = (self._relogio(), entidade)
+
+    def listar(self) -> list:
+        """Recentes e arquivadas, em ordem de id."""
+        with self._lock:
+            recentes = [entidade for _, entidade in self._recentes.values()]
+        arquivadas = self._arquivo.ler_todos() if self._arquivo is not None else []
+        return sorted(recentes + arquivadas, key=lambda e: e.id)
+
+    def compactar(self, idade_minima: float = IDADE_MINIMA_PADRAO_SEGUNDOS) -> int:
+        """Move para o arquivo morto as excluídas há mais de idade_minima segundos."""
+        if self._arquivo is None:
+            return 0
+        limite = self._relogio() - idade_minima
+        with self._lock:
+            antigas: List[Any] = []
+            while self._recentes:
+                excluida_em, entidade = next(iter(self._recentes.values()))
+                if excluida_em > limite:
+                    break
+                self._recentes.popitem(last=False)
+                antigas.append(entidade)
+            # Grava ainda sob a trava: quem listar agora ou vê a entidade na
+            # memória ou no arquivo, nunca em nenhum dos dois.
+            self._arquivo.acrescentar(antigas)
+        return len(antigas)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._recentes.clear()
+            if self._arquivo is not None:
+                self._arquivo.limpar()
+
+    def __len__(self) -> int:
+        return len(self._recentes)
+
+
+class CompactadorDeExcluidos:
+    """
+    Tarefa em segundo plano que compacta periodicamente as excluídas de
+    vários repositórios. Os arquivos mortos são abertos ao iniciar e
+    fechados ao parar.
+    """
+
+    def __init__(self, excluidos: List[Excluidos], intervalo: float = INTERVALO_COMPACTACAO_PADRAO_SEGUNDOS,
+                 idade_minima: float = IDADE_MINIMA_PADRAO_SEGUNDOS):
+        self._excluidos = excluidos
+        self.intervalo = intervalo
+        self.idade_minima = idade_minima
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def compactar_agora(self) -> int:
+        return sum(e.compactar(self.idade_minima) for e in self._excluidos)
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.compactar_agora()
+
+    def iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        for excluidos in self._excluidos:
+            excluidos.abrir()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="compactador-excluidos", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+        for excluidos in self._excluidos:
+            excluidos.fechar()
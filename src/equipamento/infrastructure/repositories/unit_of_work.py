@@ -0,0 +1,190 @@
+# src/equipamento/infrastructure/repositories/unit_of_work.py
+"""
+Unidade de trabalho das ações em lote (POST /batch).
+
+As ações de um lote rodam com casos de uso próprios, montados sobre os
+objetos retidos daqui (publicador, caixa de saída e reservas): os eventos,
+as notificações e o encerramento de reservas só saem quando o lote é
+confirmado. Antes de cada ação, quem executa o lote guarda uma cópia das
+bicicletas e trancas que ela pode alterar; se o lote falhar, as cópias
+voltam aos repositórios (o que também entra no log de mudanças), as trancas
+livres e o mapa bicicleta -> tranca são acertados e o que estava retido é
+descartado.
+
+A trava é a mesma que as rotas de uma ação só tomam, então nenhuma outra
+escrita em bicicletas e trancas se intercala com um lote e a restauração
+não desfaz o que não é dele.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from ...application.repositories import (
+    BicicletaRepositoryInterface,
+    CaixaDeSaidaInterface,
+    LocalizacaoDeBicicletasInterface,
+    PublicadorDeEventosInterface,
+    ReservasInterface,
+    TrancaRepositoryInterface,
+    TrancasLivresInterface,
+)
+from ...domain.entities import Bicicleta, Evento, Notificacao, Reserva, StatusTranca, Tranca
+from .versioned_repository import copiar
+
+
+class _PublicadorRetido(PublicadorDeEventosInterface):
+    def __init__(self, unidade: "UnidadeDeTrabalho"):
+        self._unidade = unidade
+
+    def publicar(self, evento: Evento) -> None:
+        self._unidade._eventos.append(evento)
+
+
+class _CaixaRetida(CaixaDeSaidaInterface):
+    def __init__(self, unidade: "UnidadeDeTrabalho"):
+        self._unidade = unidade
+
+    def acrescentar(self, tipo: str, dados: Dict[str, Any]) -> List[Notificacao]:
+        self._unidade._notificacoes.append((tipo, dados))
+        return []
+
+
+class _ReservasRetidas(ReservasInterface):
+    """Reservas encerradas pelo lote deixam de valer para ele, mas só são removidas na confirmação."""
+
+    def __init__(self, unidade: "UnidadeDeTrabalho", reservas: ReservasInterface):
+        self._unidade = unidade
+        self._reservas = reservas
+
+    def criar(self, entidade: str, entidade_id: int, duracao: float, totem_id: Optional[int] = None) -> Optional[Reserva]:
+        return self._reservas.criar(entidade, entidade_id, duracao, totem_id)
+
+    def buscar(self, reserva_id: str) -> Optional[Reserva]:
+        return None if reserva_id in self._unidade._reservas_encerradas else self._reservas.buscar(reserva_id)
+
+    def ativa(self, entidade: str, entidade_id: int) -> Optional[Reserva]:
+        reserva = self._reservas.ativa(entidade, entidade_id)
+        return None if reserva is not None and reserva.id in self._unidade._reservas_encerradas else reserva
+
+    def remover(self, reserva_id: str) -> Optional[Reserva]:
+        reserva = self.buscar(reserva_id)
+        if reserva is not None:
+            self._unidade._reservas_encerradas.append(reserva_id)
+        return reserva
+
+
+class UnidadeDeTrabalho:
+    """Executa um conjunto de ações como uma só: tudo é confirmado no fim ou nada vale."""
+
+    def __init__(self, bicicleta_repo: BicicletaRepositoryInterface, tranca_repo: TrancaRepositoryInterface,
+                 publicador: Optional[PublicadorDeEventosInterface] = None, caixa: Optional[CaixaDeSaidaInterface] = None,
+                 reservas: Optional[ReservasInterface] = None, localizacao: Optional[LocalizacaoDeBicicletasInterface] = None,
+                 livres: Optional[TrancasLivresInterface] = None, travar: Optional[Callable[[], ContextManager[Any]]] = None):
+        self.bicicleta_repo = bicicleta_repo
+        self.tranca_repo = tranca_repo
+        self._publicador_destino = publicador
+        self._caixa_destino = caixa
+        self._reservas_destino = reservas
+        self._localizacao = localizacao
+        self._livres = livres
+        # Por padrão uma trava do processo; no backend "compartilhado", uma entre processos.
+        if travar is None:
+            lock = threading.Lock()
+            travar = lambda: lock
+        self._travar = travar
+
+        # Entregues aos casos de uso do lote no lugar dos verdadeiros.
+        self.publicador = _PublicadorRetido(self) if publicador is not None else None
+        self.caixa = _CaixaRetida(self) if caixa is not None else None
+        self.reservas = _ReservasRetidas(self, reservas) if reservas is not None else None
+
+        self._bicicletas: Dict[int, Bicicleta] = {}
+        self._trancas: Dict[int, Tranca] = {}
+        self._eventos: List[Evento] = []
+        self._notificacoes: List[Tuple[str, Dict[str, Any]]] = []
+        self._reservas_encerradas: List[str] = []
+        self.confirmadas = 0
+        self.desfeitas = 0
+
+    def travada(self) -> ContextManager[Any]:
+        """Trava tomada pelas rotas que alteram bicicletas e trancas fora de um lote."""
+        return self._travar()
+
+    @contextmanager
+    def executar(self) -> Iterator["UnidadeDeTrabalho"]:
+        """
+        Trava e entrega a unidade ao lote. Se o bloco terminar normalmente,
+        os efeitos retidos saem; com qualquer exceção, tudo é desfeito e a
+        exceção segue adiante.
+        """
+        with self._travar():
+            try:
+                yield self
+            except BaseException:
+                self._desfazer()
+                raise
+            else:
+                self._confirmar()
+            finally:
+                self._bicicletas.clear()
+                self._trancas.clear()
+                self._eventos.clear()
+                self._notificacoes.clear()
+                self._reservas_encerradas.clear()
+
+    def guardar_bicicleta(self, bicicleta_id: Optional[int]) -> None:
+        """Cópia da bicicleta como estava antes da primeira ação do lote que pode alterá-la."""
+        if bicicleta_id is None or bicicleta_id in self._bicicletas:
+            return
+        bicicleta = self.bicicleta_repo.buscar_por_id(bicicleta_id)
+        if bicicleta is not None:
+            self._bicicletas[bicicleta_id] = copiar(bicicleta)
+
+    def guardar_tranca(self, tranca_id: Optional[int]) -> None:
+        """Cópia da tranca, e da bicicleta presa nela, antes da primeira ação do lote que pode alterá-las."""
+        if tranca_id is None or tranca_id in self._trancas:
+            return
+        tranca = self.tranca_repo.buscar_por_id(tranca_id)
+        if tranca is not None:
+            self._trancas[tranca_id] = copiar(tranca)
+            self.guardar_bicicleta(tranca.bicicleta_id)
+
+    def guardar_trancas_do_totem(self, totem_id: int) -> None:
+        for tranca in self.tranca_repo.buscar_por_totem_id(totem_id):
+            self.guardar_tranca(tranca.id)
+
+    def _confirmar(self) -> None:
+        if self._reservas_destino is not None:
+            for reserva_id in self._reservas_encerradas:
+                self._reservas_destino.remover(reserva_id)
+        if self._caixa_destino is not None:
+            for tipo, dados in self._notificacoes:
+                self._caixa_destino.acrescentar(tipo, dados)
+        if self._publicador_destino is not None:
+            for evento in self._eventos:
+                self._publicador_destino.publicar(evento)
+        self.confirmadas += 1
+
+    def _desfazer(self) -> None:
+        for bicicleta in self._bicicletas.values():
+            self.bicicleta_repo.salvar(copiar(bicicleta))
+        for tranca in self._trancas.values():
+            self.tranca_repo.salvar(copiar(tranca))
+
+        if self._localizacao is not None:
+            presas = {tranca.bicicleta_id: tranca.id for tranca in self._trancas.values() if tranca.bicicleta_id is not None}
+            for bicicleta_id in self._bicicletas:
+                tranca_id = self._localizacao.tranca_de(bicicleta_id)
+                if tranca_id in self._trancas and presas.get(bicicleta_id) != tranca_id:
+                    self._localizacao.desassociar(bicicleta_id, tranca_id)
+            for bicicleta_id, tranca_id in presas.items():
+                self._localizacao.associar(bicicleta_id, tranca_id)
+
+        if self._livres is not None:
+            for tranca in self._trancas.values():
+                if tranca.status == StatusTranca.DISPONIVEL and tranca.totem_id is not None and tranca.bicicleta_id is None:
+                    self._livres.liberar(tranca.totem_id, tranca.id)
+                else:
+                    self._livres.remover(tranca.id)
+        self.desfeitas += 1
@@ -0,0 +1,283 @@
+# src/equipamento/infrastructure/repositories/versioned_repository.py
+"""
+Repositórios em memória com versões imutáveis (MVCC).
+
+O estado de cada repositório é uma Versao imutável: as entidades num
+MapaPersistente e, por campo de filtro, valor -> MapaPersistente de ids.
+Uma gravação monta a versão seguinte a partir da publicada, compartilhando
+com ela tudo o que não mudou, e só então toma a trava de escrita para
+publicá-la com uma única atribuição, desde que nenhuma outra gravação tenha
+publicado antes (senão remonta sobre a nova). Leituras pegam a versão
+publicada e nunca tomam trava, então uma listagem longa não segura as
+gravações e também não vê um estado pela metade.
+
+salvar guarda uma cópia do objeto recebido e buscar_por_id devolve uma
+cópia, então um caso de uso pode alterar o objeto que buscou antes de
+salvá-lo sem que leitores concorrentes vejam a alteração antes da hora. As
+listagens e filtros devolvem as próprias entidades da versão, sem copiar,
+e devem ser tratadas como somente leitura.
+"""
+
+import dataclasses
+import threading
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...application.repositories import (
+    BicicletaRepositoryInterface,
+    TrancaRepositoryInterface,
+    TotemRepositoryInterface,
+    RegistroDeMudancasInterface,
+    AlocadorDeIdsInterface,
+)
+from ...domain.entities import (
+    Bicicleta, Tranca, Totem,
+    ENTIDADE_BICICLETA, ENTIDADE_TRANCA, ENTIDADE_TOTEM,
+)
+from .id_allocator import AlocadorSequencial
+from .mem_change_log import OPERACAO_SALVAR, OPERACAO_DELETAR, registrar_mudanca
+from .mem_repository import bicicletas_iniciais, trancas_iniciais, totens_iniciais
+from .mem_attribute_index import validar_criterios, CAMPOS_FILTRO_BICICLETA, CAMPOS_FILTRO_TRANCA, CAMPOS_FILTRO_TOTEM
+from .persistent_map import MapaPersistente
+from .tombstone_archive import ArquivoMorto, Excluidos
+
+IndicePersistente = Dict[str, Dict[Any, MapaPersistente]]
+
+
+def copiar(entidade):
+    """Cópia rasa da entidade, com as listas também copiadas (sem passar pelo __init__)."""
+    copia = object.__new__(type(entidade))
+    copia.__dict__ = {
+        campo: list(valor) if isinstance(valor, list) else valor
+        for campo, valor in entidade.__dict__.items()
+    }
+    return copia
+
+
+@dataclasses.dataclass(frozen=True)
+class Versao:
+    """Estado de um repositório num instante; nunca é alterado depois de publicado."""
+    numero: int
+    entidades: MapaPersistente
+    indice: IndicePersistente
+
+    def buscar(self, entidade_id: int):
+        entidade = self.entidades.get(entidade_id)
+        return copiar(entidade) if entidade is not None else None
+
+    def listar(self) -> list:
+        """Todas as entidades vivas desta versão, em ordem de id (somente leitura)."""
+        return [entidade for _, entidade in sorted(self.entidades.itens(), key=itemgetter(0))]
+
+    def filtrar(self, criterios: Dict[str, Any]) -> list:
+        conjuntos = []
+        for campo, valor in criterios.items():
+            ids = self.indice[campo].get(valor)
+            if ids is None:
+                return []
+            conjuntos.append(ids)
+        if not conjuntos:
+            return self.listar()
+        conjuntos.sort(key=len)
+        menor, demais = conjuntos[0], conjuntos[1:]
+        ids = sorted(i for i in menor if all(i in outro for outro in demais))
+        return [self.entidades.get(i) for i in ids]
+
+
+def _indexar(indice: IndicePersistente, campos: Tuple[str, ...], anterior, nova) -> IndicePersistente:
+    """Novo índice com os valores de 'anterior' trocados pelos de 'nova' (qualquer um pode ser None)."""
+    novo = dict(indice)
+    for campo in campos:
+        valor_antigo = getattr(anterior, campo) if anterior is not None else None
+        valor_novo = getattr(nova, campo) if nova is not None else None
+        if anterior is not None and nova is not None and valor_antigo == valor_novo:
+            continue
+        # Só o dicionário do campo alterado é copiado; os conjuntos de ids
+        # dos outros valores continuam compartilhados.
+        por_valor = dict(novo[campo])
+        if anterior is not None:
+            ids = por_valor[valor_antigo].sem(anterior.id)
+            if len(ids):
+                por_valor[valor_antigo] = ids
+            else:
+                del por_valor[valor_antigo]
+        if nova is not None:
+            por_valor[valor_novo] = por_valor.get(valor_novo, MapaPersistente()).com(nova.id, None)
+        novo[campo] = por_valor
+    return novo
+
+
+class _RepositorioVersionado:
+    """Operações comuns aos repositórios versionados."""
+
+    ENTIDADE = ""
+    CAMPOS_FILTRO: Tuple[str, ...] = ()
+
+    def __init__(self, registro: Optional[RegistroDeMudancasInterface] = None, arquivo: Optional[ArquivoMorto] = None,
+                 alocador: Optional[AlocadorDeIdsInterface] = None):
+        self._registro = registro
+        self._alocador = alocador if alocador is not None else AlocadorSequencial()
+        self._lock_escrita = threading.Lock()
+        self._versao = self._versao_vazia(0)
+        self.excluidos = Excluidos(arquivo, reservar=self._alocador.reservar_ate)
+
+    def _versao_vazia(self, numero: int) -> Versao:
+        return Versao(numero=numero, entidades=MapaPersistente(), indice={campo: {} for campo in self.CAMPOS_FILTRO})
+
+    def versao(self) -> Versao:
+        """A versão publicada agora; continua válida e inalterada mesmo depois de novas gravações."""
+        return self._versao
+
+    def geracao(self) -> int:
+        return self._versao.numero
+
+    def _publicar(self, montar: Callable[[Versao], Optional[Versao]]) -> bool:
+        """
+        Publica montar(versão atual). A montagem roda fora da trava; se outra
+        gravação publicar nesse meio tempo, monta de novo sobre a versão nova.
+        Retorna False se montar devolver None (nada a gravar).
+        """
+        while True:
+            atual = self._versao
+            nova = montar(atual)
+            if nova is None:
+                return False
+            with self._lock_escrita:
+                if self._versao is atual:
+                    self._versao = nova
+                    return True
+
+    def _salvar(self, entidade):
+        if entidade.id is None:
+            entidade.id = self._alocador.alocar()
+        elif entidade.id not in self._versao.entidades:
+            # ID explícito (ex.: estado inicial): não pode ser alocado de novo.
+            self._alocador.reservar_ate(entidade.id)
+        guardada = copiar(entidade)
+
+        def montar(atual: Versao) -> Versao:
+            anterior = atual.entidades.get(guardada.id)
+            return Versao(
+                numero=atual.numero + 1,
+                entidades=atual.entidades.com(guardada.id, guardada),
+                indice=_indexar(atual.indice, self.CAMPOS_FILTRO, anterior, guardada),
+            )
+
+        self._publicar(montar)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_SALVAR, guardada)
+        return entidade
+
+    def _buscar(self, entidade_id: int):
+        return self._versao.buscar(entidade_id)
+
+    def deletar(self, entidade_id: int) -> None:
+        removida = []
+
+        def montar(atual: Versao) -> Optional[Versao]:
+            entidade = atual.entidades.get(entidade_id)
+            if entidade is None:
+                return None
+            removida[:] = [entidade]
+            return Versao(
+                numero=atual.numero + 1,
+                entidades=atual.entidades.sem(entidade_id),
+                indice=_indexar(atual.indice, self.CAMPOS_FILTRO, entidade, None),
+            )
+
+        if not self._publicar(montar):
+            return
+        excluida = dataclasses.replace(copiar(removida[0]), is_deleted=True)
+        self.excluidos.adicionar(excluida)
+        registrar_mudanca(self._registro, self.ENTIDADE, OPERACAO_DELETAR, excluida)
+
+    def filtrar(self, criterios: Dict[str, Any]) -> list:
+        validar_criterios(criterios, self.CAMPOS_FILTRO)
+        return self._versao.filtrar(criterios)
+
+    def _listar(self, include_deleted: bool) -> list:
+        vivas = self._versao.listar()
+        if not include_deleted:
+            return vivas
+        return sorted(vivas + self.excluidos.listar(), key=lambda e: e.id)
+
+    def _buscar_varios(self, entidade_ids: List[int]) -> list:
+        versao = self._versao
+        entidades = (versao.buscar(entidade_id) for entidade_id in sorted(set(entidade_ids)))
+        return [e for e in entidades if e is not None]
+
+    def _restaurar(self, iniciais: list) -> None:
+        self._publicar(lambda atual: self._versao_vazia(atual.numero + 1))
+        self.excluidos.limpar()
+        # As remoções feitas aqui não entram no log; os consumidores precisam recomeçar.
+        if self._registro is not None:
+            self._registro.descartar_historico()
+        for entidade in iniciais:
+            self._salvar(entidade)
+
+
+class VersionadoBicicletaRepository(_RepositorioVersionado, BicicletaRepositoryInterface):
+    """Repositório de bicicletas com leituras sobre versões imutáveis."""
+
+    ENTIDADE = ENTIDADE_BICICLETA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_BICICLETA
+
+    def salvar(self, bicicleta: Bicicleta) -> Bicicleta:
+        return self._salvar(bicicleta)
+
+    def buscar_por_id(self, bicicleta_id: int) -> Optional[Bicicleta]:
+        return self._buscar(bicicleta_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Bicicleta]:
+        return self._listar(include_deleted)
+
+    def buscar_por_ids(self, bicicleta_ids: List[int]) -> List[Bicicleta]:
+        return self._buscar_varios(bicicleta_ids)
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(bicicletas_iniciais())
+
+
+class VersionadoTrancaRepository(_RepositorioVersionado, TrancaRepositoryInterface):
+    """Repositório de trancas com leituras sobre versões imutáveis."""
+
+    ENTIDADE = ENTIDADE_TRANCA
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TRANCA
+
+    def salvar(self, tranca: Tranca) -> Tranca:
+        return self._salvar(tranca)
+
+    def buscar_por_id(self, tranca_id: int) -> Optional[Tranca]:
+        return self._buscar(tranca_id)
+
+    def listar_todas(self, include_deleted: bool = False) -> List[Tranca]:
+        return self._listar(include_deleted)
+
+    def buscar_por_totem_id(self, totem_id: int) -> List[Tranca]:
+        return self.filtrar({"totem_id": totem_id})
+
+    def buscar_por_totem_ids(self, totem_ids: List[int]) -> Dict[int, List[Tranca]]:
+        # Todos os totens lidos da mesma versão.
+        versao = self._versao
+        return {totem_id: versao.filtrar({"totem_id": totem_id}) for totem_id in dict.fromkeys(totem_ids)}
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(trancas_iniciais())
+
+
+class VersionadoTotemRepository(_RepositorioVersionado, TotemRepositoryInterface):
+    """Repositório de totens com leituras sobre versões imutáveis."""
+
+    ENTIDADE = ENTIDADE_TOTEM
+    CAMPOS_FILTRO = CAMPOS_FILTRO_TOTEM
+
+    def salvar(self, totem: Totem) -> Totem:
+        return self._salvar(totem)
+
+    def buscar_por_id(self, totem_id: int) -> Optional[Totem]:
+        return self._buscar(totem_id)
+
+    def listar_todos(self, include_deleted: bool = False) -> List[Totem]:
+        return self._listar(include_deleted)
+
+    def restaurar_para_estado_inicial(self):
+        self._restaurar(totens_iniciais())
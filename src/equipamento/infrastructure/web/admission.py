@@ -0,0 +1,206 @@
+# src/equipamento/infrastructure/web/admission.py
+"""
+Controle de admissão por classe de rota.
+
+Cada requisição é classificada como ação (POST/PUT/DELETE: alugar, devolver,
+integrar...), leitura pontual (uma entidade pelo id) ou leitura em massa
+(listagens, buscas, filtros, snapshot). Cada classe tem o seu orçamento de
+requisições simultâneas e a sua fila limitada, então uma rajada de
+listagens esgota o orçamento das leituras em massa e não o threadpool
+inteiro, que continua com folga para quem está esperando na tranca.
+
+Enquanto uma classe de prioridade maior tiver requisições esperando na
+fila, as classes de prioridade menor recusam na hora, mesmo com orçamento
+livre: a carga é descartada primeiro nas leituras em massa, depois nas
+pontuais. Recusas respondem 503 com Retry-After.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+CLASSE_ACOES = "acoes"
+CLASSE_LEITURAS_PONTUAIS = "leituras_pontuais"
+CLASSE_LEITURAS_EM_MASSA = "leituras_em_massa"
+# Da maior para a menor prioridade.
+PRIORIDADES = (CLASSE_ACOES, CLASSE_LEITURAS_PONTUAIS, CLASSE_LEITURAS_EM_MASSA)
+
+_RECURSOS = ("/bicicleta", "/tranca", "/totem", "/rede", "/mudancas", "/reserva", "/batch")
+_LEITURA_PONTUAL = re.compile(r"^/((bicicleta|tranca|totem)/\d+(/[A-Za-z]+)?|reserva/[0-9a-f]+)$")
+# Conexões longas (SSE) e rotas de diagnóstico não passam pelo controle.
+_ISENTOS = ("/eventos", "/admin", "/docs", "/redoc", "/openapi.json")
+
+
+def classificar_rota(metodo: str, caminho: str) -> Optional[str]:
+    """Classe de admissão da requisição, ou None se ela não é controlada."""
+    if caminho.startswith(_ISENTOS) or not caminho.startswith(_RECURSOS):
+        return None
+    if metodo not in ("GET", "HEAD"):
+        return CLASSE_ACOES
+    if _LEITURA_PONTUAL.match(caminho):
+        return CLASSE_LEITURAS_PONTUAIS
+    return CLASSE_LEITURAS_EM_MASSA
+
+
+@dataclass
+class Orcamento:
+    """Limites de uma classe: simultâneas, tamanho da fila, espera máxima na fila e Retry-After."""
+    limite: int
+    fila: int
+    espera_maxima: float
+    retry_after: int = 1
+
+
+ORCAMENTOS_PADRAO: Dict[str, Orcamento] = {
+    CLASSE_ACOES: Orcamento(limite=16, fila=256, espera_maxima=5.0, retry_after=1),
+    CLASSE_LEITURAS_PONTUAIS: Orcamento(limite=12, fila=64, espera_maxima=2.0, retry_after=1),
+    CLASSE_LEITURAS_EM_MASSA: Orcamento(limite=4, fila=8, espera_maxima=0.5, retry_after=2),
+}
+
+
+class _Classe:
+    def __init__(self, nome: str, orcamento: Orcamento):
+        self.nome = nome
+        self.orcamento = orcamento
+        self.em_execucao = 0
+        self.fila: Deque["asyncio.Future[None]"] = deque()
+        self.admitidas = 0
+        self.enfileiradas = 0
+        self.recusadas = 0
+        self.expiradas = 0
+        self.espera_total = 0.0
+
+    def estatisticas(self) -> Dict[str, float]:
+        return {
+            "limite": self.orcamento.limite,
+            "em_execucao": self.em_execucao,
+            "na_fila": len(self.fila),
+            "admitidas": self.admitidas,
+            "enfileiradas": self.enfileiradas,
+            "recusadas": self.recusadas,
+            "expiradas": self.expiradas,
+            "espera_media_ms": round(1000 * self.espera_total / self.enfileiradas, 3) if self.enfileiradas else 0.0,
+        }
+
+
+class ControladorDeAdmissao:
+    """
+    Orçamentos e filas por classe. Só é usado de dentro do loop de eventos,
+    então nenhum estado precisa de trava.
+    """
+
+    def __init__(self, orcamentos: Optional[Dict[str, Orcamento]] = None,
+                 classificar: Callable[[str, str], Optional[str]] = classificar_rota,
+                 relogio: Callable[[], float] = time.monotonic):
+        orcamentos = {**ORCAMENTOS_PADRAO, **(orcamentos or {})}
+        self._classes = {nome: _Classe(nome, orcamentos[nome]) for nome in PRIORIDADES}
+        self.classificar = classificar
+        self._relogio = relogio
+
+    def _prioridade_maior_esperando(self, nome: str) -> bool:
+        for outra in PRIORIDADES:
+            if outra == nome:
+                return False
+            if self._classes[outra].fila:
+                return True
+        return False
+
+    async def admitir(self, nome: str) -> Tuple[bool, int]:
+        """Espera por uma vaga da classe; retorna (admitida, retry_after)."""
+        classe = self._classes[nome]
+        orcamento = classe.orcamento
+        if self._prioridade_maior_esperando(nome):
+            classe.recusadas += 1
+            return False, orcamento.retry_after
+        if classe.em_execucao < orcamento.limite and not classe.fila:
+            classe.em_execucao += 1
+            classe.admitidas += 1
+            return True, 0
+        if len(classe.fila) >= orcamento.fila:
+            classe.recusadas += 1
+            return False, orcamento.retry_after
+
+        vaga = asyncio.get_running_loop().create_future()
+        classe.fila.append(vaga)
+        classe.enfileiradas += 1
+        inicio = self._relogio()
+        try:
+            await asyncio.wait_for(asyncio.shield(vaga), orcamento.espera_maxima)
+        except asyncio.TimeoutError:
+            if not vaga.done():
+                vaga.cancel()
+                classe.fila.remove(vaga)
+                classe.expiradas += 1
+                classe.espera_total += self._relogio() - inicio
+                return False, orcamento.retry_after
+        except asyncio.CancelledError:
+            # O cliente desistiu: se a vaga já tinha sido passada, devolve.
+            if vaga.done() and not vaga.cancelled():
+                self.liberar(nome)
+            else:
+                vaga.cancel()
+                classe.fila.remove(vaga)
+            raise
+        # A vaga foi passada diretamente por liberar(); em_execucao não muda.
+        classe.admitidas += 1
+        classe.espera_total += self._relogio() - inicio
+        return True, 0
+
+    def liberar(self, nome: str) -> None:
+        classe = self._classes[nome]
+        while classe.fila:
+            vaga = classe.fila.popleft()
+            if not vaga.done():
+                vaga.set_result(None)
+                return
+        classe.em_execucao -= 1
+
+    def estatisticas(self) -> Dict[str, Dict[str, float]]:
+        return {nome: classe.estatisticas() for nome, classe in self._classes.items()}
+
+
+class AdmissaoMiddleware:
+    """Middleware ASGI que passa cada requisição HTTP pelo ControladorDeAdmissao."""
+
+    def __init__(self, app, controlador: Optional[ControladorDeAdmissao] = None):
+        self.app = app
+        self.controlador = controlador if controlador is not None else ControladorDeAdmissao()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        classe = self.controlador.classificar(scope["method"], scope["path"])
+        if classe is None:
+            await self.app(scope, receive, send)
+            return
+
+        admitida, retry_after = await self.controlador.admitir(classe)
+        if not admitida:
+            await _recusar(retry_after, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controlador.liberar(classe)
+
+
+async def _recusar(retry_after: int, send) -> None:
+    corpo = json.dumps({"detail": {
+        "codigo": "SERVICO_SOBRECARREGADO",
+        "mensagem": "Serviço sobrecarregado. Tente novamente em instantes.",
+    }}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(corpo)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": corpo})
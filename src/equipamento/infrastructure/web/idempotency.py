@@ -0,0 +1,329 @@
+# src/equipamento/infrastructure/web/idempotency.py
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+CABECALHO_CHAVE = b"idempotency-key"
+CABECALHO_REPETIDA = b"idempotency-replayed"
+CAPACIDADE_PADRAO = 10_000
+TTL_PADRAO_SEGUNDOS = 24 * 60 * 60
+# Uma execução em andamento em outro processo há mais que isso é dada como
+# abandonada (o worker caiu) e a chave pode ser executada de novo.
+PRAZO_EXECUCAO_PADRAO = 30.0
+INTERVALO_CONSULTA = 0.05
+
+Chave = Tuple[str, str, str]
+
+
+@dataclass
+class RespostaArmazenada:
+    """Resposta original de uma requisição idempotente, pronta para ser repetida."""
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    corpo: bytes
+    impressao_digital: str
+    criada_em: float
+
+
+class ArmazemIdempotencia:
+    """
+    Guarda as respostas já produzidas por chave de idempotência.
+
+    É limitado em quantidade e em tempo: as entradas ficam em ordem de inserção,
+    então tanto a expiração por TTL quanto a remoção por capacidade retiram
+    itens do início, em O(1) amortizado.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO, ttl_segundos: float = TTL_PADRAO_SEGUNDOS,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.capacidade = capacidade
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._respostas: "OrderedDict[Chave, RespostaArmazenada]" = OrderedDict()
+
+    def _expirar(self) -> None:
+        limite = self._relogio() - self.ttl_segundos
+        while self._respostas:
+            resposta = next(iter(self._respostas.values()))
+            if resposta.criada_em > limite:
+                break
+            self._respostas.popitem(last=False)
+
+    def obter(self, chave: Chave) -> Optional[RespostaArmazenada]:
+        self._expirar()
+        return self._respostas.get(chave)
+
+    def guardar(self, chave: Chave, status: int, headers: List[Tuple[bytes, bytes]], corpo: bytes,
+                impressao_digital: str) -> RespostaArmazenada:
+        self._expirar()
+        resposta = RespostaArmazenada(status, headers, corpo, impressao_digital, self._relogio())
+        self._respostas.pop(chave, None)
+        self._respostas[chave] = resposta
+        while len(self._respostas) > self.capacidade:
+            self._respostas.popitem(last=False)
+        return resposta
+
+    def reivindicar(self, chave: Chave) -> bool:
+        """Num único processo as duplicatas simultâneas já esperam pelo middleware."""
+        return True
+
+    def liberar(self, chave: Chave) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._respostas)
+
+
+class ArmazemIdempotenciaCompartilhado:
+    """
+    Respostas idempotentes num arquivo SQLite, vistas por todos os workers.
+
+    Além das respostas prontas, o arquivo marca as chaves em execução: o
+    processo que reivindica a chave executa a requisição e os demais esperam
+    a resposta aparecer. Uma reivindicação mais velha que 'prazo_execucao'
+    (o worker caiu no meio) pode ser retomada por outro processo.
+    """
+
+    def __init__(self, caminho: str, capacidade: int = CAPACIDADE_PADRAO, ttl_segundos: float = TTL_PADRAO_SEGUNDOS,
+                 prazo_execucao: float = PRAZO_EXECUCAO_PADRAO, relogio: Callable[[], float] = time.time):
+        self.caminho = caminho
+        self.capacidade = capacidade
+        self.ttl_segundos = ttl_segundos
+        self.prazo_execucao = prazo_execucao
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS idempotencia ("
+            "chave TEXT NOT NULL, metodo TEXT NOT NULL, caminho TEXT NOT NULL, concluida INTEGER NOT NULL, "
+            "status INTEGER, headers TEXT, corpo BLOB, impressao_digital TEXT, criada_em REAL NOT NULL, "
+            "PRIMARY KEY (chave, metodo, caminho))"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idempotencia_criada_em ON idempotencia (criada_em)")
+
+    def obter(self, chave: Chave) -> Optional[RespostaArmazenada]:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT status, headers, corpo, impressao_digital, criada_em FROM idempotencia "
+                "WHERE chave = ? AND metodo = ? AND caminho = ? AND concluida = 1 AND criada_em > ?",
+                (*chave, self._relogio() - self.ttl_segundos),
+            ).fetchone()
+        if linha is None:
+            return None
+        status, headers, corpo, impressao_digital, criada_em = linha
+        headers = [(nome.encode("latin-1"), valor.encode("latin-1")) for nome, valor in json.loads(headers)]
+        return RespostaArmazenada(status, headers, corpo, impressao_digital, criada_em)
+
+    def reivindicar(self, chave: Chave) -> bool:
+        """Marca a chave como em execução por este processo; False se outro já a executa (ou concluiu)."""
+        agora = self._relogio()
+        with self._lock:
+            cursor = self._conexao.execute(
+                "INSERT INTO idempotencia (chave, metodo, caminho, concluida, criada_em) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (chave, metodo, caminho) DO UPDATE SET concluida = 0, status = NULL, headers = NULL, "
+                "corpo = NULL, impressao_digital = NULL, criada_em = excluded.criada_em "
+                "WHERE (concluida = 0 AND criada_em <= ?) OR (concluida = 1 AND criada_em <= ?)",
+                (*chave, agora, agora - self.prazo_execucao, agora - self.ttl_segundos),
+            )
+            return cursor.rowcount == 1
+
+    def liberar(self, chave: Chave) -> None:
+        """Desiste da execução (resposta 5xx ou erro), para que o cliente possa tentar de novo."""
+        with self._lock:
+            self._conexao.execute(
+                "DELETE FROM idempotencia WHERE chave = ? AND metodo = ? AND caminho = ? AND concluida = 0", chave
+            )
+
+    def guardar(self, chave: Chave, status: int, headers: List[Tuple[bytes, bytes]], corpo: bytes,
+                impressao_digital: str) -> RespostaArmazenada:
+        agora = self._relogio()
+        headers_json = json.dumps([(nome.decode("latin-1"), valor.decode("latin-1")) for nome, valor in headers])
+        with self._lock:
+            self._conexao.execute(
+                "INSERT INTO idempotencia VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (chave, metodo, caminho) DO UPDATE SET concluida = 1, status = excluded.status, "
+                "headers = excluded.headers, corpo = excluded.corpo, impressao_digital = excluded.impressao_digital, "
+                "criada_em = excluded.criada_em",
+                (*chave, status, headers_json, corpo, impressao_digital, agora),
+            )
+            # Expiração e capacidade: as mais antigas saem primeiro, pelo índice de criada_em.
+            self._conexao.execute(
+                "DELETE FROM idempotencia WHERE concluida = 1 AND criada_em <= ?", (agora - self.ttl_segundos,)
+            )
+            self._conexao.execute(
+                "DELETE FROM idempotencia WHERE rowid IN (SELECT rowid FROM idempotencia WHERE concluida = 1 "
+                "ORDER BY criada_em DESC LIMIT -1 OFFSET ?)", (self.capacidade,)
+            )
+        return RespostaArmazenada(status, headers, corpo, impressao_digital, agora)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM idempotencia WHERE concluida = 1").fetchone()[0]
+
+    def fechar(self) -> None:
+        self._conexao.close()
+
+
+class IdempotenciaMiddleware:
+    """
+    Middleware ASGI que honra o cabeçalho Idempotency-Key nas requisições POST.
+
+    - A primeira requisição com uma chave executa normalmente e sua resposta é guardada.
+    - Repetições com a mesma chave (mesmo método e caminho) recebem a resposta original.
+    - Duplicatas concorrentes aguardam a execução em andamento em vez de rodar de novo.
+    - Reutilizar a chave com outro corpo é rejeitado com 422.
+
+    Respostas 5xx não são guardadas, para que o cliente possa tentar de novo.
+    Com um armazém compartilhado entre processos, uma duplicata que chega a
+    outro worker espera a resposta do que está executando; se ela não sair
+    em 'espera_maxima' segundos, a duplicata recebe 409 com Retry-After.
+    """
+
+    def __init__(self, app, armazem: Union[ArmazemIdempotencia, ArmazemIdempotenciaCompartilhado, None] = None, metodos: Tuple[str, ...] = ("POST",),
+                 espera_maxima: float = PRAZO_EXECUCAO_PADRAO):
+        self.app = app
+        self.armazem = armazem if armazem is not None else ArmazemIdempotencia()
+        self.metodos = metodos
+        self.espera_maxima = espera_maxima
+        self._em_andamento: Dict[Chave, "asyncio.Future[RespostaArmazenada]"] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.metodos:
+            await self.app(scope, receive, send)
+            return
+
+        valor_chave = dict(scope["headers"]).get(CABECALHO_CHAVE)
+        if not valor_chave:
+            await self.app(scope, receive, send)
+            return
+
+        chave = (valor_chave.decode("latin-1"), scope["method"], scope["path"])
+        corpo = await _ler_corpo(receive)
+        impressao_digital = hashlib.sha256(corpo).hexdigest()
+
+        resposta = self.armazem.obter(chave)
+        if resposta is None and chave in self._em_andamento:
+            resposta = await asyncio.shield(self._em_andamento[chave])
+        if resposta is None and not self.armazem.reivindicar(chave):
+            # Outro processo executa (ou acabou de executar) a mesma chave.
+            resposta, reivindicada = await self._aguardar_outro_processo(chave)
+            if resposta is None and not reivindicada:
+                await _recusar_em_andamento(send)
+                return
+        if resposta is not None:
+            await _repetir(resposta, impressao_digital, send)
+            return
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._em_andamento[chave] = futuro
+        guardada = False
+        try:
+            resposta = await self._executar(scope, corpo, impressao_digital, receive, send)
+            if resposta.status < 500:
+                self.armazem.guardar(chave, resposta.status, resposta.headers, resposta.corpo, impressao_digital)
+                guardada = True
+            futuro.set_result(resposta)
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            # Evita o aviso de "exception was never retrieved" quando ninguém aguardava.
+            futuro.exception()
+            raise
+        finally:
+            del self._em_andamento[chave]
+            if not guardada:
+                self.armazem.liberar(chave)
+
+    async def _aguardar_outro_processo(self, chave: Chave) -> Tuple[Optional[RespostaArmazenada], bool]:
+        """A resposta do outro processo, ou (None, True) se a chave passou a ser deste."""
+        limite = time.monotonic() + self.espera_maxima
+        while time.monotonic() < limite:
+            await asyncio.sleep(INTERVALO_CONSULTA)
+            resposta = self.armazem.obter(chave)
+            if resposta is not None:
+                return resposta, False
+            if self.armazem.reivindicar(chave):
+                # O outro processo desistiu (5xx) ou caiu: a chave é executada aqui.
+                return None, True
+        return None, False
+
+    async def _executar(self, scope, corpo: bytes, impressao_digital: str, receive, send) -> RespostaArmazenada:
+        status = 500
+        headers: List[Tuple[bytes, bytes]] = []
+        partes: List[bytes] = []
+        corpo_entregue = False
+
+        async def receive_reproduzido():
+            nonlocal corpo_entregue
+            if not corpo_entregue:
+                corpo_entregue = True
+                return {"type": "http.request", "body": corpo, "more_body": False}
+            return await receive()
+
+        async def send_capturado(mensagem):
+            nonlocal status, headers
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                headers = list(mensagem.get("headers", []))
+            elif mensagem["type"] == "http.response.body":
+                partes.append(mensagem.get("body", b""))
+            await send(mensagem)
+
+        await self.app(scope, receive_reproduzido, send_capturado)
+        return RespostaArmazenada(status, headers, b"".join(partes), impressao_digital, 0.0)
+
+
+async def _ler_corpo(receive) -> bytes:
+    partes = []
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] != "http.request":
+            break
+        partes.append(mensagem.get("body", b""))
+        if not mensagem.get("more_body", False):
+            break
+    return b"".join(partes)
+
+
+async def _recusar_em_andamento(send) -> None:
+    corpo = json.dumps({"detail": {
+        "codigo": "REQUISICAO_EM_ANDAMENTO",
+        "mensagem": "Uma requisição com esta Idempotency-Key ainda está em execução.",
+    }}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 409,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode()),
+                    (b"retry-after", b"1")],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+async def _repetir(resposta: RespostaArmazenada, impressao_digital: str, send) -> None:
+    if resposta.impressao_digital != impressao_digital:
+        corpo = json.dumps({"detail": {
+            "codigo": "CHAVE_IDEMPOTENCIA_REUTILIZADA",
+            "mensagem": "Idempotency-Key já usada com outro corpo de requisição.",
+        }}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 422,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode())],
+        })
+        await send({"type": "http.response.body", "body": corpo})
+        return
+
+    await send({
+        "type": "http.response.start",
+        "status": resposta.status,
+        "headers": resposta.headers + [(CABECALHO_REPETIDA, b"true")],
+    })
+    await send({"type": "http.response.body", "body": resposta.corpo})
@@ -0,0 +1,175 @@
+# src/equipamento/infrastructure/web/rate_limit.py
+"""
+Limite de requisições por cliente com baldes de fichas (token bucket).
+
+O cliente é identificado pelo cabeçalho X-API-Key quando a chave está na
+lista de chaves configurada e, caso contrário, pelo IP de origem: como a
+chave não é autenticada aqui, trocar de chave a cada requisição não pode
+render um balde novo (nem tirar do LRU os baldes dos clientes legítimos).
+Cada par (cliente, grupo de rotas) tem um balde com até 'rajada' fichas,
+reabastecido a 'taxa' fichas por segundo; cada requisição gasta uma ficha
+e, sem fichas, recebe 429 com Retry-After. As rotas fora dos grupos
+conhecidos (ex.: /admin) dividem o grupo "*".
+
+Os baldes ficam num OrderedDict usado como LRU limitado: consultar e
+reabastecer um balde é O(1) e, passada a capacidade, o cliente inativo há
+mais tempo é descartado (se voltar, recomeça com o balde cheio). Os limites
+valem por processo.
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional
+
+CABECALHO_CHAVE_API = b"x-api-key"
+CAPACIDADE_PADRAO = 100_000
+# Grupo usado para as rotas sem limite próprio.
+GRUPO_PADRAO = "*"
+GRUPOS = ("bicicleta", "tranca", "totem", "rede", "mudancas", "eventos", "reserva", "batch")
+
+
+@dataclass(frozen=True)
+class Limite:
+    """'taxa' requisições por segundo em regime, com rajadas de até 'rajada'."""
+    taxa: float
+    rajada: float
+
+    def __post_init__(self):
+        if self.taxa <= 0 or self.rajada < 1:
+            raise ValueError("A taxa deve ser positiva e a rajada de pelo menos 1 requisição.")
+
+
+def ler_limites(valor: str) -> Dict[str, Limite]:
+    """Lê 'grupo=taxa/rajada,...' (ex.: 'bicicleta=5/20,*=50/100')."""
+    limites = {}
+    for item in filter(None, (parte.strip() for parte in valor.split(","))):
+        try:
+            grupo, numeros = item.split("=")
+            taxa, rajada = numeros.split("/")
+            limites[grupo.strip()] = Limite(float(taxa), float(rajada))
+        except ValueError as erro:
+            raise ValueError(f"Limite inválido: '{item}'. Use 'grupo=taxa/rajada'. ({erro})") from None
+    return limites
+
+
+def grupo_da_rota(caminho: str) -> Optional[str]:
+    """Primeiro segmento do caminho, se for um dos grupos de rotas do serviço."""
+    segmento = caminho[1:].split("/", 1)[0]
+    return segmento if segmento in GRUPOS else None
+
+
+class BaldesDeFichas:
+    """Baldes por chave num LRU limitado. Só é usado de dentro do loop de eventos."""
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO, relogio: Callable[[], float] = time.monotonic):
+        self.capacidade = capacidade
+        self._relogio = relogio
+        # chave -> [fichas, instante da última atualização]
+        self._baldes: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+        self.descartados = 0
+
+    def consumir(self, chave: Hashable, limite: Limite) -> float:
+        """Gasta uma ficha; retorna 0 se havia ficha ou os segundos até a próxima."""
+        agora = self._relogio()
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = self._baldes[chave] = [limite.rajada, agora]
+            if len(self._baldes) > self.capacidade:
+                self._baldes.popitem(last=False)
+                self.descartados += 1
+        else:
+            self._baldes.move_to_end(chave)
+            balde[0] = min(limite.rajada, balde[0] + (agora - balde[1]) * limite.taxa)
+            balde[1] = agora
+        if balde[0] >= 1:
+            balde[0] -= 1
+            return 0.0
+        return (1 - balde[0]) / limite.taxa
+
+    def __len__(self) -> int:
+        return len(self._baldes)
+
+
+class LimitadorDeTaxa:
+    """
+    Aplica os limites configurados por grupo de rotas; os grupos sem limite
+    próprio usam o de "*" e, sem ele, passam direto. 'chaves' são as
+    X-API-Key que identificam um cliente (ver identificar_cliente).
+    """
+
+    def __init__(self, limites: Dict[str, Limite], baldes: Optional[BaldesDeFichas] = None, chaves: Iterable[str] = ()):
+        self.limites = limites
+        self.baldes = baldes if baldes is not None else BaldesDeFichas()
+        self.chaves: FrozenSet[str] = frozenset(chaves)
+        self.permitidas = 0
+        self.recusadas = 0
+
+    def verificar(self, cliente: str, caminho: str) -> float:
+        """0 se a requisição pode seguir; senão, os segundos até o cliente poder tentar de novo."""
+        grupo = grupo_da_rota(caminho) or GRUPO_PADRAO
+        limite = self.limites.get(grupo) or self.limites.get(GRUPO_PADRAO)
+        if limite is None:
+            return 0.0
+        espera = self.baldes.consumir((cliente, grupo), limite)
+        if espera:
+            self.recusadas += 1
+        else:
+            self.permitidas += 1
+        return espera
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "permitidas": self.permitidas,
+            "recusadas": self.recusadas,
+            "baldes": len(self.baldes),
+            "baldes_descartados": self.baldes.descartados,
+        }
+
+
+def identificar_cliente(scope, chaves: FrozenSet[str] = frozenset()) -> str:
+    """A X-API-Key, se for uma das chaves conhecidas; senão, o IP de origem."""
+    if chaves:
+        for nome, valor in scope["headers"]:
+            if nome == CABECALHO_CHAVE_API:
+                chave = valor.decode("latin-1")
+                if chave in chaves:
+                    return "chave:" + chave
+                break
+    cliente = scope.get("client")
+    return "ip:" + (cliente[0] if cliente else "desconhecido")
+
+
+class LimiteDeTaxaMiddleware:
+    """Middleware ASGI que recusa com 429 as requisições acima do limite do cliente."""
+
+    def __init__(self, app, limitador: LimitadorDeTaxa):
+        self.app = app
+        self.limitador = limitador
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.limitador.limites:
+            espera = self.limitador.verificar(identificar_cliente(scope, self.limitador.chaves), scope["path"])
+            if espera:
+                await _recusar(espera, send)
+                return
+        await self.app(scope, receive, send)
+
+
+async def _recusar(espera: float, send) -> None:
+    corpo = json.dumps({"detail": {
+        "codigo": "LIMITE_DE_REQUISICOES",
+        "mensagem": "Limite de requisições excedido. Tente novamente mais tarde.",
+    }}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(corpo)).encode()),
+            (b"retry-after", str(max(1, math.ceil(espera))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": corpo})
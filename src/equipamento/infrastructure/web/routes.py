@@ -1,14 +1,80 @@
 # src/equipamento/infrastructure/web/routes.py
 
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Query
-from pydantic import BaseModel
+import asyncio
+import math
+import os
+import tempfile
+from typing import Annotated, Any, Dict, List, Literal, Optional, Set, Tuple, Union
+from fastapi import APIRouter, HTTPException, Request, status, Query
+from fastapi.routing import APIRoute
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, TypeAdapter
 
 from ..repositories.mem_repository import (
     MemBicicletaRepository,
     MemTrancaRepository, 
     MemTotemRepository
 )
+from ..repositories.mem_change_log import MemRegistroDeMudancas
+from ..repositories.mem_search_index import IndiceSincronizado, MemIndiceDeBusca
+from ..repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+from ..repositories.mem_free_docks import MemTrancasLivres
+from ..repositories.mem_reservations import ExpiradorDeReservas, MemReservas
+from ..repositories.mem_outbox import MemCaixaDeSaida
+from ..repositories.mem_repository import decodificar_bicicleta, decodificar_tranca, decodificar_totem
+from ..repositories.tombstone_archive import ArquivoMorto, CompactadorDeExcluidos
+from ..repositories.unit_of_work import UnidadeDeTrabalho
+from ..repositories.id_allocator import AlocadorPorBlocos, AlocadorSnowflake
+from ..repositories.shm_repository import (
+    ShmBicicletaRepository,
+    ShmTrancaRepository,
+    ShmTotemRepository,
+    CAPACIDADE_PADRAO as SHM_CAPACIDADE_PADRAO,
+    TAMANHO_SLOT_PADRAO as SHM_TAMANHO_SLOT_PADRAO,
+    TravaEntreProcessos,
+)
+from ..repositories.shm_change_log import FOLGA_SLOT_MUDANCA, ShmRegistroDeMudancas
+from ..repositories.shm_events import ShmPublicadorDeEventos
+from ..repositories.sharded_repository import (
+    ShardedBicicletaRepository,
+    ShardedTrancaRepository,
+    ShardedTotemRepository,
+)
+from ..clients.employee_client import (
+    CacheDeValidacoes,
+    ClienteDeFuncionarios,
+    Disjuntor,
+    ServicoDeFuncionariosIndisponivel,
+)
+from ..clients.notification_dispatcher import DespachanteDeNotificacoes
+from ..repositories.versioned_repository import (
+    VersionadoBicicletaRepository,
+    VersionadoTrancaRepository,
+    VersionadoTotemRepository,
+)
+from .sse import DifusorDeEventos, RetransmissorDeEventos, transmitir_eventos
+from .admission import (
+    ControladorDeAdmissao,
+    Orcamento,
+    CLASSE_ACOES,
+    CLASSE_LEITURAS_PONTUAIS,
+    CLASSE_LEITURAS_EM_MASSA,
+)
+from .idempotency import ArmazemIdempotencia, ArmazemIdempotenciaCompartilhado
+from .rate_limit import BaldesDeFichas, LimitadorDeTaxa, ler_limites
+from .runtime_stats import (
+    AmostradorDeAlocacoes,
+    contar_entidades,
+    estatisticas_gc,
+    estatisticas_processo,
+    tamanhos_profundos,
+    utilizacao_threadpool,
+)
+from .single_flight import SingleFlight
+from .slow_requests import RegistroDeLentas, arquivo_rotativo, instrumentar_chamadas, instrumentar_passos
+from .snapshot import SnapshotEmCache
+from .tracing import ExportadorArquivoJson, ExportadorEmMemoria, Rastreador, classe_de_rota, instrumentar
 from ...application.use_cases import ( 
     CadastrarBicicletaUseCase,
     ListarBicicletasUseCase,
@@ -36,14 +102,145 @@ from ...application.use_cases import (
     DeletarTotemUseCase,
     AtualizarTotemUseCase,
     ListarBicicletasPorTotemUseCase,
+    ListarBicicletasPorTotensUseCase,
+    ListarTrancasPorTotensUseCase,
+    MontarTopologiaDaRedeUseCase,
     RestaurarDadosUseCase,
+    ListarMudancasUseCase,
+    BuscarBicicletasPorTextoUseCase,
+    BuscarTrancasPorTextoUseCase,
+    BuscarTotensPorTextoUseCase,
+    BuscarLocalizacaoDaBicicletaUseCase,
+    DevolverBicicletaNoTotemUseCase,
+    ReservarBicicletaUseCase,
+    ReservarTrancaUseCase,
+    BuscarReservaPorIdUseCase,
+    CancelarReservaUseCase,
+    LiberarReservasEncerradasUseCase,
+    FiltrarBicicletasUseCase,
+    FiltrarTrancasUseCase,
+    FiltrarTotensUseCase,
+    reconstruir_indice,
+    reconstruir_localizacoes,
+    reconstruir_vagas,
+    localizar_tranca,
+    ERRO_TOTEM_SEM_TRANCA_LIVRE,
+    ERRO_BICICLETA_RESERVADA,
+    ERRO_TRANCA_RESERVADA,
+    textos_bicicleta,
+    textos_tranca,
+    textos_totem,
 )
-from ...domain.entities import StatusBicicleta, StatusTranca 
+from ...domain.entities import StatusBicicleta, StatusTranca, ENTIDADE_BICICLETA, ENTIDADE_TRANCA, ENTIDADE_TOTEM
+from ...domain.state_machine import MAQUINA_BICICLETA, MAQUINA_TRANCA
 
 # ===================================================================
 # Constantes
 # ===================================================================
 INCLUDE_DELETED_DESCRIPTION = "Incluir itens deletados na lista"
+TOTEM_IDS_DESCRIPTION = "IDs dos totens separados por vírgula (ex.: 1,2,3)"
+MAX_TOTENS_POR_CONSULTA = 200
+BUSCA_DESCRIPTION = "Termos a buscar; acentos e maiúsculas são ignorados e cada termo casa também por prefixo"
+
+# "memoria" (padrão, um processo), "particionado" (memória particionada por
+# hash do id, com uma trava por partição), "versionado" (versões imutáveis:
+# leituras sem trava sobre um instante consistente) ou "compartilhado"
+# (memória compartilhada, para rodar o uvicorn com --workers N sobre um único estado).
+REPOSITORIO_BACKEND = os.environ.get("EQUIPAMENTO_REPOSITORIO", "memoria")
+REPOSITORIO_SHM_PREFIXO = os.environ.get("EQUIPAMENTO_SHM_PREFIXO", "equipamento")
+# Slots por segmento e bytes por entidade (JSON) no backend "compartilhado".
+# Passada a capacidade, a tabela cresce com novos segmentos; uma entidade
+# maior que o slot é recusada com 413.
+REPOSITORIO_SHM_CAPACIDADE = int(os.environ.get("EQUIPAMENTO_SHM_CAPACIDADE", str(SHM_CAPACIDADE_PADRAO)))
+REPOSITORIO_SHM_TAMANHO_SLOT = int(os.environ.get("EQUIPAMENTO_SHM_TAMANHO_SLOT", str(SHM_TAMANHO_SLOT_PADRAO)))
+# Arquivo SQLite com as respostas idempotentes, visto por todos os workers do
+# backend "compartilhado" (nos demais, elas ficam na memória do processo).
+IDEMPOTENCIA_ARQUIVO = os.environ.get("EQUIPAMENTO_IDEMPOTENCIA_ARQUIVO", os.path.join(tempfile.gettempdir(), "equipamento", f"{REPOSITORIO_SHM_PREFIXO}-idempotencia.sqlite3"))
+REPOSITORIO_PARTICOES = int(os.environ.get("EQUIPAMENTO_PARTICOES", "16"))
+
+# Entidades excluídas há mais de EQUIPAMENTO_COMPACTACAO_IDADE segundos saem da
+# memória e vão para o arquivo morto (todos os backends exceto "compartilhado").
+ARQUIVO_MORTO_DIR = os.environ.get("EQUIPAMENTO_ARQUIVO_MORTO_DIR", os.path.join(tempfile.gettempdir(), "equipamento"))
+COMPACTACAO_INTERVALO = float(os.environ.get("EQUIPAMENTO_COMPACTACAO_INTERVALO", "300"))
+COMPACTACAO_IDADE = float(os.environ.get("EQUIPAMENTO_COMPACTACAO_IDADE", "3600"))
+
+# Geração de ids nos backends em memória do processo: "local" (contador do
+# processo), "blocos" (blocos arrendados de um SQLite compartilhado entre os
+# nós) ou "snowflake" (tempo | EQUIPAMENTO_NO_ID | sequência). O backend
+# "compartilhado" usa o contador da própria tabela, já que o id é o slot.
+ALOCADOR_IDS = os.environ.get("EQUIPAMENTO_ALOCADOR_IDS", "local")
+ALOCADOR_ARQUIVO = os.environ.get("EQUIPAMENTO_ALOCADOR_ARQUIVO", os.path.join(tempfile.gettempdir(), "equipamento", "ids.sqlite3"))
+ALOCADOR_BLOCO = int(os.environ.get("EQUIPAMENTO_ALOCADOR_BLOCO", "1000"))
+NO_ID = int(os.environ.get("EQUIPAMENTO_NO_ID", "0"))
+
+# Orçamentos do controle de admissão, no formato "limite,fila,espera[,retry_after]"
+# (simultâneas, tamanho da fila, segundos de espera na fila, Retry-After das recusas).
+ADMISSAO_ORCAMENTOS = {
+    CLASSE_ACOES: os.environ.get("EQUIPAMENTO_ADMISSAO_ACOES"),
+    CLASSE_LEITURAS_PONTUAIS: os.environ.get("EQUIPAMENTO_ADMISSAO_LEITURAS_PONTUAIS"),
+    CLASSE_LEITURAS_EM_MASSA: os.environ.get("EQUIPAMENTO_ADMISSAO_LEITURAS_EM_MASSA"),
+}
+
+# Limites por cliente (X-API-Key ou IP) e grupo de rotas, no formato
+# "grupo=taxa/rajada,..." com "*" para as demais rotas. Vazio: sem limite.
+LIMITES_POR_CLIENTE = os.environ.get("EQUIPAMENTO_LIMITES", "")
+LIMITE_CLIENTES = int(os.environ.get("EQUIPAMENTO_LIMITE_CLIENTES", "100000"))
+# X-API-Key aceitas como identidade do cliente, separadas por vírgula. Outras
+# chaves (ou nenhuma) contam no balde do IP de origem.
+CHAVES_DE_CLIENTE = [c.strip() for c in os.environ.get("EQUIPAMENTO_LIMITE_CHAVES", "").split(",") if c.strip()]
+
+# Fração das requisições rastreadas (0 a 1). Com 0 nada é instrumentado. Os
+# spans vão para um buffer em memória (GET /admin/rastros) e, se o caminho
+# for informado, para um arquivo JSON Lines (sem caminho padrão, para que
+# cada processo não deixe o seu arquivo para trás).
+RASTREAMENTO_AMOSTRAGEM = float(os.environ.get("EQUIPAMENTO_RASTREAMENTO_AMOSTRAGEM", "0"))
+RASTREAMENTO_ARQUIVO = os.environ.get("EQUIPAMENTO_RASTREAMENTO_ARQUIVO", "")
+RASTREAMENTO_MEMORIA = int(os.environ.get("EQUIPAMENTO_RASTREAMENTO_MEMORIA", "10000"))
+
+# Requisições acima de EQUIPAMENTO_LENTAS_LIMIAR_MS (0 desliga) vão, com os
+# tempos por caso de uso e as chamadas aos repositórios, para o buffer de
+# GET /admin/lentas e, se o caminho for informado, para um log JSON Lines com
+# rotação por tamanho.
+LENTAS_LIMIAR_MS = float(os.environ.get("EQUIPAMENTO_LENTAS_LIMIAR_MS", "1000"))
+LENTAS_ARQUIVO = os.environ.get("EQUIPAMENTO_LENTAS_ARQUIVO", "")
+LENTAS_MAX_BYTES = int(os.environ.get("EQUIPAMENTO_LENTAS_MAX_BYTES", str(10 * 1024 * 1024)))
+LENTAS_BACKUPS = int(os.environ.get("EQUIPAMENTO_LENTAS_BACKUPS", "5"))
+
+# Reservas de bicicletas e trancas: duração padrão e máxima (segundos) e de
+# quanto em quanto tempo as vencidas são recolhidas.
+RESERVA_DURACAO = int(os.environ.get("EQUIPAMENTO_RESERVA_DURACAO", "600"))
+RESERVA_DURACAO_MAXIMA = int(os.environ.get("EQUIPAMENTO_RESERVA_DURACAO_MAXIMA", "1800"))
+RESERVA_RESOLUCAO = float(os.environ.get("EQUIPAMENTO_RESERVA_RESOLUCAO", "1"))
+
+# Quantidade máxima de operações em um POST /batch.
+LOTE_MAXIMO_OPERACOES = int(os.environ.get("EQUIPAMENTO_LOTE_MAXIMO_OPERACOES", "500"))
+
+# Serviço de funcionários que valida o idFuncionario das ações de manutenção
+# (vazio: o idFuncionario não é validado). Respostas ficam em cache por
+# EQUIPAMENTO_FUNCIONARIO_TTL segundos (as negativas, por
+# EQUIPAMENTO_FUNCIONARIO_TTL_NEGATIVO) e, depois de
+# EQUIPAMENTO_FUNCIONARIO_FALHAS falhas seguidas, o serviço deixa de ser
+# consultado por EQUIPAMENTO_FUNCIONARIO_ESPERA segundos.
+FUNCIONARIO_URL = os.environ.get("EQUIPAMENTO_FUNCIONARIO_URL", "")
+FUNCIONARIO_TIMEOUT = float(os.environ.get("EQUIPAMENTO_FUNCIONARIO_TIMEOUT", "2"))
+FUNCIONARIO_CONEXOES = int(os.environ.get("EQUIPAMENTO_FUNCIONARIO_CONEXOES", "20"))
+FUNCIONARIO_CACHE = int(os.environ.get("EQUIPAMENTO_FUNCIONARIO_CACHE", "10000"))
+FUNCIONARIO_TTL = float(os.environ.get("EQUIPAMENTO_FUNCIONARIO_TTL", "300"))
+FUNCIONARIO_TTL_NEGATIVO = float(os.environ.get("EQUIPAMENTO_FUNCIONARIO_TTL_NEGATIVO", "30"))
+FUNCIONARIO_FALHAS = int(os.environ.get("EQUIPAMENTO_FUNCIONARIO_FALHAS", "5"))
+FUNCIONARIO_ESPERA = float(os.environ.get("EQUIPAMENTO_FUNCIONARIO_ESPERA", "30"))
+
+# Destinos das notificações de integração e retirada, no formato
+# "nome=url,..." (ex.: "aluguel=http://aluguel:8000,email=http://email:8000").
+# Vazio: nada é notificado. As notificações são entregues em lotes de até
+# EQUIPAMENTO_NOTIFICACAO_LOTE, verificados a cada
+# EQUIPAMENTO_NOTIFICACAO_INTERVALO segundos, com até
+# EQUIPAMENTO_NOTIFICACAO_TENTATIVAS tentativas por lote.
+NOTIFICACAO_DESTINOS = os.environ.get("EQUIPAMENTO_NOTIFICACAO_DESTINOS", "")
+NOTIFICACAO_LOTE = int(os.environ.get("EQUIPAMENTO_NOTIFICACAO_LOTE", "100"))
+NOTIFICACAO_INTERVALO = float(os.environ.get("EQUIPAMENTO_NOTIFICACAO_INTERVALO", "0.5"))
+NOTIFICACAO_TENTATIVAS = int(os.environ.get("EQUIPAMENTO_NOTIFICACAO_TENTATIVAS", "8"))
+NOTIFICACAO_ESPERA_MAXIMA = float(os.environ.get("EQUIPAMENTO_NOTIFICACAO_ESPERA_MAXIMA", "60"))
 
 # ===================================================================
 # Pydantic Models
@@ -71,7 +268,8 @@ class IntegrarBicicletaRequest(BaseModel):
 
 class RetirarBicicletaRequest(BaseModel):
     idBicicleta: int
-    idTranca: int
+    # Opcional: sem ele, a bicicleta sai da tranca onde está presa.
+    idTranca: Optional[int] = None
     statusAcaoReparador: StatusBicicleta
     idFuncionario: int
     
@@ -104,6 +302,11 @@ class RetirarTrancaRequest(BaseModel):
 
 class AcaoBicicletaRequest(BaseModel):
     bicicleta: int
+    reserva: Optional[str] = None
+
+class DestrancarRequest(BaseModel):
+    bicicleta: Optional[int] = None
+    reserva: Optional[str] = None
 
 class TotemCreate(BaseModel): 
     localizacao: str
@@ -116,61 +319,503 @@ class TotemResponse(BaseModel):
     tranca_ids: List[int] = []
     is_deleted: bool
 
+class ReservaResponse(BaseModel):
+    id: str
+    entidade: str
+    entidade_id: int
+    expira_em: float
+    totem_id: Optional[int] = None
+
+class LocalizacaoBicicletaResponse(BaseModel):
+    bicicleta_id: int
+    tranca: TrancaResponse
+    totem: Optional[TotemResponse] = None
+
+# --- Operações de POST /batch: os mesmos campos das rotas de ação, mais o nome da operação ---
+class TrancarOperacao(AcaoBicicletaRequest):
+    operacao: Literal["trancar"]
+    idTranca: int
+
+class DestrancarOperacao(DestrancarRequest):
+    operacao: Literal["destrancar"]
+    idTranca: int
+
+class DevolverOperacao(AcaoBicicletaRequest):
+    operacao: Literal["devolver"]
+    idTotem: int
+
+class IntegrarBicicletaOperacao(IntegrarBicicletaRequest):
+    operacao: Literal["integrarBicicleta"]
+
+class RetirarBicicletaOperacao(RetirarBicicletaRequest):
+    operacao: Literal["retirarBicicleta"]
+
+class IntegrarTrancaOperacao(IntegrarTrancaRequest):
+    operacao: Literal["integrarTranca"]
+
+class RetirarTrancaOperacao(RetirarTrancaRequest):
+    operacao: Literal["retirarTranca"]
+
+class StatusBicicletaOperacao(BaseModel):
+    operacao: Literal["statusBicicleta"]
+    idBicicleta: int
+    acao: StatusBicicleta
+
+class StatusTrancaOperacao(BaseModel):
+    operacao: Literal["statusTranca"]
+    idTranca: int
+    acao: StatusTranca
+
+OperacaoDoLote = Annotated[
+    Union[TrancarOperacao, DestrancarOperacao, DevolverOperacao, IntegrarBicicletaOperacao, RetirarBicicletaOperacao,
+          IntegrarTrancaOperacao, RetirarTrancaOperacao, StatusBicicletaOperacao, StatusTrancaOperacao],
+    Field(discriminator="operacao"),
+]
+
+class LoteRequest(BaseModel):
+    operacoes: List[OperacaoDoLote] = Field(..., min_length=1, max_length=LOTE_MAXIMO_OPERACOES)
+    # Por padrão o lote é tudo ou nada: a primeira falha desfaz as ações já
+    # feitas e interrompe as seguintes, que costumam depender dela. Com
+    # false, cada ação é tentada e confirmada independentemente.
+    pararNoErro: bool = True
+
+class ResultadoOperacaoResponse(BaseModel):
+    indice: int
+    operacao: str
+    status: int
+    resultado: Optional[Union[TrancaResponse, BicicletaResponse]] = None
+    erro: Optional[Dict[str, str]] = None
+
+class LoteResponse(BaseModel):
+    executadas: int
+    falhas: int
+    resultados: List[ResultadoOperacaoResponse]
+
+lista_bicicletas_adapter = TypeAdapter(List[BicicletaResponse])
+lista_trancas_adapter = TypeAdapter(List[TrancaResponse])
+trancas_por_totem_adapter = TypeAdapter(Dict[int, List[TrancaResponse]])
+bicicletas_por_totem_adapter = TypeAdapter(Dict[int, List[BicicletaResponse]])
+
+def serializar_lista(adapter: TypeAdapter, entidades: Any) -> bytes:
+    """Valida e serializa uma lista de entidades (ou listas agrupadas por id) no mesmo formato do response_model."""
+    return adapter.dump_json(adapter.validate_python(entidades, from_attributes=True))
+
+def ler_ids_de_totens(ids: str) -> List[int]:
+    """Converte "1,2,3" em [1, 2, 3], rejeitando valores inválidos com 422."""
+    try:
+        totem_ids = [int(parte) for parte in ids.split(",") if parte.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids deve ser uma lista de inteiros separados por vírgula.")
+    if not totem_ids or len(totem_ids) > MAX_TOTENS_POR_CONSULTA:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Informe entre 1 e {MAX_TOTENS_POR_CONSULTA} totens.")
+    return totem_ids
+
+class MudancaResponse(BaseModel):
+    sequencia: int
+    entidade: str
+    entidade_id: int
+    operacao: str
+    dados: Dict[str, Any]
+
+class PaginaDeMudancasResponse(BaseModel):
+    mudancas: List[MudancaResponse]
+    sequencia_atual: int
+
 # ===================================================================
 # Montagem das dependências (Wiring)
 # ===================================================================
 
-bicicleta_repo = MemBicicletaRepository()
-tranca_repo = MemTrancaRepository()
-totem_repo = MemTotemRepository()
+spans_recentes = ExportadorEmMemoria(capacidade=RASTREAMENTO_MEMORIA)
+exportadores_de_spans: List[Any] = [spans_recentes]
+if RASTREAMENTO_AMOSTRAGEM > 0 and RASTREAMENTO_ARQUIVO:
+    os.makedirs(os.path.dirname(RASTREAMENTO_ARQUIVO) or ".", exist_ok=True)
+    exportadores_de_spans.append(ExportadorArquivoJson(RASTREAMENTO_ARQUIVO))
+# Usado pelo RastreamentoMiddleware (ver main.py).
+rastreador = Rastreador(amostragem=RASTREAMENTO_AMOSTRAGEM, exportadores=exportadores_de_spans)
+
+def _registro_de_lentas() -> RegistroDeLentas:
+    if LENTAS_LIMIAR_MS <= 0 or not LENTAS_ARQUIVO:
+        return RegistroDeLentas(limiar_ms=LENTAS_LIMIAR_MS)
+    os.makedirs(os.path.dirname(LENTAS_ARQUIVO) or ".", exist_ok=True)
+    return RegistroDeLentas(limiar_ms=LENTAS_LIMIAR_MS, handler=arquivo_rotativo(LENTAS_ARQUIVO, LENTAS_MAX_BYTES, LENTAS_BACKUPS))
+
+# Usado pelo RequisicoesLentasMiddleware e iniciado com a aplicação (ver main.py).
+registro_lentas = _registro_de_lentas()
+
+difusor_eventos = DifusorDeEventos()
+# Leituras quentes por totem: requisições idênticas e simultâneas compartilham
+# a mesma consulta e o mesmo corpo JSON já serializado. Cada worker coalesce
+# as suas; a consulta em si sempre lê o estado atual.
+leituras_por_totem = SingleFlight()
+# Só no backend "compartilhado": repassa a este worker os eventos publicados por todos.
+retransmissor_eventos = None
+
+if REPOSITORIO_BACKEND == "compartilhado":
+    # Tudo o que precisa valer entre requisições atendidas por workers
+    # diferentes vive fora do processo: as tabelas e o log de mudanças em
+    # memória compartilhada (um cursor de /mudancas vale em qualquer worker),
+    # os eventos num anel que cada worker repassa aos seus assinantes SSE e
+    # as respostas idempotentes num SQLite.
+    _dimensoes_shm = {"capacidade": REPOSITORIO_SHM_CAPACIDADE, "tamanho_slot": REPOSITORIO_SHM_TAMANHO_SLOT}
+    _slot_anel = REPOSITORIO_SHM_TAMANHO_SLOT + FOLGA_SLOT_MUDANCA
+    registro_mudancas = ShmRegistroDeMudancas(prefixo=REPOSITORIO_SHM_PREFIXO, tamanho_slot=_slot_anel)
+    publicador_eventos = ShmPublicadorDeEventos(prefixo=REPOSITORIO_SHM_PREFIXO, tamanho_slot=_slot_anel)
+    retransmissor_eventos = RetransmissorDeEventos(publicador_eventos, difusor_eventos)
+    os.makedirs(os.path.dirname(IDEMPOTENCIA_ARQUIVO) or ".", exist_ok=True)
+    armazem_idempotencia = ArmazemIdempotenciaCompartilhado(IDEMPOTENCIA_ARQUIVO)
+    bicicleta_repo = ShmBicicletaRepository(prefixo=REPOSITORIO_SHM_PREFIXO, registro=registro_mudancas, **_dimensoes_shm)
+    tranca_repo = ShmTrancaRepository(prefixo=REPOSITORIO_SHM_PREFIXO, registro=registro_mudancas, **_dimensoes_shm)
+    totem_repo = ShmTotemRepository(prefixo=REPOSITORIO_SHM_PREFIXO, registro=registro_mudancas, **_dimensoes_shm)
+elif REPOSITORIO_BACKEND in ("particionado", "versionado", "memoria"):
+    registro_mudancas = MemRegistroDeMudancas()
+    publicador_eventos = difusor_eventos
+    armazem_idempotencia = ArmazemIdempotencia()
+
+    def _arquivo_morto(entidade: str, decodificar) -> ArquivoMorto:
+        # Caminho estável: o arquivo é aberto para acréscimo quando a aplicação
+        # inicia (ver CompactadorDeExcluidos) e lido de novo após reinícios.
+        return ArquivoMorto(os.path.join(ARQUIVO_MORTO_DIR, f"{entidade}.jsonl"), decodificar)
+
+    arquivo_bicicletas = _arquivo_morto("bicicletas", decodificar_bicicleta)
+    arquivo_trancas = _arquivo_morto("trancas", decodificar_tranca)
+    arquivo_totens = _arquivo_morto("totens", decodificar_totem)
+
+    def _alocador(entidade: str):
+        if ALOCADOR_IDS == "local":
+            return None
+        if ALOCADOR_IDS == "blocos":
+            os.makedirs(os.path.dirname(ALOCADOR_ARQUIVO) or ".", exist_ok=True)
+            return AlocadorPorBlocos(ALOCADOR_ARQUIVO, chave=entidade, tamanho_bloco=ALOCADOR_BLOCO)
+        if ALOCADOR_IDS == "snowflake":
+            return AlocadorSnowflake(no_id=NO_ID)
+        raise ValueError(f"EQUIPAMENTO_ALOCADOR_IDS inválido: '{ALOCADOR_IDS}'.")
 
-cadastrar_bicicleta_uc = CadastrarBicicletaUseCase(repository=bicicleta_repo)
+    if REPOSITORIO_BACKEND == "particionado":
+        bicicleta_repo = ShardedBicicletaRepository(particoes=REPOSITORIO_PARTICOES, registro=registro_mudancas, arquivo=arquivo_bicicletas, alocador=_alocador("bicicletas"))
+        tranca_repo = ShardedTrancaRepository(particoes=REPOSITORIO_PARTICOES, registro=registro_mudancas, arquivo=arquivo_trancas, alocador=_alocador("trancas"))
+        totem_repo = ShardedTotemRepository(particoes=REPOSITORIO_PARTICOES, registro=registro_mudancas, arquivo=arquivo_totens, alocador=_alocador("totens"))
+    elif REPOSITORIO_BACKEND == "versionado":
+        bicicleta_repo = VersionadoBicicletaRepository(registro=registro_mudancas, arquivo=arquivo_bicicletas, alocador=_alocador("bicicletas"))
+        tranca_repo = VersionadoTrancaRepository(registro=registro_mudancas, arquivo=arquivo_trancas, alocador=_alocador("trancas"))
+        totem_repo = VersionadoTotemRepository(registro=registro_mudancas, arquivo=arquivo_totens, alocador=_alocador("totens"))
+    else:
+        bicicleta_repo = MemBicicletaRepository(registro=registro_mudancas, arquivo=arquivo_bicicletas, alocador=_alocador("bicicletas"))
+        tranca_repo = MemTrancaRepository(registro=registro_mudancas, arquivo=arquivo_trancas, alocador=_alocador("trancas"))
+        totem_repo = MemTotemRepository(registro=registro_mudancas, arquivo=arquivo_totens, alocador=_alocador("totens"))
+else:
+    raise ValueError(f"EQUIPAMENTO_REPOSITORIO inválido: '{REPOSITORIO_BACKEND}'.")
+
+def _ler_orcamento(valor: str) -> Orcamento:
+    partes = [p.strip() for p in valor.split(",")]
+    if len(partes) not in (3, 4):
+        raise ValueError(f"Orçamento de admissão inválido: '{valor}'. Use 'limite,fila,espera[,retry_after]'.")
+    return Orcamento(int(partes[0]), int(partes[1]), float(partes[2]), *(int(p) for p in partes[3:]))
+
+# Usado pelo AdmissaoMiddleware (ver main.py).
+controlador_admissao = ControladorDeAdmissao(
+    {classe: _ler_orcamento(valor) for classe, valor in ADMISSAO_ORCAMENTOS.items() if valor}
+)
+
+# Usado pelo LimiteDeTaxaMiddleware (ver main.py).
+limitador_taxa = LimitadorDeTaxa(ler_limites(LIMITES_POR_CLIENTE), BaldesDeFichas(capacidade=LIMITE_CLIENTES), CHAVES_DE_CLIENTE)
+
+# Fechado junto com a aplicação (ver main.py).
+cliente_funcionarios = ClienteDeFuncionarios(
+    FUNCIONARIO_URL,
+    cache=CacheDeValidacoes(capacidade=FUNCIONARIO_CACHE, ttl_positivo=FUNCIONARIO_TTL, ttl_negativo=FUNCIONARIO_TTL_NEGATIVO),
+    disjuntor=Disjuntor(limite_falhas=FUNCIONARIO_FALHAS, espera=FUNCIONARIO_ESPERA),
+    timeout=FUNCIONARIO_TIMEOUT,
+    conexoes=FUNCIONARIO_CONEXOES,
+) if FUNCIONARIO_URL else None
+
+def _ler_destinos(valor: str) -> Dict[str, str]:
+    destinos = {}
+    for parte in valor.split(","):
+        if not parte.strip():
+            continue
+        nome, separador, url = parte.partition("=")
+        if not separador or not nome.strip() or not url.strip():
+            raise ValueError(f"Destino de notificação inválido: '{parte}'. Use 'nome=url'.")
+        destinos[nome.strip()] = url.strip()
+    return destinos
+
+# Caixa de saída das notificações aos outros microsserviços; o despachante é
+# iniciado e encerrado junto com a aplicação (ver main.py).
+destinos_notificacao = _ler_destinos(NOTIFICACAO_DESTINOS)
+caixa_de_saida = MemCaixaDeSaida(destinos_notificacao) if destinos_notificacao else None
+despachante_notificacoes = DespachanteDeNotificacoes(
+    caixa_de_saida,
+    destinos_notificacao,
+    lote=NOTIFICACAO_LOTE,
+    intervalo=NOTIFICACAO_INTERVALO,
+    max_tentativas=NOTIFICACAO_TENTATIVAS,
+    espera_maxima=NOTIFICACAO_ESPERA_MAXIMA,
+) if caixa_de_saida is not None else None
+
+# Iniciado e parado junto com a aplicação (ver main.py).
+compactador_excluidos = CompactadorDeExcluidos(
+    [repo.excluidos for repo in (bicicleta_repo, tranca_repo, totem_repo) if hasattr(repo, "excluidos")],
+    intervalo=COMPACTACAO_INTERVALO,
+    idade_minima=COMPACTACAO_IDADE,
+)
+
+# Índices de busca textual, locais a cada processo e montados a partir do
+# estado atual. No backend "compartilhado" cada um acompanha o log de
+# mudanças para ver também as gravações dos outros workers.
+indice_bicicletas = MemIndiceDeBusca()
+indice_trancas = MemIndiceDeBusca()
+indice_totens = MemIndiceDeBusca()
+if REPOSITORIO_BACKEND == "compartilhado":
+    indice_bicicletas = IndiceSincronizado(
+        indice_bicicletas, registro_mudancas, ENTIDADE_BICICLETA,
+        textos=lambda dados: textos_bicicleta(decodificar_bicicleta(dados)),
+        recarregar=lambda: [(b.id, textos_bicicleta(b)) for b in bicicleta_repo.listar_todas()],
+    )
+    indice_trancas = IndiceSincronizado(
+        indice_trancas, registro_mudancas, ENTIDADE_TRANCA,
+        textos=lambda dados: textos_tranca(decodificar_tranca(dados)),
+        recarregar=lambda: [(t.id, textos_tranca(t)) for t in tranca_repo.listar_todas()],
+    )
+    indice_totens = IndiceSincronizado(
+        indice_totens, registro_mudancas, ENTIDADE_TOTEM,
+        textos=lambda dados: textos_totem(decodificar_totem(dados)),
+        recarregar=lambda: [(t.id, textos_totem(t)) for t in totem_repo.listar_todos()],
+    )
+reconstruir_indice(indice_bicicletas, bicicleta_repo.listar_todas(), textos_bicicleta)
+reconstruir_indice(indice_trancas, tranca_repo.listar_todas(), textos_tranca)
+reconstruir_indice(indice_totens, totem_repo.listar_todos(), textos_totem)
+
+# Mapa bicicleta -> tranca, local ao processo. No backend "compartilhado" os
+# outros workers também prendem e soltam bicicletas, então a localização é
+# procurada nas próprias trancas.
+localizacao_bicicletas = MemLocalizacaoDeBicicletas() if REPOSITORIO_BACKEND != "compartilhado" else None
+reconstruir_localizacoes(localizacao_bicicletas, tranca_repo.listar_todas())
+# Trancas livres de cada totem, para as devoluções; local ao processo pelo mesmo motivo.
+trancas_livres = MemTrancasLivres() if REPOSITORIO_BACKEND != "compartilhado" else None
+reconstruir_vagas(trancas_livres, tranca_repo.listar_todas())
+# Reservas, locais ao processo pelo mesmo motivo: sem elas no backend "compartilhado".
+reservas = MemReservas(resolucao=RESERVA_RESOLUCAO) if REPOSITORIO_BACKEND != "compartilhado" else None
+
+cadastrar_bicicleta_uc = CadastrarBicicletaUseCase(repository=bicicleta_repo, indice=indice_bicicletas)
 listar_bicicletas_uc = ListarBicicletasUseCase(repository=bicicleta_repo)
 buscar_bicicleta_uc = BuscarBicicletaPorIdUseCase(repository=bicicleta_repo)
-deletar_bicicleta_uc = DeletarBicicletaUseCase(repository=bicicleta_repo)
-integrar_bicicleta_uc = IntegrarBicicletaNaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo)
-retirar_bicicleta_uc = RetirarBicicletaDaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo)
-alterar_status_bicicleta_uc = AlterarStatusBicicletaUseCase(repository=bicicleta_repo) 
+buscar_bicicletas_por_texto_uc = BuscarBicicletasPorTextoUseCase(repository=bicicleta_repo, indice=indice_bicicletas)
+filtrar_bicicletas_uc = FiltrarBicicletasUseCase(repository=bicicleta_repo)
+deletar_bicicleta_uc = DeletarBicicletaUseCase(repository=bicicleta_repo, indice=indice_bicicletas)
+integrar_bicicleta_uc = IntegrarBicicletaNaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, publicador=publicador_eventos, localizacao=localizacao_bicicletas, livres=trancas_livres, caixa=caixa_de_saida)
+retirar_bicicleta_uc = RetirarBicicletaDaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, publicador=publicador_eventos, localizacao=localizacao_bicicletas, livres=trancas_livres, caixa=caixa_de_saida)
+buscar_localizacao_bicicleta_uc = BuscarLocalizacaoDaBicicletaUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, totem_repo=totem_repo, localizacao=localizacao_bicicletas)
+alterar_status_bicicleta_uc = AlterarStatusBicicletaUseCase(repository=bicicleta_repo, publicador=publicador_eventos)
 
-cadastrar_tranca_uc = CadastrarTrancaUseCase(repository=tranca_repo)
+cadastrar_tranca_uc = CadastrarTrancaUseCase(repository=tranca_repo, indice=indice_trancas)
 listar_trancas_uc = ListarTrancasUseCase(repository=tranca_repo)
 buscar_tranca_uc = BuscarTrancaPorIdUseCase(repository=tranca_repo)
-deletar_tranca_uc = DeletarTrancaUseCase(repository=tranca_repo)
-alterar_status_tranca_uc = AlterarStatusTrancaUseCase(repository=tranca_repo)
+buscar_trancas_por_texto_uc = BuscarTrancasPorTextoUseCase(repository=tranca_repo, indice=indice_trancas)
+filtrar_trancas_uc = FiltrarTrancasUseCase(repository=tranca_repo)
+deletar_tranca_uc = DeletarTrancaUseCase(repository=tranca_repo, indice=indice_trancas, livres=trancas_livres)
+alterar_status_tranca_uc = AlterarStatusTrancaUseCase(repository=tranca_repo, publicador=publicador_eventos, livres=trancas_livres)
 listar_trancas_por_totem_uc = ListarTrancasPorTotemUseCase(totem_repo=totem_repo, tranca_repo=tranca_repo)
-integrar_tranca_uc = IntegrarTrancaNoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo)
+integrar_tranca_uc = IntegrarTrancaNoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo, publicador=publicador_eventos, livres=trancas_livres, caixa=caixa_de_saida)
 buscar_bicicleta_em_tranca_uc = BuscarBicicletaEmTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo)
-retirar_tranca_uc = RetirarTrancaDoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo)
-trancar_tranca_uc = TrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo)
-destrancar_tranca_uc = DestrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo)
+retirar_tranca_uc = RetirarTrancaDoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo, publicador=publicador_eventos, livres=trancas_livres, caixa=caixa_de_saida)
+trancar_tranca_uc = TrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo, publicador=publicador_eventos, localizacao=localizacao_bicicletas, livres=trancas_livres, reservas=reservas)
+destrancar_tranca_uc = DestrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo, publicador=publicador_eventos, localizacao=localizacao_bicicletas, livres=trancas_livres, reservas=reservas)
+devolver_bicicleta_uc = DevolverBicicletaNoTotemUseCase(
+    totem_repo=totem_repo,
+    tranca_repo=tranca_repo,
+    bicicleta_repo=bicicleta_repo,
+    trancar=trancar_tranca_uc,
+    livres=trancas_livres,
+    reservas=reservas,
+)
 
-cadastrar_totem_uc = CadastrarTotemUseCase(repository=totem_repo)
+# Ações de POST /batch: casos de uso próprios, montados sobre a unidade de
+# trabalho, que retém eventos, notificações e encerramento de reservas até o
+# lote ser confirmado. A trava é tomada também pelas rotas de uma ação só
+# (ver _sob_trava); no backend "compartilhado" ela vale entre os workers.
+unidade_de_trabalho = UnidadeDeTrabalho(
+    bicicleta_repo,
+    tranca_repo,
+    publicador=publicador_eventos,
+    caixa=caixa_de_saida,
+    reservas=reservas,
+    localizacao=localizacao_bicicletas,
+    livres=trancas_livres,
+    travar=TravaEntreProcessos(os.path.join(tempfile.gettempdir(), f"{REPOSITORIO_SHM_PREFIXO}_acoes.lock")).escrita
+    if REPOSITORIO_BACKEND == "compartilhado" else None,
+)
+_lote_trancar_uc = TrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo, publicador=unidade_de_trabalho.publicador, localizacao=localizacao_bicicletas, livres=trancas_livres, reservas=unidade_de_trabalho.reservas)
+_lote_destrancar_uc = DestrancarTrancaUseCase(tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo, publicador=unidade_de_trabalho.publicador, localizacao=localizacao_bicicletas, livres=trancas_livres, reservas=unidade_de_trabalho.reservas)
+_lote_devolver_uc = DevolverBicicletaNoTotemUseCase(
+    totem_repo=totem_repo,
+    tranca_repo=tranca_repo,
+    bicicleta_repo=bicicleta_repo,
+    trancar=_lote_trancar_uc,
+    livres=trancas_livres,
+    reservas=unidade_de_trabalho.reservas,
+)
+_lote_integrar_bicicleta_uc = IntegrarBicicletaNaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, publicador=unidade_de_trabalho.publicador, localizacao=localizacao_bicicletas, livres=trancas_livres, caixa=unidade_de_trabalho.caixa)
+_lote_retirar_bicicleta_uc = RetirarBicicletaDaRedeUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, publicador=unidade_de_trabalho.publicador, localizacao=localizacao_bicicletas, livres=trancas_livres, caixa=unidade_de_trabalho.caixa)
+_lote_integrar_tranca_uc = IntegrarTrancaNoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo, publicador=unidade_de_trabalho.publicador, livres=trancas_livres, caixa=unidade_de_trabalho.caixa)
+_lote_retirar_tranca_uc = RetirarTrancaDoTotemUseCase(tranca_repo=tranca_repo, totem_repo=totem_repo, publicador=unidade_de_trabalho.publicador, livres=trancas_livres, caixa=unidade_de_trabalho.caixa)
+_lote_status_bicicleta_uc = AlterarStatusBicicletaUseCase(repository=bicicleta_repo, publicador=unidade_de_trabalho.publicador)
+_lote_status_tranca_uc = AlterarStatusTrancaUseCase(repository=tranca_repo, publicador=unidade_de_trabalho.publicador, livres=trancas_livres)
+
+liberar_reservas_encerradas_uc = LiberarReservasEncerradasUseCase(tranca_repo=tranca_repo, livres=trancas_livres)
+if reservas is not None:
+    reservar_bicicleta_uc = ReservarBicicletaUseCase(bicicleta_repo=bicicleta_repo, tranca_repo=tranca_repo, reservas=reservas, localizacao=localizacao_bicicletas)
+    reservar_tranca_uc = ReservarTrancaUseCase(tranca_repo=tranca_repo, reservas=reservas, livres=trancas_livres)
+    buscar_reserva_uc = BuscarReservaPorIdUseCase(reservas=reservas)
+    cancelar_reserva_uc = CancelarReservaUseCase(reservas=reservas, liberar=liberar_reservas_encerradas_uc)
+# Iniciado e parado junto com a aplicação (ver main.py): uma única tarefa no
+# loop de eventos vence todas as reservas.
+expirador_reservas = ExpiradorDeReservas(reservas, ao_expirar=liberar_reservas_encerradas_uc.execute) if reservas is not None else None
+
+cadastrar_totem_uc = CadastrarTotemUseCase(repository=totem_repo, indice=indice_totens)
 listar_totens_uc = ListarTotensUseCase(repository=totem_repo)
 buscar_totem_uc = BuscarTotemPorIdUseCase(repository=totem_repo)
-deletar_totem_uc = DeletarTotemUseCase(repository=totem_repo)
+buscar_totens_por_texto_uc = BuscarTotensPorTextoUseCase(repository=totem_repo, indice=indice_totens)
+filtrar_totens_uc = FiltrarTotensUseCase(repository=totem_repo)
+deletar_totem_uc = DeletarTotemUseCase(repository=totem_repo, indice=indice_totens)
 listar_bicicletas_por_totem_uc = ListarBicicletasPorTotemUseCase(
     totem_repo=totem_repo,
     tranca_repo=tranca_repo,
     bicicleta_repo=bicicleta_repo
 )
+listar_trancas_por_totens_uc = ListarTrancasPorTotensUseCase(totem_repo=totem_repo, tranca_repo=tranca_repo)
+listar_bicicletas_por_totens_uc = ListarBicicletasPorTotensUseCase(
+    totem_repo=totem_repo,
+    tranca_repo=tranca_repo,
+    bicicleta_repo=bicicleta_repo
+)
 
 restaurar_dados_uc = RestaurarDadosUseCase(
     bicicleta_repo=bicicleta_repo,
     tranca_repo=tranca_repo,
-    totem_repo=totem_repo
+    totem_repo=totem_repo,
+    indice_bicicletas=indice_bicicletas,
+    indice_trancas=indice_trancas,
+    indice_totens=indice_totens,
+    localizacao=localizacao_bicicletas,
+    livres=trancas_livres,
 )
 
-atualizar_bicicleta_uc = AtualizarBicicletaUseCase(repository=bicicleta_repo)
-atualizar_tranca_uc = AtualizarTrancaUseCase(repository=tranca_repo)
-atualizar_totem_uc = AtualizarTotemUseCase(repository=totem_repo)
+atualizar_bicicleta_uc = AtualizarBicicletaUseCase(repository=bicicleta_repo, indice=indice_bicicletas)
+atualizar_tranca_uc = AtualizarTrancaUseCase(repository=tranca_repo, indice=indice_trancas)
+atualizar_totem_uc = AtualizarTotemUseCase(repository=totem_repo, indice=indice_totens)
 
-router = APIRouter()
+listar_mudancas_uc = ListarMudancasUseCase(registro=registro_mudancas)
+
+montar_topologia_uc = MontarTopologiaDaRedeUseCase(totem_repo=totem_repo, tranca_repo=tranca_repo, bicicleta_repo=bicicleta_repo)
+# A sequência do log de mudanças muda a cada gravação. No backend
+# "compartilhado" ela é a mesma em todos os workers, e o prefixo do ETag
+# vem da época do log para que um ETag valha em qualquer um deles.
+snapshot_da_rede = SnapshotEmCache(
+    geracao=registro_mudancas.sequencia_atual,
+    montar=montar_topologia_uc.execute,
+    instancia=f"{registro_mudancas.epoca:x}" if REPOSITORIO_BACKEND == "compartilhado" else None,
+)
+
+# Contabilidade de memória de GET /admin/stats.
+amostrador_alocacoes = AmostradorDeAlocacoes()
+REPOSITORIOS_MONITORADOS = {
+    "bicicletas": (bicicleta_repo, bicicleta_repo.listar_todas),
+    "trancas": (tranca_repo, tranca_repo.listar_todas),
+    "totens": (totem_repo, totem_repo.listar_todos),
+}
+CACHES_MONITORADOS = {
+    "registro_mudancas": registro_mudancas,
+    "indice_bicicletas": indice_bicicletas,
+    "indice_trancas": indice_trancas,
+    "indice_totens": indice_totens,
+    "snapshot_da_rede": snapshot_da_rede,
+    "leituras_por_totem": leituras_por_totem,
+    "idempotencia": armazem_idempotencia,
+    "limite_de_requisicoes": limitador_taxa.baldes,
+    "eventos": difusor_eventos,
+}
+if localizacao_bicicletas is not None:
+    CACHES_MONITORADOS["localizacao_bicicletas"] = localizacao_bicicletas
+if trancas_livres is not None:
+    CACHES_MONITORADOS["trancas_livres"] = trancas_livres
+if reservas is not None:
+    CACHES_MONITORADOS["reservas"] = reservas
+if cliente_funcionarios is not None:
+    CACHES_MONITORADOS["validacoes_funcionario"] = cliente_funcionarios.cache
+if caixa_de_saida is not None:
+    CACHES_MONITORADOS["caixa_de_saida"] = caixa_de_saida
+
+def montar_estatisticas_de_memoria(profundo: bool, alocacoes: int) -> Dict[str, Any]:
+    repositorios = {nome: contar_entidades(repo, listar) for nome, (repo, listar) in REPOSITORIOS_MONITORADOS.items()}
+    for nome, (repo, _) in REPOSITORIOS_MONITORADOS.items():
+        if hasattr(repo, "tamanho_segmento"):
+            repositorios[nome]["memoria_compartilhada_bytes"] = repo.tamanho_segmento()
+    resultado: Dict[str, Any] = {"repositorios": repositorios}
+    if profundo:
+        # Os caches guardam referências às entidades; elas ficam na conta do
+        # repositório, e cada cache só com o que é dele.
+        vistos: set = set()
+        tamanhos = tamanhos_profundos(
+            {nome: repo for nome, (repo, _) in REPOSITORIOS_MONITORADOS.items()},
+            reservados=CACHES_MONITORADOS.values(), vistos=vistos,
+        )
+        for nome, tamanho in tamanhos.items():
+            repositorios[nome]["tamanho_bytes"] = tamanho
+        resultado["caches"] = {nome: {"tamanho_bytes": tamanho}
+                               for nome, tamanho in tamanhos_profundos(CACHES_MONITORADOS, vistos=vistos).items()}
+    resultado["gc"] = estatisticas_gc()
+    resultado["processo"] = estatisticas_processo()
+    resultado["alocacoes"] = amostrador_alocacoes.amostrar(alocacoes) if alocacoes else amostrador_alocacoes.estatisticas()
+    return resultado
+
+if registro_lentas.ativo:
+    for _nome, _repo in (("bicicleta_repo", bicicleta_repo), ("tranca_repo", tranca_repo), ("totem_repo", totem_repo)):
+        instrumentar_chamadas(_repo, _nome)
+    for _nome, _caso_de_uso in list(globals().items()):
+        if _nome.endswith("_uc"):
+            instrumentar_passos(_caso_de_uso, type(_caso_de_uso).__name__)
+
+if rastreador.ativo:
+    # Instrumenta as próprias instâncias já montadas: os casos de uso continuam
+    # com as mesmas referências e passam a ver os métodos rastreados.
+    for _nome, _repo in (("bicicleta_repo", bicicleta_repo), ("tranca_repo", tranca_repo), ("totem_repo", totem_repo)):
+        instrumentar(rastreador, _repo, _nome)
+    for _nome, _caso_de_uso in list(globals().items()):
+        if _nome.endswith("_uc"):
+            instrumentar(rastreador, _caso_de_uso, type(_caso_de_uso).__name__, metodos=["execute"])
+    if cliente_funcionarios is not None:
+        instrumentar(rastreador, cliente_funcionarios, "cliente_funcionarios", metodos=["existe"])
+
+router = APIRouter(route_class=classe_de_rota(rastreador) if rastreador.ativo else APIRoute)
 
 # ===================================================================
 # Rotas da API
 # ===================================================================
 
+async def _funcionario_existe(funcionario_id: int) -> bool:
+    """Sem serviço configurado, todo funcionário existe; fora do ar, 503."""
+    if cliente_funcionarios is None:
+        return True
+    try:
+        return await cliente_funcionarios.existe(funcionario_id)
+    except ServicoDeFuncionariosIndisponivel as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"codigo": "FUNCIONARIO_INDISPONIVEL", "mensagem": str(e)},
+            headers={"Retry-After": str(max(1, math.ceil(e.tentar_em)))},
+        )
+
+async def _validar_funcionario(funcionario_id: int) -> None:
+    """Recusa a ação se o funcionário não existir."""
+    if not await _funcionario_existe(funcionario_id):
+        raise HTTPException(status_code=422, detail={"codigo": "FUNCIONARIO_INVALIDO", "mensagem": "Funcionário não encontrado."})
+
 # --- Rotas para Bicicletas ---
+def _sob_trava(acao, *args, **kwargs):
+    """Executa a ação sob a trava dos lotes, para que ela não se intercale com um POST /batch."""
+    with unidade_de_trabalho.travada():
+        return acao(*args, **kwargs)
+
 @router.post("/bicicleta", response_model=BicicletaResponse, status_code=status.HTTP_201_CREATED, tags=["Bicicletas"])
 def cadastrar_bicicleta(data: BicicletaCreate):
     bicicleta = cadastrar_bicicleta_uc.execute(data.model_dump())
@@ -180,28 +825,64 @@ def cadastrar_bicicleta(data: BicicletaCreate):
 def listar_bicicletas(include_deleted: bool = Query(False, description=INCLUDE_DELETED_DESCRIPTION)):
     return listar_bicicletas_uc.execute(include_deleted=include_deleted)
 
+@router.get("/bicicleta/busca", response_model=List[BicicletaResponse], tags=["Bicicletas"])
+def buscar_bicicletas_por_texto(q: str = Query(..., description=BUSCA_DESCRIPTION), limit: int = Query(20, ge=1, le=100)):
+    try:
+        return buscar_bicicletas_por_texto_uc.execute(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.get("/bicicleta/filtro", response_model=List[BicicletaResponse], tags=["Bicicletas"])
+def filtrar_bicicletas(status_bicicleta: Optional[StatusBicicleta] = Query(None, alias="status"), marca: Optional[str] = None,
+                       modelo: Optional[str] = None, ano: Optional[str] = None):
+    try:
+        return filtrar_bicicletas_uc.execute({"status": status_bicicleta, "marca": marca, "modelo": modelo, "ano": ano})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
 @router.get("/bicicleta/{bicicleta_id}", response_model=BicicletaResponse, tags=["Bicicletas"])
 def buscar_bicicleta(bicicleta_id: int):
     bicicleta = buscar_bicicleta_uc.execute(bicicleta_id)
     if not bicicleta: raise HTTPException(status.HTTP_404_NOT_FOUND, "Bicicleta não encontrada.")
     return bicicleta
 
+@router.get("/bicicleta/{bicicleta_id}/localizacao", response_model=LocalizacaoBicicletaResponse, tags=["Bicicletas"])
+def buscar_localizacao_da_bicicleta(bicicleta_id: int):
+    try:
+        localizacao = buscar_localizacao_bicicleta_uc.execute(bicicleta_id)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, str(e))
+    if localizacao is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "A bicicleta não está presa em nenhuma tranca.")
+    tranca, totem = localizacao
+    return {"bicicleta_id": bicicleta_id, "tranca": tranca, "totem": totem}
+
 @router.delete("/bicicleta/{bicicleta_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Bicicletas"])
 def deletar_bicicleta(bicicleta_id: int):
-    deletar_bicicleta_uc.execute(bicicleta_id)
+    _sob_trava(deletar_bicicleta_uc.execute, bicicleta_id)
 
 @router.post("/bicicleta/integrarNaRede", response_model=TrancaResponse, tags=["Ações"])
-def integrar_bicicleta_na_rede(data: IntegrarBicicletaRequest):
+async def integrar_bicicleta_na_rede(data: IntegrarBicicletaRequest):
+    await _validar_funcionario(data.idFuncionario)
     try:
-        tranca = integrar_bicicleta_uc.execute(bicicleta_id=data.idBicicleta, tranca_id=data.idTranca, funcionario_id=data.idFuncionario)
+        tranca = await run_in_threadpool(
+            _sob_trava,
+            integrar_bicicleta_uc.execute,
+            bicicleta_id=data.idBicicleta,
+            tranca_id=data.idTranca,
+            funcionario_id=data.idFuncionario
+        )
         return tranca
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     
 @router.post("/bicicleta/retirarDaRede", response_model=BicicletaResponse, tags=["Ações"])
-def retirar_bicicleta_da_rede(data: RetirarBicicletaRequest):
+async def retirar_bicicleta_da_rede(data: RetirarBicicletaRequest):
+    await _validar_funcionario(data.idFuncionario)
     try:
-        bicicleta = retirar_bicicleta_uc.execute(
+        bicicleta = await run_in_threadpool(
+            _sob_trava,
+            retirar_bicicleta_uc.execute,
             bicicleta_id=data.idBicicleta,
             tranca_id=data.idTranca,
             status_final=data.statusAcaoReparador,
@@ -217,7 +898,8 @@ def alterar_status_bicicleta(idBicicleta: int, acao: StatusBicicleta):
     Altera o status de uma bicicleta específica.
     """
     try:
-        bicicleta = alterar_status_bicicleta_uc.execute(
+        bicicleta = _sob_trava(
+            alterar_status_bicicleta_uc.execute,
             bicicleta_id=idBicicleta,
             novo_status=acao
         )
@@ -233,7 +915,7 @@ def alterar_status_bicicleta(idBicicleta: int, acao: StatusBicicleta):
 @router.put("/bicicleta/{idBicicleta}", response_model=BicicletaResponse, tags=["Bicicletas"])
 def atualizar_bicicleta(idBicicleta: int, data: BicicletaCreate):
     try:
-        bicicleta = atualizar_bicicleta_uc.execute(idBicicleta, data.model_dump())
+        bicicleta = _sob_trava(atualizar_bicicleta_uc.execute, idBicicleta, data.model_dump())
         return bicicleta
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -248,6 +930,21 @@ def cadastrar_tranca(data: TrancaCreate):
 def listar_trancas(include_deleted: bool = Query(False, description=INCLUDE_DELETED_DESCRIPTION)):
     return listar_trancas_uc.execute(include_deleted=include_deleted)
 
+@router.get("/tranca/busca", response_model=List[TrancaResponse], tags=["Trancas"])
+def buscar_trancas_por_texto(q: str = Query(..., description=BUSCA_DESCRIPTION), limit: int = Query(20, ge=1, le=100)):
+    try:
+        return buscar_trancas_por_texto_uc.execute(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.get("/tranca/filtro", response_model=List[TrancaResponse], tags=["Trancas"])
+def filtrar_trancas(status_tranca: Optional[StatusTranca] = Query(None, alias="status"), modelo: Optional[str] = None,
+                    localizacao: Optional[str] = None, totem_id: Optional[int] = None):
+    try:
+        return filtrar_trancas_uc.execute({"status": status_tranca, "modelo": modelo, "localizacao": localizacao, "totem_id": totem_id})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
 @router.get("/tranca/{idTranca}", response_model=TrancaResponse, tags=["Trancas"])
 def buscar_tranca(idTranca: int):
     tranca = buscar_tranca_uc.execute(idTranca)
@@ -256,26 +953,18 @@ def buscar_tranca(idTranca: int):
 
 @router.delete("/tranca/{idTranca}", status_code=status.HTTP_204_NO_CONTENT, tags=["Trancas"])
 def deletar_tranca(idTranca: int):
-    deletar_tranca_uc.execute(idTranca)
+    _sob_trava(deletar_tranca_uc.execute, idTranca)
 
-@router.post("/tranca/{idTranca}/status/{acao}", response_model=TrancaResponse, tags=["Trancas"])
-def alterar_status_tranca(idTranca: int, acao: StatusTranca):
-    try:
-        tranca = alterar_status_tranca_uc.execute(idTranca=idTranca, novo_status=acao)
-        return tranca
-    except ValueError as e:
-        if "não encontrada" in str(e):
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
-    
 @router.post("/tranca/integrarNaRede", response_model=TrancaResponse, tags=["Ações"])
-def integrar_tranca_na_rede(data: IntegrarTrancaRequest):
+async def integrar_tranca_na_rede(data: IntegrarTrancaRequest):
     """
     Coloca uma tranca nova ou retornando de reparo de volta na rede de totens.
     """
+    await _validar_funcionario(data.idFuncionario)
     try:
-        # O idFuncionario é recebido mas não utilizado na lógica atual deste microsserviço.
-        tranca = integrar_tranca_uc.execute(
+        tranca = await run_in_threadpool(
+            _sob_trava,
+            integrar_tranca_uc.execute,
             tranca_id=data.idTranca,
             totem_id=data.idTotem,
             funcionario_id=data.idFuncionario
@@ -287,7 +976,7 @@ def integrar_tranca_na_rede(data: IntegrarTrancaRequest):
 @router.put("/tranca/{idTranca}", response_model=TrancaResponse, tags=["Trancas"])
 def atualizar_tranca(idTranca: int, data: TrancaCreate):
     try:
-        tranca = atualizar_tranca_uc.execute(idTranca, data.model_dump())
+        tranca = _sob_trava(atualizar_tranca_uc.execute, idTranca, data.model_dump())
         return tranca
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -303,9 +992,12 @@ def buscar_bicicleta_na_tranca(idTranca: int):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
 @router.post("/tranca/retirarDaRede", response_model=TrancaResponse, tags=["Ações"])
-def retirar_tranca_do_totem(data: RetirarTrancaRequest):
+async def retirar_tranca_do_totem(data: RetirarTrancaRequest):
+    await _validar_funcionario(data.idFuncionario)
     try:
-        tranca = retirar_tranca_uc.execute(
+        tranca = await run_in_threadpool(
+            _sob_trava,
+            retirar_tranca_uc.execute,
             tranca_id=data.idTranca,
             totem_id=data.idTotem,
             status_final=data.statusAcaoReparador,
@@ -318,24 +1010,72 @@ def retirar_tranca_do_totem(data: RetirarTrancaRequest):
 @router.post("/tranca/{idTranca}/trancar", response_model=TrancaResponse, tags=["Ações"])
 def trancar_tranca(idTranca: int, data: AcaoBicicletaRequest):
     try:
-        tranca = trancar_tranca_uc.execute(tranca_id=idTranca, bicicleta_id=data.bicicleta)
+        tranca = _sob_trava(trancar_tranca_uc.execute, tranca_id=idTranca, bicicleta_id=data.bicicleta, reserva_id=data.reserva)
         return tranca
     except ValueError as e:
+        _recusar_se_reservada(e)
         raise HTTPException(status_code=422, detail={"codigo": "DADOS_INVALIDOS", "mensagem": str(e)})
 
 
 @router.post("/tranca/{idTranca}/destrancar", response_model=TrancaResponse, tags=["Ações"])
-def destrancar_tranca(idTranca: int, data: Optional[AcaoBicicletaRequest] = None):
+def destrancar_tranca(idTranca: int, data: Optional[DestrancarRequest] = None):
     """
     Realiza o destrancamento de uma bicicleta de uma tranca.
-    O corpo da requisição é opcional e não é utilizado pela lógica.
+    O corpo da requisição é opcional; se a bicicleta estiver reservada, ele
+    deve trazer a reserva.
     """
     try:
-        tranca = destrancar_tranca_uc.execute(tranca_id=idTranca)
+        tranca = _sob_trava(destrancar_tranca_uc.execute, tranca_id=idTranca, reserva_id=data.reserva if data else None)
         return tranca
     except ValueError as e:
+        _recusar_se_reservada(e)
         raise HTTPException(status_code=422, detail={"codigo": "DADOS_INVALIDOS", "mensagem": str(e)})
 
+def _recusar_se_reservada(e: ValueError) -> None:
+    if str(e) in (ERRO_BICICLETA_RESERVADA, ERRO_TRANCA_RESERVADA):
+        raise HTTPException(status_code=409, detail={"codigo": "RESERVADA", "mensagem": str(e)})
+
+# --- Rotas para Reservas ---
+def _exigir_reservas() -> None:
+    if reservas is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Reservas não estão disponíveis no backend compartilhado.")
+
+def _reservar(reservar, entidade_id: int, duracao: int):
+    try:
+        return reservar(entidade_id, duracao)
+    except ValueError as e:
+        if "não encontrad" in str(e):
+            raise HTTPException(status_code=404, detail={"codigo": "NAO_ENCONTRADO", "mensagem": str(e)})
+        _recusar_se_reservada(e)
+        raise HTTPException(status_code=422, detail={"codigo": "DADOS_INVALIDOS", "mensagem": str(e)})
+
+@router.post("/bicicleta/{idBicicleta}/reservar", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED, tags=["Reservas"])
+def reservar_bicicleta(idBicicleta: int, duracao: int = Query(RESERVA_DURACAO, ge=1, le=RESERVA_DURACAO_MAXIMA, description="Duração da reserva, em segundos.")):
+    """Reserva uma bicicleta disponível presa numa tranca; só quem tiver a reserva pode destrancá-la."""
+    _exigir_reservas()
+    return _reservar(reservar_bicicleta_uc.execute, idBicicleta, duracao)
+
+@router.post("/tranca/{idTranca}/reservar", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED, tags=["Reservas"])
+def reservar_tranca(idTranca: int, duracao: int = Query(RESERVA_DURACAO, ge=1, le=RESERVA_DURACAO_MAXIMA, description="Duração da reserva, em segundos.")):
+    """Reserva uma tranca livre; só quem tiver a reserva pode trancar uma bicicleta nela."""
+    _exigir_reservas()
+    return _reservar(reservar_tranca_uc.execute, idTranca, duracao)
+
+@router.get("/reserva/{reserva_id}", response_model=ReservaResponse, tags=["Reservas"])
+def buscar_reserva(reserva_id: str):
+    _exigir_reservas()
+    reserva = buscar_reserva_uc.execute(reserva_id)
+    if not reserva: raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada.")
+    return reserva
+
+@router.delete("/reserva/{reserva_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Reservas"])
+def cancelar_reserva(reserva_id: str):
+    _exigir_reservas()
+    try:
+        cancelar_reserva_uc.execute(reserva_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
 # --- Rotas para Totens ---
 @router.post("/totem", response_model=TotemResponse, status_code=status.HTTP_201_CREATED, tags=["Totens"])
 def cadastrar_totem(data: TotemCreate):
@@ -346,6 +1086,44 @@ def cadastrar_totem(data: TotemCreate):
 def listar_totens(include_deleted: bool = Query(False, description=INCLUDE_DELETED_DESCRIPTION)):
     return listar_totens_uc.execute(include_deleted=include_deleted)
 
+@router.get("/totem/busca", response_model=List[TotemResponse], tags=["Totens"])
+def buscar_totens_por_texto(q: str = Query(..., description=BUSCA_DESCRIPTION), limit: int = Query(20, ge=1, le=100)):
+    try:
+        return buscar_totens_por_texto_uc.execute(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.get("/totem/filtro", response_model=List[TotemResponse], tags=["Totens"])
+def filtrar_totens(localizacao: Optional[str] = None):
+    try:
+        return filtrar_totens_uc.execute({"localizacao": localizacao})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.get("/totem/trancas", response_model=Dict[int, List[TrancaResponse]], tags=["Totens"])
+def listar_trancas_de_varios_totens(ids: str = Query(..., description=TOTEM_IDS_DESCRIPTION)):
+    totem_ids = ler_ids_de_totens(ids)
+    try:
+        corpo = leituras_por_totem.executar(
+            ("trancas", tuple(totem_ids)),
+            lambda: serializar_lista(trancas_por_totem_adapter, listar_trancas_por_totens_uc.execute(totem_ids)),
+        )
+        return Response(content=corpo, media_type="application/json")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/totem/bicicletas", response_model=Dict[int, List[BicicletaResponse]], tags=["Totens"])
+def listar_bicicletas_de_varios_totens(ids: str = Query(..., description=TOTEM_IDS_DESCRIPTION)):
+    totem_ids = ler_ids_de_totens(ids)
+    try:
+        corpo = leituras_por_totem.executar(
+            ("bicicletas", tuple(totem_ids)),
+            lambda: serializar_lista(bicicletas_por_totem_adapter, listar_bicicletas_por_totens_uc.execute(totem_ids)),
+        )
+        return Response(content=corpo, media_type="application/json")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
 @router.get("/totem/{idTotem}", response_model=TotemResponse, tags=["Totens"])
 def buscar_totem(idTotem: int):
     totem = buscar_totem_uc.execute(idTotem)
@@ -359,11 +1137,30 @@ def deletar_totem(idTotem: int):
 @router.get("/totem/{idTotem}/trancas", response_model=List[TrancaResponse], tags=["Totens"])
 def listar_trancas_do_totem(idTotem: int):
     try:
-        trancas = listar_trancas_por_totem_uc.execute(idTotem)
-        return trancas
+        corpo = leituras_por_totem.executar(
+            ("trancas", idTotem),
+            lambda: serializar_lista(lista_trancas_adapter, listar_trancas_por_totem_uc.execute(idTotem)),
+        )
+        return Response(content=corpo, media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
+@router.post("/totem/{idTotem}/devolver", response_model=TrancaResponse, tags=["Ações"])
+def devolver_bicicleta_no_totem(idTotem: int, data: AcaoBicicletaRequest):
+    """
+    Devolve a bicicleta numa tranca livre do totem escolhida pelo serviço, sem
+    que o cliente precise listar as trancas e disputar uma delas.
+    """
+    try:
+        return _sob_trava(devolver_bicicleta_uc.execute, totem_id=idTotem, bicicleta_id=data.bicicleta, reserva_id=data.reserva)
+    except ValueError as e:
+        _recusar_se_reservada(e)
+        if "não encontrad" in str(e):
+            raise HTTPException(status_code=404, detail={"codigo": "NAO_ENCONTRADO", "mensagem": str(e)})
+        if str(e) == ERRO_TOTEM_SEM_TRANCA_LIVRE:
+            raise HTTPException(status_code=409, detail={"codigo": "TOTEM_SEM_TRANCA_LIVRE", "mensagem": str(e)})
+        raise HTTPException(status_code=422, detail={"codigo": "DADOS_INVALIDOS", "mensagem": str(e)})
+
 @router.put("/totem/{idTotem}", response_model=TotemResponse, tags=["Totens"])
 def atualizar_totem(idTotem: int, data: TotemCreate):
     try:
@@ -375,8 +1172,11 @@ def atualizar_totem(idTotem: int, data: TotemCreate):
 @router.get("/totem/{idTotem}/bicicletas", response_model=List[BicicletaResponse], tags=["Totens"])
 def listar_bicicletas_do_totem(idTotem: int):
     try:
-        bicicletas = listar_bicicletas_por_totem_uc.execute(idTotem)
-        return bicicletas
+        corpo = leituras_por_totem.executar(
+            ("bicicletas", idTotem),
+            lambda: serializar_lista(lista_bicicletas_adapter, listar_bicicletas_por_totem_uc.execute(idTotem)),
+        )
+        return Response(content=corpo, media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
@@ -386,7 +1186,8 @@ def alterar_status_tranca(idTranca: int, acao: StatusTranca):
     Altera o status de uma tranca (ex: para NOVA, EM_REPARO, APOSENTADA).
     """
     try:
-        tranca = alterar_status_tranca_uc.execute(
+        tranca = _sob_trava(
+            alterar_status_tranca_uc.execute,
             tranca_id=idTranca,
             novo_status=acao
         )
@@ -395,7 +1196,256 @@ def alterar_status_tranca(idTranca: int, acao: StatusTranca):
         if "não encontrada" in str(e):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
-    
+
+
+# --- Rotas para Lotes ---
+_ACOES_DO_LOTE = {
+    "trancar": lambda op: _lote_trancar_uc.execute(tranca_id=op.idTranca, bicicleta_id=op.bicicleta, reserva_id=op.reserva),
+    "destrancar": lambda op: _lote_destrancar_uc.execute(tranca_id=op.idTranca, reserva_id=op.reserva),
+    "devolver": lambda op: _lote_devolver_uc.execute(totem_id=op.idTotem, bicicleta_id=op.bicicleta, reserva_id=op.reserva),
+    "integrarBicicleta": lambda op: _lote_integrar_bicicleta_uc.execute(
+        bicicleta_id=op.idBicicleta, tranca_id=op.idTranca, funcionario_id=op.idFuncionario),
+    "retirarBicicleta": lambda op: _lote_retirar_bicicleta_uc.execute(
+        bicicleta_id=op.idBicicleta, tranca_id=op.idTranca, status_final=op.statusAcaoReparador, funcionario_id=op.idFuncionario),
+    "integrarTranca": lambda op: _lote_integrar_tranca_uc.execute(tranca_id=op.idTranca, totem_id=op.idTotem, funcionario_id=op.idFuncionario),
+    "retirarTranca": lambda op: _lote_retirar_tranca_uc.execute(
+        tranca_id=op.idTranca, totem_id=op.idTotem, status_final=op.statusAcaoReparador, funcionario_id=op.idFuncionario),
+    "statusBicicleta": lambda op: _lote_status_bicicleta_uc.execute(bicicleta_id=op.idBicicleta, novo_status=op.acao),
+    "statusTranca": lambda op: _lote_status_tranca_uc.execute(tranca_id=op.idTranca, novo_status=op.acao),
+}
+
+ERRO_LOTE_NAO_EXECUTADA = {"codigo": "NAO_EXECUTADA", "mensagem": "Uma operação anterior do lote falhou."}
+ERRO_LOTE_DESFEITA = {"codigo": "DESFEITA", "mensagem": "Desfeita porque uma operação seguinte do lote falhou."}
+
+class _AcaoRecusada(Exception):
+    """Falha de uma ação do lote, com o status e o erro que a rota dela responderia."""
+    def __init__(self, status_code: int, erro: Dict[str, str]):
+        super().__init__(erro["mensagem"])
+        self.status_code = status_code
+        self.erro = erro
+
+def _erro_da_acao(e: ValueError) -> Tuple[int, Dict[str, str]]:
+    """O mesmo status e código que a rota da ação responderia."""
+    mensagem = str(e)
+    if mensagem in (ERRO_BICICLETA_RESERVADA, ERRO_TRANCA_RESERVADA):
+        return 409, {"codigo": "RESERVADA", "mensagem": mensagem}
+    if mensagem == ERRO_TOTEM_SEM_TRANCA_LIVRE:
+        return 409, {"codigo": "TOTEM_SEM_TRANCA_LIVRE", "mensagem": mensagem}
+    if "não encontrad" in mensagem:
+        return 404, {"codigo": "NAO_ENCONTRADO", "mensagem": mensagem}
+    return 422, {"codigo": "DADOS_INVALIDOS", "mensagem": mensagem}
+
+def _guardar_afetadas(op: BaseModel) -> None:
+    """Guarda na unidade de trabalho as bicicletas e trancas que a ação pode alterar."""
+    unidade_de_trabalho.guardar_tranca(getattr(op, "idTranca", None))
+    unidade_de_trabalho.guardar_bicicleta(getattr(op, "idBicicleta", None))
+    unidade_de_trabalho.guardar_bicicleta(getattr(op, "bicicleta", None))
+    if op.operacao == "devolver":
+        unidade_de_trabalho.guardar_trancas_do_totem(op.idTotem)
+    elif op.operacao == "retirarBicicleta" and op.idTranca is None:
+        tranca = localizar_tranca(localizacao_bicicletas, tranca_repo, op.idBicicleta)
+        unidade_de_trabalho.guardar_tranca(tranca.id if tranca else None)
+
+def _executar_acao(op: BaseModel, funcionarios_invalidos: Set[int]) -> Any:
+    if getattr(op, "idFuncionario", None) in funcionarios_invalidos:
+        raise _AcaoRecusada(422, {"codigo": "FUNCIONARIO_INVALIDO", "mensagem": "Funcionário não encontrado."})
+    _guardar_afetadas(op)
+    try:
+        return _ACOES_DO_LOTE[op.operacao](op)
+    except ValueError as e:
+        raise _AcaoRecusada(*_erro_da_acao(e))
+
+def _executar_lote(operacoes: List[BaseModel], funcionarios_invalidos: Set[int], parar_no_erro: bool) -> Dict[str, Any]:
+    resultados: List[Dict[str, Any]] = [{"indice": indice, "operacao": op.operacao} for indice, op in enumerate(operacoes)]
+    if parar_no_erro:
+        # Uma única unidade de trabalho: na primeira falha tudo é desfeito.
+        try:
+            with unidade_de_trabalho.executar():
+                for resultado, op in zip(resultados, operacoes):
+                    try:
+                        resultado.update(status=200, resultado=_executar_acao(op, funcionarios_invalidos))
+                    except _AcaoRecusada as e:
+                        resultado.update(status=e.status_code, erro=e.erro)
+                        raise
+        except _AcaoRecusada:
+            for resultado in resultados:
+                if "status" not in resultado:
+                    resultado.update(status=424, erro=ERRO_LOTE_NAO_EXECUTADA)
+                elif resultado["status"] == 200:
+                    resultado.update(status=424, resultado=None, erro=ERRO_LOTE_DESFEITA)
+    else:
+        # Melhor esforço: cada ação é uma unidade de trabalho própria.
+        for resultado, op in zip(resultados, operacoes):
+            try:
+                with unidade_de_trabalho.executar():
+                    resultado.update(status=200, resultado=_executar_acao(op, funcionarios_invalidos))
+            except _AcaoRecusada as e:
+                resultado.update(status=e.status_code, erro=e.erro)
+    return {
+        "executadas": sum(r["status"] == 200 for r in resultados),
+        "falhas": sum(r["status"] not in (200, 424) for r in resultados),
+        "resultados": resultados,
+    }
+
+@router.post("/batch", response_model=LoteResponse, tags=["Ações"])
+async def executar_lote(data: LoteRequest):
+    """
+    Executa em ordem uma lista de ações (trancar, destrancar, devolver,
+    integrar, retirar e alterar status), com o resultado de cada uma no
+    formato da rota correspondente. Pensado para aparelhos que acumulam ações
+    sem conexão e as reenviam de uma vez.
+
+    Com pararNoErro (padrão) o lote é uma unidade de trabalho: roda sob a
+    trava das ações, os eventos e notificações só saem se todas derem certo
+    e, na primeira falha, as bicicletas e trancas voltam ao estado de antes
+    do lote; as ações já feitas voltam com 424 (DESFEITA) e as seguintes
+    com 424 (NAO_EXECUTADA). Sem pararNoErro é melhor esforço: cada ação é
+    confirmada ou desfeita sozinha.
+    """
+    funcionarios = list({op.idFuncionario for op in data.operacoes if hasattr(op, "idFuncionario")})
+    # Cada funcionário é validado uma vez, antes de qualquer ação; com o
+    # serviço fora do ar nenhuma é executada e o lote inteiro recebe 503.
+    existem = await asyncio.gather(*(_funcionario_existe(funcionario_id) for funcionario_id in funcionarios))
+    invalidos = {funcionario_id for funcionario_id, existe in zip(funcionarios, existem) if not existe}
+    # Uma única ida ao threadpool para o lote inteiro, em vez de uma por ação.
+    return await run_in_threadpool(_executar_lote, data.operacoes, invalidos, data.pararNoErro)
+
+
+# --- Rotas para Sincronização ---
+@router.get("/mudancas", response_model=PaginaDeMudancasResponse, tags=["Sincronização"])
+def listar_mudancas(
+    desde: int = Query(0, ge=0, description="Última sequência já aplicada pelo consumidor"),
+    limit: int = Query(500, ge=1, le=5000, description="Quantidade máxima de mudanças retornadas"),
+):
+    """
+    Retorna apenas as mudanças posteriores ao cursor 'desde'.
+    Se o cursor já saiu do log, responde 410 e o consumidor deve recarregar as
+    listas completas e continuar a partir de 'sequencia_atual'.
+    """
+    pagina = listar_mudancas_uc.execute(desde=desde, limite=limit)
+    if pagina.ressincronizar:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={
+                "codigo": "RESSINCRONIZACAO_NECESSARIA",
+                "mensagem": "O cursor informado não está mais disponível no log de mudanças.",
+                "sequencia_atual": pagina.sequencia_atual,
+            },
+        )
+    return pagina
+
+# --- Rotas de Administração ---
+@router.get("/admin/coalescencia", tags=["Administração"])
+def estatisticas_coalescencia():
+    """Contadores da coalescência das leituras por totem."""
+    return leituras_por_totem.estatisticas()
+
+@router.get("/admin/admissao", tags=["Administração"])
+def estatisticas_admissao():
+    """Ocupação, filas e recusas do controle de admissão, por classe de rota."""
+    return controlador_admissao.estatisticas()
+
+@router.get("/admin/limites", tags=["Administração"])
+def estatisticas_limites():
+    """Requisições permitidas e recusadas pelo limite por cliente e baldes em uso."""
+    return limitador_taxa.estatisticas()
+
+@router.get("/admin/stats", tags=["Administração"])
+async def estatisticas_de_execucao(
+    profundo: bool = Query(False, description="Calcular o tamanho aproximado de repositórios e caches (percorre todos os objetos)"),
+    alocacoes: int = Query(0, ge=0, le=100, description="Linhas do tracemalloc a mostrar; a primeira chamada liga o rastreamento"),
+):
+    """Entidades e memória por repositório e cache, coletor de lixo, threadpool e alocações."""
+    # Lido antes de a contagem ocupar ela mesma uma thread do threadpool.
+    threadpool = utilizacao_threadpool()
+    resultado = await run_in_threadpool(montar_estatisticas_de_memoria, profundo, alocacoes)
+    resultado["threadpool"] = threadpool
+    return resultado
+
+@router.delete("/admin/stats/alocacoes", status_code=status.HTTP_204_NO_CONTENT, tags=["Administração"])
+def parar_rastreamento_de_alocacoes():
+    """Desliga o tracemalloc ligado por GET /admin/stats?alocacoes=N."""
+    amostrador_alocacoes.parar()
+
+@router.get("/admin/rastros", tags=["Administração"])
+def listar_rastros(limit: int = Query(100, ge=1, le=1000), trace_id: Optional[str] = None):
+    """Spans mais recentes do buffer em memória, opcionalmente de um único rastro."""
+    return {**rastreador.estatisticas(), "spans": spans_recentes.recentes(limit, trace_id)}
+
+@router.get("/admin/lentas", tags=["Administração"])
+def listar_requisicoes_lentas():
+    """Limiar, contadores e as requisições lentas mais recentes deste processo."""
+    return {**registro_lentas.estatisticas(), "recentes": registro_lentas.recentes()}
+
+@router.get("/admin/reservas", tags=["Administração"])
+def estatisticas_reservas():
+    """Reservas ativas e quantas já venceram neste processo."""
+    _exigir_reservas()
+    return {**reservas.estatisticas(), "falhas_ao_expirar": expirador_reservas.falhas}
+
+@router.get("/admin/funcionarios", tags=["Administração"])
+def estatisticas_funcionarios():
+    """Cache, coalescência e disjuntor da validação de funcionários."""
+    if cliente_funcionarios is None:
+        return {"ativo": False}
+    return {"ativo": True, **cliente_funcionarios.estatisticas()}
+
+@router.get("/admin/notificacoes", tags=["Administração"])
+def estatisticas_notificacoes():
+    """Notificações pendentes, entregues e descartadas por destino, e as últimas descartadas."""
+    if caixa_de_saida is None:
+        return {"ativo": False}
+    return {
+        "ativo": True,
+        **caixa_de_saida.estatisticas(),
+        **despachante_notificacoes.estatisticas(),
+        "ultimas_descartadas": caixa_de_saida.ultimas_descartadas(),
+    }
+
+@router.get("/admin/snapshot", tags=["Administração"])
+def estatisticas_snapshot():
+    """Contadores de remontagens e reaproveitamentos do snapshot da rede."""
+    return snapshot_da_rede.estatisticas()
+
+@router.get("/admin/transicoes", tags=["Administração"])
+def estatisticas_transicoes():
+    """Quantas vezes cada transição de status foi aplicada, por operação."""
+    return {"bicicleta": MAQUINA_BICICLETA.estatisticas(), "tranca": MAQUINA_TRANCA.estatisticas()}
+
+# --- Rotas da Rede ---
+@router.get("/rede/snapshot", tags=["Rede"])
+def obter_snapshot_da_rede(request: Request):
+    """
+    Topologia completa da rede (totens, trancas e bicicletas presas) num
+    único documento compacto, comprimido com gzip quando o cliente aceita.
+    O snapshot só é remontado quando algum dado muda; com If-None-Match
+    igual ao ETag atual a resposta é 304 sem corpo.
+    """
+    snapshot = snapshot_da_rede.obter()
+    cabecalhos = {"ETag": snapshot.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        cabecalhos["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.corpo_gzip, media_type="application/json", headers=cabecalhos)
+    return Response(content=snapshot.corpo, media_type="application/json", headers=cabecalhos)
+
+@router.get("/eventos", tags=["Sincronização"])
+async def transmitir_eventos_sse(
+    totem: Optional[int] = Query(None, description="Receber apenas eventos deste totem"),
+    entidade: Optional[Literal["bicicleta", "tranca"]] = Query(None, description="Receber apenas eventos deste tipo de entidade"),
+):
+    """
+    Envia por Server-Sent Events as mudanças de estado de trancas e bicicletas
+    assim que os casos de uso as confirmam.
+    """
+    assinatura = difusor_eventos.inscrever(totem_id=totem, entidade=entidade)
+    return StreamingResponse(
+        transmitir_eventos(difusor_eventos, assinatura),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
     
 @router.get("/restaurarDados", status_code=status.HTTP_200_OK, tags=["Testes"])
 def restaurar_dados():
@@ -404,7 +1454,8 @@ def restaurar_dados():
     Útil para garantir um estado limpo antes de executar testes automatizados.
     """
     try:
-        restaurar_dados_uc.execute()
+        _sob_trava(restaurar_dados_uc.execute)
+        snapshot_da_rede.invalidar()
         return {"message": "Dados restaurados para o estado inicial com sucesso."}
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,185 @@
+# src/equipamento/infrastructure/web/runtime_stats.py
+"""
+Estatísticas de execução e contabilidade de memória para GET /admin/stats.
+
+O tamanho profundo é uma aproximação: soma o sys.getsizeof de cada objeto
+alcançável a partir das raízes (contêineres, __dict__ e __slots__), contando
+cada objeto uma única vez. Objetos compartilhados por todo o processo
+(classes, módulos, funções, membros de Enum) não entram na conta.
+"""
+
+import gc
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from enum import Enum
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import anyio.to_thread
+
+_NAO_CONTABILIZADOS = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, Enum)
+_ATOMICOS = (str, bytes, bytearray, int, float, bool, type(None), memoryview)
+
+
+def _slots(tipo: type) -> List[str]:
+    nomes = []
+    for classe in tipo.__mro__:
+        slots = classe.__dict__.get("__slots__", ())
+        nomes.extend((slots,) if isinstance(slots, str) else slots)
+    return nomes
+
+
+def tamanho_profundo(raiz: Any, vistos: Optional[Set[int]] = None) -> int:
+    """
+    Bytes aproximados de 'raiz' e de tudo o que ela alcança. Passe o mesmo
+    'vistos' para várias raízes para que o que elas compartilham seja
+    contado só na primeira.
+    """
+    vistos = set() if vistos is None else vistos
+    total = 0
+    pendentes = [raiz]
+    while pendentes:
+        objeto = pendentes.pop()
+        if id(objeto) in vistos or isinstance(objeto, _NAO_CONTABILIZADOS):
+            continue
+        vistos.add(id(objeto))
+        total += sys.getsizeof(objeto)
+        if isinstance(objeto, _ATOMICOS):
+            continue
+        # list() de um contêiner embutido é feito em C sem soltar o GIL, então
+        # não falha se outra thread alterar o contêiner durante a contagem.
+        if isinstance(objeto, dict):
+            for chave, valor in list(objeto.items()):
+                pendentes.append(chave)
+                pendentes.append(valor)
+        elif isinstance(objeto, (list, tuple, set, frozenset, deque)):
+            pendentes.extend(list(objeto))
+        if hasattr(objeto, "__dict__"):
+            pendentes.append(objeto.__dict__)
+        for nome in _slots(type(objeto)):
+            valor = getattr(objeto, nome, None)
+            if valor is not None:
+                pendentes.append(valor)
+    return total
+
+
+def tamanhos_profundos(raizes: Dict[str, Any], reservados: Iterable[Any] = (),
+                       vistos: Optional[Set[int]] = None) -> Dict[str, int]:
+    """
+    Tamanho profundo de cada raiz; o que elas compartilham entra só na
+    primeira. Os objetos em 'reservados' não são percorridos (são contados
+    depois, por conta própria).
+    """
+    vistos = set() if vistos is None else vistos
+    ids_reservados = {id(objeto) for objeto in reservados}
+    vistos |= ids_reservados
+    tamanhos = {nome: tamanho_profundo(raiz, vistos) for nome, raiz in raizes.items()}
+    vistos -= ids_reservados
+    return tamanhos
+
+
+def contar_entidades(repositorio, listar: Callable[..., list]) -> Dict[str, int]:
+    """Entidades vivas e excluídas que o repositório mantém (as do arquivo morto não entram)."""
+    vivas = len(listar())
+    if hasattr(repositorio, "excluidos"):
+        excluidas = len(repositorio.excluidos)
+    else:
+        excluidas = len(listar(include_deleted=True)) - vivas
+    return {"vivas": vivas, "excluidas": excluidas}
+
+
+def estatisticas_processo() -> Dict[str, int]:
+    """Memória residente atual e o pico do processo."""
+    resultado = {"rss_maximo_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+    try:
+        with open("/proc/self/statm") as statm:
+            resultado["rss_bytes"] = int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        pass
+    return resultado
+
+
+def estatisticas_gc() -> Dict[str, Any]:
+    return {
+        "contagens": list(gc.get_count()),
+        "limiares": list(gc.get_threshold()),
+        "geracoes": gc.get_stats(),
+    }
+
+
+def utilizacao_threadpool() -> Dict[str, Any]:
+    """Ocupação do threadpool das rotas síncronas. Deve ser chamada de dentro do loop de eventos."""
+    limitador = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "limite": limitador.total_tokens,
+        "em_uso": limitador.borrowed_tokens,
+        "threads_ativas": threading.active_count(),
+    }
+
+
+def _linhas(estatisticas: list, top: int) -> List[Dict[str, Any]]:
+    return [
+        {"local": str(e.traceback[0]), "tamanho_bytes": e.size, "blocos": e.count}
+        for e in estatisticas[:top]
+    ]
+
+
+def _diferencas(estatisticas: list, top: int) -> List[Dict[str, Any]]:
+    return [
+        {"local": str(e.traceback[0]), "diferenca_bytes": e.size_diff, "tamanho_bytes": e.size, "blocos": e.count}
+        for e in estatisticas[:top]
+    ]
+
+
+class AmostradorDeAlocacoes:
+    """
+    Rastreamento do tracemalloc ligado sob demanda.
+
+    A primeira amostra liga o rastreamento; as seguintes trazem as linhas que
+    mais alocaram e o que mais cresceu desde a amostra anterior. O
+    rastreamento custa CPU e memória enquanto estiver ligado, então deve ser
+    desligado com parar() ao fim da investigação.
+    """
+
+    def __init__(self, quadros: int = 1):
+        self.quadros = quadros
+        self._anterior: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tirar_amostra() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def amostrar(self, top: int) -> Dict[str, Any]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.quadros)
+                # Amostra de referência: a próxima já mostra o crescimento desde agora.
+                self._anterior = self._tirar_amostra()
+                return {"ativo": True, "iniciado_agora": True, "maiores": [], "crescimento": []}
+            atual = self._tirar_amostra()
+            anterior, self._anterior = self._anterior, atual
+        rastreada, pico = tracemalloc.get_traced_memory()
+        return {
+            "ativo": True,
+            "iniciado_agora": False,
+            "memoria_rastreada_bytes": rastreada,
+            "pico_bytes": pico,
+            "maiores": _linhas(atual.statistics("lineno"), top),
+            "crescimento": _diferencas(atual.compare_to(anterior, "lineno"), top) if anterior is not None else [],
+        }
+
+    def parar(self) -> None:
+        with self._lock:
+            self._anterior = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {"ativo": tracemalloc.is_tracing()}
@@ -0,0 +1,65 @@
+# src/equipamento/infrastructure/web/single_flight.py
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Chamada:
+    """Uma computação em andamento, compartilhada por todos que pediram a mesma chave."""
+
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado: Any = None
+        self.erro: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalescência de requisições (single-flight).
+
+    Enquanto uma computação para uma chave está em andamento, as chamadas
+    concorrentes com a mesma chave esperam e recebem o mesmo resultado (ou a
+    mesma exceção) em vez de repetir o trabalho. Nada é guardado depois que a
+    computação termina: não é um cache, então não há risco de servir dado velho.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chamadas: Dict[Hashable, _Chamada] = {}
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._chamadas[chave] = _Chamada()
+                self.execucoes += 1
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            chamada.concluida.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao()
+            return chamada.resultado
+        except BaseException as erro:
+            chamada.erro = erro
+            raise
+        finally:
+            with self._lock:
+                del self._chamadas[chave]
+            chamada.concluida.set()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "execucoes": self.execucoes,
+                "coalescidas": self.coalescidas,
+                "em_andamento": len(self._chamadas),
+            }
@@ -0,0 +1,214 @@
+# src/equipamento/infrastructure/web/slow_requests.py
+"""
+Log de requisições lentas.
+
+Toda requisição ganha uma Medicao numa ContextVar. Os casos de uso
+instrumentados anotam nela quanto cada execute levou (os passos) e os
+repositórios instrumentados contam as suas chamadas e o tempo gasto em cada
+método. Ao fim da requisição, se ela passou do limiar, a rota, os
+parâmetros, os passos e as contagens vão para um log estruturado (uma linha
+JSON por requisição) com rotação por tamanho; abaixo do limiar a Medicao é
+simplesmente descartada.
+
+A gravação em disco é feita por uma thread própria (QueueListener), então
+o loop de eventos só enfileira o registro.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+LIMIAR_PADRAO_MS = 1000.0
+MAX_BYTES_PADRAO = 10 * 1024 * 1024
+BACKUPS_PADRAO = 5
+# Quanto do corpo da requisição é guardado para o log.
+CORPO_MAXIMO = 1024
+RECENTES_PADRAO = 100
+# Conexões longas (SSE) duram o quanto o cliente quiser: não são medidas.
+_ISENTOS = ("/eventos",)
+
+
+class Medicao:
+    """Passos e chamadas de repositório de uma requisição em andamento."""
+
+    __slots__ = ("passos", "chamadas")
+
+    def __init__(self):
+        self.passos: List[tuple] = []
+        # "repo.metodo" -> [chamadas, nanossegundos]
+        self.chamadas: Dict[str, List[int]] = {}
+
+
+_medicao_atual: ContextVar[Optional[Medicao]] = ContextVar("medicao_atual", default=None)
+
+
+def _medir_passo(funcao: Callable, nome: str) -> Callable:
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return funcao(*args, **kwargs)
+        inicio = time.perf_counter_ns()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            medicao.passos.append((nome, time.perf_counter_ns() - inicio))
+    return medida
+
+
+def _contar_chamada(funcao: Callable, nome: str) -> Callable:
+    @functools.wraps(funcao)
+    def contada(*args, **kwargs):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return funcao(*args, **kwargs)
+        inicio = time.perf_counter_ns()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            contador = medicao.chamadas.get(nome)
+            if contador is None:
+                contador = medicao.chamadas[nome] = [0, 0]
+            contador[0] += 1
+            contador[1] += time.perf_counter_ns() - inicio
+    return contada
+
+
+def instrumentar_passos(caso_de_uso: Any, nome: str) -> None:
+    """Anota na Medicao corrente a duração de cada execute do caso de uso."""
+    caso_de_uso.execute = _medir_passo(caso_de_uso.execute, nome)
+
+
+def instrumentar_chamadas(repositorio: Any, prefixo: str) -> None:
+    """Conta, na Medicao corrente, as chamadas a cada método público do repositório."""
+    for nome, _ in inspect.getmembers(type(repositorio), inspect.isfunction):
+        if not nome.startswith("_"):
+            setattr(repositorio, nome, _contar_chamada(getattr(repositorio, nome), f"{prefixo}.{nome}"))
+
+
+def arquivo_rotativo(caminho: str, max_bytes: int = MAX_BYTES_PADRAO, backups: int = BACKUPS_PADRAO) -> logging.Handler:
+    # delay: o arquivo só é criado na primeira requisição lenta.
+    handler = logging.handlers.RotatingFileHandler(caminho, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+class RegistroDeLentas:
+    """Grava as requisições acima do limiar e guarda as mais recentes em memória."""
+
+    def __init__(self, limiar_ms: float = LIMIAR_PADRAO_MS, handler: Optional[logging.Handler] = None,
+                 recentes: int = RECENTES_PADRAO):
+        self.limiar_ms = limiar_ms
+        self.requisicoes = 0
+        self.lentas = 0
+        self._recentes: Deque[Dict[str, Any]] = deque(maxlen=recentes)
+        self._fila: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._logger = logging.Logger("equipamento.lentas")
+        self._logger.addHandler(logging.handlers.QueueHandler(self._fila))
+        self._escritor = logging.handlers.QueueListener(self._fila, handler) if handler is not None else None
+        self._gravando = False
+
+    @property
+    def ativo(self) -> bool:
+        return self.limiar_ms > 0
+
+    def iniciar(self) -> None:
+        if self._escritor is not None and not self._gravando:
+            self._escritor.start()
+            self._gravando = True
+
+    def parar(self) -> None:
+        """Para a thread de gravação depois de gravar o que estiver na fila."""
+        if self._gravando:
+            self._escritor.stop()
+            self._gravando = False
+
+    def e_lenta(self, duracao_ms: float) -> bool:
+        self.requisicoes += 1
+        return duracao_ms >= self.limiar_ms
+
+    def registrar(self, registro: Dict[str, Any]) -> None:
+        self.lentas += 1
+        self._recentes.append(registro)
+        if self._escritor is not None:
+            self._logger.warning(json.dumps(registro, ensure_ascii=False, default=str))
+
+    def recentes(self) -> List[Dict[str, Any]]:
+        return list(self._recentes)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {"limiar_ms": self.limiar_ms, "requisicoes": self.requisicoes, "lentas": self.lentas}
+
+
+def _ms(nanossegundos: int) -> float:
+    return round(nanossegundos / 1e6, 3)
+
+
+def _montar_registro(scope, medicao: Medicao, corpo: bytearray, status: Optional[int], duracao: int) -> Dict[str, Any]:
+    rota = scope.get("route")
+    passos_ns = sum(ns for _, ns in medicao.passos)
+    return {
+        "momento": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "metodo": scope["method"],
+        "rota": getattr(rota, "path", scope["path"]),
+        "caminho": scope["path"],
+        "parametros": {
+            "caminho": scope.get("path_params", {}),
+            "consulta": scope.get("query_string", b"").decode("latin-1"),
+            "corpo": corpo.decode("utf-8", "replace"),
+        },
+        "status": status,
+        "duracao_ms": _ms(duracao),
+        "passos": [{"nome": nome, "duracao_ms": _ms(ns)} for nome, ns in medicao.passos],
+        # Validação, serialização, espera no threadpool e na admissão.
+        "fora_dos_passos_ms": _ms(duracao - passos_ns),
+        "chamadas": {
+            nome: {"quantidade": quantidade, "duracao_ms": _ms(ns)}
+            for nome, (quantidade, ns) in sorted(medicao.chamadas.items())
+        },
+    }
+
+
+class RequisicoesLentasMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP e entrega as lentas ao RegistroDeLentas."""
+
+    def __init__(self, app, registro: RegistroDeLentas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(_ISENTOS):
+            await self.app(scope, receive, send)
+            return
+        medicao = Medicao()
+        corpo = bytearray()
+        status_resposta = [None]
+
+        async def receber():
+            mensagem = await receive()
+            if mensagem["type"] == "http.request" and len(corpo) < CORPO_MAXIMO:
+                corpo.extend(mensagem.get("body", b"")[:CORPO_MAXIMO - len(corpo)])
+            return mensagem
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status_resposta[0] = mensagem["status"]
+            await send(mensagem)
+
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter_ns()
+        try:
+            await self.app(scope, receber, enviar)
+        finally:
+            _medicao_atual.reset(token)
+            duracao = time.perf_counter_ns() - inicio
+            # Abaixo do limiar nada é montado: a Medicao é só descartada.
+            if self.registro.e_lenta(duracao / 1e6):
+                self.registro.registrar(_montar_registro(scope, medicao, corpo, status_resposta[0], duracao))
@@ -0,0 +1,119 @@
+# src/equipamento/infrastructure/web/snapshot.py
+"""
+Snapshot compacto da rede inteira para os painéis de operação.
+
+Formato (JSON, status como índices nas listas de legenda):
+
+    {
+      "geracao": ...,
+      "status_bicicleta": ["DISPONÍVEL", ...],
+      "status_tranca": ["DISPONÍVEL", ...],
+      "totens": [[id, localizacao, [[tranca_id, numero, status, bicicleta], ...]], ...]
+    }
+
+onde bicicleta é [bicicleta_id, status] ou null.
+"""
+
+import gzip
+import json
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional
+
+from ...application.use_cases import TopologiaDaRede
+from ...domain.entities import StatusBicicleta, StatusTranca
+
+STATUS_BICICLETA = list(StatusBicicleta)
+STATUS_TRANCA = list(StatusTranca)
+CODIGO_STATUS_BICICLETA = {s: i for i, s in enumerate(STATUS_BICICLETA)}
+CODIGO_STATUS_TRANCA = {s: i for i, s in enumerate(STATUS_TRANCA)}
+NIVEL_GZIP = 6
+
+
+def codificar_topologia(topologia: TopologiaDaRede, geracao: Hashable) -> bytes:
+    totens = []
+    for totem, trancas in topologia:
+        totens.append([
+            totem.id,
+            totem.localizacao,
+            [
+                [
+                    tranca.id,
+                    tranca.numero,
+                    CODIGO_STATUS_TRANCA[tranca.status],
+                    [bicicleta.id, CODIGO_STATUS_BICICLETA[bicicleta.status]] if bicicleta else None,
+                ]
+                for tranca, bicicleta in trancas
+            ],
+        ])
+    documento = {
+        "geracao": geracao,
+        "status_bicicleta": [s.value for s in STATUS_BICICLETA],
+        "status_tranca": [s.value for s in STATUS_TRANCA],
+        "totens": totens,
+    }
+    return json.dumps(documento, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    geracao: Hashable
+    etag: str
+    corpo: bytes
+    corpo_gzip: bytes
+
+
+class SnapshotEmCache:
+    """
+    Mantém o último snapshot já codificado e comprimido.
+
+    A cada pedido só a geração é consultada; o snapshot é remontado apenas
+    quando ela muda. A geração é lida antes da montagem, então uma mudança
+    durante a montagem invalida o resultado no pedido seguinte. Pedidos
+    simultâneos com a geração desatualizada esperam uma única remontagem.
+    """
+
+    def __init__(self, geracao: Callable[[], Hashable], montar: Callable[[], TopologiaDaRede],
+                 instancia: Optional[str] = None):
+        self._geracao = geracao
+        self._montar = montar
+        self._atual: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        # A geração recomeça junto com o processo; o prefixo evita que um
+        # ETag de outra vida do processo seja confundido com o atual. Com uma
+        # geração compartilhada entre workers, a instância também precisa ser.
+        self._instancia = instancia or uuid.uuid4().hex[:8]
+        self.reconstrucoes = 0
+        self.acertos = 0
+
+    def obter(self) -> Snapshot:
+        geracao = self._geracao()
+        atual = self._atual
+        if atual is not None and atual.geracao == geracao:
+            self.acertos += 1
+            return atual
+
+        with self._lock:
+            geracao = self._geracao()
+            atual = self._atual
+            if atual is not None and atual.geracao == geracao:
+                self.acertos += 1
+                return atual
+            corpo = codificar_topologia(self._montar(), geracao)
+            self._atual = Snapshot(
+                geracao=geracao,
+                etag=f'"{self._instancia}-{abs(hash(geracao)):x}"',
+                corpo=corpo,
+                corpo_gzip=gzip.compress(corpo, compresslevel=NIVEL_GZIP, mtime=0),
+            )
+            self.reconstrucoes += 1
+            return self._atual
+
+    def invalidar(self) -> None:
+        """Descarta o snapshot atual; usado quando os dados mudam sem avançar a geração."""
+        with self._lock:
+            self._atual = None
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {"reconstrucoes": self.reconstrucoes, "acertos": self.acertos}
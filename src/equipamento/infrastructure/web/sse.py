@@ -0,0 +1,203 @@
+# src/equipamento/infrastructure/web/sse.py
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ...application.repositories import PublicadorDeEventosInterface
+from ...domain.entities import Evento
+
+CAPACIDADE_PADRAO_ASSINATURA = 256
+INTERVALO_KEEP_ALIVE = 15.0
+INTERVALO_RETRANSMISSAO = 0.05
+LOTE_RETRANSMISSAO = 1000
+
+
+class Assinatura:
+    """
+    Fila limitada de eventos de um único assinante SSE.
+
+    Os eventos pendentes são indexados por (entidade, id): um novo evento da mesma
+    entidade substitui o anterior (coalescência), já que o painel só precisa do
+    estado mais recente. Se a fila enche com entidades distintas, o evento mais
+    antigo é descartado. Em nenhum caso quem publica fica bloqueado.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, totem_id: Optional[int] = None,
+                 entidade: Optional[str] = None, capacidade: int = CAPACIDADE_PADRAO_ASSINATURA):
+        self.loop = loop
+        self.totem_id = totem_id
+        self.entidade = entidade
+        self.capacidade = capacidade
+        self.coalescidos = 0
+        self.descartados = 0
+        self._descartes_nao_avisados = 0
+        self._pendentes: "OrderedDict[Tuple[str, int], Evento]" = OrderedDict()
+        self._sinal = asyncio.Event()
+
+    def aceita(self, evento: Evento) -> bool:
+        if self.entidade is not None and evento.entidade != self.entidade:
+            return False
+        if self.totem_id is not None and evento.totem_id != self.totem_id:
+            return False
+        return True
+
+    def entregar(self, evento: Evento) -> None:
+        """Enfileira o evento. Deve ser chamado na thread do event loop."""
+        chave = (evento.entidade, evento.entidade_id)
+        if chave in self._pendentes:
+            self.coalescidos += 1
+            del self._pendentes[chave]
+        elif len(self._pendentes) >= self.capacidade:
+            self._pendentes.popitem(last=False)
+            self.descartados += 1
+            self._descartes_nao_avisados += 1
+        self._pendentes[chave] = evento
+        self._sinal.set()
+
+    async def proximo(self) -> Evento:
+        while not self._pendentes:
+            self._sinal.clear()
+            await self._sinal.wait()
+        return self._pendentes.popitem(last=False)[1]
+
+    def consumir_descartes(self) -> int:
+        """Retorna quantos eventos foram descartados desde a última consulta."""
+        descartes, self._descartes_nao_avisados = self._descartes_nao_avisados, 0
+        return descartes
+
+
+class DifusorDeEventos(PublicadorDeEventosInterface):
+    """
+    Distribui os eventos publicados pelos casos de uso para os assinantes SSE.
+
+    Os casos de uso rodam no threadpool do FastAPI, então a entrega é agendada
+    no event loop de cada assinante com call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._assinaturas: List[Assinatura] = []
+        self._lock = threading.Lock()
+
+    def inscrever(self, totem_id: Optional[int] = None, entidade: Optional[str] = None,
+                  capacidade: int = CAPACIDADE_PADRAO_ASSINATURA) -> Assinatura:
+        """Cria uma assinatura ligada ao event loop em execução."""
+        assinatura = Assinatura(asyncio.get_running_loop(), totem_id=totem_id, entidade=entidade, capacidade=capacidade)
+        with self._lock:
+            # Copy-on-write: publicar() percorre a lista sem segurar o lock.
+            self._assinaturas = self._assinaturas + [assinatura]
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            self._assinaturas = [a for a in self._assinaturas if a is not assinatura]
+
+    @property
+    def total_assinantes(self) -> int:
+        return len(self._assinaturas)
+
+    def publicar(self, evento: Evento) -> None:
+        for assinatura in self._assinaturas:
+            if not assinatura.aceita(evento):
+                continue
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.entregar, evento)
+            except RuntimeError:
+                # O event loop do assinante já foi encerrado.
+                self.cancelar(assinatura)
+
+
+def formatar_evento_sse(evento: Evento) -> str:
+    corpo = {
+        "tipo": evento.tipo,
+        "entidade": evento.entidade,
+        "entidade_id": evento.entidade_id,
+        "totem_id": evento.totem_id,
+        "dados": evento.dados,
+    }
+    return f"event: {evento.tipo}\ndata: {json.dumps(corpo, ensure_ascii=False)}\n\n"
+
+
+async def transmitir_eventos(difusor: DifusorDeEventos, assinatura: Assinatura,
+                             intervalo_keep_alive: float = INTERVALO_KEEP_ALIVE) -> AsyncIterator[str]:
+    """Gera o corpo text/event-stream de uma assinatura até o cliente desconectar."""
+    try:
+        while True:
+            try:
+                evento = await asyncio.wait_for(assinatura.proximo(), timeout=intervalo_keep_alive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            descartes = assinatura.consumir_descartes()
+            if descartes:
+                # Avisa o cliente que perdeu eventos e deve se ressincronizar via /mudancas.
+                yield f"event: EVENTOS_DESCARTADOS\ndata: {json.dumps({'quantidade': descartes})}\n\n"
+            yield formatar_evento_sse(evento)
+    finally:
+        difusor.cancelar(assinatura)
+
+
+class RetransmissorDeEventos:
+    """
+    Tarefa no loop de eventos que, a cada 'intervalo' segundos, lê os eventos
+    novos publicados por qualquer worker num anel compartilhado
+    (ShmPublicadorDeEventos) e os entrega ao difusor local. Sem assinantes
+    neste worker, só o cursor avança.
+    """
+
+    def __init__(self, fonte, difusor: DifusorDeEventos, intervalo: float = INTERVALO_RETRANSMISSAO, lote: int = LOTE_RETRANSMISSAO):
+        self.fonte = fonte
+        self.difusor = difusor
+        self.intervalo = intervalo
+        self.lote = lote
+        self.repassados = 0
+        # Eventos que saíram do anel antes de serem lidos (o worker ficou para trás).
+        self.perdidos = 0
+        self.falhas = 0
+        self._cursor = fonte.sequencia_atual()
+        self._tarefa: Optional[asyncio.Task] = None
+
+    def repassar_agora(self) -> int:
+        if not self.difusor.total_assinantes:
+            self._cursor = self.fonte.sequencia_atual()
+            return 0
+        repassados = 0
+        while True:
+            eventos, sequencia, perdido = self.fonte.eventos_desde(self._cursor, self.lote)
+            if perdido:
+                self.perdidos += max(0, sequencia - self._cursor)
+                self._cursor = sequencia
+                return repassados
+            for evento in eventos:
+                self.difusor.publicar(evento)
+            self._cursor += len(eventos)
+            repassados += len(eventos)
+            self.repassados += len(eventos)
+            if self._cursor >= sequencia:
+                return repassados
+
+    async def _executar(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                self.repassar_agora()
+            except Exception:
+                # Uma leitura com falha não pode parar os repasses seguintes.
+                self.falhas += 1
+
+    def iniciar(self) -> None:
+        """Deve ser chamada de dentro do loop de eventos (no lifespan da aplicação)."""
+        if self._tarefa is None:
+            self._cursor = self.fonte.sequencia_atual()
+            self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {"repassados": self.repassados, "perdidos": self.perdidos, "falhas": self.falhas}
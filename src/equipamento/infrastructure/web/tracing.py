@@ -0,0 +1,329 @@
+# src/equipamento/infrastructure/web/tracing.py
+"""
+Rastreamento leve de requisições em spans.
+
+O RastreamentoMiddleware abre o span raiz de cada requisição amostrada e o
+guarda numa ContextVar; a rota (via RotaRastreada), os casos de uso e os
+repositórios instrumentados abrem spans filhos do span corrente. Como o
+contexto é copiado para as threads do threadpool, os spans das rotas
+síncronas continuam ligados à requisição. Cada span terminado vai para os
+exportadores configurados.
+
+O span raiz traz também validacao_ms (do início da requisição até a função
+da rota, o que inclui ler e validar o corpo) e serializacao_ms (do fim da
+função da rota até o início da resposta).
+
+Com a amostragem em 0 nada é instrumentado e o middleware não é instalado,
+então o custo é nulo. Ligado, uma chamada fora de requisição amostrada custa
+só uma leitura da ContextVar.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+CABECALHO_TRACEPARENT = b"traceparent"
+CAPACIDADE_MEMORIA_PADRAO = 10_000
+
+
+class Span:
+    """Uma operação cronometrada dentro de um rastro."""
+
+    __slots__ = ("trace_id", "span_id", "pai_id", "nome", "inicio_ns", "duracao_ns", "atributos", "erro", "_t0")
+
+    def __init__(self, trace_id: str, span_id: str, pai_id: Optional[str], nome: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.pai_id = pai_id
+        self.nome = nome
+        self.inicio_ns = time.time_ns()
+        self.duracao_ns = 0
+        self.atributos: Dict[str, Any] = {}
+        self.erro: Optional[str] = None
+        self._t0 = time.perf_counter_ns()
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "pai_id": self.pai_id,
+            "nome": self.nome,
+            "inicio_ns": self.inicio_ns,
+            "duracao_ms": self.duracao_ns / 1e6,
+            "atributos": self.atributos,
+            "erro": self.erro,
+        }
+
+
+_span_atual: ContextVar[Optional[Span]] = ContextVar("span_atual", default=None)
+
+
+def span_atual() -> Optional[Span]:
+    return _span_atual.get()
+
+
+def _novo_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def _novo_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+# ===================================================================
+# Exportadores: qualquer objeto com exportar(span) serve.
+# ===================================================================
+
+class ExportadorEmMemoria:
+    """Buffer circular com os spans mais recentes, consultado por GET /admin/rastros."""
+
+    def __init__(self, capacidade: int = CAPACIDADE_MEMORIA_PADRAO):
+        self._spans: Deque[Span] = deque(maxlen=capacidade)
+
+    def exportar(self, span: Span) -> None:
+        # deque.append com maxlen é atômico: dispensa trava.
+        self._spans.append(span)
+
+    def recentes(self, limite: int, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return [s.como_dict() for s in spans[-limite:]]
+
+
+class ExportadorArquivoJson:
+    """Acrescenta cada span como uma linha JSON num arquivo."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._arquivo = open(caminho, "a", encoding="utf-8", buffering=1)
+
+    def exportar(self, span: Span) -> None:
+        linha = json.dumps(span.como_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._arquivo.write(linha + "\n")
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._arquivo.close()
+
+
+# ===================================================================
+# Rastreador
+# ===================================================================
+
+class Rastreador:
+    """Decide a amostragem das requisições e entrega os spans terminados aos exportadores."""
+
+    def __init__(self, amostragem: float = 0.0, exportadores: Optional[List[Any]] = None,
+                 aleatorio: Callable[[], float] = random.random):
+        if not 0.0 <= amostragem <= 1.0:
+            raise ValueError("A amostragem deve estar entre 0 e 1.")
+        self.amostragem = amostragem
+        self.exportadores = list(exportadores or [])
+        self._aleatorio = aleatorio
+        self.exportados = 0
+        self.falhas_de_exportacao = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.amostragem > 0
+
+    def iniciar_raiz(self, nome: str, traceparent: Optional[str] = None) -> Optional[Span]:
+        """Span raiz de uma requisição, ou None se ela não foi amostrada."""
+        contexto = _ler_traceparent(traceparent) if traceparent else None
+        if contexto is not None:
+            trace_id, pai_id, amostrado = contexto
+            if not amostrado:
+                return None
+            return Span(trace_id, _novo_span_id(), pai_id, nome)
+        if self._aleatorio() >= self.amostragem:
+            return None
+        return Span(_novo_trace_id(), _novo_span_id(), None, nome)
+
+    def iniciar_filho(self, pai: Span, nome: str) -> Span:
+        return Span(pai.trace_id, _novo_span_id(), pai.span_id, nome)
+
+    def finalizar(self, span: Span) -> None:
+        span.duracao_ns = time.perf_counter_ns() - span._t0
+        for exportador in self.exportadores:
+            try:
+                exportador.exportar(span)
+            except Exception:
+                # Um exportador com problema não pode derrubar a requisição.
+                self.falhas_de_exportacao += 1
+        self.exportados += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "amostragem": self.amostragem,
+            "exportados": self.exportados,
+            "falhas_de_exportacao": self.falhas_de_exportacao,
+        }
+
+
+def _ler_traceparent(valor: str):
+    """(trace_id, pai_id, amostrado) de um cabeçalho W3C traceparent, ou None se for inválido."""
+    partes = valor.strip().split("-")
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16:
+        return None
+    try:
+        flags = int(partes[3], 16)
+        int(partes[1], 16), int(partes[2], 16)
+    except ValueError:
+        return None
+    return partes[1], partes[2], bool(flags & 1)
+
+
+# ===================================================================
+# Instrumentação
+# ===================================================================
+
+def _rastrear(rastreador: Rastreador, funcao: Callable, nome: str) -> Callable:
+    if asyncio.iscoroutinefunction(funcao):
+        @functools.wraps(funcao)
+        async def rastreada_async(*args, **kwargs):
+            pai = _span_atual.get()
+            if pai is None:
+                return await funcao(*args, **kwargs)
+            span = rastreador.iniciar_filho(pai, nome)
+            token = _span_atual.set(span)
+            try:
+                return await funcao(*args, **kwargs)
+            except BaseException as erro:
+                span.erro = type(erro).__name__
+                raise
+            finally:
+                _span_atual.reset(token)
+                rastreador.finalizar(span)
+        return rastreada_async
+
+    @functools.wraps(funcao)
+    def rastreada(*args, **kwargs):
+        pai = _span_atual.get()
+        if pai is None:
+            return funcao(*args, **kwargs)
+        span = rastreador.iniciar_filho(pai, nome)
+        token = _span_atual.set(span)
+        try:
+            return funcao(*args, **kwargs)
+        except BaseException as erro:
+            span.erro = type(erro).__name__
+            raise
+        finally:
+            _span_atual.reset(token)
+            rastreador.finalizar(span)
+    return rastreada
+
+
+def instrumentar(rastreador: Rastreador, objeto: Any, prefixo: str, metodos: Optional[List[str]] = None) -> None:
+    """
+    Troca, só nesta instância, os métodos públicos (ou os listados) por
+    versões que abrem um span 'prefixo.metodo'. Quem já guardou referência
+    ao objeto passa a ver os métodos rastreados.
+    """
+    if metodos is None:
+        metodos = [
+            nome for nome, atributo in inspect.getmembers(type(objeto), inspect.isfunction)
+            if not nome.startswith("_")
+        ]
+    for nome in metodos:
+        setattr(objeto, nome, _rastrear(rastreador, getattr(objeto, nome), f"{prefixo}.{nome}"))
+
+
+def classe_de_rota(rastreador: Rastreador) -> type:
+    """APIRoute cuja função de rota abre um span e marca no span raiz quanto durou a validação."""
+
+    def _marcar_inicio(funcao: Callable) -> Callable:
+        if getattr(funcao, "_rota_rastreada", False):
+            # include_router recria as rotas com a mesma classe e a função já envolvida.
+            return funcao
+        interna = _rastrear(rastreador, funcao, f"rota.{funcao.__name__}")
+        if asyncio.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def rota_async(*args, **kwargs):
+                raiz = _span_atual.get()
+                if raiz is None:
+                    return await funcao(*args, **kwargs)
+                raiz.atributos["validacao_ms"] = (time.perf_counter_ns() - raiz._t0) / 1e6
+                try:
+                    return await interna(*args, **kwargs)
+                finally:
+                    raiz.atributos["fim_rota_ns"] = time.perf_counter_ns()
+            rota_async._rota_rastreada = True
+            return rota_async
+
+        @functools.wraps(funcao)
+        def rota(*args, **kwargs):
+            raiz = _span_atual.get()
+            if raiz is None:
+                return funcao(*args, **kwargs)
+            raiz.atributos["validacao_ms"] = (time.perf_counter_ns() - raiz._t0) / 1e6
+            try:
+                return interna(*args, **kwargs)
+            finally:
+                raiz.atributos["fim_rota_ns"] = time.perf_counter_ns()
+        rota._rota_rastreada = True
+        return rota
+
+    class RotaRastreada(APIRoute):
+        def __init__(self, path: str, endpoint: Callable, **kwargs):
+            super().__init__(path, _marcar_inicio(endpoint), **kwargs)
+
+    return RotaRastreada
+
+
+class RastreamentoMiddleware:
+    """Middleware ASGI que abre o span raiz das requisições HTTP amostradas."""
+
+    def __init__(self, app, rastreador: Rastreador):
+        self.app = app
+        self.rastreador = rastreador
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for nome, valor in scope["headers"]:
+            if nome == CABECALHO_TRACEPARENT:
+                traceparent = valor.decode("latin-1")
+                break
+        raiz = self.rastreador.iniciar_raiz(f"{scope['method']} {scope['path']}", traceparent)
+        if raiz is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                raiz.atributos["status"] = mensagem["status"]
+                fim_rota = raiz.atributos.pop("fim_rota_ns", None)
+                if fim_rota is not None:
+                    raiz.atributos["serializacao_ms"] = (time.perf_counter_ns() - fim_rota) / 1e6
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"x-trace-id", raiz.trace_id.encode())]}
+            await send(mensagem)
+
+        token = _span_atual.set(raiz)
+        try:
+            await self.app(scope, receive, enviar)
+        except BaseException as erro:
+            raiz.erro = type(erro).__name__
+            raise
+        finally:
+            _span_atual.reset(token)
+            rota = scope.get("route")
+            if rota is not None and hasattr(rota, "path"):
+                # Nome pelo molde da rota, para agrupar /bicicleta/1 e /bicicleta/2.
+                raiz.nome = f"{scope['method']} {rota.path}"
+            raiz.atributos.pop("fim_rota_ns", None)
+            self.rastreador.finalizar(raiz)
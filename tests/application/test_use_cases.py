@@ -5,8 +5,8 @@ import pytest
 
 # Importando o que vamos testar
 from src.equipamento.application.use_cases import *
-from src.equipamento.domain.entities import Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca
-from src.equipamento.application.repositories import BicicletaRepositoryInterface, TrancaRepositoryInterface, TotemRepositoryInterface
+from src.equipamento.domain.entities import Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca, PaginaDeMudancas
+from src.equipamento.application.repositories import BicicletaRepositoryInterface, TrancaRepositoryInterface, TotemRepositoryInterface, RegistroDeMudancasInterface, PublicadorDeEventosInterface, IndiceDeBuscaInterface
 
 # Constantes de erro para facilitar a verificação das mensagens
 ERRO_BICICLETA_NAO_ENCONTRADA = "Bicicleta não encontrada."
@@ -733,3 +733,314 @@ def test_destrancar_tranca_sucesso():
     resultado = use_case.execute(1)
     assert resultado.status == StatusTranca.DISPONIVEL
     assert bicicleta_na_tranca.status == StatusBicicleta.EM_USO
+
+def test_listar_mudancas_delega_ao_registro():
+    mock_registro = MagicMock(spec=RegistroDeMudancasInterface)
+    pagina = PaginaDeMudancas(mudancas=[], sequencia_atual=7)
+    mock_registro.listar_desde.return_value = pagina
+    use_case = ListarMudancasUseCase(registro=mock_registro)
+    assert use_case.execute(desde=7, limite=100) == pagina
+    mock_registro.listar_desde.assert_called_once_with(7, 100)
+
+def test_listar_mudancas_deve_falhar_com_limite_invalido():
+    use_case = ListarMudancasUseCase(registro=MagicMock(spec=RegistroDeMudancasInterface))
+    with pytest.raises(ValueError, match="limite"):
+        use_case.execute(desde=0, limite=0)
+
+def test_trancar_tranca_publica_eventos_da_bicicleta_e_da_tranca():
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_publicador = MagicMock(spec=PublicadorDeEventosInterface)
+    bicicleta_em_uso = Bicicleta(id=1, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.EM_USO)
+    tranca_livre = Tranca(id=2, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=3)
+    mock_tranca_repo.buscar_por_id.return_value = tranca_livre
+    mock_bicicleta_repo.buscar_por_id.return_value = bicicleta_em_uso
+    mock_tranca_repo.salvar.side_effect = lambda t: t
+    use_case = TrancarTrancaUseCase(tranca_repo=mock_tranca_repo, bicicleta_repo=mock_bicicleta_repo, publicador=mock_publicador)
+    use_case.execute(2, 1)
+    eventos = [c.args[0] for c in mock_publicador.publicar.call_args_list]
+    assert [(e.entidade, e.entidade_id, e.totem_id) for e in eventos] == [("bicicleta", 1, 3), ("tranca", 2, 3)]
+    assert all(e.tipo == EVENTO_TRANCA_TRANCADA for e in eventos)
+    assert eventos[1].dados["status"] == StatusTranca.OCUPADA
+
+def test_alterar_status_tranca_nao_publica_evento_quando_falha():
+    mock_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_publicador = MagicMock(spec=PublicadorDeEventosInterface)
+    mock_repo.buscar_por_id.return_value = None
+    use_case = AlterarStatusTrancaUseCase(repository=mock_repo, publicador=mock_publicador)
+    with pytest.raises(ValueError):
+        use_case.execute(1, StatusTranca.EM_REPARO)
+    mock_publicador.publicar.assert_not_called()
+
+def test_cadastrar_bicicleta_indexa_marca_e_modelo():
+    mock_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_indice = MagicMock(spec=IndiceDeBuscaInterface)
+    mock_repo.salvar.side_effect = lambda b: Bicicleta(id=9, marca=b.marca, modelo=b.modelo, ano=b.ano, numero=b.numero, status=b.status)
+    use_case = CadastrarBicicletaUseCase(repository=mock_repo, indice=mock_indice)
+    use_case.execute({"marca": "Caloi", "modelo": "Elite", "ano": "2020", "numero": 1})
+    mock_indice.indexar.assert_called_once_with(9, ["Caloi", "Elite"])
+
+def test_deletar_totem_remove_do_indice():
+    mock_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_indice = MagicMock(spec=IndiceDeBuscaInterface)
+    DeletarTotemUseCase(repository=mock_repo, indice=mock_indice).execute(4)
+    mock_repo.deletar.assert_called_once_with(4)
+    mock_indice.remover.assert_called_once_with(4)
+
+def test_buscar_trancas_por_texto_mantem_a_ordem_do_indice_e_ignora_ids_inexistentes():
+    mock_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_indice = MagicMock(spec=IndiceDeBuscaInterface)
+    tranca_3 = Tranca(id=3, numero=3, localizacao="Centro", ano_de_fabricacao="2020", modelo="M", status=StatusTranca.NOVA)
+    tranca_1 = Tranca(id=1, numero=1, localizacao="Centro", ano_de_fabricacao="2020", modelo="M", status=StatusTranca.NOVA)
+    mock_indice.buscar.return_value = [3, 2, 1]
+    mock_repo.buscar_por_id.side_effect = {3: tranca_3, 2: None, 1: tranca_1}.get
+    resultado = BuscarTrancasPorTextoUseCase(repository=mock_repo, indice=mock_indice).execute("cent", 10)
+    assert resultado == [tranca_3, tranca_1]
+    mock_indice.buscar.assert_called_once_with("cent", 10)
+
+def test_buscar_por_texto_deve_falhar_com_consulta_sem_termos():
+    use_case = BuscarBicicletasPorTextoUseCase(repository=MagicMock(spec=BicicletaRepositoryInterface), indice=MagicMock(spec=IndiceDeBuscaInterface))
+    with pytest.raises(ValueError, match="consulta"):
+        use_case.execute(" -- ", 10)
+
+def test_filtrar_bicicletas_ignora_criterios_vazios():
+    mock_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_repo.filtrar.return_value = []
+    FiltrarBicicletasUseCase(repository=mock_repo).execute({"marca": "Caloi", "ano": None, "status": StatusBicicleta.EM_REPARO})
+    mock_repo.filtrar.assert_called_once_with({"marca": "Caloi", "status": StatusBicicleta.EM_REPARO})
+
+def test_filtrar_sem_criterios_deve_falhar():
+    with pytest.raises(ValueError, match="critério"):
+        FiltrarTrancasUseCase(repository=MagicMock(spec=TrancaRepositoryInterface)).execute({"status": None})
+
+def test_listar_bicicletas_por_totens_agrupa_com_uma_busca_de_bicicletas():
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_totem_repo.buscar_por_id.side_effect = lambda i: Totem(id=i, localizacao="L", descricao="D")
+    mock_tranca_repo.buscar_por_totem_ids.return_value = {
+        1: [Tranca(id=1, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7, totem_id=1)],
+        2: [Tranca(id=2, numero=2, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=2)],
+    }
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL)
+    mock_bicicleta_repo.buscar_por_ids.return_value = [bicicleta]
+    use_case = ListarBicicletasPorTotensUseCase(totem_repo=mock_totem_repo, tranca_repo=mock_tranca_repo, bicicleta_repo=mock_bicicleta_repo)
+
+    resultado = use_case.execute([1, 2, 1])
+
+    assert resultado == {1: [bicicleta], 2: []}
+    mock_tranca_repo.buscar_por_totem_ids.assert_called_once_with([1, 2])
+    mock_bicicleta_repo.buscar_por_ids.assert_called_once_with([7])
+
+def test_listar_trancas_por_totens_falha_informando_os_totens_inexistentes():
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_totem_repo.buscar_por_id.side_effect = lambda i: Totem(id=i, localizacao="L", descricao="D") if i == 1 else None
+    use_case = ListarTrancasPorTotensUseCase(totem_repo=mock_totem_repo, tranca_repo=MagicMock(spec=TrancaRepositoryInterface))
+    with pytest.raises(ValueError, match="IDs: 8, 9"):
+        use_case.execute([1, 8, 9])
+
+def test_montar_topologia_da_rede_associa_bicicletas_as_trancas():
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    totem_1 = Totem(id=1, localizacao="L1", descricao="D")
+    totem_2 = Totem(id=2, localizacao="L2", descricao="D")
+    mock_totem_repo.listar_todos.return_value = [totem_2, totem_1]
+    ocupada = Tranca(id=1, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7, totem_id=1)
+    livre = Tranca(id=2, numero=2, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=1)
+    mock_tranca_repo.buscar_por_totem_ids.return_value = {1: [ocupada, livre], 2: []}
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL)
+    mock_bicicleta_repo.buscar_por_ids.return_value = [bicicleta]
+    use_case = MontarTopologiaDaRedeUseCase(totem_repo=mock_totem_repo, tranca_repo=mock_tranca_repo, bicicleta_repo=mock_bicicleta_repo)
+
+    topologia = use_case.execute()
+
+    assert topologia == [(totem_1, [(ocupada, bicicleta), (livre, None)]), (totem_2, [])]
+    mock_tranca_repo.buscar_por_totem_ids.assert_called_once_with([1, 2])
+    mock_bicicleta_repo.buscar_por_ids.assert_called_once_with([7])
+
+def test_trancar_e_destrancar_mantem_o_mapa_de_localizacao():
+    from src.equipamento.infrastructure.repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    tranca = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=1)
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.EM_USO)
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    mock_tranca_repo.salvar.side_effect = lambda t: t
+    mock_bicicleta_repo.buscar_por_id.return_value = bicicleta
+    localizacao = MemLocalizacaoDeBicicletas()
+
+    TrancarTrancaUseCase(mock_tranca_repo, mock_bicicleta_repo, localizacao=localizacao).execute(3, 7)
+    assert localizacao.tranca_de(7) == 3
+
+    DestrancarTrancaUseCase(mock_tranca_repo, mock_bicicleta_repo, localizacao=localizacao).execute(3)
+    assert localizacao.tranca_de(7) is None
+
+def test_buscar_localizacao_da_bicicleta_usa_o_mapa_sem_listar_as_trancas():
+    from src.equipamento.infrastructure.repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_bicicleta_repo.buscar_por_id.side_effect = lambda i: Bicicleta(id=i, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL) if i in (7, 8) else None
+    tranca = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7, totem_id=1)
+    totem = Totem(id=1, localizacao="L1", descricao="D")
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    mock_totem_repo.buscar_por_id.return_value = totem
+    localizacao = MemLocalizacaoDeBicicletas()
+    reconstruir_localizacoes(localizacao, [tranca])
+    use_case = BuscarLocalizacaoDaBicicletaUseCase(mock_bicicleta_repo, mock_tranca_repo, mock_totem_repo, localizacao=localizacao)
+
+    assert use_case.execute(7) == (tranca, totem)
+    assert use_case.execute(8) is None
+    with pytest.raises(ValueError, match=ERRO_BICICLETA_NAO_ENCONTRADA):
+        use_case.execute(9)
+    mock_tranca_repo.listar_todas.assert_not_called()
+
+def test_buscar_localizacao_corrige_o_mapa_desatualizado():
+    from src.equipamento.infrastructure.repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    atual = Tranca(id=4, numero=2, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7)
+    antiga = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL)
+    mock_tranca_repo.buscar_por_id.return_value = antiga
+    mock_tranca_repo.listar_todas.return_value = [antiga, atual]
+    localizacao = MemLocalizacaoDeBicicletas()
+    localizacao.associar(7, 3)
+    use_case = BuscarLocalizacaoDaBicicletaUseCase(mock_bicicleta_repo, mock_tranca_repo, MagicMock(spec=TotemRepositoryInterface), localizacao=localizacao)
+
+    assert use_case.execute(7) == (atual, None)
+    assert localizacao.tranca_de(7) == 4
+
+def test_retirar_bicicleta_sem_tranca_informada_usa_a_localizacao():
+    from src.equipamento.infrastructure.repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL)
+    tranca = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7)
+    mock_bicicleta_repo.buscar_por_id.return_value = bicicleta
+    mock_bicicleta_repo.salvar.side_effect = lambda b: b
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    localizacao = MemLocalizacaoDeBicicletas()
+    localizacao.associar(7, 3)
+    use_case = RetirarBicicletaDaRedeUseCase(mock_bicicleta_repo, mock_tranca_repo, localizacao=localizacao)
+
+    resultado = use_case.execute(7, None, StatusBicicleta.EM_REPARO)
+
+    assert resultado.status == StatusBicicleta.EM_REPARO
+    assert tranca.bicicleta_id is None
+    assert localizacao.tranca_de(7) is None
+    with pytest.raises(ValueError, match="não está presa"):
+        use_case.execute(7, None, StatusBicicleta.EM_REPARO)
+
+def test_devolver_bicicleta_no_totem_aloca_tranca_livre_e_descarta_entrada_desatualizada():
+    from src.equipamento.infrastructure.repositories.mem_free_docks import MemTrancasLivres
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    livre = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=1)
+    ocupada = Tranca(id=4, numero=2, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=8, totem_id=1)
+    mock_totem_repo.buscar_por_id.return_value = Totem(id=1, localizacao="L1", descricao="D")
+    mock_tranca_repo.buscar_por_id.side_effect = {3: livre, 4: ocupada}.get
+    mock_tranca_repo.salvar.side_effect = lambda t: t
+    mock_bicicleta_repo.buscar_por_id.return_value = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.EM_USO)
+    livres = MemTrancasLivres()
+    livres.liberar(1, 3)
+    # A tranca 4 foi ocupada sem passar pelos casos de uso: a entrada está desatualizada.
+    livres.liberar(1, 4)
+    trancar = TrancarTrancaUseCase(mock_tranca_repo, mock_bicicleta_repo, livres=livres)
+    use_case = DevolverBicicletaNoTotemUseCase(mock_totem_repo, mock_tranca_repo, mock_bicicleta_repo, trancar, livres=livres)
+
+    tranca = use_case.execute(1, 7)
+
+    assert tranca.id == 3
+    assert tranca.status == StatusTranca.OCUPADA and tranca.bicicleta_id == 7
+    assert len(livres) == 0
+
+def test_devolver_bicicleta_no_totem_sem_tranca_livre_ou_com_bicicleta_invalida():
+    from src.equipamento.infrastructure.repositories.mem_free_docks import MemTrancasLivres
+    mock_totem_repo = MagicMock(spec=TotemRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_totem_repo.buscar_por_id.return_value = Totem(id=1, localizacao="L1", descricao="D")
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.EM_USO)
+    mock_bicicleta_repo.buscar_por_id.return_value = bicicleta
+    livres = MemTrancasLivres()
+    use_case = DevolverBicicletaNoTotemUseCase(mock_totem_repo, mock_tranca_repo, mock_bicicleta_repo,
+                                               TrancarTrancaUseCase(mock_tranca_repo, mock_bicicleta_repo, livres=livres), livres=livres)
+
+    with pytest.raises(ValueError, match=ERRO_TOTEM_SEM_TRANCA_LIVRE):
+        use_case.execute(1, 7)
+
+    livres.liberar(1, 3)
+    bicicleta.status = StatusBicicleta.DISPONIVEL
+    with pytest.raises(ValueError, match="não está em uso"):
+        use_case.execute(1, 7)
+    # A bicicleta foi recusada antes da alocação: a tranca continua livre.
+    assert livres.alocar(1) == 3
+
+def test_destrancar_bicicleta_reservada_exige_a_reserva_e_a_encerra():
+    from src.equipamento.infrastructure.repositories.mem_reservations import MemReservas
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    tranca = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7, totem_id=1)
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    mock_tranca_repo.listar_todas.return_value = [tranca]
+    mock_tranca_repo.salvar.side_effect = lambda t: t
+    mock_bicicleta_repo.buscar_por_id.return_value = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL)
+    reservas = MemReservas()
+    reserva = ReservarBicicletaUseCase(mock_bicicleta_repo, mock_tranca_repo, reservas).execute(7, 60)
+    use_case = DestrancarTrancaUseCase(mock_tranca_repo, mock_bicicleta_repo, reservas=reservas)
+
+    with pytest.raises(ValueError, match=ERRO_BICICLETA_RESERVADA):
+        use_case.execute(3)
+    with pytest.raises(ValueError, match=ERRO_BICICLETA_RESERVADA):
+        use_case.execute(3, reserva_id="outra")
+    resultado = use_case.execute(3, reserva_id=reserva.id)
+
+    assert resultado.status == StatusTranca.DISPONIVEL
+    assert reservas.buscar(reserva.id) is None
+
+def test_tranca_reservada_sai_das_livres_e_volta_quando_a_reserva_acaba():
+    from src.equipamento.infrastructure.repositories.mem_free_docks import MemTrancasLivres
+    from src.equipamento.infrastructure.repositories.mem_reservations import MemReservas
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    tranca = Tranca(id=3, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=1)
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    livres = MemTrancasLivres()
+    livres.liberar(1, 3)
+    reservas = MemReservas()
+    liberar = LiberarReservasEncerradasUseCase(mock_tranca_repo, livres=livres)
+
+    reserva = ReservarTrancaUseCase(mock_tranca_repo, reservas, livres=livres).execute(3, 60)
+    assert livres.alocar(1) is None
+    with pytest.raises(ValueError, match=ERRO_TRANCA_RESERVADA):
+        ReservarTrancaUseCase(mock_tranca_repo, reservas, livres=livres).execute(3, 60)
+
+    CancelarReservaUseCase(reservas, liberar).execute(reserva.id)
+
+    assert livres.alocar(1) == 3
+    with pytest.raises(ValueError, match=ERRO_RESERVA_NAO_ENCONTRADA):
+        CancelarReservaUseCase(reservas, liberar).execute(reserva.id)
+
+def test_integrar_e_retirar_bicicleta_guardam_notificacoes_na_caixa_de_saida():
+    from src.equipamento.infrastructure.repositories.mem_outbox import MemCaixaDeSaida
+    mock_bicicleta_repo = MagicMock(spec=BicicletaRepositoryInterface)
+    mock_tranca_repo = MagicMock(spec=TrancaRepositoryInterface)
+    bicicleta = Bicicleta(id=1, marca="M", modelo="M", ano="2024", numero=1, status=StatusBicicleta.NOVA)
+    tranca = Tranca(id=2, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=5)
+    mock_bicicleta_repo.buscar_por_id.return_value = bicicleta
+    mock_tranca_repo.buscar_por_id.return_value = tranca
+    mock_bicicleta_repo.salvar.side_effect = lambda b: b
+    mock_tranca_repo.salvar.side_effect = lambda t: t
+    caixa = MemCaixaDeSaida(["aluguel", "email"])
+
+    IntegrarBicicletaNaRedeUseCase(mock_bicicleta_repo, mock_tranca_repo, caixa=caixa).execute(1, 2, funcionario_id=9)
+    bicicleta.status = StatusBicicleta.REPARO_SOLICITADO
+    RetirarBicicletaDaRedeUseCase(mock_bicicleta_repo, mock_tranca_repo, caixa=caixa).execute(1, 2, StatusBicicleta.EM_REPARO, funcionario_id=9)
+    with pytest.raises(ValueError):
+        RetirarBicicletaDaRedeUseCase(mock_bicicleta_repo, mock_tranca_repo, caixa=caixa).execute(1, 2, StatusBicicleta.EM_REPARO, funcionario_id=9)
+
+    lote = caixa.lote("email", 10)
+    assert [n.tipo for n in lote] == [EVENTO_BICICLETA_INTEGRADA, EVENTO_BICICLETA_RETIRADA]
+    assert lote[1].dados == {"bicicleta_id": 1, "tranca_id": 2, "totem_id": 5, "status": "EM_REPARO", "funcionario_id": 9}
+    assert caixa.pendentes("aluguel") == 2
@@ -0,0 +1,57 @@
+# tests/domain/test_state_machine.py
+
+from src.equipamento.domain.entities import StatusBicicleta, StatusTranca
+from src.equipamento.domain.state_machine import (
+    MaquinaDeEstados,
+    MAQUINA_TRANCA,
+    OPERACAO_ALTERAR_STATUS,
+    OPERACAO_RETIRAR,
+    OPERACAO_TRANCAR,
+)
+
+
+def _maquina():
+    return MaquinaDeEstados(StatusBicicleta, {
+        OPERACAO_TRANCAR: [(StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)],
+        OPERACAO_RETIRAR: [(StatusBicicleta.DISPONIVEL, StatusBicicleta.EM_REPARO), (StatusBicicleta.DISPONIVEL, StatusBicicleta.APOSENTADA)],
+    })
+
+def test_permite_apenas_os_pares_declarados_para_a_operacao():
+    maquina = _maquina()
+
+    assert maquina.permite(OPERACAO_TRANCAR, StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)
+    assert not maquina.permite(OPERACAO_TRANCAR, StatusBicicleta.NOVA, StatusBicicleta.DISPONIVEL)
+    assert not maquina.permite(OPERACAO_RETIRAR, StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)
+    assert maquina.aceita_origem(OPERACAO_RETIRAR, StatusBicicleta.DISPONIVEL)
+    assert not maquina.aceita_origem(OPERACAO_RETIRAR, StatusBicicleta.EM_USO)
+    assert maquina.aceita_destino(OPERACAO_RETIRAR, StatusBicicleta.APOSENTADA)
+    assert not maquina.aceita_destino(OPERACAO_TRANCAR, StatusBicicleta.APOSENTADA)
+
+def test_validar_lote_concorda_com_consultas_individuais():
+    maquina = _maquina()
+    transicoes = [
+        (operacao, origem, destino)
+        for operacao in (OPERACAO_TRANCAR, OPERACAO_RETIRAR)
+        for origem in StatusBicicleta
+        for destino in StatusBicicleta
+    ]
+
+    assert maquina.validar_lote(transicoes) == [maquina.permite(*t) for t in transicoes]
+
+def test_contadores_por_transicao():
+    maquina = _maquina()
+    maquina.registrar(OPERACAO_TRANCAR, StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)
+    maquina.registrar(OPERACAO_TRANCAR, StatusBicicleta.EM_USO, StatusBicicleta.DISPONIVEL)
+    maquina.registrar(OPERACAO_RETIRAR, StatusBicicleta.DISPONIVEL, StatusBicicleta.EM_REPARO)
+
+    assert maquina.estatisticas() == {
+        OPERACAO_TRANCAR: {"EM_USO->DISPONÍVEL": 2},
+        OPERACAO_RETIRAR: {"DISPONÍVEL->EM_REPARO": 1},
+    }
+    maquina.zerar()
+    assert maquina.estatisticas() == {}
+
+def test_tranca_ocupada_so_e_alcancada_e_deixada_pelas_operacoes_proprias():
+    assert not MAQUINA_TRANCA.aceita_destino(OPERACAO_ALTERAR_STATUS, StatusTranca.OCUPADA)
+    assert not MAQUINA_TRANCA.permite(OPERACAO_ALTERAR_STATUS, StatusTranca.OCUPADA, StatusTranca.DISPONIVEL)
+    assert MAQUINA_TRANCA.permite(OPERACAO_ALTERAR_STATUS, StatusTranca.OCUPADA, StatusTranca.REPARO_SOLICITADO)
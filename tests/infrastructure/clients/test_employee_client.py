@@ -0,0 +1,112 @@
+# tests/infrastructure/clients/test_employee_client.py
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.equipamento.infrastructure.clients.employee_client import (
+    ABERTO,
+    FECHADO,
+    CacheDeValidacoes,
+    ClienteDeFuncionarios,
+    Disjuntor,
+    ServicoDeFuncionariosIndisponivel,
+)
+from src.equipamento.infrastructure.clients.employee_stub_server import ServidorDeFuncionariosLocal
+from src.equipamento.infrastructure.web import routes
+
+
+class _Relogio:
+    def __init__(self, agora: float = 1000.0):
+        self.agora = agora
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def test_cache_guarda_negativas_por_menos_tempo_e_descarta_o_menos_usado():
+    relogio = _Relogio()
+    cache = CacheDeValidacoes(capacidade=2, ttl_positivo=60, ttl_negativo=5, relogio=relogio)
+    cache.guardar(1, True)
+    cache.guardar(2, False)
+
+    relogio.agora += 10
+    assert cache.obter(1) is True
+    assert cache.obter(2) is None
+
+    cache.guardar(3, True)
+    cache.guardar(4, True)
+    assert cache.obter(1) is None
+    assert len(cache) == 2
+
+
+def test_consultas_simultaneas_viram_uma_requisicao_e_as_seguintes_saem_do_cache():
+    with ServidorDeFuncionariosLocal(funcionarios=[7], atraso=0.05) as servidor:
+        cliente = ClienteDeFuncionarios(servidor.url)
+
+        async def cenario():
+            resultados = await asyncio.gather(*(cliente.existe(7) for _ in range(50)))
+            repetida = await cliente.existe(7)
+            desconhecidos = [await cliente.existe(i) for i in range(100, 110)]
+            await cliente.fechar()
+            return resultados, repetida, desconhecidos
+
+        resultados, repetida, desconhecidos = asyncio.run(cenario())
+
+    assert all(resultados) and repetida is True
+    assert desconhecidos == [False] * 10
+    assert cliente.coalescidas == 49
+    assert servidor.requisicoes == 11
+    # As consultas em sequência reaproveitam a conexão do pool.
+    assert servidor.conexoes == 1
+
+
+def test_disjuntor_abre_depois_das_falhas_e_fecha_com_a_sondagem():
+    relogio = _Relogio()
+    with ServidorDeFuncionariosLocal(funcionarios=[1]) as servidor:
+        servidor.falhar = True
+        cliente = ClienteDeFuncionarios(servidor.url, disjuntor=Disjuntor(limite_falhas=3, espera=10, relogio=relogio))
+
+        async def consultar():
+            try:
+                return await cliente.existe(1)
+            except ServicoDeFuncionariosIndisponivel as erro:
+                return erro
+
+        async def cenario():
+            falhas = [await consultar() for _ in range(5)]
+            estado_aberto = cliente.disjuntor.estado
+            servidor.falhar = False
+            relogio.agora += 10
+            sondagem = await consultar()
+            await cliente.fechar()
+            return falhas, estado_aberto, sondagem
+
+        falhas, estado_aberto, sondagem = asyncio.run(cenario())
+
+    assert all(isinstance(f, ServicoDeFuncionariosIndisponivel) for f in falhas)
+    assert estado_aberto == ABERTO
+    assert falhas[-1].tentar_em == pytest.approx(10)
+    # Com o disjuntor aberto, as duas últimas nem chegaram ao serviço.
+    assert servidor.requisicoes == 4
+    assert sondagem is True
+    assert cliente.disjuntor.estado == FECHADO
+
+
+def test_acao_de_manutencao_recusa_funcionario_inexistente(monkeypatch):
+    with ServidorDeFuncionariosLocal(funcionarios=[1]) as servidor:
+        monkeypatch.setattr(routes, "cliente_funcionarios", ClienteDeFuncionarios(servidor.url))
+        client = TestClient(app)
+        corpo = {"idTranca": 1, "idTotem": 1, "statusAcaoReparador": "EM_REPARO", "idFuncionario": 99}
+
+        recusada = client.post("/tranca/retirarDaRede", json=corpo)
+        servidor.parar()
+        indisponivel = client.post("/tranca/retirarDaRede", json={**corpo, "idFuncionario": 2})
+
+    assert recusada.status_code == 422
+    assert recusada.json()["detail"]["codigo"] == "FUNCIONARIO_INVALIDO"
+    assert indisponivel.status_code == 503
+    assert indisponivel.json()["detail"]["codigo"] == "FUNCIONARIO_INDISPONIVEL"
+    assert "retry-after" in indisponivel.headers
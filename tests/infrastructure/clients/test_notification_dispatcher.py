@@ -0,0 +1,69 @@
+# tests/infrastructure/clients/test_notification_dispatcher.py
+
+import asyncio
+
+from src.equipamento.infrastructure.clients.notification_dispatcher import DespachanteDeNotificacoes
+from src.equipamento.infrastructure.clients.notification_stub_server import ReceptorDeNotificacoesLocal
+from src.equipamento.infrastructure.repositories.mem_outbox import MemCaixaDeSaida
+
+
+class _Relogio:
+    def __init__(self, agora: float = 1000.0):
+        self.agora = agora
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def test_entrega_em_lotes_para_cada_destino_pela_mesma_conexao():
+    with ReceptorDeNotificacoesLocal() as aluguel, ReceptorDeNotificacoesLocal() as email:
+        caixa = MemCaixaDeSaida(["aluguel", "email"])
+        for i in range(250):
+            caixa.acrescentar("BICICLETA_INTEGRADA", {"bicicleta_id": i})
+        despachante = DespachanteDeNotificacoes(caixa, {"aluguel": aluguel.url, "email": email.url}, lote=100)
+
+        async def cenario():
+            entregues = await despachante.despachar_agora()
+            await despachante.encerrar()
+            return entregues
+
+        entregues = asyncio.run(cenario())
+
+    assert entregues == 500
+    assert len(caixa) == 0
+    for receptor in (aluguel, email):
+        assert [n["dados"]["bicicleta_id"] for n in receptor.recebidas] == list(range(250))
+        assert receptor.lotes == 3
+        assert receptor.conexoes == 1
+
+
+def test_falhas_esperam_recuo_exponencial_e_recusa_definitiva_descarta_o_lote():
+    relogio = _Relogio()
+    with ReceptorDeNotificacoesLocal() as receptor:
+        caixa = MemCaixaDeSaida(["email"])
+        caixa.acrescentar("TRANCA_RETIRADA", {"tranca_id": 1})
+        despachante = DespachanteDeNotificacoes(
+            caixa, {"email": receptor.url}, espera_inicial=1.0, relogio=relogio, aleatorio=lambda: 1.0)
+        receptor.falhar_proximas = 2
+
+        async def cenario():
+            rodadas = [await despachante.despachar_agora()]
+            relogio.agora += 0.5
+            rodadas.append(await despachante.despachar_agora())  # ainda esperando: nem tenta
+            relogio.agora += 0.5
+            rodadas.append(await despachante.despachar_agora())  # segunda falha: espera 2 s
+            relogio.agora += 2
+            rodadas.append(await despachante.despachar_agora())
+            receptor.falhar_proximas, receptor.status_de_falha = 1, 400
+            caixa.acrescentar("TRANCA_RETIRADA", {"tranca_id": 2})
+            rodadas.append(await despachante.despachar_agora())
+            await despachante.encerrar()
+            return rodadas
+
+        rodadas = asyncio.run(cenario())
+
+    assert rodadas == [0, 0, 0, 1, 0]
+    assert receptor.requisicoes == 4
+    assert [n["dados"]["tranca_id"] for n in receptor.recebidas] == [1]
+    assert [n.dados["tranca_id"] for n in caixa.ultimas_descartadas()] == [2]
+    assert despachante.estatisticas()["destinos"]["email"]["tentativas"] == 0
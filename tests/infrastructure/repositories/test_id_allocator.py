@@ -0,0 +1,63 @@
+# tests/infrastructure/repositories/test_id_allocator.py
+
+import threading
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.id_allocator import (
+    BITS_SEQUENCIA,
+    AlocadorPorBlocos,
+    AlocadorSnowflake,
+)
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository
+
+
+def _bicicleta():
+    return Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=1, status=StatusBicicleta.NOVA)
+
+
+def test_nova_entidade_depois_de_restaurar_nao_sobrescreve_o_estado_inicial():
+    repo = MemBicicletaRepository()
+    repo.restaurar_para_estado_inicial()
+
+    nova = repo.salvar(_bicicleta())
+
+    assert nova.id == 6
+    assert len(repo.listar_todas()) == 6
+
+def test_nos_com_o_mesmo_arquivo_recebem_blocos_disjuntos(tmp_path):
+    caminho = str(tmp_path / "ids.sqlite3")
+    no_a = AlocadorPorBlocos(caminho, chave="bicicletas", tamanho_bloco=10)
+    no_b = AlocadorPorBlocos(caminho, chave="bicicletas", tamanho_bloco=10)
+    ids = []
+
+    def alocar(alocador):
+        for _ in range(250):
+            ids.append(alocador.alocar())
+
+    threads = [threading.Thread(target=alocar, args=(a,)) for a in (no_a, no_b, no_a, no_b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(ids) == len(set(ids)) == 1000
+    assert no_a.blocos_arrendados + no_b.blocos_arrendados == 100
+
+def test_reservar_ate_impede_que_outros_nos_aloquem_ids_explicitos(tmp_path):
+    caminho = str(tmp_path / "ids.sqlite3")
+    no_a = AlocadorPorBlocos(caminho, chave="trancas", tamanho_bloco=10)
+    no_b = AlocadorPorBlocos(caminho, chave="trancas", tamanho_bloco=10)
+    for entidade_id in range(1, 7):
+        no_a.reservar_ate(entidade_id)
+
+    assert no_b.alocar() == 7
+    assert no_a.alocar() == 17
+
+def test_snowflake_e_crescente_e_carrega_o_numero_do_no():
+    instantes = iter([1_800_000_000_000] * 3 + [1_799_999_999_000, 1_800_000_000_001])
+    alocador = AlocadorSnowflake(no_id=5, relogio_ms=lambda: next(instantes))
+
+    ids = [alocador.alocar() for _ in range(5)]
+
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    assert all((i >> BITS_SEQUENCIA) & 0x3FF == 5 for i in ids)
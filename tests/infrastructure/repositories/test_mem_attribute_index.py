@@ -0,0 +1,46 @@
+# tests/infrastructure/repositories/test_mem_attribute_index.py
+
+import pytest
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.mem_attribute_index import IndiceDeAtributos, CAMPOS_FILTRO_BICICLETA
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository
+
+
+def _bicicleta(marca, ano, status, id=None):
+    return Bicicleta(id=id, marca=marca, modelo="X", ano=ano, numero=1, status=status)
+
+
+def test_buscar_intersecta_todos_os_criterios():
+    indice = IndiceDeAtributos(CAMPOS_FILTRO_BICICLETA)
+    indice.atualizar(_bicicleta("Caloi", "2020", StatusBicicleta.EM_REPARO, id=1))
+    indice.atualizar(_bicicleta("Caloi", "2021", StatusBicicleta.EM_REPARO, id=2))
+    indice.atualizar(_bicicleta("Monark", "2020", StatusBicicleta.EM_REPARO, id=3))
+    indice.atualizar(_bicicleta("Caloi", "2020", StatusBicicleta.DISPONIVEL, id=4))
+
+    assert indice.buscar({"marca": "Caloi", "ano": "2020", "status": StatusBicicleta.EM_REPARO}) == [1]
+    assert indice.buscar({"marca": "Caloi"}) == [1, 2, 4]
+    assert indice.buscar({"marca": "Sense"}) == []
+
+def test_alteracao_no_lugar_move_a_entidade_para_os_novos_valores():
+    indice = IndiceDeAtributos(CAMPOS_FILTRO_BICICLETA)
+    bicicleta = _bicicleta("Caloi", "2020", StatusBicicleta.NOVA, id=1)
+    indice.atualizar(bicicleta)
+
+    bicicleta.status = StatusBicicleta.DISPONIVEL
+    indice.atualizar(bicicleta)
+
+    assert indice.buscar({"status": StatusBicicleta.NOVA}) == []
+    assert indice.buscar({"status": StatusBicicleta.DISPONIVEL}) == [1]
+
+def test_campo_desconhecido_e_rejeitado():
+    with pytest.raises(ValueError, match="numero"):
+        IndiceDeAtributos(CAMPOS_FILTRO_BICICLETA).buscar({"numero": 1})
+
+def test_repositorio_em_memoria_filtra_sem_as_deletadas():
+    repo = MemBicicletaRepository()
+    caloi = repo.salvar(_bicicleta("Caloi", "2020", StatusBicicleta.EM_REPARO))
+    outra = repo.salvar(_bicicleta("Caloi", "2020", StatusBicicleta.EM_REPARO))
+    repo.deletar(outra.id)
+
+    assert repo.filtrar({"marca": "Caloi", "status": "EM_REPARO"}) == [caloi]
@@ -0,0 +1,66 @@
+# tests/infrastructure/repositories/test_mem_change_log.py
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.mem_change_log import MemRegistroDeMudancas
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository
+
+
+def test_listar_desde_retorna_apenas_as_mudancas_posteriores_ao_cursor():
+    registro = MemRegistroDeMudancas(capacidade=10)
+    for i in range(1, 6):
+        registro.registrar("bicicleta", i, "salvar", {"id": i})
+
+    pagina = registro.listar_desde(desde=3, limite=100)
+
+    assert [m.sequencia for m in pagina.mudancas] == [4, 5]
+    assert pagina.sequencia_atual == 5
+    assert pagina.ressincronizar is False
+
+def test_listar_desde_respeita_o_limite():
+    registro = MemRegistroDeMudancas(capacidade=10)
+    for i in range(1, 6):
+        registro.registrar("bicicleta", i, "salvar", {"id": i})
+
+    pagina = registro.listar_desde(desde=0, limite=2)
+
+    assert [m.sequencia for m in pagina.mudancas] == [1, 2]
+    assert pagina.sequencia_atual == 5
+
+def test_cursor_que_saiu_do_anel_exige_ressincronizacao():
+    registro = MemRegistroDeMudancas(capacidade=3)
+    for i in range(1, 6):
+        registro.registrar("tranca", i, "salvar", {"id": i})
+
+    assert registro.listar_desde(desde=1, limite=10).ressincronizar is True
+    pagina = registro.listar_desde(desde=2, limite=10)
+    assert pagina.ressincronizar is False
+    assert [m.sequencia for m in pagina.mudancas] == [3, 4, 5]
+
+def test_cursor_a_frente_da_sequencia_atual_exige_ressincronizacao():
+    registro = MemRegistroDeMudancas()
+    registro.registrar("totem", 1, "salvar", {"id": 1})
+
+    assert registro.listar_desde(desde=50, limite=10).ressincronizar is True
+
+def test_repositorio_registra_salvar_e_deletar_com_copia_do_estado():
+    registro = MemRegistroDeMudancas()
+    repo = MemBicicletaRepository(registro=registro)
+    bicicleta = repo.salvar(Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=1, status=StatusBicicleta.NOVA))
+    repo.deletar(bicicleta.id)
+
+    mudancas = registro.listar_desde(desde=0, limite=10).mudancas
+
+    assert [(m.entidade, m.operacao) for m in mudancas] == [("bicicleta", "salvar"), ("bicicleta", "deletar")]
+    assert mudancas[0].dados["is_deleted"] is False
+    assert mudancas[1].dados["is_deleted"] is True
+
+def test_restaurar_estado_inicial_invalida_os_cursores_existentes():
+    registro = MemRegistroDeMudancas()
+    repo = MemBicicletaRepository(registro=registro)
+    repo.salvar(Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=1, status=StatusBicicleta.NOVA))
+
+    repo.restaurar_para_estado_inicial()
+
+    assert registro.listar_desde(desde=0, limite=10).ressincronizar is True
+    pagina = registro.listar_desde(desde=1, limite=10)
+    assert len(pagina.mudancas) == 5
@@ -0,0 +1,40 @@
+# tests/infrastructure/repositories/test_mem_free_docks.py
+
+import threading
+
+from src.equipamento.infrastructure.repositories.mem_free_docks import MemTrancasLivres
+
+
+def test_alocar_entrega_cada_tranca_livre_uma_unica_vez_sob_concorrencia():
+    livres = MemTrancasLivres()
+    for tranca_id in range(1000):
+        livres.liberar(1, tranca_id)
+    alocadas = []
+    barreira = threading.Barrier(8)
+
+    def devolver():
+        barreira.wait()
+        while (tranca_id := livres.alocar(1)) is not None:
+            alocadas.append(tranca_id)
+
+    threads = [threading.Thread(target=devolver) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(alocadas) == list(range(1000))
+    assert len(livres) == 0
+
+
+def test_liberar_em_outro_totem_move_a_tranca_e_remover_a_tira_da_lista():
+    livres = MemTrancasLivres()
+    livres.liberar(1, 10)
+    livres.liberar(1, 11)
+    livres.liberar(2, 10)
+    livres.remover(11)
+    livres.remover(99)
+
+    assert livres.alocar(1) is None
+    assert livres.alocar(2) == 10
+    assert livres.alocar(2) is None
@@ -0,0 +1,33 @@
+# tests/infrastructure/repositories/test_mem_outbox.py
+
+from src.equipamento.infrastructure.repositories.mem_outbox import MemCaixaDeSaida
+
+
+def test_cada_destino_recebe_a_notificacao_e_confirma_na_propria_fila():
+    caixa = MemCaixaDeSaida(["aluguel", "email"])
+    for i in range(3):
+        caixa.acrescentar("TRANCA_INTEGRADA", {"tranca_id": i})
+
+    lote = caixa.lote("aluguel", 2)
+    caixa.confirmar("aluguel", lote[-1].id)
+
+    assert [n.dados["tranca_id"] for n in lote] == [0, 1]
+    assert caixa.pendentes("aluguel") == 1
+    assert caixa.pendentes("email") == 3
+    assert caixa.estatisticas()["entregues"] == 2
+
+
+def test_fila_cheia_perde_as_mais_antigas_sem_confundir_a_confirmacao():
+    caixa = MemCaixaDeSaida(["email"], capacidade=3)
+    for i in range(3):
+        caixa.acrescentar("TRANCA_RETIRADA", {"tranca_id": i})
+    em_transito = caixa.lote("email", 2)
+    # Enquanto o lote viaja, a fila enche e perde as duas primeiras.
+    caixa.acrescentar("TRANCA_RETIRADA", {"tranca_id": 3})
+    caixa.acrescentar("TRANCA_RETIRADA", {"tranca_id": 4})
+
+    caixa.descartar("email", em_transito[-1].id)
+
+    assert [n.dados["tranca_id"] for n in caixa.lote("email", 10)] == [2, 3, 4]
+    assert caixa.estatisticas()["perdidas"] == 2
+    assert caixa.ultimas_descartadas() == []
@@ -0,0 +1,55 @@
+# tests/infrastructure/repositories/test_mem_reservations.py
+
+import asyncio
+
+from src.equipamento.domain.entities import ENTIDADE_BICICLETA, ENTIDADE_TRANCA
+from src.equipamento.infrastructure.repositories.mem_reservations import ExpiradorDeReservas, MemReservas
+
+
+class _Relogio:
+    def __init__(self, agora: float = 1000.0):
+        self.agora = agora
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def test_reserva_vale_ate_o_prazo_e_a_roda_a_recolhe_depois():
+    relogio = _Relogio()
+    reservas = MemReservas(resolucao=1.0, relogio=relogio)
+    reserva = reservas.criar(ENTIDADE_TRANCA, 3, duracao=30, totem_id=1)
+
+    assert reservas.criar(ENTIDADE_TRANCA, 3, duracao=30) is None
+    assert reservas.ativa(ENTIDADE_TRANCA, 3) == reserva
+    assert reservas.ativa(ENTIDADE_BICICLETA, 3) is None
+
+    relogio.agora += 29.5
+    assert reservas.expirar_vencidas() == []
+    relogio.agora += 0.5
+    # Vencida já não vale, mesmo antes de a roda recolhê-la.
+    assert reservas.buscar(reserva.id) is None
+    relogio.agora += 0.5
+    assert reservas.expirar_vencidas() == [reserva]
+    assert len(reservas) == 0
+    assert reservas.criar(ENTIDADE_TRANCA, 3, duracao=30) is not None
+
+
+def test_expirador_entrega_as_vencidas_pelo_loop_de_eventos_e_ignora_as_canceladas():
+    reservas = MemReservas(resolucao=0.01)
+    entregues = []
+    expirador = ExpiradorDeReservas(reservas, ao_expirar=entregues.extend)
+
+    async def rodar():
+        expirador.iniciar()
+        vence = reservas.criar(ENTIDADE_BICICLETA, 1, duracao=0.02)
+        cancelada = reservas.criar(ENTIDADE_BICICLETA, 2, duracao=0.02)
+        reservas.criar(ENTIDADE_BICICLETA, 3, duracao=60)
+        reservas.remover(cancelada.id)
+        await asyncio.sleep(0.1)
+        expirador.parar()
+        return vence
+
+    vence = asyncio.run(rodar())
+
+    assert entregues == [vence]
+    assert reservas.estatisticas() == {"ativas": 1, "expiradas": 1}
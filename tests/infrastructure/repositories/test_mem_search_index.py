@@ -0,0 +1,60 @@
+# tests/infrastructure/repositories/test_mem_search_index.py
+
+from src.equipamento.infrastructure.repositories.mem_change_log import MemRegistroDeMudancas
+from src.equipamento.infrastructure.repositories.mem_search_index import IndiceSincronizado, MemIndiceDeBusca, normalizar
+
+
+def test_normalizar_remove_acentos_e_maiusculas():
+    assert normalizar("Praça São-José, 12") == ["praca", "sao", "jose", "12"]
+
+def test_buscar_por_prefixo_ignorando_acentos():
+    indice = MemIndiceDeBusca()
+    indice.indexar(1, ["Caloi", "Elite"])
+    indice.indexar(2, ["Monark", "Barra Circular"])
+    indice.indexar(3, ["Caloí", "Andes"])
+
+    assert indice.buscar("cal", limite=10) == [1, 3]
+    assert indice.buscar("CALOI", limite=10) == [1, 3]
+    assert indice.buscar("circ", limite=10) == [2]
+
+def test_todos_os_termos_precisam_casar_e_exato_vale_mais_que_prefixo():
+    indice = MemIndiceDeBusca()
+    indice.indexar(1, ["Caloi", "Elite Carbon"])
+    indice.indexar(2, ["Caloi", "Elite"])
+    indice.indexar(3, ["Caloi", "Andes"])
+
+    assert indice.buscar("caloi elite", limite=10) == [1, 2]
+    assert indice.buscar("caloi car", limite=10) == [1]
+    assert indice.buscar("elit", limite=1) == [1]
+
+def test_reindexar_e_remover_atualizam_o_vocabulario():
+    indice = MemIndiceDeBusca()
+    indice.indexar(1, ["Caloi"])
+    indice.indexar(1, ["Monark"])
+
+    assert indice.buscar("caloi", limite=10) == []
+    assert indice.buscar("mon", limite=10) == [1]
+
+    indice.remover(1)
+    assert indice.buscar("mon", limite=10) == []
+    assert indice._vocabulario == []
+
+def test_indice_sincronizado_aplica_mudancas_de_outros_workers():
+    registro = MemRegistroDeMudancas(capacidade=4)
+    indice = IndiceSincronizado(
+        MemIndiceDeBusca(), registro, "bicicleta",
+        textos=lambda dados: [dados["marca"]],
+        recarregar=lambda: [(9, ["Sense"])],
+    )
+    # Gravações feitas por outro worker só aparecem no log.
+    registro.registrar("bicicleta", 1, "salvar", {"marca": "Caloi", "is_deleted": False})
+    registro.registrar("tranca", 1, "salvar", {"marca": "Ignorada", "is_deleted": False})
+    assert indice.buscar("caloi", 10) == [1]
+
+    registro.registrar("bicicleta", 1, "deletar", {"marca": "Caloi", "is_deleted": True})
+    assert indice.buscar("caloi", 10) == []
+
+    # O cursor saiu do anel: o índice é refeito a partir do estado atual.
+    for i in range(5):
+        registro.registrar("bicicleta", 2, "salvar", {"marca": "Monark", "is_deleted": False})
+    assert indice.buscar("sense", 10) == [9]
@@ -0,0 +1,38 @@
+# tests/infrastructure/repositories/test_persistent_map.py
+
+import random
+
+from src.equipamento.infrastructure.repositories.persistent_map import MapaPersistente
+
+
+def test_versoes_antigas_nao_mudam():
+    vazio = MapaPersistente()
+    um = vazio.com(1, "a")
+    dois = um.com(2, "b").com(1, "c")
+
+    assert len(vazio) == 0 and 1 not in vazio
+    assert um.get(1) == "a" and len(um) == 1
+    assert dois.get(1) == "c" and dois.get(2) == "b" and len(dois) == 2
+    assert dois.sem(1).get(1) is None and dois.get(1) == "c"
+
+def test_sem_chave_inexistente_devolve_o_mesmo_mapa():
+    mapa = MapaPersistente().com(5, "x")
+    assert mapa.sem(6) is mapa
+
+def test_concorda_com_dict_em_operacoes_aleatorias():
+    aleatorio = random.Random(7)
+    mapa, referencia = MapaPersistente(), {}
+    # Chaves grandes e com os mesmos bits baixos forçam caminhos profundos.
+    chaves = [aleatorio.randrange(1, 5000) for _ in range(300)] + [i << 40 for i in range(1, 50)] + [(1 << 62) + 3]
+    for _ in range(5000):
+        chave = aleatorio.choice(chaves)
+        if aleatorio.random() < 0.6:
+            mapa, referencia[chave] = mapa.com(chave, chave * 2), chave * 2
+        else:
+            mapa = mapa.sem(chave)
+            referencia.pop(chave, None)
+
+    assert len(mapa) == len(referencia)
+    assert dict(mapa.itens()) == referencia
+    assert mapa.chaves_ordenadas() == sorted(referencia)
+    assert all(mapa.get(chave) == referencia.get(chave) for chave in chaves)
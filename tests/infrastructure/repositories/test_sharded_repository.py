@@ -0,0 +1,92 @@
+# tests/infrastructure/repositories/test_sharded_repository.py
+
+import threading
+
+from src.equipamento.domain.entities import Bicicleta, Tranca, StatusBicicleta, StatusTranca
+from src.equipamento.infrastructure.repositories.sharded_repository import (
+    TAMANHO_BLOCO,
+    ShardedBicicletaRepository,
+    ShardedTrancaRepository,
+)
+
+
+def _bicicleta(numero=1):
+    return Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=numero, status=StatusBicicleta.NOVA)
+
+
+def test_salvar_buscar_e_deletar():
+    repo = ShardedBicicletaRepository(particoes=4)
+    bicicleta = repo.salvar(_bicicleta())
+
+    assert repo.buscar_por_id(bicicleta.id) is bicicleta
+    repo.deletar(bicicleta.id)
+    assert repo.buscar_por_id(bicicleta.id) is None
+    assert repo.listar_todas() == []
+    assert repo.listar_todas(include_deleted=True) == [bicicleta]
+
+def test_cada_entidade_fica_na_particao_calculada_pelo_id():
+    repo = ShardedBicicletaRepository(particoes=4)
+    for i in range(10):
+        repo.salvar(_bicicleta(numero=i))
+
+    for indice, particao in enumerate(repo._particoes):
+        for entidade_id in particao.dados:
+            assert ((entidade_id - 1) // TAMANHO_BLOCO) % 4 == indice
+
+def test_threads_concorrentes_nao_colidem_ids_e_listagem_sai_ordenada():
+    repo = ShardedBicicletaRepository(particoes=8)
+
+    def cadastrar():
+        for i in range(200):
+            repo.salvar(_bicicleta(numero=i))
+
+    threads = [threading.Thread(target=cadastrar) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ids = [b.id for b in repo.listar_todas()]
+    assert len(ids) == 1600
+    assert len(set(ids)) == 1600
+    assert ids == sorted(ids)
+
+def test_ids_explicitos_do_estado_inicial_nao_sao_realocados():
+    repo = ShardedTrancaRepository(particoes=1)
+    repo.restaurar_para_estado_inicial()
+
+    nova = repo.salvar(Tranca(numero=1, localizacao="L", ano_de_fabricacao="2024", modelo="M", status=StatusTranca.NOVA))
+
+    assert nova.id == 7
+    assert [t.id for t in repo.buscar_por_totem_id(1)] == [1, 2, 3, 4, 6]
+
+def test_id_explicito_excluido_nao_e_realocado():
+    repo = ShardedBicicletaRepository(particoes=1)
+    for i in (1, 2, 3):
+        bicicleta = _bicicleta(numero=i)
+        bicicleta.id = i
+        repo.salvar(bicicleta)
+    repo.deletar(3)
+
+    novas = [repo.salvar(_bicicleta(numero=i)).id for i in range(2)]
+
+    assert novas == [4, 5]
+    ids = [b.id for b in repo.listar_todas(include_deleted=True)]
+    assert len(ids) == len(set(ids))
+
+def test_filtrar_combina_os_indices_de_todas_as_particoes():
+    repo = ShardedTrancaRepository(particoes=4)
+    esperadas = []
+    for i in range(40):
+        status = StatusTranca.DISPONIVEL if i % 2 else StatusTranca.OCUPADA
+        tranca = repo.salvar(Tranca(numero=i, localizacao="Centro", ano_de_fabricacao="2020", modelo="M", status=status, totem_id=i % 3))
+        if status == StatusTranca.DISPONIVEL and tranca.totem_id == 1:
+            esperadas.append(tranca.id)
+    # Força entidades em partições diferentes.
+    repo.salvar(Tranca(id=TAMANHO_BLOCO + 1, numero=99, localizacao="Centro", ano_de_fabricacao="2020", modelo="M", status=StatusTranca.DISPONIVEL, totem_id=1))
+    esperadas.append(TAMANHO_BLOCO + 1)
+
+    resultado = repo.filtrar({"status": StatusTranca.DISPONIVEL, "totem_id": 1})
+
+    assert [t.id for t in resultado] == sorted(esperadas)
+    assert [t.id for t in repo.buscar_por_totem_id(1)] == [t.id for t in repo.listar_todas() if t.totem_id == 1]
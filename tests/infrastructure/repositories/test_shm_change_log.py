@@ -0,0 +1,64 @@
+# tests/infrastructure/repositories/test_shm_change_log.py
+
+import uuid
+
+import pytest
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.shm_change_log import ShmRegistroDeMudancas
+from src.equipamento.infrastructure.repositories.shm_repository import ShmBicicletaRepository
+
+
+@pytest.fixture
+def prefixo():
+    return f"teste_{uuid.uuid4().hex[:12]}"
+
+
+def test_registros_do_mesmo_prefixo_compartilham_a_sequencia(prefixo, tmp_path):
+    worker_a = ShmRegistroDeMudancas(prefixo, capacidade=16, diretorio_travas=str(tmp_path))
+    worker_b = ShmRegistroDeMudancas(prefixo, capacidade=16, diretorio_travas=str(tmp_path))
+    try:
+        worker_a.registrar("bicicleta", 1, "salvar", {"id": 1})
+        worker_b.registrar("tranca", 7, "salvar", {"id": 7})
+
+        pagina = worker_a.listar_desde(1, 10)
+
+        assert worker_a.sequencia_atual() == worker_b.sequencia_atual() == 2
+        assert [(m.sequencia, m.entidade, m.entidade_id) for m in pagina.mudancas] == [(2, "tranca", 7)]
+        assert worker_a.epoca == worker_b.epoca
+    finally:
+        worker_b.fechar()
+        worker_a.destruir()
+
+def test_cursor_que_saiu_do_anel_exige_ressincronizacao(prefixo, tmp_path):
+    registro = ShmRegistroDeMudancas(prefixo, capacidade=4, diretorio_travas=str(tmp_path))
+    try:
+        for i in range(1, 7):
+            registro.registrar("bicicleta", i, "salvar", {"id": i})
+
+        assert registro.listar_desde(1, 10).ressincronizar
+        assert [m.entidade_id for m in registro.listar_desde(2, 10).mudancas] == [3, 4, 5, 6]
+        registro.descartar_historico()
+        assert registro.listar_desde(2, 10).ressincronizar
+        assert registro.listar_desde(6, 10).mudancas == []
+    finally:
+        registro.destruir()
+
+def test_repositorios_em_workers_diferentes_registram_no_mesmo_log(prefixo, tmp_path):
+    registro_a = ShmRegistroDeMudancas(prefixo, diretorio_travas=str(tmp_path))
+    registro_b = ShmRegistroDeMudancas(prefixo, diretorio_travas=str(tmp_path))
+    repo_a = ShmBicicletaRepository(prefixo, capacidade=64, registro=registro_a, diretorio_travas=str(tmp_path))
+    repo_b = ShmBicicletaRepository(prefixo, capacidade=64, registro=registro_b, diretorio_travas=str(tmp_path))
+    try:
+        bicicleta = repo_a.salvar(Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=1, status=StatusBicicleta.NOVA))
+        repo_b.deletar(bicicleta.id)
+
+        mudancas = registro_a.listar_desde(0, 10).mudancas
+
+        assert [(m.sequencia, m.operacao) for m in mudancas] == [(1, "salvar"), (2, "deletar")]
+        assert mudancas[1].dados["is_deleted"] is True
+    finally:
+        repo_b.fechar()
+        repo_a.destruir()
+        registro_b.fechar()
+        registro_a.destruir()
@@ -0,0 +1,134 @@
+# tests/infrastructure/repositories/test_shm_repository.py
+
+import multiprocessing
+import uuid
+
+import pytest
+
+from src.equipamento.domain.entities import Bicicleta, Tranca, StatusBicicleta, StatusTranca
+from src.equipamento.infrastructure.repositories.mem_change_log import MemRegistroDeMudancas
+from src.equipamento.infrastructure.repositories.shm_repository import (
+    RegistroGrandeDemais,
+    ShmBicicletaRepository,
+    ShmTrancaRepository,
+)
+
+
+@pytest.fixture
+def prefixo():
+    return f"teste_{uuid.uuid4().hex[:12]}"
+
+
+def _bicicleta(numero=1):
+    return Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=numero, status=StatusBicicleta.NOVA)
+
+
+def _cadastrar_em_outro_processo(prefixo, diretorio, quantidade):
+    repo = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=diretorio)
+    for i in range(quantidade):
+        repo.salvar(_bicicleta(numero=i))
+    repo.fechar()
+
+
+def test_instancias_com_o_mesmo_prefixo_compartilham_os_dados(prefixo, tmp_path):
+    repo_a = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=str(tmp_path))
+    repo_b = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=str(tmp_path))
+    try:
+        bicicleta = repo_a.salvar(_bicicleta())
+        bicicleta.status = StatusBicicleta.DISPONIVEL
+        repo_a.salvar(bicicleta)
+
+        encontrada = repo_b.buscar_por_id(bicicleta.id)
+
+        assert encontrada == bicicleta
+        assert encontrada.status is StatusBicicleta.DISPONIVEL
+        repo_b.deletar(bicicleta.id)
+        assert repo_a.buscar_por_id(bicicleta.id) is None
+        assert [b.id for b in repo_a.listar_todas(include_deleted=True)] == [bicicleta.id]
+    finally:
+        repo_b.fechar()
+        repo_a.destruir()
+
+def test_processos_concorrentes_nao_colidem_ids(prefixo, tmp_path):
+    repo = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=str(tmp_path))
+    contexto = multiprocessing.get_context("fork")
+    processos = [
+        contexto.Process(target=_cadastrar_em_outro_processo, args=(prefixo, str(tmp_path), 50))
+        for _ in range(4)
+    ]
+    try:
+        for p in processos:
+            p.start()
+        for p in processos:
+            p.join()
+
+        ids = [b.id for b in repo.listar_todas()]
+
+        assert all(p.exitcode == 0 for p in processos)
+        assert sorted(ids) == list(range(1, 201))
+    finally:
+        repo.destruir()
+
+def test_restaurar_estado_inicial_e_filtro_por_totem(prefixo, tmp_path):
+    registro = MemRegistroDeMudancas()
+    repo = ShmTrancaRepository(prefixo=prefixo, capacidade=64, diretorio_travas=str(tmp_path), registro=registro)
+    try:
+        repo.restaurar_para_estado_inicial()
+
+        assert [t.id for t in repo.buscar_por_totem_id(1)] == [1, 2, 3, 4, 6]
+        assert repo.buscar_por_id(5).status is StatusTranca.EM_REPARO
+        # ids explícitos do estado inicial não são realocados
+        nova = Tranca(numero=1, localizacao="L", ano_de_fabricacao="2024", modelo="M", status=StatusTranca.NOVA)
+        assert repo.salvar(nova).id == 7
+        assert len(registro.listar_desde(0, 10).mudancas) == 7
+    finally:
+        repo.destruir()
+
+def test_registro_maior_que_o_slot_e_rejeitado(prefixo, tmp_path):
+    repo = ShmBicicletaRepository(prefixo=prefixo, capacidade=8, tamanho_slot=64, diretorio_travas=str(tmp_path))
+    try:
+        bicicleta = Bicicleta(marca="x" * 100, modelo="X", ano="2020", numero=1, status=StatusBicicleta.NOVA)
+        with pytest.raises(RegistroGrandeDemais, match="excede o tamanho do slot"):
+            repo.salvar(bicicleta)
+        assert bicicleta.id is None
+        assert repo.listar_todas() == []
+    finally:
+        repo.destruir()
+
+def test_tabela_cresce_com_segmentos_de_extensao(prefixo, tmp_path):
+    repo_a = ShmBicicletaRepository(prefixo=prefixo, capacidade=4, diretorio_travas=str(tmp_path))
+    repo_b = ShmBicicletaRepository(prefixo=prefixo, capacidade=4, diretorio_travas=str(tmp_path))
+    try:
+        ids = [repo_a.salvar(_bicicleta(numero=i)).id for i in range(10)]
+
+        assert ids == list(range(1, 11))
+        # O outro processo anexa as extensões sob demanda.
+        assert repo_b.buscar_por_id(10).numero == 9
+        assert [b.id for b in repo_b.listar_todas()] == ids
+        assert repo_b.tamanho_segmento() > repo_a._tabela.capacidade * repo_a._tabela.tamanho_slot * 2
+        repo_b.restaurar_para_estado_inicial()
+        assert repo_a.buscar_por_id(10) is None
+    finally:
+        repo_b.fechar()
+        repo_a.destruir()
+
+def test_filtrar_compara_o_status_gravado_com_o_enum(prefixo, tmp_path):
+    repo = ShmBicicletaRepository(prefixo=prefixo, capacidade=64, diretorio_travas=str(tmp_path))
+    try:
+        repo.restaurar_para_estado_inicial()
+        assert [b.id for b in repo.filtrar({"marca": "Caloi", "status": StatusBicicleta.EM_USO})] == [3, 5]
+        with pytest.raises(ValueError):
+            repo.filtrar({"numero": 12345})
+    finally:
+        repo.destruir()
+
+def test_geracao_avanca_com_gravacoes_de_qualquer_instancia(prefixo, tmp_path):
+    repo_a = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=str(tmp_path))
+    repo_b = ShmBicicletaRepository(prefixo=prefixo, capacidade=1024, diretorio_travas=str(tmp_path))
+    try:
+        inicial = repo_b.geracao()
+        repo_a.salvar(_bicicleta())
+        assert repo_b.geracao() > inicial
+    finally:
+        repo_a.fechar()
+        repo_b.destruir()
@@ -0,0 +1,45 @@
+# tests/infrastructure/repositories/test_timing_wheel.py
+
+import random
+
+from src.equipamento.infrastructure.repositories.timing_wheel import RodaDeTempo
+
+
+def test_avancar_vence_cada_chave_no_seu_tick_em_todos_os_niveis():
+    roda = RodaDeTempo(tick_inicial=100)
+    prazos = {"nivel0": 110, "nivel1": 100 + 64 * 5 + 3, "nivel2": 100 + 64 * 64 * 3, "ja_vencida": 90}
+    for chave, prazo in prazos.items():
+        roda.agendar(chave, prazo)
+
+    assert roda.avancar(100) == ["ja_vencida"]
+    assert roda.avancar(109) == []
+    assert roda.avancar(110) == ["nivel0"]
+    assert roda.avancar(prazos["nivel1"] - 1) == []
+    assert roda.avancar(prazos["nivel1"]) == ["nivel1"]
+    assert roda.avancar(prazos["nivel2"]) == ["nivel2"]
+    assert len(roda) == 0
+
+
+def test_agendamentos_e_cancelamentos_aleatorios_batem_com_a_contagem_ingenua():
+    aleatorio = random.Random(7)
+    tick = 1_000_000
+    roda = RodaDeTempo(tick, niveis=3)
+    prazos = {}
+    for _ in range(500):
+        for _ in range(10):
+            chave = aleatorio.randrange(300)
+            prazo = tick + aleatorio.choice([aleatorio.randrange(-2, 64), aleatorio.randrange(5000), aleatorio.randrange(10 ** 6)])
+            roda.agendar(chave, prazo)
+            prazos[chave] = prazo
+        cancelada = aleatorio.randrange(300)
+        roda.cancelar(cancelada)
+        prazos.pop(cancelada, None)
+        tick += aleatorio.choice([1, 3, 64, aleatorio.randrange(50_000)])
+
+        vencidas = roda.avancar(tick)
+
+        esperadas = {chave for chave, prazo in prazos.items() if prazo <= tick}
+        assert sorted(vencidas) == sorted(esperadas)
+        for chave in esperadas:
+            del prazos[chave]
+    assert len(roda) == len(prazos)
@@ -0,0 +1,83 @@
+# tests/infrastructure/repositories/test_tombstone_archive.py
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository, decodificar_bicicleta
+from src.equipamento.infrastructure.repositories.sharded_repository import ShardedBicicletaRepository
+from src.equipamento.infrastructure.repositories.tombstone_archive import ArquivoMorto, Excluidos, CompactadorDeExcluidos
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _bicicleta(numero=1):
+    return Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=numero, status=StatusBicicleta.EM_REPARO)
+
+
+def test_deletar_tira_a_entidade_das_vivas():
+    repo = MemBicicletaRepository()
+    viva = repo.salvar(_bicicleta(1))
+    excluida = repo.salvar(_bicicleta(2))
+    repo.deletar(excluida.id)
+
+    assert excluida.id not in repo._dados
+    assert repo.listar_todas() == [viva]
+    assert repo.listar_todas(include_deleted=True) == [viva, excluida]
+    assert repo.buscar_por_id(excluida.id) is None
+
+def test_compactar_move_apenas_as_antigas_para_o_arquivo(tmp_path):
+    relogio = RelogioFalso()
+    arquivo = ArquivoMorto(str(tmp_path / "bicicletas.jsonl"), decodificar_bicicleta)
+    repo = MemBicicletaRepository()
+    repo.excluidos = Excluidos(arquivo, relogio=relogio)
+    antiga, recente = repo.salvar(_bicicleta(1)), repo.salvar(_bicicleta(2))
+    repo.deletar(antiga.id)
+    relogio.agora = 100.0
+    repo.deletar(recente.id)
+
+    movidas = repo.excluidos.compactar(idade_minima=50)
+
+    assert movidas == 1
+    assert len(repo.excluidos) == 1
+    assert [b.id for b in arquivo.ler_todos()] == [antiga.id]
+    listadas = repo.listar_todas(include_deleted=True)
+    assert [(b.id, b.status, b.is_deleted) for b in listadas] == [
+        (antiga.id, StatusBicicleta.EM_REPARO, True),
+        (recente.id, StatusBicicleta.EM_REPARO, True),
+    ]
+
+def test_restaurar_esvazia_as_excluidas_e_o_arquivo(tmp_path):
+    arquivo = ArquivoMorto(str(tmp_path / "bicicletas.jsonl"), decodificar_bicicleta)
+    repo = ShardedBicicletaRepository(particoes=2, arquivo=arquivo)
+    repo.restaurar_para_estado_inicial()
+    repo.deletar(1)
+    CompactadorDeExcluidos([repo.excluidos], idade_minima=0).compactar_agora()
+
+    assert [b.id for b in repo.listar_todas(include_deleted=True)][:2] == [1, 2]
+    repo.restaurar_para_estado_inicial()
+    assert arquivo.ler_todos() == []
+    assert all(not b.is_deleted for b in repo.listar_todas(include_deleted=True))
+
+def test_arquivo_reaberto_mantem_as_arquivadas_e_reserva_os_ids(tmp_path):
+    caminho = tmp_path / "mortos" / "bicicletas.jsonl"
+    anterior = MemBicicletaRepository(arquivo=ArquivoMorto(str(caminho), decodificar_bicicleta))
+    assert not caminho.parent.exists()
+    for numero in range(3):
+        anterior.salvar(_bicicleta(numero))
+    anterior.deletar(3)
+    CompactadorDeExcluidos([anterior.excluidos], idade_minima=0).compactar_agora()
+
+    # Um novo processo, com o mesmo caminho, começando do zero.
+    for repo in (MemBicicletaRepository(arquivo=ArquivoMorto(str(caminho), decodificar_bicicleta)),
+                 ShardedBicicletaRepository(particoes=2, arquivo=ArquivoMorto(str(caminho), decodificar_bicicleta))):
+        compactador = CompactadorDeExcluidos([repo.excluidos])
+        compactador.iniciar()
+        nova = repo.salvar(_bicicleta(9))
+        compactador.parar()
+
+        assert [b.id for b in repo.listar_todas(include_deleted=True)] == [3, nova.id]
+        assert nova.id > 3
@@ -0,0 +1,73 @@
+# tests/infrastructure/repositories/test_unit_of_work.py
+
+import pytest
+
+from src.equipamento.application.use_cases import DestrancarTrancaUseCase, TrancarTrancaUseCase, reconstruir_vagas
+from src.equipamento.domain.entities import ENTIDADE_BICICLETA, StatusBicicleta, StatusTranca
+from src.equipamento.infrastructure.repositories.mem_bike_location import MemLocalizacaoDeBicicletas
+from src.equipamento.infrastructure.repositories.mem_free_docks import MemTrancasLivres
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository, MemTrancaRepository
+from src.equipamento.infrastructure.repositories.mem_reservations import MemReservas
+from src.equipamento.infrastructure.repositories.unit_of_work import UnidadeDeTrabalho
+
+
+class _Publicador:
+    def __init__(self):
+        self.eventos = []
+
+    def publicar(self, evento):
+        self.eventos.append(evento)
+
+
+def _montar():
+    bicicletas, trancas = MemBicicletaRepository(), MemTrancaRepository()
+    bicicletas.restaurar_para_estado_inicial()
+    trancas.restaurar_para_estado_inicial()
+    localizacao, livres, reservas, publicador = MemLocalizacaoDeBicicletas(), MemTrancasLivres(), MemReservas(), _Publicador()
+    localizacao.associar(1, 1)
+    reconstruir_vagas(livres, trancas.listar_todas())
+    unidade = UnidadeDeTrabalho(bicicletas, trancas, publicador=publicador, reservas=reservas, localizacao=localizacao, livres=livres)
+    destrancar = DestrancarTrancaUseCase(trancas, bicicletas, unidade.publicador, localizacao, livres, unidade.reservas)
+    trancar = TrancarTrancaUseCase(trancas, bicicletas, unidade.publicador, localizacao, livres, unidade.reservas)
+    return unidade, destrancar, trancar, publicador, reservas
+
+
+def test_eventos_e_reservas_so_saem_na_confirmacao():
+    unidade, destrancar, trancar, publicador, reservas = _montar()
+    reserva = reservas.criar(ENTIDADE_BICICLETA, 1, 60)
+
+    with unidade.executar():
+        unidade.guardar_tranca(1)
+        destrancar.execute(1, reserva_id=reserva.id)
+        # Encerrada para o lote, mas ainda não para os outros.
+        assert unidade.reservas.ativa(ENTIDADE_BICICLETA, 1) is None
+        assert reservas.ativa(ENTIDADE_BICICLETA, 1) is not None
+        assert publicador.eventos == []
+
+    assert len(publicador.eventos) == 2
+    assert reservas.buscar(reserva.id) is None
+    assert unidade.confirmadas == 1
+
+def test_falha_restaura_entidades_vagas_e_localizacao_e_descarta_o_retido():
+    unidade, destrancar, trancar, publicador, reservas = _montar()
+    reserva = reservas.criar(ENTIDADE_BICICLETA, 1, 60)
+    livre = unidade.tranca_repo.buscar_por_id(2)
+
+    with pytest.raises(ValueError):
+        with unidade.executar():
+            unidade.guardar_tranca(1)
+            destrancar.execute(1, reserva_id=reserva.id)
+            unidade.guardar_tranca(2)
+            unidade.guardar_bicicleta(1)
+            trancar.execute(2, 1)
+            trancar.execute(99, 1)
+
+    tranca_1, tranca_2 = unidade.tranca_repo.buscar_por_id(1), unidade.tranca_repo.buscar_por_id(2)
+    assert (tranca_1.status, tranca_1.bicicleta_id) == (StatusTranca.OCUPADA, 1)
+    assert (tranca_2.status, tranca_2.bicicleta_id) == (StatusTranca.DISPONIVEL, None)
+    assert unidade.bicicleta_repo.buscar_por_id(1).status == StatusBicicleta.DISPONIVEL
+    assert unidade._localizacao.tranca_de(1) == 1
+    assert unidade._livres.alocar(livre.totem_id) == 2
+    assert publicador.eventos == []
+    assert reservas.buscar(reserva.id) is not None
+    assert unidade.desfeitas == 1
@@ -0,0 +1,76 @@
+# tests/infrastructure/repositories/test_versioned_repository.py
+
+import threading
+
+from src.equipamento.domain.entities import Bicicleta, Tranca, StatusBicicleta, StatusTranca
+from src.equipamento.infrastructure.repositories.versioned_repository import (
+    VersionadoBicicletaRepository,
+    VersionadoTrancaRepository,
+)
+
+
+def _bicicleta(numero=1):
+    return Bicicleta(marca="Caloi", modelo="X", ano="2020", numero=numero, status=StatusBicicleta.NOVA)
+
+
+def test_salvar_buscar_e_deletar():
+    repo = VersionadoBicicletaRepository()
+    bicicleta = repo.salvar(_bicicleta())
+
+    assert repo.buscar_por_id(bicicleta.id) == bicicleta
+    repo.deletar(bicicleta.id)
+    assert repo.buscar_por_id(bicicleta.id) is None
+    assert repo.listar_todas() == []
+    assert [b.is_deleted for b in repo.listar_todas(include_deleted=True)] == [True]
+
+def test_alterar_objeto_buscado_nao_afeta_o_repositorio_antes_de_salvar():
+    repo = VersionadoBicicletaRepository()
+    bicicleta_id = repo.salvar(_bicicleta()).id
+
+    buscada = repo.buscar_por_id(bicicleta_id)
+    buscada.status = StatusBicicleta.EM_USO
+
+    assert repo.buscar_por_id(bicicleta_id).status == StatusBicicleta.NOVA
+    repo.salvar(buscada)
+    assert repo.buscar_por_id(bicicleta_id).status == StatusBicicleta.EM_USO
+
+def test_versao_antiga_continua_consistente_depois_de_gravacoes():
+    repo = VersionadoTrancaRepository()
+    repo.restaurar_para_estado_inicial()
+    antes = repo.versao()
+
+    tranca = repo.buscar_por_id(2)
+    tranca.status = StatusTranca.REPARO_SOLICITADO
+    repo.salvar(tranca)
+    repo.deletar(1)
+
+    assert [t.id for t in antes.listar()] == [1, 2, 3, 4, 5, 6]
+    assert [t.id for t in antes.filtrar({"status": StatusTranca.DISPONIVEL})] == [2]
+    assert [t.id for t in repo.filtrar({"status": StatusTranca.DISPONIVEL})] == []
+    assert [t.id for t in repo.filtrar({"status": StatusTranca.REPARO_SOLICITADO, "totem_id": 1})] == [2, 6]
+    assert repo.geracao() > antes.numero
+
+def test_listagens_concorrentes_com_gravacoes_nunca_veem_estado_pela_metade():
+    repo = VersionadoBicicletaRepository()
+    ids = [repo.salvar(_bicicleta(numero=i)).id for i in range(50)]
+    parar = threading.Event()
+
+    def alternar():
+        status = StatusBicicleta.DISPONIVEL
+        while not parar.is_set():
+            for bicicleta_id in ids:
+                bicicleta = repo.buscar_por_id(bicicleta_id)
+                bicicleta.status = status
+                repo.salvar(bicicleta)
+            status = StatusBicicleta.NOVA if status == StatusBicicleta.DISPONIVEL else StatusBicicleta.DISPONIVEL
+
+    escritor = threading.Thread(target=alternar)
+    escritor.start()
+    try:
+        for _ in range(200):
+            listagem = repo.listar_todas()
+            assert len(listagem) == 50
+            assert [b.id for b in listagem] == ids
+    finally:
+        parar.set()
+        escritor.join()
@@ -0,0 +1,107 @@
+# tests/infrastructure/web/test_admission.py
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.equipamento.infrastructure.web.admission import (
+    AdmissaoMiddleware,
+    ControladorDeAdmissao,
+    Orcamento,
+    classificar_rota,
+    CLASSE_ACOES,
+    CLASSE_LEITURAS_PONTUAIS,
+    CLASSE_LEITURAS_EM_MASSA,
+)
+
+
+def test_classificar_rota():
+    assert classificar_rota("POST", "/tranca/1/destrancar") == CLASSE_ACOES
+    assert classificar_rota("DELETE", "/bicicleta/3") == CLASSE_ACOES
+    assert classificar_rota("GET", "/bicicleta/3") == CLASSE_LEITURAS_PONTUAIS
+    assert classificar_rota("GET", "/totem/1/trancas") == CLASSE_LEITURAS_PONTUAIS
+    assert classificar_rota("GET", "/tranca") == CLASSE_LEITURAS_EM_MASSA
+    assert classificar_rota("GET", "/bicicleta/filtro") == CLASSE_LEITURAS_EM_MASSA
+    assert classificar_rota("GET", "/reserva/9f3a0c") == CLASSE_LEITURAS_PONTUAIS
+    assert classificar_rota("POST", "/tranca/2/reservar") == CLASSE_ACOES
+    assert classificar_rota("POST", "/batch") == CLASSE_ACOES
+    assert classificar_rota("GET", "/eventos") is None
+    assert classificar_rota("GET", "/admin/admissao") is None
+
+def _app_lento(controlador, liberar):
+    app = FastAPI()
+
+    @app.get("/tranca")
+    async def listar():
+        await liberar.wait()
+        return []
+
+    @app.post("/tranca/{tranca_id}/destrancar")
+    async def destrancar(tranca_id: int):
+        await liberar.wait()
+        return {"id": tranca_id}
+
+    app.add_middleware(AdmissaoMiddleware, controlador=controlador)
+    return app
+
+def test_leituras_em_massa_alem_do_orcamento_e_da_fila_recebem_503():
+    controlador = ControladorDeAdmissao({CLASSE_LEITURAS_EM_MASSA: Orcamento(limite=2, fila=1, espera_maxima=5, retry_after=7)})
+
+    async def cenario():
+        liberar = asyncio.Event()
+        transporte = httpx.ASGITransport(app=_app_lento(controlador, liberar))
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            pedidos = [asyncio.ensure_future(cliente.get("/tranca")) for _ in range(5)]
+            while controlador.estatisticas()[CLASSE_LEITURAS_EM_MASSA]["recusadas"] < 2:
+                await asyncio.sleep(0.001)
+            liberar.set()
+            return await asyncio.gather(*pedidos)
+
+    respostas = asyncio.run(cenario())
+
+    assert sorted(r.status_code for r in respostas) == [200, 200, 200, 503, 503]
+    recusada = next(r for r in respostas if r.status_code == 503)
+    assert recusada.headers["retry-after"] == "7"
+    assert recusada.json()["detail"]["codigo"] == "SERVICO_SOBRECARREGADO"
+    estatisticas = controlador.estatisticas()[CLASSE_LEITURAS_EM_MASSA]
+    assert (estatisticas["admitidas"], estatisticas["enfileiradas"], estatisticas["em_execucao"]) == (3, 1, 0)
+
+def test_leituras_em_massa_sao_recusadas_enquanto_acoes_esperam_na_fila():
+    controlador = ControladorDeAdmissao({CLASSE_ACOES: Orcamento(limite=1, fila=10, espera_maxima=5)})
+
+    async def cenario():
+        liberar = asyncio.Event()
+        transporte = httpx.ASGITransport(app=_app_lento(controlador, liberar))
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            acoes = [asyncio.ensure_future(cliente.post(f"/tranca/{i}/destrancar")) for i in range(2)]
+            while controlador.estatisticas()[CLASSE_ACOES]["na_fila"] < 1:
+                await asyncio.sleep(0.001)
+            listagem = await cliente.get("/tranca")
+            liberar.set()
+            return listagem, await asyncio.gather(*acoes)
+
+    listagem, acoes = asyncio.run(cenario())
+
+    assert listagem.status_code == 503
+    assert [r.status_code for r in acoes] == [200, 200]
+
+def test_espera_na_fila_alem_do_limite_expira():
+    controlador = ControladorDeAdmissao({CLASSE_ACOES: Orcamento(limite=1, fila=10, espera_maxima=0.01)})
+
+    async def cenario():
+        liberar = asyncio.Event()
+        transporte = httpx.ASGITransport(app=_app_lento(controlador, liberar))
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            primeira = asyncio.ensure_future(cliente.post("/tranca/1/destrancar"))
+            while controlador.estatisticas()[CLASSE_ACOES]["em_execucao"] < 1:
+                await asyncio.sleep(0.001)
+            segunda = await cliente.post("/tranca/2/destrancar")
+            liberar.set()
+            return await primeira, segunda
+
+    primeira, segunda = asyncio.run(cenario())
+
+    assert primeira.status_code == 200
+    assert segunda.status_code == 503
+    assert controlador.estatisticas()[CLASSE_ACOES]["expiradas"] == 1
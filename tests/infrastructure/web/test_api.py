@@ -301,3 +301,148 @@ def test_destrancar_e_trancar_api_ciclo_completo():
     # Assert
     assert response_trancar.status_code == 200
     assert data_tranca_fechada["status"] == "OCUPADA"
+
+def test_listar_mudancas_api_retorna_apenas_os_deltas():
+    # Arrange
+    cursor = client.get("/mudancas").json()["sequencia_atual"]
+    id_bicicleta = client.post("/bicicleta", json={"marca": "Delta", "modelo": "D1", "ano": "2025", "numero": 77}).json()["id"]
+
+    # Act
+    response = client.get(f"/mudancas?desde={cursor}")
+    data = response.json()
+
+    # Assert
+    assert response.status_code == 200
+    assert [(m["entidade"], m["entidade_id"], m["operacao"]) for m in data["mudancas"]] == [("bicicleta", id_bicicleta, "salvar")]
+    assert data["sequencia_atual"] == cursor + 1
+
+def test_listar_mudancas_api_cursor_invalido_exige_ressincronizacao():
+    # Act
+    response = client.get("/mudancas?desde=999999999")
+
+    # Assert
+    assert response.status_code == 410
+    assert response.json()["detail"]["codigo"] == "RESSINCRONIZACAO_NECESSARIA"
+
+def test_listar_trancas_e_bicicletas_do_totem_api():
+    # Arrange
+    client.get("/restaurarDados")
+
+    # Act
+    response_trancas = client.get("/totem/1/trancas")
+    response_bicicletas = client.get("/totem/1/bicicletas")
+
+    # Assert
+    assert response_trancas.status_code == 200
+    assert [t["id"] for t in response_trancas.json()] == [1, 2, 3, 4, 6]
+    assert response_bicicletas.status_code == 200
+    assert [b["id"] for b in response_bicicletas.json()] == [1, 2, 5]
+    assert client.get("/totem/999/trancas").status_code == 404
+
+def test_buscar_totens_e_bicicletas_por_texto_api():
+    # Arrange
+    client.get("/restaurarDados")
+    id_bicicleta = client.post("/bicicleta", json={"marca": "Bicicletária Ímpar", "modelo": "Urbana", "ano": "2024", "numero": 77}).json()["id"]
+
+    # Act
+    response_totens = client.get("/totem/busca?q=praca")
+    response_bicicletas = client.get("/bicicleta/busca?q=bicicletaria imp")
+    client.delete(f"/bicicleta/{id_bicicleta}")
+    response_apos_delecao = client.get("/bicicleta/busca?q=bicicletaria")
+
+    # Assert
+    assert response_totens.status_code == 200
+    assert [t["id"] for t in response_totens.json()] == [1]
+    assert [b["id"] for b in response_bicicletas.json()] == [id_bicicleta]
+    assert response_apos_delecao.json() == []
+    assert client.get("/tranca/busca?q=%20").status_code == 422
+
+def test_filtrar_bicicletas_e_trancas_api():
+    # Arrange
+    client.get("/restaurarDados")
+
+    # Act
+    response_bicicletas = client.get("/bicicleta/filtro?marca=Caloi&ano=2020&status=EM_USO")
+    response_trancas = client.get("/tranca/filtro", params={"totem_id": 1, "status": "DISPONÍVEL"})
+    response_sem_criterio = client.get("/totem/filtro")
+
+    # Assert
+    assert [b["id"] for b in response_bicicletas.json()] == [3, 5]
+    assert [t["id"] for t in response_trancas.json()] == [2]
+    assert response_sem_criterio.status_code == 422
+
+def test_listar_trancas_e_bicicletas_de_varios_totens_api():
+    # Arrange
+    client.get("/restaurarDados")
+
+    # Act
+    response_trancas = client.get("/totem/trancas?ids=1,2")
+    response_bicicletas = client.get("/totem/bicicletas?ids=2,1")
+
+    # Assert
+    assert response_trancas.status_code == 200
+    assert {k: [t["id"] for t in v] for k, v in response_trancas.json().items()} == {"1": [1, 2, 3, 4, 6], "2": []}
+    assert {k: [b["id"] for b in v] for k, v in response_bicicletas.json().items()} == {"2": [], "1": [1, 2, 5]}
+    assert client.get("/totem/trancas?ids=1,999").status_code == 404
+    assert client.get("/totem/trancas?ids=1,x").status_code == 422
+
+def test_snapshot_da_rede_api_com_gzip_e_etag():
+    # Arrange
+    client.get("/restaurarDados")
+
+    # Act
+    response = client.get("/rede/snapshot", headers={"Accept-Encoding": "gzip"})
+    response_inalterado = client.get("/rede/snapshot", headers={"If-None-Match": response.headers["etag"]})
+    client.post("/totem", json={"localizacao": "Nova", "descricao": "Novo totem"})
+    response_alterado = client.get("/rede/snapshot", headers={"If-None-Match": response.headers["etag"]})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert [t[0] for t in response.json()["totens"]] == [1, 2]
+    assert response_inalterado.status_code == 304
+    assert response_alterado.status_code == 200
+    assert response_alterado.headers["etag"] != response.headers["etag"]
+    assert len(response_alterado.json()["totens"]) == 3
+
+def test_estatisticas_de_transicoes_api():
+    # Arrange
+    client.get("/restaurarDados")
+    antes = client.get("/admin/transicoes").json()["tranca"].get("alterar_status", {}).get("DISPONÍVEL->REPARO_SOLICITADO", 0)
+
+    # Act
+    client.post("/tranca/2/status/REPARO_SOLICITADO")
+    response = client.get("/admin/transicoes")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["tranca"]["alterar_status"]["DISPONÍVEL->REPARO_SOLICITADO"] == antes + 1
+
+def test_executar_lote_de_acoes_api():
+    # Arrange
+    client.get("/restaurarDados")
+    operacoes = [
+        {"operacao": "destrancar", "idTranca": 1},
+        {"operacao": "trancar", "idTranca": 2, "bicicleta": 1},
+        {"operacao": "destrancar", "idTranca": 1},
+        {"operacao": "statusBicicleta", "idBicicleta": 1, "acao": "EM_USO"},
+    ]
+
+    # Act
+    response = client.post("/batch", json={"operacoes": operacoes})
+    tranca_1, tranca_2 = client.get("/tranca/1").json(), client.get("/tranca/2").json()
+    response_sem_parar = client.post("/batch", json={"operacoes": operacoes[:3], "pararNoErro": False})
+    response_invalido = client.post("/batch", json={"operacoes": [{"operacao": "teletransportar", "idTranca": 1}]})
+
+    # Assert
+    assert response.status_code == 200
+    corpo = response.json()
+    assert (corpo["executadas"], corpo["falhas"]) == (0, 1)
+    assert [r["status"] for r in corpo["resultados"]] == [424, 424, 422, 424]
+    assert [r["erro"]["codigo"] for r in corpo["resultados"]] == ["DESFEITA", "DESFEITA", "DADOS_INVALIDOS", "NAO_EXECUTADA"]
+    # A falha desfez as duas primeiras ações.
+    assert (tranca_1["status"], tranca_1["bicicleta_id"]) == (StatusTranca.OCUPADA.value, 1)
+    assert (tranca_2["status"], tranca_2["bicicleta_id"]) == (StatusTranca.DISPONIVEL.value, None)
+    assert [r["status"] for r in response_sem_parar.json()["resultados"]] == [200, 200, 422]
+    assert client.get("/tranca/2").json()["bicicleta_id"] == 1
+    assert response_invalido.status_code == 422
@@ -0,0 +1,94 @@
+# tests/infrastructure/web/test_api_compartilhado.py
+"""
+Testes da API com o backend "compartilhado". A montagem das dependências é
+feita na importação de routes, então cada "worker" é um processo Python
+separado com as variáveis de ambiente do backend e o mesmo prefixo.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import uuid
+from pathlib import Path
+
+import pytest
+
+from src.equipamento.infrastructure.repositories.shm_change_log import ShmRegistroDeMudancas
+from src.equipamento.infrastructure.repositories.shm_events import ShmPublicadorDeEventos
+from src.equipamento.infrastructure.repositories.shm_repository import (
+    ShmBicicletaRepository,
+    ShmTrancaRepository,
+    ShmTotemRepository,
+)
+
+RAIZ = Path(__file__).resolve().parents[3]
+
+
+@pytest.fixture
+def prefixo(tmp_path, monkeypatch):
+    prefixo = f"teste_api_{uuid.uuid4().hex[:10]}"
+    monkeypatch.setenv("EQUIPAMENTO_IDEMPOTENCIA_ARQUIVO", str(tmp_path / "idempotencia.sqlite3"))
+    yield prefixo
+    for classe in (ShmBicicletaRepository, ShmTrancaRepository, ShmTotemRepository, ShmRegistroDeMudancas, ShmPublicadorDeEventos):
+        classe(prefixo=prefixo).destruir()
+
+
+def _no_worker(prefixo: str, roteiro: str):
+    """Executa o roteiro num processo com a aplicação montada e retorna o valor de 'resultado'."""
+    codigo = "import json\nfrom fastapi.testclient import TestClient\nfrom main import app\nclient = TestClient(app)\n"
+    codigo += textwrap.dedent(roteiro) + "\nprint(json.dumps(resultado))\n"
+    ambiente = {**os.environ, "EQUIPAMENTO_REPOSITORIO": "compartilhado", "EQUIPAMENTO_SHM_PREFIXO": prefixo,
+                "EQUIPAMENTO_LENTAS_LIMIAR_MS": "0"}
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=60)
+    assert saida.returncode == 0, saida.stderr
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def test_entidade_maior_que_o_slot_e_recusada_com_413(prefixo):
+    resultado = _no_worker(prefixo, """
+        grande = {"localizacao": "Centro", "descricao": "x" * 600}
+        criado = client.post("/totem", json=grande)
+        totem = client.post("/totem", json={"localizacao": "Centro", "descricao": "Praça"}).json()
+        alterado = client.put(f"/totem/{totem['id']}", json=grande)
+        resultado = {
+            "criar": [criado.status_code, criado.json()["detail"]["codigo"]],
+            "alterar": [alterado.status_code, alterado.json()["detail"]["codigo"]],
+            "descricao": client.get(f"/totem/{totem['id']}").json()["descricao"],
+        }
+    """)
+
+    assert resultado["criar"] == [413, "REGISTRO_GRANDE_DEMAIS"]
+    assert resultado["alterar"] == [413, "REGISTRO_GRANDE_DEMAIS"]
+    assert resultado["descricao"] == "Praça"
+
+def test_cursor_de_mudancas_vale_em_qualquer_worker(prefixo):
+    cadastro = _no_worker(prefixo, """
+        client.get("/restaurarDados")
+        # restaurarDados descarta o histórico: o 410 informa de onde continuar.
+        antes = client.get("/mudancas", params={"desde": 0}).json()["detail"]["sequencia_atual"]
+        bicicleta = client.post("/bicicleta", json={"marca": "Sense", "modelo": "Rock", "ano": "2024", "numero": 9}).json()
+        resultado = {"antes": antes, "id": bicicleta["id"]}
+    """)
+    leitura = _no_worker(prefixo, f"""
+        pagina = client.get("/mudancas", params={{"desde": {cadastro["antes"]}}}).json()
+        busca = client.get("/bicicleta/busca", params={{"q": "sense"}}).json()
+        resultado = {{"ids": [m["entidade_id"] for m in pagina["mudancas"]], "busca": [b["id"] for b in busca]}}
+    """)
+
+    assert leitura["ids"] == [cadastro["id"]]
+    assert leitura["busca"] == [cadastro["id"]]
+
+def test_idempotency_key_repetida_em_outro_worker_nao_executa_de_novo(prefixo):
+    roteiro = """
+        resposta = client.post("/tranca/1/destrancar", headers={"Idempotency-Key": "destrancar-1"})
+        resultado = [resposta.status_code, resposta.headers.get("idempotency-replayed")]
+    """
+    _no_worker(prefixo, 'client.get("/restaurarDados")\nresultado = None')
+
+    primeira = _no_worker(prefixo, roteiro)
+    repetida = _no_worker(prefixo, roteiro)
+
+    assert primeira == [200, None]
+    assert repetida == [200, "true"]
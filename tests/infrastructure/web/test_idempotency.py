@@ -0,0 +1,143 @@
+# tests/infrastructure/web/test_idempotency.py
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from main import app
+from src.equipamento.infrastructure.web.idempotency import (
+    ArmazemIdempotencia,
+    ArmazemIdempotenciaCompartilhado,
+    IdempotenciaMiddleware,
+)
+
+client = TestClient(app)
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_armazem_expira_entradas_apos_o_ttl():
+    relogio = RelogioFalso()
+    armazem = ArmazemIdempotencia(ttl_segundos=10, relogio=relogio)
+    armazem.guardar(("k", "POST", "/x"), 200, [], b"{}", "hash")
+
+    relogio.agora = 9
+    assert armazem.obter(("k", "POST", "/x")) is not None
+    relogio.agora = 11
+    assert armazem.obter(("k", "POST", "/x")) is None
+    assert len(armazem) == 0
+
+def test_armazem_descarta_as_entradas_mais_antigas_ao_atingir_capacidade():
+    armazem = ArmazemIdempotencia(capacidade=2)
+    for chave in ("a", "b", "c"):
+        armazem.guardar((chave, "POST", "/x"), 200, [], b"{}", "hash")
+
+    assert armazem.obter(("a", "POST", "/x")) is None
+    assert armazem.obter(("c", "POST", "/x")) is not None
+    assert len(armazem) == 2
+
+def test_destrancar_repetido_com_a_mesma_chave_devolve_a_resposta_original():
+    # Arrange: tranca 1 começa ocupada pela bicicleta 1 no estado inicial
+    client.get("/restaurarDados")
+    headers = {"Idempotency-Key": "destrancar-tranca-1"}
+
+    # Act
+    primeira = client.post("/tranca/1/destrancar", headers=headers)
+    repetida = client.post("/tranca/1/destrancar", headers=headers)
+    sem_chave = client.post("/tranca/1/destrancar")
+
+    # Assert
+    assert primeira.status_code == 200
+    assert repetida.status_code == 200
+    assert repetida.json() == primeira.json()
+    assert repetida.headers["idempotency-replayed"] == "true"
+    # Sem a chave o caso de uso roda de novo e a tranca já está livre
+    assert sem_chave.status_code == 422
+
+def test_reutilizar_chave_com_outro_corpo_e_rejeitado():
+    client.get("/restaurarDados")
+    headers = {"Idempotency-Key": "trancar-reuso"}
+    client.post("/tranca/1/destrancar")
+
+    client.post("/tranca/1/trancar", json={"bicicleta": 1}, headers=headers)
+    response = client.post("/tranca/1/trancar", json={"bicicleta": 3}, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["codigo"] == "CHAVE_IDEMPOTENCIA_REUTILIZADA"
+
+def test_duplicatas_concorrentes_aguardam_a_execucao_em_andamento():
+    execucoes = []
+    app_lento = FastAPI()
+
+    @app_lento.post("/acao")
+    async def acao():
+        execucoes.append(1)
+        await asyncio.sleep(0.05)
+        return {"execucao": len(execucoes)}
+
+    app_lento.add_middleware(IdempotenciaMiddleware)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app_lento)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            return await asyncio.gather(*[
+                cliente.post("/acao", headers={"Idempotency-Key": "mesma"}) for _ in range(5)
+            ])
+
+    respostas = asyncio.run(cenario())
+
+    assert len(execucoes) == 1
+    assert {r.json()["execucao"] for r in respostas} == {1}
+    assert sum(1 for r in respostas if r.headers.get("idempotency-replayed") == "true") == 4
+
+def test_duplicata_em_outro_worker_recebe_a_resposta_de_quem_executou(tmp_path):
+    # Dois middlewares sobre o mesmo arquivo fazem o papel de dois workers.
+    caminho = str(tmp_path / "idempotencia.sqlite3")
+    execucoes = []
+    app_lento = FastAPI()
+
+    @app_lento.post("/acao")
+    async def acao():
+        execucoes.append(1)
+        await asyncio.sleep(0.2)
+        return {"execucao": len(execucoes)}
+
+    worker_a = IdempotenciaMiddleware(app_lento, armazem=ArmazemIdempotenciaCompartilhado(caminho))
+    worker_b = IdempotenciaMiddleware(app_lento, armazem=ArmazemIdempotenciaCompartilhado(caminho))
+
+    async def cenario():
+        async def enviar(worker):
+            transporte = httpx.ASGITransport(app=worker)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+                return await cliente.post("/acao", headers={"Idempotency-Key": "mesma"})
+        return await asyncio.gather(enviar(worker_a), enviar(worker_b))
+
+    respostas = asyncio.run(cenario())
+
+    assert len(execucoes) == 1
+    assert [r.json() for r in respostas] == [{"execucao": 1}, {"execucao": 1}]
+    assert len(worker_b.armazem) == 1
+
+def test_armazem_compartilhado_retoma_execucao_abandonada(tmp_path):
+    relogio = RelogioFalso()
+    caminho = str(tmp_path / "idempotencia.sqlite3")
+    worker_a = ArmazemIdempotenciaCompartilhado(caminho, prazo_execucao=30, relogio=relogio)
+    worker_b = ArmazemIdempotenciaCompartilhado(caminho, prazo_execucao=30, relogio=relogio)
+    chave = ("k", "POST", "/x")
+
+    assert worker_a.reivindicar(chave)
+    assert not worker_b.reivindicar(chave)
+    relogio.agora = 31
+    # O worker A caiu sem responder: a chave volta a poder ser executada.
+    assert worker_b.reivindicar(chave)
+    worker_b.guardar(chave, 200, [(b"content-type", b"application/json")], b"{}", "hash")
+    assert worker_a.obter(chave).headers == [(b"content-type", b"application/json")]
+    assert not worker_a.reivindicar(chave)
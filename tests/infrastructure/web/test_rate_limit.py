@@ -0,0 +1,129 @@
+# tests/infrastructure/web/test_rate_limit.py
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.equipamento.infrastructure.web.rate_limit import (
+    BaldesDeFichas,
+    Limite,
+    LimitadorDeTaxa,
+    LimiteDeTaxaMiddleware,
+    ler_limites,
+)
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_ler_limites():
+    assert ler_limites("tranca=5/20, *=50/100") == {"tranca": Limite(5, 20), "*": Limite(50, 100)}
+    assert ler_limites("") == {}
+    for invalido in ("tranca=5", "tranca:5/20", "tranca=0/10", "tranca=5/0.5"):
+        with pytest.raises(ValueError):
+            ler_limites(invalido)
+
+def test_balde_esgota_a_rajada_e_reabastece_com_o_tempo():
+    relogio = RelogioFalso()
+    baldes = BaldesDeFichas(relogio=relogio)
+    limite = Limite(taxa=2, rajada=3)
+
+    assert [baldes.consumir("a", limite) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert baldes.consumir("a", limite) == pytest.approx(0.5)
+    # Outro cliente tem o seu próprio balde.
+    assert baldes.consumir("b", limite) == 0.0
+
+    relogio.agora = 0.5
+    assert baldes.consumir("a", limite) == 0.0
+    assert baldes.consumir("a", limite) > 0
+
+    # O balde nunca passa da rajada, por mais tempo que fique parado.
+    relogio.agora = 100.0
+    assert [baldes.consumir("a", limite) for _ in range(4)].count(0.0) == 3
+
+def test_lru_descarta_o_cliente_inativo_ha_mais_tempo():
+    baldes = BaldesDeFichas(capacidade=2, relogio=RelogioFalso())
+    limite = Limite(taxa=1, rajada=1)
+    baldes.consumir("a", limite)
+    baldes.consumir("b", limite)
+    baldes.consumir("a", limite)
+    baldes.consumir("c", limite)
+
+    assert len(baldes) == 2
+    assert baldes.descartados == 1
+    # "b" foi descartado e recomeça com o balde cheio; "a" continua sem fichas.
+    assert baldes.consumir("b", limite) == 0.0
+    assert baldes.consumir("c", limite) > 0
+
+def test_limitador_usa_o_limite_do_grupo_ou_o_padrao():
+    limitador = LimitadorDeTaxa(ler_limites("tranca=1/1,*=1/2"), BaldesDeFichas(relogio=RelogioFalso()))
+
+    assert limitador.verificar("ip:1", "/tranca/1") == 0.0
+    assert limitador.verificar("ip:1", "/tranca") > 0
+    assert [limitador.verificar("ip:1", "/bicicleta/3") for _ in range(3)].count(0.0) == 2
+    # Rotas fora dos grupos dividem o balde de "*".
+    assert [limitador.verificar("ip:1", "/admin/limites") for _ in range(3)].count(0.0) == 2
+    assert limitador.verificar("ip:1", "/docs") > 0
+    assert limitador.estatisticas()["recusadas"] == 4
+
+def test_sem_limite_padrao_rotas_fora_dos_grupos_passam_direto():
+    limitador = LimitadorDeTaxa(ler_limites("tranca=1/1"), BaldesDeFichas(relogio=RelogioFalso()))
+
+    assert all(limitador.verificar("ip:1", "/admin/limites") == 0.0 for _ in range(5))
+
+def test_middleware_responde_429_com_retry_after_por_chave_de_api():
+    app = FastAPI()
+
+    @app.get("/tranca")
+    def listar():
+        return []
+
+    limitador = LimitadorDeTaxa(ler_limites("tranca=0.5/2"), chaves={"a", "b"})
+    app.add_middleware(LimiteDeTaxaMiddleware, limitador=limitador)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            primeiro = [await cliente.get("/tranca", headers={"X-API-Key": "a"}) for _ in range(3)]
+            segundo = await cliente.get("/tranca", headers={"X-API-Key": "b"})
+            return primeiro, segundo
+
+    primeiro, segundo = asyncio.run(cenario())
+
+    assert [r.status_code for r in primeiro] == [200, 200, 429]
+    assert primeiro[2].headers["retry-after"] == "2"
+    assert primeiro[2].json()["detail"]["codigo"] == "LIMITE_DE_REQUISICOES"
+    assert segundo.status_code == 200
+
+def test_chave_fora_da_lista_conta_no_balde_do_ip():
+    app = FastAPI()
+
+    @app.get("/tranca")
+    def listar():
+        return []
+
+    limitador = LimitadorDeTaxa(ler_limites("tranca=0.5/2"), BaldesDeFichas(capacidade=2), chaves={"a"})
+    app.add_middleware(LimiteDeTaxaMiddleware, limitador=limitador)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            legitimo = await cliente.get("/tranca", headers={"X-API-Key": "a"})
+            # Trocar de chave a cada requisição não rende um balde novo.
+            trocando = [await cliente.get("/tranca", headers={"X-API-Key": f"falsa-{i}"}) for i in range(4)]
+            return legitimo, trocando
+
+    legitimo, trocando = asyncio.run(cenario())
+
+    assert legitimo.status_code == 200
+    assert [r.status_code for r in trocando] == [200, 200, 429, 429]
+    # Só dois baldes: o da chave conhecida continua no LRU.
+    assert limitador.estatisticas()["baldes"] == 2
+    assert limitador.baldes.descartados == 0
@@ -0,0 +1,54 @@
+# tests/infrastructure/web/test_runtime_stats.py
+
+import sys
+
+from src.equipamento.domain.entities import Bicicleta, StatusBicicleta
+from src.equipamento.infrastructure.repositories.mem_repository import MemBicicletaRepository
+from src.equipamento.infrastructure.web.runtime_stats import (
+    AmostradorDeAlocacoes,
+    contar_entidades,
+    tamanho_profundo,
+    tamanhos_profundos,
+)
+
+
+def test_tamanho_profundo_conta_cada_objeto_uma_vez():
+    compartilhada = ["x" * 1000]
+    raiz = {"a": compartilhada, "b": compartilhada}
+
+    tamanho = tamanho_profundo(raiz)
+
+    assert tamanho >= sys.getsizeof("x" * 1000) + sys.getsizeof(compartilhada) + sys.getsizeof(raiz)
+    assert tamanho < 2 * sys.getsizeof("x" * 1000)
+
+def test_tamanhos_profundos_deixam_os_reservados_para_depois():
+    cache = {"dados": "y" * 5000}
+    repositorio = {"entidades": list(range(10)), "cache": cache}
+    vistos: set = set()
+
+    repositorios = tamanhos_profundos({"repo": repositorio}, reservados=[cache], vistos=vistos)
+    caches = tamanhos_profundos({"cache": cache}, vistos=vistos)
+
+    assert repositorios["repo"] < 5000
+    assert caches["cache"] > 5000
+
+def test_contar_entidades_separa_vivas_e_excluidas():
+    repo = MemBicicletaRepository()
+    for numero in range(3):
+        repo.salvar(Bicicleta(id=None, marca="M", modelo="M", ano="2020", numero=numero, status=StatusBicicleta.NOVA))
+    repo.deletar(1)
+
+    assert contar_entidades(repo, repo.listar_todas) == {"vivas": 2, "excluidas": 1}
+
+def test_amostrador_mostra_o_crescimento_desde_a_amostra_anterior():
+    amostrador = AmostradorDeAlocacoes()
+    try:
+        assert amostrador.amostrar(5)["iniciado_agora"]
+        retidos = [bytearray(1024) for _ in range(2000)]
+        amostra = amostrador.amostrar(5)
+    finally:
+        amostrador.parar()
+
+    assert not amostra["iniciado_agora"]
+    assert amostra["crescimento"][0]["diferenca_bytes"] >= 1024 * len(retidos)
+    assert __file__ in amostra["crescimento"][0]["local"]
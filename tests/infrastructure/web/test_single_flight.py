@@ -0,0 +1,82 @@
+# tests/infrastructure/web/test_single_flight.py
+
+import threading
+
+import pytest
+
+from src.equipamento.infrastructure.web.single_flight import SingleFlight
+
+
+def _disparar_seguidores(single_flight, chave, quantidade, resultados):
+    def seguidor():
+        try:
+            resultados.append(single_flight.executar(chave, lambda: "nunca executado"))
+        except ValueError as e:
+            resultados.append(e)
+
+    threads = [threading.Thread(target=seguidor) for _ in range(quantidade)]
+    for t in threads:
+        t.start()
+    return threads
+
+def _aguardar_coalescidas(single_flight, quantidade):
+    while single_flight.estatisticas()["coalescidas"] < quantidade:
+        pass
+
+def test_chamadas_concorrentes_compartilham_uma_unica_execucao():
+    single_flight = SingleFlight()
+    liberar = threading.Event()
+    resultados = []
+
+    def computar():
+        liberar.wait()
+        return b"[corpo]"
+
+    lider = threading.Thread(target=lambda: resultados.append(single_flight.executar("totem-1", computar)))
+    lider.start()
+    while single_flight.estatisticas()["em_andamento"] == 0:
+        pass
+    seguidores = _disparar_seguidores(single_flight, "totem-1", 5, resultados)
+    _aguardar_coalescidas(single_flight, 5)
+    liberar.set()
+    for t in [lider, *seguidores]:
+        t.join()
+
+    assert resultados == [b"[corpo]"] * 6
+    assert single_flight.estatisticas() == {"execucoes": 1, "coalescidas": 5, "em_andamento": 0}
+
+def test_erro_do_lider_e_repassado_aos_seguidores():
+    single_flight = SingleFlight()
+    liberar = threading.Event()
+    resultados = []
+
+    def falhar():
+        liberar.wait()
+        raise ValueError("Totem não encontrado.")
+
+    def lider():
+        with pytest.raises(ValueError):
+            single_flight.executar("totem-9", falhar)
+
+    thread_lider = threading.Thread(target=lider)
+    thread_lider.start()
+    while single_flight.estatisticas()["em_andamento"] == 0:
+        pass
+    seguidores = _disparar_seguidores(single_flight, "totem-9", 3, resultados)
+    _aguardar_coalescidas(single_flight, 3)
+    liberar.set()
+    for t in [thread_lider, *seguidores]:
+        t.join()
+
+    assert len(resultados) == 3
+    assert all(isinstance(r, ValueError) for r in resultados)
+
+def test_resultado_nao_e_guardado_apos_a_execucao():
+    single_flight = SingleFlight()
+    chamadas = []
+
+    single_flight.executar("totem-1", lambda: chamadas.append(1))
+    single_flight.executar("totem-1", lambda: chamadas.append(2))
+
+    assert chamadas == [1, 2]
+    assert single_flight.estatisticas()["coalescidas"] == 0
@@ -0,0 +1,97 @@
+# tests/infrastructure/web/test_slow_requests.py
+
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.equipamento.infrastructure.web.slow_requests import (
+    RegistroDeLentas,
+    RequisicoesLentasMiddleware,
+    arquivo_rotativo,
+    instrumentar_chamadas,
+    instrumentar_passos,
+)
+
+
+class Repositorio:
+    def buscar_por_totem_id(self, totem_id):
+        return list(range(totem_id))
+
+    def buscar_por_id(self, entidade_id):
+        return entidade_id
+
+
+class ListarUseCase:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def execute(self, totem_id, atraso):
+        time.sleep(atraso)
+        return [self.repository.buscar_por_id(i) for i in self.repository.buscar_por_totem_id(totem_id)]
+
+
+class Pedido(BaseModel):
+    atraso: float
+
+
+def _app(registro):
+    repo = Repositorio()
+    caso_de_uso = ListarUseCase(repository=repo)
+    instrumentar_chamadas(repo, "repo")
+    instrumentar_passos(caso_de_uso, "ListarUseCase")
+
+    app = FastAPI()
+
+    @app.post("/totem/{totem_id}/trancas")
+    def listar(totem_id: int, pedido: Pedido):
+        return caso_de_uso.execute(totem_id, pedido.atraso)
+
+    app.add_middleware(RequisicoesLentasMiddleware, registro=registro)
+    return app
+
+
+def test_requisicao_lenta_registra_rota_parametros_passos_e_chamadas():
+    registro = RegistroDeLentas(limiar_ms=20)
+    cliente = TestClient(_app(registro))
+
+    cliente.post("/totem/3/trancas?origem=painel", json={"atraso": 0.03})
+
+    [lenta] = registro.recentes()
+    assert lenta["rota"] == "/totem/{totem_id}/trancas"
+    assert lenta["status"] == 200
+    assert lenta["parametros"]["caminho"] == {"totem_id": "3"}
+    assert lenta["parametros"]["consulta"] == "origem=painel"
+    assert json.loads(lenta["parametros"]["corpo"]) == {"atraso": 0.03}
+    assert lenta["passos"][0]["nome"] == "ListarUseCase"
+    assert lenta["passos"][0]["duracao_ms"] >= 30
+    assert lenta["chamadas"]["repo.buscar_por_id"]["quantidade"] == 3
+    assert lenta["chamadas"]["repo.buscar_por_totem_id"]["quantidade"] == 1
+
+def test_requisicoes_abaixo_do_limiar_sao_descartadas():
+    registro = RegistroDeLentas(limiar_ms=1000)
+    cliente = TestClient(_app(registro))
+
+    cliente.post("/totem/2/trancas", json={"atraso": 0})
+
+    assert registro.recentes() == []
+    assert registro.estatisticas() == {"limiar_ms": 1000, "requisicoes": 1, "lentas": 0}
+
+def test_lentas_vao_para_o_arquivo_rotativo(tmp_path):
+    caminho = tmp_path / "lentas.jsonl"
+    registro = RegistroDeLentas(limiar_ms=0.001, handler=arquivo_rotativo(str(caminho), max_bytes=2000, backups=2))
+    registro.iniciar()
+    cliente = TestClient(_app(registro))
+    # O arquivo só aparece com a primeira lenta.
+    assert not caminho.exists()
+
+    for _ in range(10):
+        cliente.post("/totem/1/trancas", json={"atraso": 0})
+    registro.parar()
+
+    linhas = caminho.read_text(encoding="utf-8").splitlines()
+    assert json.loads(linhas[-1])["rota"] == "/totem/{totem_id}/trancas"
+    assert (tmp_path / "lentas.jsonl.1").exists()
+    assert not (tmp_path / "lentas.jsonl.3").exists()
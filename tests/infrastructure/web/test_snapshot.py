@@ -0,0 +1,51 @@
+# tests/infrastructure/web/test_snapshot.py
+
+import gzip
+import json
+
+from src.equipamento.domain.entities import Bicicleta, Tranca, Totem, StatusBicicleta, StatusTranca
+from src.equipamento.infrastructure.web.snapshot import SnapshotEmCache, STATUS_BICICLETA, STATUS_TRANCA
+
+
+def _topologia():
+    totem = Totem(id=1, localizacao="Centro", descricao="D")
+    ocupada = Tranca(id=10, numero=1, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.OCUPADA, bicicleta_id=7)
+    livre = Tranca(id=11, numero=2, localizacao="L", ano_de_fabricacao="A", modelo="M", status=StatusTranca.DISPONIVEL)
+    bicicleta = Bicicleta(id=7, marca="T", modelo="T", ano="T", numero=1, status=StatusBicicleta.DISPONIVEL)
+    return [(totem, [(ocupada, bicicleta), (livre, None)])]
+
+def test_snapshot_codifica_status_como_indices_da_legenda():
+    snapshot = SnapshotEmCache(geracao=lambda: 3, montar=_topologia).obter()
+
+    documento = json.loads(snapshot.corpo)
+
+    assert documento["geracao"] == 3
+    [[totem_id, localizacao, trancas]] = documento["totens"]
+    assert (totem_id, localizacao) == (1, "Centro")
+    assert trancas[0] == [10, 1, STATUS_TRANCA.index(StatusTranca.OCUPADA), [7, STATUS_BICICLETA.index(StatusBicicleta.DISPONIVEL)]]
+    assert trancas[1][3] is None
+    assert gzip.decompress(snapshot.corpo_gzip) == snapshot.corpo
+
+def test_snapshot_so_e_remontado_quando_a_geracao_muda():
+    geracao = [1]
+    montagens = []
+    cache = SnapshotEmCache(geracao=lambda: geracao[0], montar=lambda: montagens.append(1) or _topologia())
+
+    primeiro = cache.obter()
+    assert cache.obter() is primeiro
+    geracao[0] = 2
+    segundo = cache.obter()
+
+    assert len(montagens) == 2
+    assert segundo.etag != primeiro.etag
+    assert cache.estatisticas() == {"reconstrucoes": 2, "acertos": 1}
+
+def test_invalidar_forca_remontagem_com_a_mesma_geracao():
+    montagens = []
+    cache = SnapshotEmCache(geracao=lambda: 1, montar=lambda: montagens.append(1) or _topologia())
+
+    cache.obter()
+    cache.invalidar()
+    cache.obter()
+
+    assert len(montagens) == 2
@@ -0,0 +1,112 @@
+# tests/infrastructure/web/test_sse.py
+
+import asyncio
+import threading
+import uuid
+
+from src.equipamento.domain.entities import Evento
+from src.equipamento.infrastructure.repositories.shm_events import ShmPublicadorDeEventos
+from src.equipamento.infrastructure.web.sse import DifusorDeEventos, RetransmissorDeEventos, formatar_evento_sse, transmitir_eventos
+
+
+def _evento(entidade="tranca", entidade_id=1, totem_id=1, status="OCUPADA"):
+    return Evento(tipo="TRANCA_TRANCADA", entidade=entidade, entidade_id=entidade_id, dados={"status": status}, totem_id=totem_id)
+
+
+def test_evento_publicado_por_outra_thread_chega_ao_assinante():
+    async def cenario():
+        difusor = DifusorDeEventos()
+        assinatura = difusor.inscrever()
+        publicador = threading.Thread(target=difusor.publicar, args=(_evento(),))
+        publicador.start()
+        publicador.join()
+        return await asyncio.wait_for(assinatura.proximo(), timeout=1)
+
+    evento = asyncio.run(cenario())
+
+    assert evento.entidade_id == 1
+
+def test_assinatura_filtra_por_totem_e_entidade():
+    async def cenario():
+        difusor = DifusorDeEventos()
+        assinatura = difusor.inscrever(totem_id=2, entidade="bicicleta")
+        difusor.publicar(_evento(entidade="bicicleta", entidade_id=1, totem_id=1))
+        difusor.publicar(_evento(entidade="tranca", entidade_id=2, totem_id=2))
+        difusor.publicar(_evento(entidade="bicicleta", entidade_id=3, totem_id=2))
+        return await asyncio.wait_for(assinatura.proximo(), timeout=1), assinatura
+
+    evento, assinatura = asyncio.run(cenario())
+
+    assert evento.entidade_id == 3
+    assert len(assinatura._pendentes) == 0
+
+def test_eventos_da_mesma_entidade_sao_coalescidos():
+    async def cenario():
+        difusor = DifusorDeEventos()
+        assinatura = difusor.inscrever()
+        difusor.publicar(_evento(status="OCUPADA"))
+        difusor.publicar(_evento(status="DISPONÍVEL"))
+        await asyncio.sleep(0)
+        return await assinatura.proximo(), assinatura
+
+    evento, assinatura = asyncio.run(cenario())
+
+    assert evento.dados["status"] == "DISPONÍVEL"
+    assert assinatura.coalescidos == 1
+
+def test_assinante_lento_descarta_os_eventos_mais_antigos_sem_bloquear():
+    async def cenario():
+        difusor = DifusorDeEventos()
+        assinatura = difusor.inscrever(capacidade=2)
+        for i in range(1, 6):
+            difusor.publicar(_evento(entidade_id=i))
+        await asyncio.sleep(0)
+        return [await assinatura.proximo(), await assinatura.proximo()], assinatura
+
+    eventos, assinatura = asyncio.run(cenario())
+
+    assert [e.entidade_id for e in eventos] == [4, 5]
+    assert assinatura.descartados == 3
+
+def test_transmissao_avisa_descartes_e_cancela_assinatura_ao_fechar():
+    async def cenario():
+        difusor = DifusorDeEventos()
+        assinatura = difusor.inscrever(capacidade=1)
+        difusor.publicar(_evento(entidade_id=1))
+        difusor.publicar(_evento(entidade_id=2))
+        await asyncio.sleep(0)
+        fluxo = transmitir_eventos(difusor, assinatura)
+        aviso = await fluxo.__anext__()
+        dados = await fluxo.__anext__()
+        await fluxo.aclose()
+        return aviso, dados, difusor.total_assinantes
+
+    aviso, dados, total = asyncio.run(cenario())
+
+    assert aviso.startswith("event: EVENTOS_DESCARTADOS")
+    assert dados == formatar_evento_sse(_evento(entidade_id=2))
+    assert total == 0
+
+def test_retransmissor_entrega_eventos_publicados_por_outro_worker(tmp_path):
+    prefixo = f"teste_sse_{uuid.uuid4().hex[:10]}"
+    outro_worker = ShmPublicadorDeEventos(prefixo, capacidade=4, diretorio_travas=str(tmp_path))
+    anel = ShmPublicadorDeEventos(prefixo, capacidade=4, diretorio_travas=str(tmp_path))
+    try:
+        async def cenario():
+            difusor = DifusorDeEventos()
+            retransmissor = RetransmissorDeEventos(anel, difusor)
+            # Sem assinantes o cursor só avança.
+            outro_worker.publicar(_evento(entidade_id=1))
+            assert retransmissor.repassar_agora() == 0
+            assinatura = difusor.inscrever()
+            outro_worker.publicar(_evento(entidade_id=2, status="LIVRE"))
+            retransmissor.repassar_agora()
+            return await asyncio.wait_for(assinatura.proximo(), timeout=1), retransmissor.estatisticas()
+
+        evento, estatisticas = asyncio.run(cenario())
+    finally:
+        outro_worker.fechar()
+        anel.destruir()
+
+    assert evento == _evento(entidade_id=2, status="LIVRE")
+    assert estatisticas == {"repassados": 1, "perdidos": 0, "falhas": 0}
@@ -0,0 +1,105 @@
+# tests/infrastructure/web/test_tracing.py
+
+import json
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.equipamento.infrastructure.web.tracing import (
+    ExportadorArquivoJson,
+    ExportadorEmMemoria,
+    Rastreador,
+    RastreamentoMiddleware,
+    classe_de_rota,
+    instrumentar,
+)
+
+
+class Repositorio:
+    def buscar_por_id(self, entidade_id):
+        if entidade_id < 0:
+            raise ValueError("id inválido")
+        return {"id": entidade_id}
+
+
+class CasoDeUso:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def execute(self, entidade_id):
+        return self.repository.buscar_por_id(entidade_id)
+
+
+def _app(rastreador):
+    repo = Repositorio()
+    caso_de_uso = CasoDeUso(repository=repo)
+    instrumentar(rastreador, repo, "repo")
+    instrumentar(rastreador, caso_de_uso, "CasoDeUso", metodos=["execute"])
+
+    router = APIRouter(route_class=classe_de_rota(rastreador))
+
+    @router.get("/item/{item_id}")
+    def buscar(item_id: int):
+        return caso_de_uso.execute(item_id)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RastreamentoMiddleware, rastreador=rastreador)
+    return app
+
+
+def test_spans_de_rota_caso_de_uso_e_repositorio_formam_um_rastro():
+    memoria = ExportadorEmMemoria()
+    cliente = TestClient(_app(Rastreador(amostragem=1.0, exportadores=[memoria])))
+
+    resposta = cliente.get("/item/7")
+
+    spans = {s["nome"]: s for s in memoria.recentes(10)}
+    assert list(spans) == ["repo.buscar_por_id", "CasoDeUso.execute", "rota.buscar", "GET /item/{item_id}"]
+    raiz = spans["GET /item/{item_id}"]
+    assert resposta.headers["x-trace-id"] == raiz["trace_id"]
+    assert {s["trace_id"] for s in spans.values()} == {raiz["trace_id"]}
+    assert spans["rota.buscar"]["pai_id"] == raiz["span_id"]
+    assert spans["CasoDeUso.execute"]["pai_id"] == spans["rota.buscar"]["span_id"]
+    assert spans["repo.buscar_por_id"]["pai_id"] == spans["CasoDeUso.execute"]["span_id"]
+    assert raiz["atributos"]["status"] == 200
+    assert {"validacao_ms", "serializacao_ms"} <= set(raiz["atributos"])
+
+def test_requisicoes_nao_amostradas_e_chamadas_fora_de_requisicao_nao_geram_spans():
+    memoria = ExportadorEmMemoria()
+    rastreador = Rastreador(amostragem=0.5, exportadores=[memoria], aleatorio=lambda: 0.9)
+    cliente = TestClient(_app(rastreador))
+
+    resposta = cliente.get("/item/7")
+    repo = Repositorio()
+    instrumentar(rastreador, repo, "repo")
+    repo.buscar_por_id(1)
+
+    assert resposta.json() == {"id": 7}
+    assert "x-trace-id" not in resposta.headers
+    assert memoria.recentes(10) == []
+
+def test_traceparent_amostrado_continua_o_rastro_de_quem_chamou():
+    memoria = ExportadorEmMemoria()
+    cliente = TestClient(_app(Rastreador(amostragem=0.01, exportadores=[memoria], aleatorio=lambda: 0.9)))
+    trace_id, pai_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    cliente.get("/item/1", headers={"traceparent": f"00-{trace_id}-{pai_id}-01"})
+    cliente.get("/item/2", headers={"traceparent": f"00-{trace_id}-{pai_id}-00"})
+
+    raiz = memoria.recentes(10)[-1]
+    assert (raiz["trace_id"], raiz["pai_id"]) == (trace_id, pai_id)
+    assert len(memoria.recentes(10)) == 4
+
+def test_exportador_json_grava_uma_linha_por_span_com_o_erro(tmp_path):
+    caminho = tmp_path / "rastros.jsonl"
+    arquivo = ExportadorArquivoJson(str(caminho))
+    rastreador = Rastreador(amostragem=1.0, exportadores=[arquivo])
+    cliente = TestClient(_app(rastreador), raise_server_exceptions=False)
+
+    cliente.get("/item/-1")
+    arquivo.fechar()
+
+    linhas = [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines()]
+    assert [linha["erro"] for linha in linhas[:3]] == ["ValueError"] * 3
+    assert rastreador.estatisticas()["exportados"] == 4